@@ -0,0 +1,3 @@
+"""
+LSL benchmark suite
+"""
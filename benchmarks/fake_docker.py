@@ -0,0 +1,337 @@
+"""
+Fake Docker Engine API
+
+This module implements a small in-process stand-in for the Docker daemon,
+used by the benchmarks when no real daemon is available. It includes:
+- An HTTP/1.1 server on a unix socket that docker-py and AsyncDockerClient can talk to
+- In-memory containers supporting create/start/stop/remove/inspect/list/wait
+- Published ports, with start failing when a host port is already allocated
+- Exec sessions that answer like a shell reaching its prompt
+- Attach sessions that echo their input like a terminal
+- Optional artificial per-request latency
+"""
+import os
+import re
+import json
+import time
+import struct
+import shutil
+import tempfile
+import threading
+import socketserver
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, Any, Optional
+
+# Output of exec sessions
+PROMPT_OUTPUT = b"lsl-ready\n"
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server on a unix socket"""
+
+    daemon_threads = True
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler routing Engine API calls to the FakeDockerDaemon"""
+
+    protocol_version = "HTTP/1.1"
+
+    def address_string(self) -> str:
+        return "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _dispatch(self, method: str) -> None:
+        daemon: "FakeDockerDaemon" = self.server.daemon
+        url = urlparse(self.path)
+        # Strip the optional API version prefix
+        path = re.sub(r"^/v[0-9.]+", "", url.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        if daemon.latency:
+            time.sleep(daemon.latency)
+        daemon.request_count += 1
+
+        route = daemon.route(method, path, query, body)
+        if route == "hijack":
+            self._exec_stream()
+            return
+        if route == "attach":
+            self._attach_stream()
+            return
+        status, payload = route
+        if isinstance(payload, str):
+            self._send_text(status, payload)
+        else:
+            self._send_json(status, payload)
+
+    def _send_json(self, status: int, payload: Any) -> None:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.send_response(status)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if data and self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _send_text(self, status: int, text: str) -> None:
+        data = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    def _exec_stream(self) -> None:
+        self.send_response(101)
+        self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Upgrade", "tcp")
+        self.end_headers()
+        self.wfile.flush()
+        # Clients read the hijacked socket directly; like a real shell, answer after a moment
+        time.sleep(self.server.daemon.exec_delay)
+        self.wfile.write(struct.pack(">BxxxL", 1, len(PROMPT_OUTPUT)) + PROMPT_OUTPUT)
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _attach_stream(self) -> None:
+        self.send_response(101)
+        self.send_header("Content-Type", "application/vnd.docker.raw-stream")
+        self.send_header("Connection", "Upgrade")
+        self.send_header("Upgrade", "tcp")
+        self.end_headers()
+        self.wfile.flush()
+        # A TTY stream is not multiplexed: echo input back until the client closes its side
+        while True:
+            data = self.connection.recv(65536)
+            if not data:
+                break
+            self.wfile.write(data)
+            self.wfile.flush()
+        self.close_connection = True
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_HEAD(self) -> None:
+        self._dispatch("HEAD")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+
+class FakeDockerDaemon:
+    """
+    Fake Docker Daemon
+
+    Serves enough of the Engine API for container start benchmarks.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, latency: float = 0.0,
+                 exec_delay: float = 0.005):
+        """
+        Initialize the fake daemon
+
+        Args:
+            socket_path: Unix socket to listen on, a temporary path if not given
+            latency: Artificial delay added to every request, in seconds
+            exec_delay: Delay before an exec session produces output, in seconds
+        """
+        self._temp_dir = None
+        if socket_path is None:
+            # Unix socket paths are length limited, so keep them short
+            self._temp_dir = tempfile.mkdtemp(prefix="lslfd")
+            socket_path = os.path.join(self._temp_dir, "docker.sock")
+        self.socket_path = socket_path
+        self.latency = latency
+        self.exec_delay = exec_delay
+        self.request_count = 0
+
+        self.containers: Dict[str, Dict[str, Any]] = {}
+        self.execs: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[_UnixHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """Docker host URL of the fake daemon"""
+        return f"unix://{self.socket_path}"
+
+    def start(self) -> "FakeDockerDaemon":
+        """
+        Start serving on a background thread
+
+        Returns:
+            The daemon itself
+        """
+        self._server = _UnixHTTPServer(self.socket_path, _Handler)
+        self._server.daemon = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True,
+                                        name="FakeDockerDaemon")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and remove the socket"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        if self._temp_dir:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+    def __enter__(self) -> "FakeDockerDaemon":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _find(self, ref: str) -> Optional[Dict[str, Any]]:
+        """Find a container by ID, ID prefix or name"""
+        for container in self.containers.values():
+            if container["Id"].startswith(ref) or container["Name"] == f"/{ref}":
+                return container
+        return None
+
+    @staticmethod
+    def _ports(container: Dict[str, Any]) -> list:
+        """Build the Ports list of a /containers/json entry"""
+        ports = []
+        for key, bindings in (container["HostConfig"].get("PortBindings") or {}).items():
+            private_port, _, protocol = key.partition("/")
+            for binding in bindings or []:
+                if binding.get("HostPort"):
+                    ports.append({"IP": binding.get("HostIp") or "0.0.0.0", "PrivatePort": int(private_port),
+                                  "PublicPort": int(binding["HostPort"]), "Type": protocol or "tcp"})
+        return ports
+
+    def _summary(self, container: Dict[str, Any]) -> Dict[str, Any]:
+        """Build a /containers/json entry"""
+        return {
+            "Id": container["Id"],
+            "Names": [container["Name"]],
+            "Image": container["Config"]["Image"],
+            "State": container["State"]["Status"],
+            "Created": container["CreatedTs"],
+            "Labels": container["Config"].get("Labels") or {},
+            "Ports": self._ports(container) if container["State"]["Running"] else []
+        }
+
+    def route(self, method: str, path: str, query: Dict[str, str], body: Any) -> Any:
+        """
+        Handle one API request
+
+        Args:
+            method: HTTP method
+            path: Path without version prefix
+            query: Query parameters
+            body: Decoded JSON body
+
+        Returns:
+            Tuple of (status, JSON payload), "hijack" for exec streams or "attach" for attach streams
+        """
+        with self._lock:
+            if path == "/_ping":
+                return 200, "OK"
+            if path == "/version":
+                return 200, {"ApiVersion": "1.43", "Version": "fake", "MinAPIVersion": "1.12"}
+
+            if method == "GET" and path == "/containers/json":
+                filters = json.loads(query.get("filters") or "{}")
+                labels = filters.get("label", [])
+                result = []
+                for container in self.containers.values():
+                    if query.get("all") not in ("1", "true", "True") and container["State"]["Status"] != "running":
+                        continue
+                    container_labels = container["Config"].get("Labels") or {}
+                    if all(container_labels.get(l.split("=", 1)[0]) == l.split("=", 1)[1]
+                           for l in labels if "=" in l):
+                        result.append(self._summary(container))
+                return 200, result
+
+            if method == "POST" and path == "/containers/create":
+                name = query.get("name") or f"fake_{len(self.containers)}"
+                if self._find(name):
+                    return 409, {"message": f"Conflict. The container name \"/{name}\" is already in use"}
+                container_id = os.urandom(32).hex()
+                self.containers[container_id] = {
+                    "Id": container_id,
+                    "Name": f"/{name}",
+                    "Created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                    "CreatedTs": int(time.time()),
+                    "Config": dict(body or {}),
+                    "HostConfig": (body or {}).get("HostConfig", {}),
+                    "State": {"Status": "created", "Running": False, "Paused": False}
+                }
+                return 201, {"Id": container_id, "Warnings": []}
+
+            match = re.fullmatch(r"/containers/([^/]+)(/[a-z]+)?", path)
+            if match:
+                container = self._find(match.group(1))
+                if container is None:
+                    return 404, {"message": f"No such container: {match.group(1)}"}
+                action = match.group(2)
+                state = container["State"]
+                if method == "GET" and action == "/json":
+                    return 200, {key: value for key, value in container.items() if key != "CreatedTs"}
+                if method == "POST" and action in ("/start", "/unpause"):
+                    if action == "/start" and not state["Running"]:
+                        in_use = {port["PublicPort"] for other in self.containers.values()
+                                  if other["State"]["Running"] for port in self._ports(other)}
+                        for port in self._ports(container):
+                            if port["PublicPort"] in in_use:
+                                return 500, {"message": f"driver failed programming external connectivity: "
+                                                        f"Bind for 0.0.0.0:{port['PublicPort']} failed: "
+                                                        f"port is already allocated"}
+                    state.update(Status="running", Running=True, Paused=False)
+                    return 204, None
+                if method == "POST" and action == "/attach":
+                    return "attach"
+                if method == "POST" and action == "/resize":
+                    return 200, None
+                if method == "POST" and action == "/wait":
+                    state.update(Status="exited", Running=False, Paused=False)
+                    return 200, {"StatusCode": 0}
+                if method == "POST" and action in ("/stop", "/kill"):
+                    state.update(Status="exited", Running=False, Paused=False)
+                    return 204, None
+                if method == "POST" and action == "/pause":
+                    state.update(Status="paused", Paused=True)
+                    return 204, None
+                if method == "POST" and action == "/rename":
+                    container["Name"] = f"/{query.get('name')}"
+                    return 204, None
+                if method == "POST" and action == "/exec":
+                    exec_id = os.urandom(16).hex()
+                    self.execs[exec_id] = container["Id"]
+                    return 201, {"Id": exec_id}
+                if method == "DELETE" and action is None:
+                    if state["Running"] and query.get("force") not in ("1", "true", "True"):
+                        return 409, {"message": "You cannot remove a running container"}
+                    del self.containers[container["Id"]]
+                    return 204, None
+
+            match = re.fullmatch(r"/exec/([^/]+)/(start|json)", path)
+            if match and match.group(1) in self.execs:
+                if match.group(2) == "start":
+                    return "hijack"
+                return 200, {"ID": match.group(1), "Running": False, "ExitCode": 0}
+
+            if path.startswith("/images/"):
+                return 200, {"Id": "sha256:fake", "RepoDigests": []}
+
+            return 404, {"message": f"page not found: {method} {path}"}
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Shared Host Flow Benchmark
+
+This script measures the docker round-trips of `lsl.py --host-shared`, from
+resolving the session image to a running SSH container, in two variants:
+- cli: the docker CLI sequence lsl.py used to spawn, one process per step
+  (`docker image inspect` for the base and derived image, `docker ps`,
+  `docker run -d`)
+- engine: the same steps through LocalEngine over one persistent Engine API
+  connection (image inspects, published_ports, run_detached)
+
+The engine variant runs against the real Docker daemon when one is
+reachable, and against the in-process fake Engine API otherwise. The cli
+variant needs a docker binary and a real daemon, and is reported as skipped
+without them. Results are reported as p50/p95/p99 per step and can be
+written as JSON.
+
+Usage:
+    python -m benchmarks.shared_host --iterations 20 --output shared.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from typing import Dict, Any, List, Optional
+
+# Add the project root to the path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.fake_docker import FakeDockerDaemon
+from benchmarks.start_latency import PhaseTimer, detect_backend, summarize
+
+# Steps in report order
+STEPS = ["image", "ports", "run"]
+
+# Command of the benchmark containers
+IDLE_COMMAND = ["sleep", "300"]
+
+# First host port published by benchmark containers
+BASE_PORT = 41000
+
+# Format version of the JSON results
+RESULTS_VERSION = 1
+
+
+def time_command(command: List[str]) -> float:
+    """
+    Time a docker CLI command from spawn to exit
+
+    Args:
+        command: Command to run
+
+    Returns:
+        Wall-clock duration in seconds
+    """
+    started = time.perf_counter()
+    subprocess.call(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def bench_cli(iterations: int, image: str) -> Dict[str, Any]:
+    """
+    Benchmark the docker CLI sequence of the shared host flow
+
+    Args:
+        iterations: Number of measured runs
+        image: Base image of the session
+
+    Returns:
+        Per-step summaries, or a 'skipped' reason
+    """
+    docker_cli = shutil.which("docker")
+    if docker_cli is None:
+        return {"skipped": "docker CLI not installed"}
+
+    timer = PhaseTimer()
+    for i in range(iterations):
+        name = f"lsl-bench-shared-cli-{os.getpid()}-{i}"
+        # Base image digest, then the derived image, as ensure_setup_image did
+        timer.record("image", time_command([docker_cli, "image", "inspect", "--format", "{{.Id}}", image])
+                     + time_command([docker_cli, "image", "inspect", "--format", "{{.Id}}", image]))
+        timer.record("ports", time_command([docker_cli, "ps", "--format", "{{.Names}}\t{{.Ports}}"]))
+        timer.record("run", time_command([docker_cli, "run", "-d", "--rm", "-p", f"{BASE_PORT + i}:22",
+                                          "--name", name, image] + IDLE_COMMAND))
+        subprocess.call([docker_cli, "rm", "-f", name], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return _report(timer)
+
+
+def bench_engine(iterations: int, image: str, state_dir: str) -> Dict[str, Any]:
+    """
+    Benchmark the Engine API path of the shared host flow
+
+    Args:
+        iterations: Number of measured runs
+        image: Base image of the session
+        state_dir: Directory holding the derived image build locks
+
+    Returns:
+        Per-step summaries
+    """
+    from client.engine import LocalEngine
+
+    engine = LocalEngine(state_dir=state_dir)
+    engine.ensure_image(image)
+
+    def resolve_image() -> None:
+        # Base image digest, then the derived image, as SetupImageBuilder does once it is built
+        engine.api.inspect_image(image)
+        engine.api.inspect_image(image)
+
+    timer = PhaseTimer()
+    for i in range(iterations):
+        name = f"lsl-bench-shared-engine-{os.getpid()}-{i}"
+        timer.measure("image", resolve_image)
+        timer.measure("ports", engine.published_ports)
+        container_id = timer.measure("run", lambda: engine.run_detached(
+            image, IDLE_COMMAND, name=name, ports={22: BASE_PORT + i}))
+        engine.remove(container_id)
+    return _report(timer)
+
+
+def _report(timer: PhaseTimer) -> Dict[str, Any]:
+    """
+    Summarize the steps of one variant
+
+    Args:
+        timer: Timer holding the step samples
+
+    Returns:
+        Dictionary of step name to summary, plus the per-run total
+    """
+    steps = {step: summarize(timer.samples[step]) for step in STEPS if step in timer.samples}
+    runs = min((len(timer.samples[step]) for step in steps), default=0)
+    steps["total"] = summarize([sum(timer.samples[step][i] for step in steps) for i in range(runs)])
+    return steps
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    """
+    Print a human readable summary
+
+    Args:
+        results: Benchmark results
+    """
+    print(f"Backend: {results['backend']}, iterations: {results['iterations']}")
+    for variant, steps in results["variants"].items():
+        print(f"\n{variant}")
+        if "skipped" in steps:
+            print(f"  skipped: {steps['skipped']}")
+            continue
+        print(f"  {'step':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for step, summary in steps.items():
+            print(f"  {step:<10}{summary['p50'] * 1000:>10.1f}"
+                  f"{summary['p95'] * 1000:>10.1f}{summary['p99'] * 1000:>10.1f}")
+
+    speedup = results.get("speedup")
+    if speedup:
+        print(f"\nEngine API p50 speedup over the CLI: {speedup:.1f}x")
+
+
+def run(iterations: int = 10, backend: str = "auto", image: str = "alpine:latest",
+        fake_latency: float = 0.0) -> Dict[str, Any]:
+    """
+    Run the shared host flow benchmarks
+
+    Args:
+        iterations: Number of measured runs per variant
+        backend: "auto", "docker" or "fake"
+        image: Base image of the session
+        fake_latency: Artificial per-request latency of the fake Engine API, in seconds
+
+    Returns:
+        Machine-readable results
+    """
+    backend = detect_backend(backend)
+    state_dir = tempfile.mkdtemp(prefix="lsl-bench-shared-")
+
+    fake = None
+    previous_host = os.environ.get("DOCKER_HOST")
+    if backend == "fake":
+        fake = FakeDockerDaemon(latency=fake_latency).start()
+        os.environ["DOCKER_HOST"] = fake.base_url
+
+    results = {
+        "version": RESULTS_VERSION,
+        "timestamp": time.time(),
+        "backend": backend,
+        "image": image,
+        "iterations": iterations,
+        "python": platform.python_version(),
+        "platform": f"{platform.system()}-{platform.release()}-{platform.machine()}",
+        "variants": {}
+    }
+    try:
+        if backend == "docker":
+            results["variants"]["cli"] = bench_cli(iterations, image)
+        else:
+            results["variants"]["cli"] = {"skipped": "no Docker daemon"}
+        results["variants"]["engine"] = bench_engine(iterations, image, state_dir)
+    finally:
+        if fake is not None:
+            fake.stop()
+            if previous_host is None:
+                os.environ.pop("DOCKER_HOST", None)
+            else:
+                os.environ["DOCKER_HOST"] = previous_host
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    cli_total = results["variants"]["cli"].get("total")
+    engine_total = results["variants"]["engine"]["total"]
+    if cli_total and engine_total["p50"] > 0:
+        results["speedup"] = cli_total["p50"] / engine_total["p50"]
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description='LSL shared host flow benchmark (docker CLI vs Engine API)')
+    parser.add_argument('-n', '--iterations', type=int, default=10, help='Measured runs per variant')
+    parser.add_argument('--backend', choices=['auto', 'docker', 'fake'], default='auto',
+                        help='Docker backend (auto uses the real daemon when reachable)')
+    parser.add_argument('--image', default='alpine:latest', help='Base image of the session')
+    parser.add_argument('--fake-latency', type=float, default=0.0,
+                        help='Per-request latency of the fake Docker API in milliseconds')
+    parser.add_argument('-o', '--output', help='Write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    results = run(
+        iterations=args.iterations,
+        backend=args.backend,
+        image=args.image,
+        fake_latency=args.fake_latency / 1000.0
+    )
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
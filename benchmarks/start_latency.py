@@ -0,0 +1,534 @@
+#!/usr/bin/env python3
+"""
+Container Start Latency Benchmark
+
+This script measures how long it takes to get a container shell, phase by
+phase, for both `lsl.py -n <name>` and `ContainerManager.start_container`:
+- startup: process start and imports
+- config_load: loading the client config / containers.txt
+- server_sync: syncing the container catalog with the server
+- volume_prep: preparing host volume directories
+- create / start: creating and starting the container (for lsl.py, through
+  the Engine API as LocalEngine.run_interactive does)
+- first_prompt: time until a shell in the container answers
+
+It runs against the real Docker daemon when one is reachable, and against
+the in-process fake Engine API otherwise. Results are reported as
+p50/p95/p99 and can be written as JSON and compared against a baseline.
+
+Usage:
+    python -m benchmarks.start_latency --iterations 20 --output start.json
+    python -m benchmarks.start_latency --baseline start.json --tolerance 0.25
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Callable
+
+# Add the project root to the path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.fake_docker import FakeDockerDaemon
+
+# Phases in report order
+PHASES = ["startup", "config_load", "server_sync", "volume_prep", "create", "start", "first_prompt"]
+
+# Template name used for benchmark containers
+TEMPLATE = "lsl-bench"
+
+# Command used to detect the first shell prompt
+PROMPT_COMMAND = ["/bin/sh", "-c", "echo lsl-ready"]
+
+# Format version of the JSON results
+RESULTS_VERSION = 1
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile
+
+    Args:
+        samples: Measured values
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Percentile value, 0.0 for no samples
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(-(-pct * len(ordered) // 100)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """
+    Summarize the samples of one phase
+
+    Args:
+        samples: Measured durations in seconds
+
+    Returns:
+        Dictionary with count, p50/p95/p99, mean, min, max and raw samples
+    """
+    return {
+        "count": len(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "mean": sum(samples) / len(samples) if samples else 0.0,
+        "min": min(samples) if samples else 0.0,
+        "max": max(samples) if samples else 0.0,
+        "samples": [round(sample, 6) for sample in samples]
+    }
+
+
+class PhaseTimer:
+    """Collects per-phase durations over several iterations"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    def measure(self, phase: str, func: Callable[[], Any]) -> Any:
+        """
+        Time one call and record it under a phase
+
+        Args:
+            phase: Phase name
+            func: Callable to time
+
+        Returns:
+            Result of the callable
+        """
+        started = time.perf_counter()
+        result = func()
+        self.samples.setdefault(phase, []).append(time.perf_counter() - started)
+        return result
+
+    def record(self, phase: str, duration: float) -> None:
+        """
+        Record an externally measured duration
+
+        Args:
+            phase: Phase name
+            duration: Duration in seconds
+        """
+        self.samples.setdefault(phase, []).append(duration)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize all phases
+
+        Returns:
+            Dictionary of phase name to summary, plus the per-iteration total
+        """
+        phases = {phase: summarize(self.samples[phase]) for phase in PHASES if phase in self.samples}
+        for phase in self.samples:
+            if phase not in phases:
+                phases[phase] = summarize(self.samples[phase])
+
+        iterations = min((len(self.samples[p]) for p in PHASES if p in self.samples), default=0)
+        totals = [sum(self.samples[p][i] for p in PHASES if p in self.samples) for i in range(iterations)]
+        phases["total"] = summarize(totals)
+        return phases
+
+
+class _CatalogHandler(BaseHTTPRequestHandler):
+    """Serves /get_config for the local catalog server"""
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        data = json.dumps(self.server.catalog).encode("utf-8")
+        self.send_response(200 if self.path.startswith("/get_config") else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_catalog_server(catalog: Dict[str, Any]) -> ThreadingHTTPServer:
+    """
+    Start a local LSL server stub serving a container catalog
+
+    Args:
+        catalog: Server config returned by /get_config
+
+    Returns:
+        Running server (call shutdown() to stop it)
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CatalogHandler)
+    server.catalog = catalog
+    threading.Thread(target=server.serve_forever, daemon=True, name="LSLBenchCatalog").start()
+    return server
+
+
+def time_subprocess(command: List[str], env: Optional[Dict[str, str]] = None) -> float:
+    """
+    Time a subprocess from spawn to exit
+
+    Args:
+        command: Command to run
+        env: Environment of the process
+
+    Returns:
+        Wall-clock duration in seconds
+    """
+    started = time.perf_counter()
+    subprocess.call(command, cwd=PROJECT_ROOT, env=env,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def bench_container_manager(iterations: int, image: str, work_dir: str,
+                            measure_startup: bool = True) -> Dict[str, Any]:
+    """
+    Benchmark ContainerManager.start_container phase by phase
+
+    Args:
+        iterations: Number of measured starts
+        image: Image of the benchmark template
+        work_dir: Scratch directory for configs and volumes
+        measure_startup: Whether to measure process startup in a subprocess
+
+    Returns:
+        Dictionary with phase summaries and end-to-end start_container timings
+    """
+    from client.config import ClientConfig
+    from client.containers import ContainerManager
+
+    volume_dir = os.path.join(work_dir, "volume")
+    catalog = {"containers": {TEMPLATE: {
+        "image": image,
+        "description": "Start latency benchmark",
+        "volumes": [{"host_path": volume_dir, "container_path": "/bench"}]
+    }}}
+    server = start_catalog_server(catalog)
+
+    config_path = os.path.join(work_dir, "config.yaml")
+    client_config = ClientConfig(config_path=config_path)
+    client_config.config["server"]["url"] = f"http://127.0.0.1:{server.server_address[1]}"
+    client_config.config["settings"].update({
+        "prefetch_images": False,
+        "container_cache_dir": os.path.join(work_dir, "cache")
+    })
+    client_config._save_config(client_config.config, immediate=True)
+
+    timer = PhaseTimer()
+    end_to_end: List[float] = []
+    try:
+        for iteration in range(iterations):
+            if measure_startup:
+                timer.record("startup", time_subprocess([sys.executable, "-c", "import client.containers"]))
+
+            config = timer.measure("config_load", lambda: ClientConfig(config_path=config_path))
+            manager = ContainerManager(config)
+            timer.measure("server_sync", manager.config_sync.force_sync)
+            template = manager.config_sync.get_available_containers()[TEMPLATE]
+
+            shutil.rmtree(volume_dir, ignore_errors=True)
+            options = timer.measure("volume_prep", lambda: manager._build_run_options(TEMPLATE, template))
+
+            docker_client = manager.docker_client
+            name = f"lsl-bench-{os.getpid()}-{iteration}"
+            container = timer.measure("create", lambda: docker_client.containers.create(
+                name=name, labels=manager._build_labels(TEMPLATE), **options))
+            try:
+                timer.measure("start", container.start)
+                timer.measure("first_prompt", lambda: _wait_for_prompt(docker_client, container.id))
+            finally:
+                docker_client.api.remove_container(container.id, force=True, v=True)
+
+            # The public API in one call, for comparison with the phase sum
+            started = time.perf_counter()
+            success, message = manager.start_container(TEMPLATE)
+            end_to_end.append(time.perf_counter() - started)
+            if not success:
+                raise RuntimeError(message)
+            manager.remove_container(TEMPLATE, force=True, remove_volumes=True)
+            manager.teardown.shutdown()
+    finally:
+        server.shutdown()
+
+    phases = timer.report()
+    phases["start_container"] = summarize(end_to_end)
+    return phases
+
+
+def bench_lsl_cli(iterations: int, image: str, work_dir: str, env: Dict[str, str],
+                  measure_startup: bool = True) -> Dict[str, Any]:
+    """
+    Benchmark the phases of `lsl.py -n <name>`
+
+    lsl.py drives the Engine API through one LocalEngine (see
+    LocalEngine.run_interactive): create is the container creation, start
+    covers attaching the TTY stream, starting the container and sizing its
+    TTY, and first_prompt runs a command in it. lsl.py has no server sync.
+
+    Args:
+        iterations: Number of measured starts
+        image: Image to start
+        work_dir: Scratch directory for containers.txt and volumes
+        env: Environment of the startup subprocess (DOCKER_HOST); LSL_CONTAINERS_FILE is added
+        measure_startup: Whether to measure process startup in a subprocess
+
+    Returns:
+        Dictionary with phase summaries
+    """
+    import lsl
+
+    # lsl.py reads local overrides from LSL_CONTAINERS_FILE, not the working directory
+    containers_file = os.path.join(work_dir, "containers.txt")
+    with open(containers_file, "w") as f:
+        f.write(f"{TEMPLATE}={image}\n")
+    env = dict(env, LSL_CONTAINERS_FILE=containers_file)
+    previous_file = os.environ.get("LSL_CONTAINERS_FILE")
+    os.environ["LSL_CONTAINERS_FILE"] = containers_file
+    # A fresh engine for the current DOCKER_HOST, not one left over from an earlier run
+    lsl._engine = None
+
+    timer = PhaseTimer()
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        engine = lsl.get_engine()
+        for iteration in range(iterations):
+            if measure_startup:
+                timer.record("startup", time_subprocess(
+                    [sys.executable, os.path.join(PROJECT_ROOT, "lsl.py"), "--help"], env))
+
+            # Resolving the name is part of the load, and fails loudly if the template is not found
+            template_image = timer.measure("config_load", lambda: lsl.load_config()[TEMPLATE])
+            volume_dir = os.path.join(work_dir, f".lsl_persist_{TEMPLATE}")
+            shutil.rmtree(volume_dir, ignore_errors=True)
+            timer.measure("volume_prep", lambda: os.makedirs(volume_dir, exist_ok=True))
+
+            name = f"lsl-bench-cli-{os.getpid()}-{iteration}"
+            container_id = timer.measure("create", lambda: engine.create(
+                template_image, ["/bin/sh"], name=name, interactive=True, auto_remove=False,
+                binds=[f"{volume_dir}:/data"]))
+            stream_fd = None
+            try:
+                def start():
+                    nonlocal stream_fd
+                    # Same order as run_interactive: attach first so no output is missed
+                    stream_fd = engine.attach(container_id)
+                    engine.start(container_id)
+                    engine.resize(container_id, 80, 24)
+
+                timer.measure("start", start)
+                timer.measure("first_prompt", lambda: _wait_for_prompt(engine, container_id))
+            finally:
+                if stream_fd is not None:
+                    os.close(stream_fd)
+                engine.remove(container_id)
+    finally:
+        os.chdir(previous_dir)
+        lsl._engine = None
+        if previous_file is None:
+            os.environ.pop("LSL_CONTAINERS_FILE", None)
+        else:
+            os.environ["LSL_CONTAINERS_FILE"] = previous_file
+
+    return timer.report()
+
+
+def _wait_for_prompt(docker_client, container_id: str) -> bytes:
+    """
+    Run a command through exec and wait for its output
+
+    Args:
+        docker_client: docker-py client, or a LocalEngine
+        container_id: Container ID
+
+    Returns:
+        Output of the prompt command
+    """
+    exec_id = docker_client.api.exec_create(container_id, PROMPT_COMMAND)["Id"]
+    return docker_client.api.exec_start(exec_id)
+
+
+def detect_backend(requested: str) -> str:
+    """
+    Decide whether to benchmark the real daemon or the fake Engine API
+
+    Args:
+        requested: "auto", "docker" or "fake"
+
+    Returns:
+        "docker" or "fake"
+    """
+    if requested != "auto":
+        return requested
+    try:
+        import docker
+        docker.from_env(timeout=2).ping()
+        return "docker"
+    except Exception:
+        return "fake"
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float, metric: str = "p95") -> List[str]:
+    """
+    Find phases that got slower than a baseline
+
+    Args:
+        results: Current results
+        baseline: Results of an earlier run
+        tolerance: Allowed relative slowdown (0.25 = 25%)
+        metric: Summary statistic to compare
+
+    Returns:
+        List of regression descriptions
+    """
+    regressions = []
+    for target, phases in results["targets"].items():
+        base_phases = baseline.get("targets", {}).get(target, {})
+        for phase, summary in phases.items():
+            base = base_phases.get(phase)
+            if not isinstance(summary, dict) or not isinstance(base, dict) or metric not in base:
+                continue
+            if base[metric] > 0 and summary[metric] > base[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{target}.{phase} {metric} {summary[metric] * 1000:.1f}ms "
+                    f"(baseline {base[metric] * 1000:.1f}ms)"
+                )
+    return regressions
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    """
+    Print a human readable summary
+
+    Args:
+        results: Benchmark results
+    """
+    print(f"Backend: {results['backend']}, iterations: {results['iterations']}")
+    for target, phases in results["targets"].items():
+        print(f"\n{target}")
+        print(f"  {'phase':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for phase, summary in phases.items():
+            if not isinstance(summary, dict):
+                print(f"  {phase}: {summary}")
+                continue
+            print(f"  {phase:<16}{summary['p50'] * 1000:>10.1f}"
+                  f"{summary['p95'] * 1000:>10.1f}{summary['p99'] * 1000:>10.1f}")
+
+
+def run(iterations: int = 10, backend: str = "auto", image: str = "alpine:latest",
+        targets: Optional[List[str]] = None, measure_startup: bool = True,
+        fake_latency: float = 0.0) -> Dict[str, Any]:
+    """
+    Run the start latency benchmarks
+
+    Args:
+        iterations: Number of measured starts per target
+        backend: "auto", "docker" or "fake"
+        image: Image of the benchmark container
+        targets: Targets to run ("container_manager", "lsl_cli"), all if not given
+        measure_startup: Whether to measure process startup in a subprocess
+        fake_latency: Artificial per-request latency of the fake Engine API, in seconds
+
+    Returns:
+        Machine-readable results
+    """
+    targets = targets or ["container_manager", "lsl_cli"]
+    backend = detect_backend(backend)
+    work_dir = tempfile.mkdtemp(prefix="lsl-bench-")
+
+    fake = None
+    previous_host = os.environ.get("DOCKER_HOST")
+    if backend == "fake":
+        fake = FakeDockerDaemon(latency=fake_latency).start()
+        os.environ["DOCKER_HOST"] = fake.base_url
+
+    results = {
+        "version": RESULTS_VERSION,
+        "timestamp": time.time(),
+        "backend": backend,
+        "image": image,
+        "iterations": iterations,
+        "python": platform.python_version(),
+        "platform": f"{platform.system()}-{platform.release()}-{platform.machine()}",
+        "targets": {}
+    }
+    try:
+        if "container_manager" in targets:
+            results["targets"]["container_manager"] = bench_container_manager(
+                iterations, image, os.path.join(work_dir, "manager"), measure_startup)
+        if "lsl_cli" in targets:
+            cli_dir = os.path.join(work_dir, "cli")
+            os.makedirs(cli_dir, exist_ok=True)
+            results["targets"]["lsl_cli"] = bench_lsl_cli(
+                iterations, image, cli_dir, dict(os.environ), measure_startup)
+    finally:
+        if fake is not None:
+            fake.stop()
+            if previous_host is None:
+                os.environ.pop("DOCKER_HOST", None)
+            else:
+                os.environ["DOCKER_HOST"] = previous_host
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description='LSL container start latency benchmark')
+    parser.add_argument('-n', '--iterations', type=int, default=10, help='Measured starts per target')
+    parser.add_argument('--backend', choices=['auto', 'docker', 'fake'], default='auto',
+                        help='Docker backend (auto uses the real daemon when reachable)')
+    parser.add_argument('--image', default='alpine:latest', help='Image of the benchmark container')
+    parser.add_argument('--target', action='append', choices=['container_manager', 'lsl_cli'],
+                        help='Benchmark target (repeatable, default: all)')
+    parser.add_argument('--no-startup', action='store_true', help='Skip the process startup phase')
+    parser.add_argument('--fake-latency', type=float, default=0.0,
+                        help='Per-request latency of the fake Docker API in milliseconds')
+    parser.add_argument('-o', '--output', help='Write JSON results to this file')
+    parser.add_argument('--baseline', help='JSON results of an earlier run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed p95 slowdown against the baseline (0.25 = 25%%)')
+    args = parser.parse_args(argv)
+
+    results = run(
+        iterations=args.iterations,
+        backend=args.backend,
+        image=args.image,
+        targets=args.target,
+        measure_startup=not args.no_startup,
+        fake_latency=args.fake_latency / 1000.0
+    )
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print("\nNo regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+CLI Startup Budget Benchmark
+
+This script measures the wall time of short-lived LSL commands that should
+return before any heavy dependency is loaded:
+- lsl_help: `lsl.py --help`
+- lsl_list: `lsl.py -l`
+- client_import: `import client.containers`
+
+Each scenario runs in a fresh interpreter. A separate run with
+`python -X importtime` lists the modules it imported and the most expensive
+ones. The command exits with status 1 if a scenario's median wall time is
+over the budget or if it imported a module that it must not touch (docker,
+requests, yaml, ...).
+
+Usage:
+    python -m benchmarks.startup --iterations 20
+    python -m benchmarks.startup --budget-ms 100 --output startup.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from typing import Dict, Any, List, Optional, Tuple
+
+# Add the project root to the path
+PROJECT_ROOT = os.path.abspath(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, PROJECT_ROOT)
+
+# Modules the CLI fast paths must not import
+CLI_FORBIDDEN = ["docker", "requests", "urllib3", "yaml", "dotenv", "asyncio"]
+
+# Modules importing the client package must not load until they are used
+CLIENT_FORBIDDEN = ["docker", "requests", "urllib3", "yaml", "asyncio"]
+
+# Scenario name -> (arguments after the interpreter, forbidden top-level modules, median budget in ms)
+SCENARIOS: Dict[str, Tuple[List[str], List[str], float]] = {
+    "lsl_help": (["lsl.py", "--help"], CLI_FORBIDDEN, 100.0),
+    "lsl_list": (["lsl.py", "-l"], CLI_FORBIDDEN, 100.0),
+    "client_import": (["-c", "import client.containers"], CLIENT_FORBIDDEN, 200.0),
+}
+
+# Format version of the JSON results
+RESULTS_VERSION = 1
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Parse the stderr of `python -X importtime`
+
+    Args:
+        output: stderr text of the interpreter
+
+    Returns:
+        One dict per imported module with name, depth, self_us and cumulative_us
+    """
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            # Header line
+            continue
+        imports.append({
+            "name": fields[2].strip(),
+            "depth": (len(fields[2]) - len(fields[2].lstrip()) - 1) // 2,
+            "self_us": int(fields[0]),
+            "cumulative_us": int(fields[1])
+        })
+    return imports
+
+
+def forbidden_imports(imports: List[Dict[str, Any]], forbidden: List[str]) -> List[str]:
+    """
+    Get the forbidden top-level packages that were imported
+
+    Args:
+        imports: Parsed importtime entries
+        forbidden: Forbidden top-level package names
+
+    Returns:
+        Sorted names of the forbidden packages found
+    """
+    found = {entry["name"].split(".")[0] for entry in imports}
+    return sorted(found.intersection(forbidden))
+
+
+def time_command(command: List[str], env: Dict[str, str]) -> float:
+    """
+    Run a command to completion and time it
+
+    Args:
+        command: Command and arguments
+        env: Environment of the process
+
+    Returns:
+        Wall time in seconds
+    """
+    started = time.perf_counter()
+    subprocess.call(command, cwd=PROJECT_ROOT, env=env,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def import_profile(command: List[str], env: Dict[str, str]) -> List[Dict[str, Any]]:
+    """
+    Run a command once under `-X importtime`
+
+    Args:
+        command: Interpreter arguments after the executable
+        env: Environment of the process
+
+    Returns:
+        Parsed importtime entries
+    """
+    process = subprocess.Popen([sys.executable, "-X", "importtime"] + command, cwd=PROJECT_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    _, stderr = process.communicate()
+    return parse_importtime(stderr)
+
+
+def bench_scenario(name: str, iterations: int, budget_ms: Optional[float] = None, top: int = 5) -> Dict[str, Any]:
+    """
+    Benchmark one startup scenario
+
+    Args:
+        name: Scenario name from SCENARIOS
+        iterations: Measured runs
+        budget_ms: Allowed median wall time in milliseconds (default: the scenario's budget)
+        top: Number of most expensive imports to report
+
+    Returns:
+        Results of the scenario
+    """
+    arguments, forbidden, default_budget_ms = SCENARIOS[name]
+    if budget_ms is None:
+        budget_ms = default_budget_ms
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+
+    # Warm the page cache and bytecode before measuring
+    time_command([sys.executable] + arguments, env)
+    samples = [time_command([sys.executable] + arguments, env) for _ in range(iterations)]
+    median_ms = statistics.median(samples) * 1000.0
+
+    imports = import_profile(arguments, env)
+    # Top-level imports of the scenario; site and whatever it pulls in belong to the interpreter
+    top_imports = sorted((entry for entry in imports if entry["depth"] == 0 and entry["name"] != "site"),
+                         key=lambda entry: entry["cumulative_us"], reverse=True)[:top]
+
+    found = forbidden_imports(imports, forbidden)
+    return {
+        "median_ms": round(median_ms, 2),
+        "min_ms": round(min(samples) * 1000.0, 2),
+        "max_ms": round(max(samples) * 1000.0, 2),
+        "budget_ms": budget_ms,
+        "over_budget": median_ms > budget_ms,
+        "forbidden_imports": found,
+        "top_imports": [
+            {"name": entry["name"], "cumulative_ms": round(entry["cumulative_us"] / 1000.0, 2)}
+            for entry in top_imports
+        ]
+    }
+
+
+def run(iterations: int = 10, budget_ms: Optional[float] = None,
+        scenarios: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Run the startup benchmark
+
+    Args:
+        iterations: Measured runs per scenario
+        budget_ms: Allowed median wall time per scenario in milliseconds (default: per-scenario budgets)
+        scenarios: Scenario names to run (default: all)
+
+    Returns:
+        Benchmark results
+    """
+    # Bare interpreter startup, for reference
+    baseline_ms = statistics.median(
+        time_command([sys.executable, "-c", "pass"], dict(os.environ)) for _ in range(max(3, iterations // 2))
+    ) * 1000.0
+
+    return {
+        "version": RESULTS_VERSION,
+        "python": sys.version.split()[0],
+        "iterations": iterations,
+        "interpreter_ms": round(baseline_ms, 2),
+        "scenarios": {
+            name: bench_scenario(name, iterations, budget_ms)
+            for name in (scenarios or list(SCENARIOS))
+        }
+    }
+
+
+def failures(results: Dict[str, Any]) -> List[str]:
+    """
+    List the budget violations of a benchmark run
+
+    Args:
+        results: Benchmark results
+
+    Returns:
+        Human-readable description of each violation
+    """
+    problems = []
+    for name, scenario in results["scenarios"].items():
+        if scenario["over_budget"]:
+            problems.append(f"{name}: median {scenario['median_ms']:.1f} ms "
+                            f"over budget of {scenario['budget_ms']:.1f} ms")
+        if scenario["forbidden_imports"]:
+            problems.append(f"{name}: imported {', '.join(scenario['forbidden_imports'])}")
+    return problems
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    """
+    Print benchmark results as a table
+
+    Args:
+        results: Benchmark results
+    """
+    print(f"Python {results['python']}, {results['iterations']} iterations, "
+          f"bare interpreter {results['interpreter_ms']:.1f} ms")
+    print(f"{'scenario':<16}{'median':>10}{'min':>10}{'max':>10}{'budget':>10}  top imports (cumulative)")
+    for name, scenario in results["scenarios"].items():
+        top = ", ".join(f"{entry['name']} {entry['cumulative_ms']:.1f}" for entry in scenario["top_imports"][:3])
+        print(f"{name:<16}{scenario['median_ms']:>8.1f}ms{scenario['min_ms']:>8.1f}ms"
+              f"{scenario['max_ms']:>8.1f}ms{scenario['budget_ms']:>8.1f}ms  {top}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description='LSL CLI startup budget benchmark')
+    parser.add_argument('-n', '--iterations', type=int, default=10, help='Measured runs per scenario')
+    parser.add_argument('--budget-ms', type=float,
+                        help='Allowed median wall time of every scenario in milliseconds '
+                             '(default: 100 for lsl.py, 200 for the client import)')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help='Scenario to run (repeatable, default: all)')
+    parser.add_argument('-o', '--output', help='Write JSON results to this file')
+    args = parser.parse_args(argv)
+
+    results = run(iterations=args.iterations, budget_ms=args.budget_ms, scenarios=args.scenario)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+    problems = failures(results)
+    if problems:
+        print("\nStartup budget exceeded:")
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    print("\nAll scenarios within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
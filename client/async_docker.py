@@ -0,0 +1,655 @@
+"""
+Async Docker Engine Client Module
+
+This module implements a small asyncio-native client for the Docker Engine
+API, used for concurrent container operations, including:
+- HTTP/1.1 over the Docker unix socket with a pool of keep-alive connections
+- Async list/inspect/create/start/stop/remove/exec of containers
+- Bounded-concurrency helpers for bulk operations
+"""
+import os
+import re
+import json
+import struct
+import asyncio
+from contextlib import aclosing
+from urllib.parse import urlencode, quote
+from typing import Dict, Any, List, Optional, Tuple, Callable, Awaitable, Iterable, AsyncIterator
+
+from client.prefetch import split_image_reference
+
+# Default Docker daemon socket
+DEFAULT_SOCKET_PATH = "/var/run/docker.sock"
+
+# Memory units accepted in container templates
+_MEMORY_UNITS = {
+    "": 1, "b": 1,
+    "k": 1024, "kb": 1024, "ki": 1024,
+    "m": 1024 ** 2, "mb": 1024 ** 2, "mi": 1024 ** 2,
+    "g": 1024 ** 3, "gb": 1024 ** 3, "gi": 1024 ** 3,
+    "t": 1024 ** 4, "tb": 1024 ** 4, "ti": 1024 ** 4,
+}
+
+
+class DockerEngineError(Exception):
+    """Error returned by the Docker Engine API"""
+
+    def __init__(self, status: int, message: str):
+        """
+        Initialize the error
+
+        Args:
+            status: HTTP status code
+            message: Error message from the daemon
+        """
+        super().__init__(f"{status}: {message}")
+        self.status = status
+        self.message = message
+
+
+def socket_path_from_env() -> str:
+    """
+    Get the Docker socket path from DOCKER_HOST
+
+    Returns:
+        Unix socket path
+    """
+    docker_host = os.environ.get("DOCKER_HOST", "")
+    if docker_host.startswith("unix://"):
+        return docker_host[len("unix://"):]
+    return DEFAULT_SOCKET_PATH
+
+
+def parse_memory_limit(value: Any) -> Optional[int]:
+    """
+    Convert a memory limit such as '512Mi' or '1g' to bytes
+
+    Args:
+        value: Memory limit string or number
+
+    Returns:
+        Number of bytes, or None if no limit is set
+
+    Raises:
+        ValueError: If the value cannot be parsed
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*([0-9]+(?:\.[0-9]+)?)\s*([a-zA-Z]*)\s*", str(value))
+    if not match or match.group(2).lower() not in _MEMORY_UNITS:
+        raise ValueError(f"Invalid memory limit: {value}")
+    return int(float(match.group(1)) * _MEMORY_UNITS[match.group(2).lower()])
+
+
+def create_config_from_options(options: Dict[str, Any], labels: Optional[Dict[str, str]] = None,
+                               command: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Convert docker-py style run options into an Engine API create body
+
+    Args:
+        options: Options as returned by ContainerManager._build_run_options
+        labels: Container labels
+        command: Optional command (string or list)
+
+    Returns:
+        JSON body for POST /containers/create
+    """
+    host_config: Dict[str, Any] = {}
+
+    binds = []
+    for host_path, bind in (options.get("volumes") or {}).items():
+        binds.append(f"{host_path}:{bind['bind']}:{bind.get('mode', 'rw')}")
+    if binds:
+        host_config["Binds"] = binds
+    if options.get("network_mode"):
+        host_config["NetworkMode"] = options["network_mode"]
+    if options.get("mem_limit") is not None:
+        host_config["Memory"] = parse_memory_limit(options["mem_limit"])
+    if options.get("cpu_shares") is not None:
+        host_config["CpuShares"] = options["cpu_shares"]
+
+    config: Dict[str, Any] = {
+        "Image": options["image"],
+        "Env": [f"{key}={value}" for key, value in (options.get("environment") or {}).items()],
+        "Labels": labels or {},
+        "HostConfig": host_config,
+    }
+    if command is not None:
+        config["Cmd"] = command.split() if isinstance(command, str) else list(command)
+    return config
+
+
+def demultiplex_stream(data: bytes) -> Tuple[bytes, bytes]:
+    """
+    Split a multiplexed attach/exec stream into stdout and stderr
+
+    Args:
+        data: Raw stream with 8-byte frame headers
+
+    Returns:
+        Tuple of (stdout, stderr)
+    """
+    stdout, stderr = bytearray(), bytearray()
+    offset = 0
+    while offset + 8 <= len(data):
+        stream_type, size = struct.unpack(">BxxxL", data[offset:offset + 8])
+        payload = data[offset + 8:offset + 8 + size]
+        (stderr if stream_type == 2 else stdout).extend(payload)
+        offset += 8 + size
+    return bytes(stdout), bytes(stderr)
+
+
+async def gather_bounded(funcs: Iterable[Callable[[], Awaitable[Any]]], limit: int) -> List[Any]:
+    """
+    Run coroutine factories concurrently with at most `limit` in flight
+
+    Exceptions are returned in place of results, in input order.
+
+    Args:
+        funcs: Callables returning awaitables
+        limit: Maximum number of concurrently running operations
+
+    Returns:
+        List of results or exceptions
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(func):
+        async with semaphore:
+            return await func()
+
+    return await asyncio.gather(*(run(func) for func in funcs), return_exceptions=True)
+
+
+class AsyncDockerClient:
+    """
+    Asyncio Docker Engine API client
+
+    Talks HTTP/1.1 to the daemon's unix socket and reuses keep-alive
+    connections from a bounded pool.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, max_connections: int = 8,
+                 api_version: Optional[str] = None, timeout: float = 60.0):
+        """
+        Initialize the client
+
+        Args:
+            socket_path: Docker unix socket, defaults to DOCKER_HOST or /var/run/docker.sock
+            max_connections: Maximum number of simultaneous connections
+            api_version: Optional API version prefix (e.g. '1.41'), latest if not set
+            timeout: Timeout for a single request in seconds
+        """
+        self.socket_path = socket_path or socket_path_from_env()
+        self.max_connections = max_connections
+        self.api_version = api_version
+        self.timeout = timeout
+
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> "AsyncDockerClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def _url(self, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Build the request target for an API path
+
+        Args:
+            path: API path, e.g. '/containers/json'
+            params: Query parameters
+
+        Returns:
+            Request target including the query string
+        """
+        prefix = f"/v{self.api_version}" if self.api_version else ""
+        query = {}
+        for key, value in (params or {}).items():
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = "1" if value else "0"
+            elif isinstance(value, (dict, list)):
+                value = json.dumps(value)
+            query[key] = value
+        return f"{prefix}{path}" + (f"?{urlencode(query)}" if query else "")
+
+    async def _acquire(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """
+        Get a connection from the pool or open a new one
+
+        Returns:
+            Tuple of (reader, writer)
+        """
+        # Pooled connections belong to the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._idle = []
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        await self._semaphore.acquire()
+        try:
+            while self._idle:
+                reader, writer = self._idle.pop()
+                if not writer.is_closing() and not reader.at_eof():
+                    return reader, writer
+                writer.close()
+            return await asyncio.open_unix_connection(self.socket_path)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def _release(self, connection: Tuple[asyncio.StreamReader, asyncio.StreamWriter], reusable: bool) -> None:
+        """
+        Return a connection to the pool, or close it
+
+        Args:
+            connection: Tuple of (reader, writer)
+            reusable: Whether the connection can serve another request
+        """
+        reader, writer = connection
+        if reusable and not writer.is_closing():
+            self._idle.append(connection)
+        else:
+            writer.close()
+        self._semaphore.release()
+
+    async def close(self) -> None:
+        """
+        Close all idle connections
+        """
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+        """
+        Read an HTTP status line and headers
+
+        Args:
+            reader: Stream reader
+
+        Returns:
+            Tuple of (status code, lower-cased headers)
+        """
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Docker daemon closed the connection")
+        parts = status_line.decode("latin-1").split(" ", 2)
+        status = int(parts[1])
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        return status, headers
+
+    @staticmethod
+    async def _read_body(reader: asyncio.StreamReader, status: int,
+                         headers: Dict[str, str]) -> Tuple[bytes, bool]:
+        """
+        Read an HTTP response body
+
+        Args:
+            reader: Stream reader
+            status: HTTP status code
+            headers: Response headers
+
+        Returns:
+            Tuple of (body, whether the connection can be reused)
+        """
+        keep_alive = headers.get("connection", "").lower() != "close"
+
+        if status in (204, 304) or 100 <= status < 200:
+            return b"", keep_alive
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            body = bytearray()
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # Skip trailers
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return bytes(body), keep_alive
+                body.extend(await reader.readexactly(size))
+                await reader.readexactly(2)
+
+        if "content-length" in headers:
+            return await reader.readexactly(int(headers["content-length"])), keep_alive
+
+        return await reader.read(), False
+
+    async def _iter_body(self, reader: asyncio.StreamReader, headers: Dict[str, str]) -> AsyncIterator[bytes]:
+        """
+        Read an HTTP response body piece by piece
+
+        Each read is bounded by the client timeout, not the whole body, so
+        a slow but steady stream never times out.
+
+        Args:
+            reader: Stream reader
+            headers: Response headers
+
+        Yields:
+            Body data as it arrives
+        """
+        async def read(awaitable):
+            return await asyncio.wait_for(awaitable, self.timeout)
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            while True:
+                size_line = await read(reader.readline())
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await read(reader.readline())) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return
+                yield await read(reader.readexactly(size))
+                await read(reader.readexactly(2))
+
+        remaining = int(headers["content-length"]) if "content-length" in headers else None
+        while remaining is None or remaining > 0:
+            data = await read(reader.read(65536 if remaining is None else min(65536, remaining)))
+            if not data:
+                if remaining:
+                    raise ConnectionError("Docker daemon closed the connection")
+                return
+            if remaining is not None:
+                remaining -= len(data)
+            yield data
+
+    @staticmethod
+    def _error(status: int, data: bytes) -> DockerEngineError:
+        """
+        Build the error for a failed response
+
+        Args:
+            status: HTTP status code
+            data: Response body
+
+        Returns:
+            DockerEngineError with the daemon's message
+        """
+        try:
+            message = json.loads(data).get("message", data.decode("utf-8", "replace"))
+        except ValueError:
+            message = data.decode("utf-8", "replace")
+        return DockerEngineError(status, message)
+
+    async def request(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                      body: Optional[Any] = None) -> Any:
+        """
+        Send an API request and decode the JSON response
+
+        Args:
+            method: HTTP method
+            path: API path
+            params: Query parameters
+            body: JSON-serializable request body
+
+        Returns:
+            Decoded JSON response, or None for empty responses
+
+        Raises:
+            DockerEngineError: If the daemon returns an error status
+        """
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        head = (
+            f"{method} {self._url(path, params)} HTTP/1.1\r\n"
+            f"Host: docker\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n"
+        ).encode("latin-1")
+
+        connection = await self._acquire()
+        reusable = False
+        try:
+            reader, writer = connection
+            writer.write(head + payload)
+            await writer.drain()
+            status, headers = await asyncio.wait_for(self._read_head(reader), self.timeout)
+            data, reusable = await asyncio.wait_for(self._read_body(reader, status, headers), self.timeout)
+        finally:
+            self._release(connection, reusable)
+
+        if status >= 400:
+            raise self._error(status, data)
+
+        if not data:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return data
+
+    async def stream_lines(self, method: str, path: str,
+                           params: Optional[Dict[str, Any]] = None) -> AsyncIterator[bytes]:
+        """
+        Send an API request and yield the response body line by line
+
+        Used for long-running streams such as image pulls: the client
+        timeout applies to each read, not to the whole response.
+
+        Args:
+            method: HTTP method
+            path: API path
+            params: Query parameters
+
+        Yields:
+            Non-empty lines of the response body
+
+        Raises:
+            DockerEngineError: If the daemon returns an error status
+        """
+        head = (
+            f"{method} {self._url(path, params)} HTTP/1.1\r\n"
+            f"Host: docker\r\n"
+            f"Content-Length: 0\r\n\r\n"
+        ).encode("latin-1")
+
+        connection = await self._acquire()
+        reusable = False
+        try:
+            reader, writer = connection
+            writer.write(head)
+            await writer.drain()
+            status, headers = await asyncio.wait_for(self._read_head(reader), self.timeout)
+            if status >= 400:
+                data, reusable = await asyncio.wait_for(self._read_body(reader, status, headers), self.timeout)
+                raise self._error(status, data)
+
+            pending = b""
+            async for data in self._iter_body(reader, headers):
+                *lines, pending = (pending + data).split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        yield line
+            if pending.strip():
+                yield pending
+            reusable = (headers.get("connection", "").lower() != "close"
+                        and ("content-length" in headers or "chunked" in headers.get("transfer-encoding", "").lower()))
+        finally:
+            self._release(connection, reusable)
+
+    # Container operations
+
+    async def list_containers(self, all: bool = True, filters: Optional[Dict[str, List[str]]] = None) -> List[Dict[str, Any]]:
+        """
+        List containers
+
+        Args:
+            all: Include stopped containers
+            filters: Engine API filters, e.g. {"label": ["lsl.managed=true"]}
+
+        Returns:
+            List of container summaries
+        """
+        return await self.request("GET", "/containers/json", params={"all": all, "filters": filters})
+
+    async def inspect_container(self, container_id: str) -> Dict[str, Any]:
+        """
+        Inspect a container
+
+        Args:
+            container_id: Container ID or name
+
+        Returns:
+            Container details
+        """
+        return await self.request("GET", f"/containers/{quote(container_id)}/json")
+
+    async def create_container(self, config: Dict[str, Any], name: Optional[str] = None) -> str:
+        """
+        Create a container
+
+        Args:
+            config: Engine API create body
+            name: Optional container name
+
+        Returns:
+            ID of the new container
+        """
+        result = await self.request("POST", "/containers/create", params={"name": name}, body=config)
+        return result["Id"]
+
+    async def start_container(self, container_id: str) -> None:
+        """
+        Start a container
+
+        Args:
+            container_id: Container ID or name
+        """
+        await self.request("POST", f"/containers/{quote(container_id)}/start")
+
+    async def stop_container(self, container_id: str, timeout: int = 10) -> None:
+        """
+        Stop a container
+
+        Args:
+            container_id: Container ID or name
+            timeout: Seconds to wait before killing the container
+        """
+        await self.request("POST", f"/containers/{quote(container_id)}/stop", params={"t": timeout})
+
+    async def remove_container(self, container_id: str, force: bool = False, v: bool = False) -> None:
+        """
+        Remove a container
+
+        Args:
+            container_id: Container ID or name
+            force: Kill the container if it is running
+            v: Remove anonymous volumes
+        """
+        await self.request("DELETE", f"/containers/{quote(container_id)}", params={"force": force, "v": v})
+
+    async def exec(self, container_id: str, cmd: Any, user: Optional[str] = None,
+                   environment: Optional[Dict[str, str]] = None) -> Tuple[Optional[int], bytes, bytes]:
+        """
+        Run a command in a container and collect its output
+
+        Args:
+            container_id: Container ID or name
+            cmd: Command (string or list)
+            user: Optional user to run as
+            environment: Optional environment variables
+
+        Returns:
+            Tuple of (exit code, stdout, stderr); the exit code is None if the
+            daemon does not report one (the command is still running)
+        """
+        exec_config = {
+            "AttachStdout": True,
+            "AttachStderr": True,
+            "Tty": False,
+            "Cmd": cmd.split() if isinstance(cmd, str) else list(cmd),
+        }
+        if user:
+            exec_config["User"] = user
+        if environment:
+            exec_config["Env"] = [f"{key}={value}" for key, value in environment.items()]
+
+        created = await self.request("POST", f"/containers/{quote(container_id)}/exec", body=exec_config)
+        exec_id = created["Id"]
+
+        # The start request hijacks the connection, so it gets its own
+        payload = json.dumps({"Detach": False, "Tty": False}).encode("utf-8")
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            writer.write((
+                f"POST {self._url(f'/exec/{exec_id}/start')} HTTP/1.1\r\n"
+                f"Host: docker\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Connection: Upgrade\r\n"
+                f"Upgrade: tcp\r\n"
+                f"Content-Length: {len(payload)}\r\n\r\n"
+            ).encode("latin-1") + payload)
+            await writer.drain()
+            status, headers = await self._read_head(reader)
+            if status >= 400:
+                data, _ = await self._read_body(reader, status, headers)
+                raise DockerEngineError(status, data.decode("utf-8", "replace"))
+            raw = await reader.read()
+        finally:
+            writer.close()
+
+        stdout, stderr = demultiplex_stream(raw)
+        inspect = await self.request("GET", f"/exec/{exec_id}/json")
+        return inspect.get("ExitCode"), stdout, stderr
+
+    async def pull_image(self, image: str) -> None:
+        """
+        Pull an image
+
+        Args:
+            image: Image reference
+
+        Raises:
+            DockerEngineError: If the daemon reports a pull error
+        """
+        repository, tag = split_image_reference(image)
+
+        # Progress is streamed as JSON lines; errors arrive in-band. Pulls
+        # can take minutes, so only a stalled stream times out.
+        lines = self.stream_lines("POST", "/images/create", params={"fromImage": repository, "tag": tag})
+        async with aclosing(lines):
+            async for line in lines:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict) and "error" in event:
+                    raise DockerEngineError(500, event["error"])
+
+    async def pause_container(self, container_id: str) -> None:
+        """
+        Pause a container
+
+        Args:
+            container_id: Container ID or name
+        """
+        await self.request("POST", f"/containers/{quote(container_id)}/pause")
+
+    async def unpause_container(self, container_id: str) -> None:
+        """
+        Unpause a container
+
+        Args:
+            container_id: Container ID or name
+        """
+        await self.request("POST", f"/containers/{quote(container_id)}/unpause")
@@ -0,0 +1,521 @@
+"""
+Terminal Broadcast Module
+
+This module shares one terminal session with many viewers, including:
+- Owning the session's PTY and the process running in it, or serving an
+  already attached terminal stream (a container TTY)
+- Broadcasting PTY output to any number of viewers from one asyncio loop
+- Per-viewer backpressure: a slow viewer skips ahead instead of slowing the session
+- Read-only viewers, and a separate key for viewers allowed to type
+- Replaying recent output to new viewers so they see the session at once
+"""
+import os
+import hmac
+import fcntl
+import struct
+import socket
+import termios
+import threading
+import subprocess
+from collections import deque
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from client.terminal import relay_terminal, write_all
+from shared.utils.lazy_import import lazy_import
+from shared.utils.yaml_logger import setup_logger
+
+asyncio = lazy_import("asyncio")
+
+# Initialize logger
+logger = setup_logger("terminal_broadcast", "/tmp/lsl_client.log")
+
+# Handshake: the viewer sends "<PROTOCOL> <mode> <key>\n", the server answers "OK <mode>\n" or "ERR <reason>\n"
+PROTOCOL = "LSL-BROADCAST/1"
+MODE_READ_ONLY = "ro"
+MODE_READ_WRITE = "rw"
+
+# Bytes of recent output replayed to new and resynced viewers
+DEFAULT_SCROLLBACK = 64 * 1024
+
+# Bytes queued for one viewer before it skips ahead
+DEFAULT_VIEWER_BUFFER = 256 * 1024
+
+# Seconds a viewer has to complete the handshake
+HANDSHAKE_TIMEOUT = 5.0
+
+# Bytes read from the PTY or a socket at once
+READ_SIZE = 64 * 1024
+
+# Sent before replaying the scrollback to a viewer that skipped ahead: clear screen, cursor home
+RESYNC_PREFIX = b"\x1b[2J\x1b[H"
+
+# Key that detaches a read-write viewer (Ctrl-])
+DETACH_KEY = b"\x1d"
+
+
+def _set_controlling_tty() -> None:
+    """Make the PTY the controlling terminal of the new session (runs in the child)"""
+    try:
+        fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+    except OSError:
+        pass
+
+
+class Viewer:
+    """
+    One connected viewer
+
+    Output is queued per viewer. When a viewer falls more than max_buffered
+    bytes behind, its queue is dropped and it is resynced from the
+    scrollback, so one slow connection never holds up the others.
+    """
+
+    def __init__(self, writer, mode: str, max_buffered: int):
+        """
+        Initialize the viewer
+
+        Args:
+            writer: asyncio StreamWriter of the connection
+            mode: MODE_READ_ONLY or MODE_READ_WRITE
+            max_buffered: Bytes queued before the viewer skips ahead
+        """
+        self.writer = writer
+        self.mode = mode
+        self.max_buffered = max_buffered
+
+        self.chunks: deque = deque()
+        self.buffered = 0
+        self.resync = False
+        self.resyncs = 0
+        self.ready = asyncio.Event()
+
+    def enqueue(self, data: bytes) -> None:
+        """
+        Queue output for the viewer
+
+        Args:
+            data: Output bytes
+        """
+        if self.resync:
+            # The scrollback replay will include this output
+            return
+        if self.buffered + len(data) > self.max_buffered:
+            self.chunks.clear()
+            self.buffered = 0
+            self.resync = True
+            self.resyncs += 1
+        else:
+            self.chunks.append(data)
+            self.buffered += len(data)
+        self.ready.set()
+
+
+class BroadcastServer:
+    """
+    Terminal Broadcast Server
+
+    Runs a command in a PTY, or takes an attached terminal stream, and
+    serves its output to viewers over TCP.
+    """
+
+    def __init__(self, command: Optional[List[str]] = None, host: str = "0.0.0.0", port: int = 0, key: str = "",
+                 write_key: Optional[str] = None, size: Optional[Tuple[int, int]] = None,
+                 scrollback: int = DEFAULT_SCROLLBACK, viewer_buffer: int = DEFAULT_VIEWER_BUFFER,
+                 stream_fd: Optional[int] = None):
+        """
+        Initialize the broadcast server
+
+        Args:
+            command: Command run in the PTY (unless stream_fd is given)
+            host: Address to listen on
+            port: Port to listen on (0 lets the kernel pick a free port)
+            key: Key viewers need to watch
+            write_key: Key viewers need to type (default: the same as key)
+            size: Terminal size as (columns, rows)
+            scrollback: Bytes of recent output replayed to new viewers
+            viewer_buffer: Bytes queued for one viewer before it skips ahead
+            stream_fd: Attached terminal stream to serve instead of a PTY; the server takes ownership
+        """
+        if command is None and stream_fd is None:
+            raise ValueError("Either command or stream_fd is required")
+        self.command = command
+        self.stream_fd = stream_fd
+        self.host = host
+        self.port = port
+        self.key = key
+        self.write_key = key if write_key is None else write_key
+        self.size = size
+        self.scrollback_limit = scrollback
+        self.viewer_buffer = viewer_buffer
+
+        self.viewers: Set[Viewer] = set()
+        self.process: Optional[subprocess.Popen] = None
+        self.master_fd: Optional[int] = None
+        self.closed = False
+        self.bytes_out = 0
+
+        self._scrollback = bytearray()
+        self._input_lock: Optional[asyncio.Lock] = None
+        self._writable: Optional[asyncio.Future] = None
+        self._server = None
+        self._loop = None
+        self._done = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _spawn(self) -> None:
+        """Start the command in a new PTY, or take over the attached stream"""
+        if self.stream_fd is not None:
+            os.set_blocking(self.stream_fd, False)
+            self.master_fd = self.stream_fd
+            return
+
+        master_fd, slave_fd = os.openpty()
+        if self.size:
+            columns, rows = self.size
+            fcntl.ioctl(slave_fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, columns, 0, 0))
+        try:
+            self.process = subprocess.Popen(
+                self.command,
+                stdin=slave_fd,
+                stdout=slave_fd,
+                stderr=slave_fd,
+                start_new_session=True,
+                preexec_fn=_set_controlling_tty
+            )
+        except Exception:
+            os.close(master_fd)
+            raise
+        finally:
+            os.close(slave_fd)
+        os.set_blocking(master_fd, False)
+        self.master_fd = master_fd
+
+    async def start(self) -> int:
+        """
+        Start the command and begin accepting viewers
+
+        Returns:
+            Port the server listens on
+        """
+        self._loop = asyncio.get_running_loop()
+        self._done = asyncio.Event()
+        self._input_lock = asyncio.Lock()
+        self._spawn()
+        self._loop.add_reader(self.master_fd, self._on_output)
+        self._server = await asyncio.start_server(self._handle_viewer, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        source = f"{self.command[0]} (pid {self.process.pid})" if self.process else "attached stream"
+        logger.info(f"Broadcasting {source} on port {self.port}")
+        return self.port
+
+    async def wait_closed(self) -> Optional[int]:
+        """
+        Wait until the session ends and every viewer got its output
+
+        Returns:
+            Exit code of the command, or None when serving an attached stream
+        """
+        await self._done.wait()
+        return self.process.wait() if self.process else None
+
+    async def serve(self) -> Optional[int]:
+        """
+        Run the session until it ends
+
+        Returns:
+            Exit code of the command, or None when serving an attached stream
+        """
+        await self.start()
+        return await self.wait_closed()
+
+    def _on_output(self) -> None:
+        """Read PTY output and fan it out to every viewer"""
+        try:
+            data = os.read(self.master_fd, READ_SIZE)
+        except BlockingIOError:
+            return
+        except OSError:
+            # EIO: every process holding the PTY has exited
+            data = b""
+        if not data:
+            self._close()
+            return
+
+        self._scrollback += data
+        if len(self._scrollback) > self.scrollback_limit:
+            del self._scrollback[:len(self._scrollback) - self.scrollback_limit]
+        for viewer in self.viewers:
+            viewer.enqueue(data)
+
+    def _close(self) -> None:
+        """Stop reading the PTY and let the viewers flush their output"""
+        if self.closed:
+            return
+        self.closed = True
+        self._loop.remove_reader(self.master_fd)
+        self._on_writable()
+        os.close(self.master_fd)
+        self._server.close()
+        for viewer in self.viewers:
+            viewer.ready.set()
+        if not self.viewers:
+            self._done.set()
+        logger.info(f"Broadcast on port {self.port} ended")
+
+    def _on_writable(self) -> None:
+        """Wake the input waiting for the PTY to accept more data"""
+        if self._writable is not None:
+            self._loop.remove_writer(self.master_fd)
+            if not self._writable.done():
+                self._writable.set_result(None)
+            self._writable = None
+
+    async def _write_input(self, data: bytes) -> None:
+        """
+        Write viewer input to the PTY without blocking the event loop
+
+        When the PTY input buffer is full (the program isn't reading), this
+        waits for the fd to become writable; the viewer's connection is not
+        read meanwhile, so the backpressure stays with that viewer while
+        output keeps flowing to everyone.
+
+        Args:
+            data: Input bytes
+        """
+        async with self._input_lock:
+            view = memoryview(data)
+            while view and not self.closed:
+                try:
+                    written = os.write(self.master_fd, view)
+                except BlockingIOError:
+                    if self._writable is None:
+                        self._writable = self._loop.create_future()
+                        self._loop.add_writer(self.master_fd, self._on_writable)
+                    await self._writable
+                    continue
+                view = view[written:]
+
+    def _authenticate(self, line: bytes) -> Optional[str]:
+        """
+        Check a viewer's handshake
+
+        Args:
+            line: Handshake line
+
+        Returns:
+            Granted mode, or None if the handshake is invalid
+        """
+        parts = line.decode('utf-8', errors='replace').rstrip("\r\n").split(" ", 2)
+        if len(parts) != 3 or parts[0] != PROTOCOL:
+            return None
+        _, mode, key = parts
+        if mode == MODE_READ_WRITE and hmac.compare_digest(key.encode(), self.write_key.encode()):
+            return MODE_READ_WRITE
+        if mode == MODE_READ_ONLY and (hmac.compare_digest(key.encode(), self.key.encode())
+                                       or hmac.compare_digest(key.encode(), self.write_key.encode())):
+            return MODE_READ_ONLY
+        return None
+
+    async def _handle_viewer(self, reader, writer) -> None:
+        """
+        Serve one viewer connection
+
+        Args:
+            reader: asyncio StreamReader of the connection
+            writer: asyncio StreamWriter of the connection
+        """
+        try:
+            line = await asyncio.wait_for(reader.readline(), HANDSHAKE_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError):
+            writer.close()
+            return
+        mode = self._authenticate(line)
+        if mode is None or self.closed:
+            writer.write(b"ERR unauthorized\n" if mode is None else b"ERR session ended\n")
+            writer.close()
+            return
+
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        writer.write(f"OK {mode}\n".encode())
+
+        viewer = Viewer(writer, mode, self.viewer_buffer)
+        viewer.enqueue(bytes(self._scrollback))
+        self.viewers.add(viewer)
+        pump = asyncio.ensure_future(self._pump(viewer))
+        logger.info(f"Viewer joined ({mode}), {len(self.viewers)} watching")
+
+        try:
+            while not self.closed:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                if viewer.mode == MODE_READ_WRITE and not self.closed:
+                    await self._write_input(data)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            if not self.closed:
+                self._drop(viewer, pump)
+            else:
+                await pump
+
+    async def _pump(self, viewer: Viewer) -> None:
+        """
+        Write queued output to a viewer
+
+        Args:
+            viewer: Viewer to serve
+        """
+        try:
+            while True:
+                await viewer.ready.wait()
+                viewer.ready.clear()
+                if viewer.resync:
+                    viewer.resync = False
+                    data = RESYNC_PREFIX + bytes(self._scrollback)
+                else:
+                    data = b"".join(viewer.chunks)
+                    viewer.chunks.clear()
+                    viewer.buffered = 0
+                if data:
+                    viewer.writer.write(data)
+                    self.bytes_out += len(data)
+                    await viewer.writer.drain()
+                if self.closed and not viewer.chunks and not viewer.resync:
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            viewer.writer.close()
+            self.viewers.discard(viewer)
+            if self.closed and not self.viewers:
+                self._done.set()
+
+    def _drop(self, viewer: Viewer, pump) -> None:
+        """
+        Disconnect a viewer that left
+
+        Args:
+            viewer: Viewer to remove
+            pump: Output task of the viewer
+        """
+        self.viewers.discard(viewer)
+        pump.cancel()
+        logger.info(f"Viewer left, {len(self.viewers)} watching")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get broadcast statistics
+
+        Returns:
+            Dictionary with viewer counts, resyncs and bytes sent
+        """
+        viewers = list(self.viewers)
+        return {
+            "viewers": len(viewers),
+            "read_only": sum(1 for viewer in viewers if viewer.mode == MODE_READ_ONLY),
+            "resyncs": sum(viewer.resyncs for viewer in viewers),
+            "bytes_out": self.bytes_out
+        }
+
+    def run_in_thread(self, timeout: float = 10.0) -> int:
+        """
+        Run the server on an event loop in a daemon thread
+
+        Args:
+            timeout: Seconds to wait for the server to start
+
+        Returns:
+            Port the server listens on
+        """
+        started = threading.Event()
+        errors: List[BaseException] = []
+
+        async def main():
+            try:
+                await self.start()
+            except BaseException as e:
+                errors.append(e)
+                started.set()
+                return
+            started.set()
+            await self.wait_closed()
+
+        self._thread = threading.Thread(target=asyncio.run, args=(main(),), daemon=True,
+                                        name="TerminalBroadcast")
+        self._thread.start()
+        if not started.wait(timeout):
+            raise RuntimeError("Terminal broadcast did not start")
+        if errors:
+            raise errors[0]
+        return self.port
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Terminate the command and wait for the server to finish
+
+        An attached stream ends when its container stops; stop the container first.
+
+        Args:
+            timeout: Seconds to wait for the server thread
+        """
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+def _read_reply(sock: socket.socket) -> Tuple[str, bytes]:
+    """
+    Read the server's handshake reply
+
+    Args:
+        sock: Connected socket
+
+    Returns:
+        Tuple of (reply line, output received after it)
+    """
+    buffer = b""
+    while b"\n" not in buffer:
+        data = sock.recv(READ_SIZE)
+        if not data:
+            break
+        buffer += data
+    line, _, rest = buffer.partition(b"\n")
+    return line.decode('utf-8', errors='replace'), rest
+
+
+def join_session(host: str, port: int, key: str, read_only: bool = False,
+                 stdin_fd: int = 0, stdout_fd: int = 1) -> None:
+    """
+    Watch (and optionally type into) a broadcast session
+
+    Read-write viewers put the local terminal in raw mode and detach with Ctrl-].
+
+    Args:
+        host: Server address
+        port: Server port
+        key: Viewing key, or the write key for a read-write viewer
+        read_only: Only watch, never send input
+        stdin_fd: File descriptor keyboard input is read from
+        stdout_fd: File descriptor output is written to
+
+    Raises:
+        ConnectionError: If the server rejects the viewer
+    """
+    mode = MODE_READ_ONLY if read_only else MODE_READ_WRITE
+    sock = socket.create_connection((host, port), timeout=HANDSHAKE_TIMEOUT)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    try:
+        sock.sendall(f"{PROTOCOL} {mode} {key}\n".encode())
+        reply, output = _read_reply(sock)
+        if not reply.startswith("OK"):
+            raise ConnectionError(f"Broadcast server refused to join: {reply or 'connection closed'}")
+        sock.settimeout(None)
+        if output:
+            write_all(stdout_fd, output)
+        relay_terminal(sock.fileno(), stdin_fd, stdout_fd, read_only=read_only, detach_key=DETACH_KEY)
+    finally:
+        sock.close()
@@ -0,0 +1,239 @@
+"""
+Container Catalog Module
+
+This module resolves container names from one catalog with two sources:
+- The server-synced templates cached next to the client config
+- Local overrides in a containers.txt file next to the client config
+
+Both sources are compiled into a JSON lookup index stored next to the
+client config. The index records the size and modification time of each
+source, so a lookup reads one small file and only recompiles when a source
+changed. Lookups never contact the server and do not depend on the
+working directory.
+"""
+import os
+import json
+from typing import Dict, Any, Optional
+
+# No logger here: lsl.py reads the catalog on every run, and importing the
+# logging setup would double the cost of `lsl -l`.
+
+# Per-user client config locations, in search order
+USER_CONFIG_LOCATIONS = [
+    os.path.expanduser("~/.config/lsl/config.yaml"),  # XDG config dir
+    os.path.expanduser("~/lsl_config.yaml"),          # User home
+]
+
+# Name of the local overrides file, next to the client config
+LOCAL_CATALOG_NAME = "containers.txt"
+
+# Format version of the compiled index
+CATALOG_VERSION = 1
+
+# Template fields kept in the index besides the image
+INDEX_FIELDS = ("shared", "setup")
+
+# Sources of catalog entries
+SOURCE_SERVER = "server"
+SOURCE_LOCAL = "local"
+
+
+def parse_containers_txt(text: str) -> Dict[str, str]:
+    """
+    Parse a containers.txt file
+
+    Args:
+        text: File contents, one `name = image` mapping per line
+
+    Returns:
+        Dictionary of container name to image
+    """
+    mappings = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        name, image = line.split('=', 1)
+        mappings[name.strip()] = image.strip()
+    return mappings
+
+
+def default_config_path() -> str:
+    """
+    Get the client config path used for the catalog
+
+    Returns:
+        The first existing per-user config path, or the XDG path
+    """
+    for path in USER_CONFIG_LOCATIONS:
+        if os.path.exists(path):
+            return path
+    return USER_CONFIG_LOCATIONS[0]
+
+
+class ContainerCatalog:
+    """
+    Container catalog
+
+    Merges the server-synced templates with local overrides; a local entry
+    replaces a server template of the same name.
+    """
+
+    def __init__(self, config_path: Optional[str] = None, local_path: Optional[str] = None):
+        """
+        Initialize the catalog
+
+        Args:
+            config_path: Path to the client config (default: the per-user config)
+            local_path: Path to the local overrides file (default: containers.txt next to the config)
+        """
+        config_path = config_path or default_config_path()
+        base = os.path.splitext(config_path)[0]
+        self.cache_path = f"{base}.cache.json"
+        self.index_path = f"{base}.catalog.json"
+        self.local_path = local_path or os.environ.get("LSL_CONTAINERS_FILE") or \
+            os.path.join(os.path.dirname(os.path.abspath(config_path)), LOCAL_CATALOG_NAME)
+
+        self._index: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def _fingerprint(path: str) -> Optional[list]:
+        """
+        Identify the current version of a source file
+
+        Args:
+            path: Source file path
+
+        Returns:
+            [mtime_ns, size], or None if the file does not exist
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _sources(self) -> Dict[str, Any]:
+        """
+        Fingerprint both sources
+
+        Returns:
+            Dictionary of source name to fingerprint
+        """
+        return {
+            SOURCE_SERVER: self._fingerprint(self.cache_path),
+            SOURCE_LOCAL: self._fingerprint(self.local_path)
+        }
+
+    def _read_server_templates(self) -> Dict[str, Any]:
+        """
+        Read the cached server templates
+
+        Returns:
+            Dictionary of template name to template configuration
+        """
+        try:
+            with open(self.cache_path, 'r') as f:
+                server_config = json.load(f)
+        except (IOError, ValueError):
+            return {}
+        containers = server_config.get("containers") if isinstance(server_config, dict) else None
+        return containers if isinstance(containers, dict) else {}
+
+    def _read_local_overrides(self) -> Dict[str, str]:
+        """
+        Read the local overrides
+
+        Returns:
+            Dictionary of container name to image
+        """
+        try:
+            with open(self.local_path, 'r') as f:
+                return parse_containers_txt(f.read())
+        except (IOError, ValueError):
+            return {}
+
+    def compile(self) -> Dict[str, Any]:
+        """
+        Compile the lookup index from both sources and store it
+
+        Returns:
+            The compiled index
+        """
+        sources = self._sources()
+        entries = {}
+        for name, template in self._read_server_templates().items():
+            if not isinstance(template, dict) or not template.get("image"):
+                continue
+            entry = {"image": template["image"], "source": SOURCE_SERVER}
+            entry.update({field: template[field] for field in INDEX_FIELDS if field in template})
+            entries[name] = entry
+        for name, image in self._read_local_overrides().items():
+            entries[name] = {"image": image, "source": SOURCE_LOCAL}
+
+        index = {"version": CATALOG_VERSION, "sources": sources, "entries": entries}
+        self._save_index(index)
+        self._index = index
+        return index
+
+    def _save_index(self, index: Dict[str, Any]) -> None:
+        """
+        Atomically write the index; a failed write only costs a recompile next time
+
+        Args:
+            index: Compiled index
+        """
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+            with open(temp_path, 'w') as f:
+                json.dump(index, f, separators=(',', ':'))
+            os.replace(temp_path, self.index_path)
+        except (IOError, OSError):
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Get the lookup index, recompiling it if a source changed
+
+        Returns:
+            The index
+        """
+        sources = self._sources()
+        if self._index is not None and self._index.get("sources") == sources:
+            return self._index
+
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            if (isinstance(index, dict) and index.get("version") == CATALOG_VERSION
+                    and index.get("sources") == sources and isinstance(index.get("entries"), dict)):
+                self._index = index
+                return index
+        except (IOError, ValueError):
+            pass
+        return self.compile()
+
+    def resolve(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a container name
+
+        Args:
+            name: Container name
+
+        Returns:
+            Catalog entry with 'image' and 'source', or None if the name is unknown
+        """
+        return self.load()["entries"].get(name)
+
+    def images(self) -> Dict[str, str]:
+        """
+        Get every catalog entry's image
+
+        Returns:
+            Dictionary of container name to image
+        """
+        return {name: entry["image"] for name, entry in self.load()["entries"].items()}
@@ -3,34 +3,35 @@ Client Configuration Module
 
 This module handles client configuration including:
 - UUID/token generation and persistence
+- Signed server tokens, issued and refreshed through config syncs
 - Fetching and syncing configuration from the LSL server
-- Local config file management
+- Local config file management (see client.config_store)
 """
 import os
-import yaml
 import uuid
 import logging
 import time
-import requests
 import json
 from typing import Dict, Any, Optional, Tuple
 from pathlib import Path
 
-# Use absolute imports for better compatibility
-import sys
-import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
+from client.catalog import USER_CONFIG_LOCATIONS
+from client.config_store import ConfigStore
+from shared.utils.lazy_import import lazy_import
 from shared.utils.uuid_hash import generate_uuid
 from shared.utils.yaml_logger import setup_logger
 
+yaml = lazy_import("yaml")
+requests = lazy_import("requests")
+
 # Initialize logger
 logger = setup_logger("client_config", "/tmp/lsl_client.log")
 
+# Signed tokens this close to expiry are no longer sent
+TOKEN_EXPIRY_MARGIN = 60
+
 # Default paths
-DEFAULT_CONFIG_LOCATIONS = [
-    os.path.expanduser("~/.config/lsl/config.yaml"),  # XDG config dir
-    os.path.expanduser("~/lsl_config.yaml"),          # User home
+DEFAULT_CONFIG_LOCATIONS = USER_CONFIG_LOCATIONS + [
     "config.yaml"                                     # Current directory
 ]
 
@@ -46,6 +47,7 @@ class ClientConfig:
                         will search in default locations
         """
         self.config_path = self._find_config_path(config_path)
+        self.store = ConfigStore(self.config_path)
         self.config = self._load_or_create_config()
         
     def _find_config_path(self, config_path: Optional[str] = None) -> str:
@@ -83,10 +85,8 @@ class ClientConfig:
         """
         try:
             # Try to load existing config
-            if os.path.exists(self.config_path):
-                with open(self.config_path, 'r') as f:
-                    config = yaml.safe_load(f)
-                
+            config = self.store.load()
+            if config is not None:
                 # Validate loaded config
                 if not self._validate_config(config):
                     logger.warning("Config validation failed, creating new config")
@@ -130,43 +130,23 @@ class ClientConfig:
         }
         
         # Save the new configuration
-        self._save_config(config)
+        self._save_config(config, immediate=True)
         logger.info(f"Generated new client UUID: {client_uuid}")
         
         return config
         
-    def _save_config(self, config: Dict[str, Any]) -> None:
+    def _save_config(self, config: Dict[str, Any], immediate: bool = False) -> None:
         """
         Save configuration to file
         
+        Writes go through the config store, which skips unchanged files and
+        debounces bursts of updates unless immediate is set.
+        
         Args:
             config: Configuration dictionary to save
+            immediate: Write synchronously instead of debouncing
         """
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
-        
-        # Create temporary file path
-        temp_path = f"{self.config_path}.tmp"
-        
-        try:
-            # Write to temporary file first
-            with open(temp_path, 'w') as f:
-                yaml.dump(config, f, default_flow_style=False)
-                
-            # Atomic replace
-            if os.path.exists(temp_path):
-                os.replace(temp_path, self.config_path)
-                logger.info(f"Configuration saved to {self.config_path}")
-            else:
-                logger.error("Failed to write temporary config file")
-                
-        except IOError as e:
-            logger.error(f"Error saving config: {str(e)}")
-            if os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass
+        self.store.save(config, immediate=immediate)
     
     def _validate_config(self, config: Dict[str, Any]) -> bool:
         """
@@ -204,6 +184,54 @@ class ClientConfig:
         """
         return self.config["client"]["uuid"], self.config["client"]["token"]
         
+    def get_auth_header(self) -> str:
+        """
+        Get the Authorization header value for server requests
+        
+        Uses the signed token issued by the server while it is valid, and
+        falls back to the client UUID and token otherwise.
+        
+        Returns:
+            Authorization header value
+        """
+        signed_token = self.config["client"].get("signed_token")
+        if signed_token and signed_token.get("expires_at", 0) > time.time() + TOKEN_EXPIRY_MARGIN:
+            return f"Bearer {signed_token['value']}"
+        uuid, token = self.get_uuid_and_token()
+        return f"Bearer {uuid}:{token}"
+        
+    def discard_signed_token(self) -> bool:
+        """
+        Drop the signed token, e.g. after the server rejected it
+        
+        The next sync authenticates with the client UUID and token and
+        receives a new signed token.
+        
+        Returns:
+            True if there was a signed token
+        """
+        if self.config["client"].pop("signed_token", None) is None:
+            return False
+        self._save_config(self.config)
+        logger.info("Discarded signed server token")
+        return True
+        
+    def _store_signed_token(self, token_info: Any) -> None:
+        """
+        Keep a signed token issued with the server config
+        
+        Args:
+            token_info: 'token' entry of the server response
+        """
+        if not isinstance(token_info, dict) or "value" not in token_info or "expires_at" not in token_info:
+            logger.warning("Ignoring malformed signed token from server")
+            return
+        self.config["client"]["signed_token"] = {
+            "value": token_info["value"],
+            "expires_at": token_info["expires_at"]
+        }
+        logger.debug("Received signed server token")
+        
     def get_server_url(self) -> str:
         """
         Get server URL
@@ -231,12 +259,11 @@ class ClientConfig:
             True if sync successful, False otherwise
         """
         try:
-            uuid, token = self.get_uuid_and_token()
             server_url = self.get_server_url()
             
             # Prepare request headers
             headers = {
-                "Authorization": f"Bearer {uuid}:{token}",
+                "Authorization": self.get_auth_header(),
                 "Content-Type": "application/json"
             }
             
@@ -247,12 +274,23 @@ class ClientConfig:
                 timeout=5
             )
             
+            # A rejected signed token (expired key, revoked) is retried once with the client UUID
+            if response.status_code == 401 and self.discard_signed_token():
+                headers = dict(headers, Authorization=self.get_auth_header())
+                response = requests.get(
+                    f"{server_url}/get_config",
+                    headers=headers,
+                    timeout=5
+                )
+            
             if response.status_code == 200:
                 # Update last sync timestamp
                 self.config["client"]["last_server_sync"] = time.time()
                 
-                # Save server config
+                # Save server config; a new signed token comes along with it
                 server_config = response.json()
+                if "token" in server_config:
+                    self._store_signed_token(server_config.pop("token"))
                 
                 # Update local cache
                 if "server_config" not in self.config:
@@ -260,6 +298,7 @@ class ClientConfig:
                     
                 self.config["server_config"] = server_config
                 self._save_config(self.config)
+                self.store.mark_synced()
                 
                 logger.info("Successfully synced configuration with server")
                 return True
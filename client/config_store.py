@@ -0,0 +1,248 @@
+"""
+Client Config Store Module
+
+This module handles persistence of the client configuration, including:
+- Thread-safe, atomic writes (unique temp files, no shared `.tmp` path)
+- Skipping writes whose content hash did not change
+- Debouncing bursts of updates into a single write
+- Keeping the large cached server config in a compact file separate
+  from the small identity file
+- Recompiling the container catalog index when the cached server config changes
+"""
+import os
+import json
+import atexit
+import hashlib
+import tempfile
+import threading
+import weakref
+from typing import Dict, Any, Optional, Tuple
+
+from client.catalog import ContainerCatalog
+from shared.utils.lazy_import import lazy_import
+from shared.utils.yaml_logger import setup_logger
+
+yaml = lazy_import("yaml")
+
+# Initialize logger
+logger = setup_logger("client_config_store", "/tmp/lsl_client.log")
+
+# Sections kept out of the identity file
+CACHE_SECTION = "server_config"
+
+# Live stores, flushed by one exit hook; weak so a store can be collected once it is dropped
+_open_stores: "weakref.WeakSet[ConfigStore]" = weakref.WeakSet()
+
+
+def _flush_open_stores() -> None:
+    """Write the debounced changes of every live store when the process exits"""
+    for store in list(_open_stores):
+        store.flush()
+
+
+atexit.register(_flush_open_stores)
+
+
+class ConfigStore:
+    """
+    Client configuration store
+
+    The identity file (config.yaml) holds the client UUID/token, server
+    settings and local settings. The cached server configuration lives in
+    a compact JSON file next to it; its modification time records when the
+    client last synced successfully.
+    """
+
+    def __init__(self, config_path: str, debounce_interval: float = 0.5):
+        """
+        Initialize the config store
+
+        Args:
+            config_path: Path to the identity config file
+            debounce_interval: Seconds to wait for further updates before writing
+        """
+        self.config_path = config_path
+        self.cache_path = f"{os.path.splitext(config_path)[0]}.cache.json"
+        self.debounce_interval = debounce_interval
+
+        self._lock = threading.RLock()
+        self._written_hashes: Dict[str, str] = {}
+        self._pending: Dict[str, Tuple[bytes, str]] = {}
+        self._timer: Optional[threading.Timer] = None
+
+        # Make sure debounced writes are not lost when the process exits
+        _open_stores.add(self)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Load the configuration from disk
+
+        Returns:
+            The configuration dictionary, or None if the identity file is missing or empty
+
+        Raises:
+            yaml.YAMLError: If the identity file contains invalid YAML
+            IOError: If the identity file cannot be read
+        """
+        if not os.path.exists(self.config_path):
+            return None
+
+        with self._lock:
+            with open(self.config_path, 'rb') as f:
+                raw = f.read()
+            config = yaml.safe_load(raw)
+            if not isinstance(config, dict):
+                return None
+            self._written_hashes[self.config_path] = self._digest(raw)
+
+            if os.path.exists(self.cache_path):
+                try:
+                    with open(self.cache_path, 'rb') as f:
+                        raw_cache = f.read()
+                    config[CACHE_SECTION] = json.loads(raw_cache)
+                    self._written_hashes[self.cache_path] = self._digest(raw_cache)
+                    if isinstance(config.get("client"), dict):
+                        config["client"]["last_server_sync"] = os.path.getmtime(self.cache_path)
+                except (ValueError, IOError) as e:
+                    logger.warning(f"Ignoring unreadable server config cache: {str(e)}")
+
+            return config
+
+    def save(self, config: Dict[str, Any], immediate: bool = False) -> None:
+        """
+        Stage a configuration for writing
+
+        Unchanged files are skipped. Unless immediate is set, the write is
+        delayed by debounce_interval so a burst of updates results in one write.
+
+        Args:
+            config: Configuration dictionary to save
+            immediate: Write synchronously instead of debouncing
+        """
+        identity, cache = self._split(config)
+
+        with self._lock:
+            self._stage(self.config_path, yaml.dump(identity, default_flow_style=False).encode('utf-8'))
+            if cache is not None:
+                self._stage(self.cache_path, json.dumps(cache, separators=(',', ':')).encode('utf-8'))
+
+            if immediate or self.debounce_interval <= 0:
+                self._flush_locked()
+            elif self._pending and self._timer is None:
+                self._timer = threading.Timer(self.debounce_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def mark_synced(self) -> None:
+        """
+        Record a successful sync by touching the cache file
+
+        Used when the synced server config did not change, so the cache
+        freshness is updated without rewriting its contents.
+        """
+        with self._lock:
+            if self.cache_path in self._pending:
+                # The pending write will set a new modification time
+                return
+            if os.path.exists(self.cache_path):
+                try:
+                    os.utime(self.cache_path, None)
+                except OSError as e:
+                    logger.warning(f"Could not update cache timestamp: {str(e)}")
+
+    def flush(self) -> None:
+        """
+        Write all pending changes to disk now
+        """
+        with self._lock:
+            self._flush_locked()
+
+    def _split(self, config: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[Any]]:
+        """
+        Split a configuration into the identity part and the server config cache
+
+        Args:
+            config: Full configuration dictionary
+
+        Returns:
+            Tuple of (identity config, cached server config or None)
+        """
+        identity = {key: value for key, value in config.items() if key != CACHE_SECTION}
+        if isinstance(identity.get("client"), dict) and "last_server_sync" in identity["client"]:
+            # Sync time is derived from the cache file, keep it out of the identity file
+            identity["client"] = {
+                key: value for key, value in identity["client"].items() if key != "last_server_sync"
+            }
+        return identity, config.get(CACHE_SECTION)
+
+    def _stage(self, path: str, data: bytes) -> None:
+        """
+        Queue data for a file unless it matches what is already on disk
+
+        Args:
+            path: Target file path
+            data: Serialized file contents
+        """
+        digest = self._digest(data)
+        if self._written_hashes.get(path) == digest:
+            self._pending.pop(path, None)
+            return
+        self._pending[path] = (data, digest)
+
+    def _flush_locked(self) -> None:
+        """Write pending files; the caller must hold the lock"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, {}
+        for path, (data, digest) in pending.items():
+            if self._atomic_write(path, data):
+                self._written_hashes[path] = digest
+                if path == self.cache_path:
+                    # Precompile the catalog lookup index used by lsl.py
+                    ContainerCatalog(self.config_path).compile()
+
+    def _atomic_write(self, path: str, data: bytes) -> bool:
+        """
+        Atomically replace a file with new contents
+
+        Args:
+            path: Target file path
+            data: File contents
+
+        Returns:
+            True if the file was written, False otherwise
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        temp_path = None
+
+        try:
+            os.makedirs(directory, exist_ok=True)
+            temp_fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.")
+            with os.fdopen(temp_fd, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+            logger.info(f"Configuration saved to {path}")
+            return True
+        except (IOError, OSError) as e:
+            logger.error(f"Error saving config: {str(e)}")
+            if temp_path and os.path.exists(temp_path):
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+            return False
+
+    @staticmethod
+    def _digest(data: bytes) -> str:
+        """
+        Compute the content hash of serialized data
+
+        Args:
+            data: Serialized file contents
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        return hashlib.sha256(data).hexdigest()
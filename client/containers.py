@@ -8,25 +8,76 @@ This module handles container operations including:
 - Error handling for Docker operations
 """
 import os
+import re
 import sys
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from typing import Dict, Any, Optional, List, Tuple
 
-import docker
-from docker.errors import APIError, ImageNotFound, NotFound
-
-# Use absolute imports for better compatibility
-import sys
-import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from client.config import get_client_config, ClientConfig
+from client.images import SetupImageBuilder
 from client.sync import ConfigSyncManager
+from client.pool import WarmPool, POOL_NAME_PREFIX
+from client.prefetch import ImagePrefetcher
+from client.teardown import TeardownPipeline
+from shared.utils.lazy_import import lazy_import
+from shared.utils.uuid_hash import generate_uuid
 from shared.utils.yaml_logger import setup_logger
 
+docker = lazy_import("docker")
+asyncio = lazy_import("asyncio")
+async_docker = lazy_import("client.async_docker")
+
 # Initialize logger
 logger = setup_logger("container_manager", "/tmp/lsl_client.log")
 
+# Labels attached to every LSL container so queries can be filtered by the Docker daemon
+LABEL_MANAGED = "lsl.managed"
+LABEL_OWNER = "lsl.owner"
+LABEL_TEMPLATE = "lsl.template"
+LABEL_SESSION = "lsl.session"
+LABEL_USER = "lsl.user"
+
+# Labels every container gets from _build_labels; warm pool containers carry only these
+STANDARD_LABELS = {LABEL_MANAGED, LABEL_OWNER, LABEL_TEMPLATE, LABEL_SESSION}
+
+# Older clients named containers lsl-<template>-<pid> and did not label them
+LEGACY_NAME_PREFIX = "lsl-"
+
+# Keys accepted in start_containers entries
+START_SPEC_KEYS = {"template", "user", "use_host_network", "persist_data"}
+
+def format_docker_error(error: Exception) -> str:
+    """
+    Format a user-friendly error message from Docker exception
+    
+    Args:
+        error: Docker exception (docker-py or asyncio Engine API client)
+        
+    Returns:
+        User-friendly error message
+    """
+    from docker.errors import APIError, ImageNotFound, NotFound
+    DockerEngineError = async_docker.DockerEngineError
+
+    if isinstance(error, ImageNotFound):
+        return f"Docker image not found. Please check the image name or pull it first."
+    elif isinstance(error, NotFound) or (isinstance(error, DockerEngineError) and error.status == 404):
+        return f"Container or resource not found."
+    elif isinstance(error, (APIError, DockerEngineError)):
+        # Extract the most relevant part of the API error
+        msg = str(error)
+        if "permission denied" in msg.lower():
+            return "Permission denied. You may need to run with sudo or add your user to the docker group."
+        elif "conflict" in msg.lower():
+            return "Name conflict. A container with this name may already exist."
+        else:
+            return f"Docker API error: {msg}"
+    else:
+        return f"Docker error: {str(error)}"
+
 class ContainerManager:
     """Container management class for LSL client"""
     
@@ -40,6 +91,10 @@ class ContainerManager:
         self.client_config = client_config or get_client_config()
         self.config_sync = ConfigSyncManager(self.client_config)
         
+        # Stop/remove operations run on a bounded worker pool
+        settings = self.client_config.config.get("settings", {})
+        self.teardown = TeardownPipeline(max_workers=settings.get("teardown_concurrency", 4))
+        
         # Initialize Docker client
         try:
             self.docker_client = docker.from_env()
@@ -48,6 +103,24 @@ class ContainerManager:
             logger.error(f"Failed to initialize Docker client: {str(e)}")
             self.docker_client = None
             
+        # Pull template images in the background after each config sync
+        self.prefetcher = None
+        self.config_sync.add_sync_listener(self._prefetch_images)
+        
+        # Keep warm pools of pooled templates filled after each config sync
+        self.pool = None
+        self.config_sync.add_sync_listener(self._refill_pools)
+        
+        # Templates with setup steps run cached derived images
+        self.image_builder = None
+        
+        # Asyncio Engine API client backing the async_* methods
+        self.async_client = None
+        self.async_concurrency = settings.get("async_concurrency", 8)
+        
+        # Unlabeled containers from older clients are looked up until none are left
+        self._unlabeled_remaining = True
+            
     def _check_docker_availability(self) -> bool:
         """
         Check if Docker is available
@@ -72,6 +145,94 @@ class ContainerManager:
             logger.error(f"Docker connection error: {str(e)}")
             return False
             
+    def _prefetch_images(self, containers: Dict[str, Any]) -> None:
+        """
+        Sync listener queueing the synced catalog's images for prefetching
+        
+        Args:
+            containers: Available container configurations
+        """
+        settings = self.client_config.config.get("settings", {})
+        if not settings.get("prefetch_images", True) or self.docker_client is None:
+            return
+            
+        if self.prefetcher is None:
+            cache_dir = os.path.expanduser(settings.get("container_cache_dir", "~/.cache/lsl/containers"))
+            self.prefetcher = ImagePrefetcher(
+                self.docker_client,
+                state_file=os.path.join(cache_dir, "images.json"),
+                max_concurrent_pulls=settings.get("prefetch_concurrency", 1)
+            )
+            
+        self.prefetcher.prefetch_catalog(containers)
+            
+    def _get_pool(self) -> WarmPool:
+        """
+        Get the warm container pool, creating it on first use
+        
+        Returns:
+            WarmPool instance
+        """
+        if self.pool is None:
+            settings = self.client_config.config.get("settings", {})
+            owner_uuid, _ = self.client_config.get_uuid_and_token()
+            cache_dir = os.path.expanduser(settings.get("container_cache_dir", "~/.cache/lsl/containers"))
+            self.pool = WarmPool(
+                self.docker_client,
+                owner=str(owner_uuid),
+                build_options=self._build_run_options,
+                build_labels=self._build_labels,
+                state_dir=cache_dir,
+                demand_window=settings.get("pool_demand_window", 600)
+            )
+        return self.pool
+        
+    def _resolve_image(self, container_config: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the image to run for a template
+        
+        Templates with setup steps run a derived image with the steps baked
+        in, built on first use and reused afterwards.
+        
+        Args:
+            container_config: Template configuration
+            
+        Returns:
+            Image reference
+        """
+        image = container_config.get("image")
+        if not image or not container_config.get("setup"):
+            return image
+            
+        if self.image_builder is None:
+            settings = self.client_config.config.get("settings", {})
+            cache_dir = os.path.expanduser(settings.get("container_cache_dir", "~/.cache/lsl/containers"))
+            self.image_builder = SetupImageBuilder(self.docker_client, state_dir=cache_dir)
+        return self.image_builder.resolve(image, container_config["setup"])
+        
+    def _refill_pools(self, containers: Dict[str, Any]) -> None:
+        """
+        Sync listener refilling the warm pools of templates with a pool section
+        
+        Args:
+            containers: Available container configurations
+        """
+        if self.docker_client is None:
+            return
+            
+        for name, config in containers.items():
+            if isinstance(config, dict) and config.get("pool"):
+                self._get_pool().refill_async(name, config)
+                
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """
+        Get warm pool metrics
+        
+        Returns:
+            Dictionary with hits, misses and the rate of starts served from the pool
+        """
+        return self._get_pool().get_metrics()
+            
     def _format_error_message(self, error: Exception) -> str:
         """
         Format a user-friendly error message from Docker exception
@@ -82,21 +243,7 @@ class ContainerManager:
         Returns:
             User-friendly error message
         """
-        if isinstance(error, ImageNotFound):
-            return f"Docker image not found. Please check the image name or pull it first."
-        elif isinstance(error, NotFound):
-            return f"Container or resource not found."
-        elif isinstance(error, APIError):
-            # Extract the most relevant part of the API error
-            msg = str(error)
-            if "permission denied" in msg.lower():
-                return "Permission denied. You may need to run with sudo or add your user to the docker group."
-            elif "conflict" in msg.lower():
-                return "Name conflict. A container with this name may already exist."
-            else:
-                return f"Docker API error: {msg}"
-        else:
-            return f"Docker error: {str(error)}"
+        return format_docker_error(error)
     
     def list_available_containers(self) -> List[Dict[str, Any]]:
         """
@@ -105,8 +252,8 @@ class ContainerManager:
         Returns:
             List of available container configurations
         """
-        # Force sync to ensure we have latest container list
-        self.config_sync.force_sync()
+        # Use the cached container list, refreshing it if stale
+        self.config_sync.refresh_if_stale()
         
         # Get container configurations from server config
         containers_dict = self.config_sync.get_available_containers()
@@ -125,6 +272,138 @@ class ContainerManager:
             
         return containers_list
         
+    def _query_containers(self, **labels: str) -> List[Dict[str, Any]]:
+        """
+        List LSL containers using a Docker label filter
+        
+        Uses the low-level list endpoint, which returns names, image, state,
+        creation time and labels in a single API call, instead of inspecting
+        every container on the host.
+        
+        Args:
+            **labels: Additional label filters, keyed by label name
+            
+        Returns:
+            List of raw container summaries from the Docker API
+        """
+        label_filters = [f"{LABEL_MANAGED}=true"]
+        label_filters.extend(f"{key}={value}" for key, value in labels.items())
+        summaries = self.docker_client.api.containers(all=True, filters={"label": label_filters})
+        
+        # Unclaimed warm pool containers are not user containers
+        return [s for s in summaries if not self._summary_name(s).startswith(POOL_NAME_PREFIX)]
+        
+    def _is_unlabeled(self, summary: Dict[str, Any]) -> bool:
+        """
+        Check whether a container summary is an unlabeled container of an older client
+        
+        Args:
+            summary: Raw container summary
+            
+        Returns:
+            True if the container has an LSL name but no LSL labels
+        """
+        name = self._summary_name(summary)
+        return (LABEL_MANAGED not in (summary.get("Labels") or {})
+                and name.startswith(LEGACY_NAME_PREFIX) and not name.startswith(POOL_NAME_PREFIX))
+        
+    def _query_unlabeled(self) -> List[Dict[str, Any]]:
+        """
+        List LSL containers created before containers were labeled
+        
+        New containers are always labeled, so once none are left the
+        query is skipped for the lifetime of the manager.
+        
+        Returns:
+            List of raw container summaries from the Docker API
+        """
+        if not self._unlabeled_remaining:
+            return []
+        summaries = self.docker_client.api.containers(all=True, filters={"name": f"^/{LEGACY_NAME_PREFIX}"})
+        unlabeled = [s for s in summaries if self._is_unlabeled(s)]
+        self._unlabeled_remaining = bool(unlabeled)
+        return unlabeled
+        
+    def _match_legacy(self, matches: List[Dict[str, Any]], unlabeled: List[Dict[str, Any]],
+                      container_name: str) -> List[Dict[str, Any]]:
+        """
+        Add unlabeled containers named after a template to its labeled containers
+        
+        Args:
+            matches: Containers found by template label
+            unlabeled: Unlabeled containers of older clients
+            container_name: Template name
+            
+        Returns:
+            Combined list of raw container summaries
+        """
+        prefix = f"{LEGACY_NAME_PREFIX}{container_name}-"
+        seen = {summary["Id"] for summary in matches}
+        return matches + [s for s in unlabeled if self._summary_name(s).startswith(prefix) and s["Id"] not in seen]
+        
+    def _find_matching_containers(self, container_name: str) -> List[Dict[str, Any]]:
+        """
+        Find containers for a template name or an exact container name
+        
+        Containers of older clients carry no labels; they match a template
+        by their lsl-<template>- name prefix.
+        
+        Args:
+            container_name: Template name (as defined in server config) or container name
+            
+        Returns:
+            List of raw container summaries from the Docker API
+        """
+        matches = self._query_containers(**{LABEL_TEMPLATE: container_name})
+        matches = self._match_legacy(matches, self._query_unlabeled(), container_name)
+        if matches:
+            return matches
+            
+        # Fall back to an exact container name, filtered by the daemon
+        by_name = self.docker_client.api.containers(all=True, filters={"name": container_name})
+        return [c for c in by_name if self._summary_name(c) == container_name]
+        
+    @staticmethod
+    def _summary_name(summary: Dict[str, Any]) -> str:
+        """
+        Get the container name from a Docker API container summary
+        
+        Args:
+            summary: Raw container summary
+            
+        Returns:
+            Container name without the leading slash
+        """
+        names = summary.get("Names") or [""]
+        return names[0].lstrip("/")
+            
+    def _summary_info(self, summary: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Extract basic container information from a Docker API container summary
+        
+        Args:
+            summary: Raw container summary
+            
+        Returns:
+            Container information dictionary
+        """
+        labels = summary.get("Labels") or {}
+        created = summary.get("Created")
+        status = summary.get("State", "")
+        
+        return {
+            "id": summary["Id"][:12],  # Short ID
+            "name": self._summary_name(summary),
+            "image": summary.get("Image", ""),
+            "status": status,
+            "created": datetime.fromtimestamp(created).isoformat() if created else "",
+            "is_running": status == "running",
+            "template": labels.get(LABEL_TEMPLATE),
+            "owner": labels.get(LABEL_OWNER),
+            "session": labels.get(LABEL_SESSION),
+            "user": labels.get(LABEL_USER)
+        }
+            
     def list_running_containers(self) -> List[Dict[str, Any]]:
         """
         List running LSL containers
@@ -137,30 +416,120 @@ class ContainerManager:
             return []
             
         try:
-            # Get LSL-managed containers
-            all_containers = self.docker_client.containers.list(all=True)
-            lsl_containers = [c for c in all_containers if c.name.startswith("lsl-")]
-            
-            result = []
-            for container in lsl_containers:
-                # Extract basic info
-                info = {
-                    "id": container.id[:12],  # Short ID
-                    "name": container.name,
-                    "image": container.image.tags[0] if container.image.tags else container.image.id[:12],
-                    "status": container.status,
-                    "created": container.attrs.get("Created", ""),
-                    "is_running": container.status == "running"
-                }
-                result.append(info)
-                
-            return result
+            # Get LSL-managed containers, and unlabeled ones from older clients
+            summaries = self._query_containers() + self._query_unlabeled()
+            return [self._summary_info(summary) for summary in summaries]
             
         except Exception as e:
             error_msg = self._format_error_message(e)
             logger.error(f"Error listing containers: {error_msg}")
             return []
             
+    def _build_labels(self, container_name: str, **extra: str) -> Dict[str, str]:
+        """
+        Build the labels identifying an LSL container
+        
+        Args:
+            container_name: Template name (as defined in server config)
+            **extra: Additional labels
+            
+        Returns:
+            Dictionary of Docker labels
+        """
+        owner_uuid, _ = self.client_config.get_uuid_and_token()
+        labels = {
+            LABEL_MANAGED: "true",
+            LABEL_OWNER: str(owner_uuid),
+            LABEL_TEMPLATE: container_name,
+            LABEL_SESSION: generate_uuid()
+        }
+        labels.update(extra)
+        return labels
+        
+    def _build_run_options(self, container_name: str, container_config: Dict[str, Any],
+                           use_host_network: bool = False, persist_data: bool = False,
+                           user: Optional[str] = None, create_dirs: bool = True) -> Dict[str, Any]:
+        """
+        Build Docker create/run options for a container template
+        
+        Host directories for volumes are created as a side effect unless
+        create_dirs is False.
+        
+        Args:
+            container_name: Template name (as defined in server config)
+            container_config: Template configuration
+            use_host_network: Whether to use host networking
+            persist_data: Whether to persist container data in volumes
+            user: Optional user the container is started for; gets its own persistent volume
+            create_dirs: Whether to create missing host directories
+            
+        Returns:
+            Keyword arguments for docker-py containers.run/create
+        """
+        # Prepare volumes
+        volumes = {}
+        if container_config.get("volumes"):
+            for vol in container_config["volumes"]:
+                host_path = vol["host_path"]
+                container_path = vol["container_path"]
+                read_only = vol.get("read_only", False)
+                
+                # Expand user home directory if needed
+                if host_path.startswith("~"):
+                    host_path = os.path.expanduser(host_path)
+                # Create host directory if it doesn't exist
+                if create_dirs and not os.path.exists(host_path):
+                    os.makedirs(host_path, exist_ok=True)
+                volumes[host_path] = {
+                    'bind': container_path, 
+                    'mode': 'ro' if read_only else 'rw'
+                }
+        
+        # Add persistent volume if requested
+        if persist_data:
+            if user:
+                persist_path = os.path.expanduser(f"~/.lsl/data/{user}/{container_name}")
+            else:
+                persist_path = os.path.expanduser(f"~/.lsl/data/{container_name}")
+            if create_dirs:
+                os.makedirs(persist_path, exist_ok=True)
+            volumes[persist_path] = {'bind': '/data', 'mode': 'rw'}
+            
+        # Network config
+        network_mode = "host" if use_host_network else None
+        
+        # Environment variables
+        environment = container_config.get("env", {})
+        
+        # Resource limits
+        resources = container_config.get("resources", {})
+        
+        # Convert memory limit
+        mem_limit = None
+        if "memory" in resources:
+            mem_limit = resources["memory"]
+        
+        # Convert CPU limit
+        cpu_limit = None
+        if "cpu" in resources:
+            try:
+                cpu_value = float(resources["cpu"].rstrip("m"))
+                if "m" in resources["cpu"]:
+                    cpu_limit = int(cpu_value * 1024)  # Convert millicores to shares
+                else:
+                    cpu_limit = int(cpu_value * 1024)  # Convert cores to shares
+            except (ValueError, AttributeError):
+                logger.warning(f"Invalid CPU limit format: {resources.get('cpu')}")
+        
+        return {
+            "image": self._resolve_image(container_config),
+            "volumes": volumes,
+            "network_mode": network_mode,
+            "environment": environment,
+            "mem_limit": mem_limit,
+            "cpu_shares": cpu_limit
+        }
+        
     def start_container(self, container_name: str, use_host_network: bool = False, 
                        persist_data: bool = False) -> Tuple[bool, str]:
         """
@@ -177,8 +546,8 @@ class ContainerManager:
         if not self._check_docker_availability():
             return False, "Docker is not available"
             
-        # Get container config
-        self.config_sync.force_sync()
+        # Get container config (cached, refreshed in the background if stale)
+        self.config_sync.refresh_if_stale()
         containers_dict = self.config_sync.get_available_containers()
         
         # Check if container exists in config
@@ -196,77 +565,8 @@ class ContainerManager:
             # Create unique container name
             unique_name = f"lsl-{container_name}-{os.getpid()}"
             
-            # Prepare volumes
-            volumes = {}
-            if container_config.get("volumes"):
-                for vol in container_config["volumes"]:
-                    host_path = vol["host_path"]
-                    container_path = vol["container_path"]
-                    read_only = vol.get("read_only", False)
-                    
-                    # Expand user home directory if needed
-                    if host_path.startswith("~"):
-                        host_path = os.path.expanduser(host_path)
-                    # Create host directory if it doesn't exist
-                    if not os.path.exists(host_path):
-                        os.makedirs(host_path, exist_ok=True)
-                    volumes[host_path] = {
-                        'bind': container_path, 
-                        'mode': 'ro' if read_only else 'rw'
-                    }
-            
-            # Add persistent volume if requested
-            if persist_data:
-                persist_path = os.path.expanduser(f"~/.lsl/data/{container_name}")
-                os.makedirs(persist_path, exist_ok=True)
-                volumes[persist_path] = {'bind': '/data', 'mode': 'rw'}
-                
-            # Network config
-            network_mode = "host" if use_host_network else None
-            
-            # Environment variables
-            environment = container_config.get("env", {})
-            
-            # Resource limits
-            resources = container_config.get("resources", {})
-            
-            # Convert memory limit
-            mem_limit = None
-            if "memory" in resources:
-                mem_limit = resources["memory"]
-            
-            # Convert CPU limit
-            cpu_limit = None
-            if "cpu" in resources:
-                try:
-                    cpu_value = float(resources["cpu"].rstrip("m"))
-                    if "m" in resources["cpu"]:
-                        cpu_limit = int(cpu_value * 1024)  # Convert millicores to shares
-                    else:
-                        cpu_limit = int(cpu_value * 1024)  # Convert cores to shares
-                except (ValueError, AttributeError):
-                    logger.warning(f"Invalid CPU limit format: {resources.get('cpu')}")
-            
-            # Start container
-            container = self.docker_client.containers.run(
-                image=image,
-                name=unique_name,
-                detach=True,
-                volumes=volumes,
-                network_mode=network_mode,
-                environment=environment,
-                mem_limit=mem_limit,
-                cpu_shares=cpu_limit
-            )
-            
-            # Handle tmux/screen setup for shared containers
-            is_shared = container_config.get("shared", False)
-            if is_shared:
-                # Here you would set up tmux/screen inside the container
-                # This would require executing commands in the container
-                pass
-                
-            logger.info(f"Started container {unique_name} from image {image}")
+            self._launch_container(container_name, container_config, unique_name,
+                                   use_host_network=use_host_network, persist_data=persist_data)
             return True, f"Container '{unique_name}' started successfully"
             
         except Exception as e:
@@ -274,12 +574,234 @@ class ContainerManager:
             logger.error(f"Error starting container: {error_msg}")
             return False, f"Failed to start container: {error_msg}"
             
-    def stop_container(self, container_name: str) -> Tuple[bool, str]:
+    def _launch_container(self, container_name: str, container_config: Dict[str, Any], unique_name: str,
+                          use_host_network: bool = False, persist_data: bool = False,
+                          labels: Optional[Dict[str, str]] = None,
+                          run_options: Optional[Dict[str, Any]] = None) -> Tuple[str, bool]:
+        """
+        Start one container from a validated template
+        
+        Args:
+            container_name: Template name (as defined in server config)
+            container_config: Template configuration
+            unique_name: Name of the new container
+            use_host_network: Whether to use host networking
+            persist_data: Whether to persist container data in volumes
+            labels: Prebuilt labels, built from the template if not given
+            run_options: Prebuilt run options, built from the template if not given
+            
+        Returns:
+            Tuple of (container ID, whether it was served from the warm pool)
+        """
+        # Use a pre-created container from the warm pool when the options allow it. Labels
+        # can't be changed after creation, so starts with extra labels (lsl.user) get a new container.
+        pool_config = container_config.get("pool")
+        custom_labels = bool(labels and set(labels) - STANDARD_LABELS)
+        if pool_config and not use_host_network and not persist_data and not custom_labels:
+            pool = self._get_pool()
+            claimed = pool.claim(container_name, container_config, unique_name)
+            pool.refill_async(container_name, container_config)
+            if claimed:
+                logger.info(f"Started container {unique_name} from warm pool")
+                return claimed, True
+                
+        # Start container
+        container = self.docker_client.containers.run(
+            name=unique_name,
+            detach=True,
+            labels=labels or self._build_labels(container_name),
+            **(run_options or self._build_run_options(container_name, container_config,
+                                                      use_host_network, persist_data))
+        )
+        
+        # Handle tmux/screen setup for shared containers
+        is_shared = container_config.get("shared", False)
+        if is_shared:
+            # Here you would set up tmux/screen inside the container
+            # This would require executing commands in the container
+            pass
+            
+        logger.info(f"Started container {unique_name} from image {container_config.get('image')}")
+        return getattr(container, "id", None), False
+        
+    def _validate_start_spec(self, spec: Any, containers_dict: Dict[str, Any]) -> Optional[str]:
+        """
+        Validate one start_containers entry
+        
+        Args:
+            spec: Entry to validate
+            containers_dict: Available container configurations
+            
+        Returns:
+            Error message, or None if the entry is valid
+        """
+        if not isinstance(spec, dict):
+            return "Entry must be a mapping"
+        unknown = set(spec) - START_SPEC_KEYS
+        if unknown:
+            return f"Unknown option(s): {', '.join(sorted(unknown))}"
+            
+        template = spec.get("template")
+        if not template:
+            return "No template specified"
+        if template not in containers_dict:
+            return f"Container '{template}' not found in available containers"
+        if not containers_dict[template].get("image"):
+            return f"No image specified for container '{template}'"
+            
+        user = spec.get("user")
+        if user is not None and not re.fullmatch(r"[A-Za-z0-9][A-Za-z0-9_.-]*", str(user)):
+            return f"Invalid user name: {user}"
+        return None
+        
+    def start_containers(self, specs: List[Dict[str, Any]],
+                         concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Start many containers with bounded parallelism
+        
+        Every entry is validated before anything is started; if any entry is
+        invalid, no container is started. The container catalog is looked up
+        once and host volume directories are created in a single pass.
+        
+        Args:
+            specs: Entries with "template" and optional "user", "use_host_network"
+                   and "persist_data" keys
+            concurrency: Maximum number of containers started at once
+                         (defaults to the start_concurrency setting)
+            
+        Returns:
+            List of per-entry results in input order, each with index, template,
+            user, success, name, container_id, from_pool, message and duration
+        """
+        results = [
+            {
+                "index": index,
+                "template": spec.get("template") if isinstance(spec, dict) else None,
+                "user": spec.get("user") if isinstance(spec, dict) else None,
+                "success": False,
+                "name": None,
+                "container_id": None,
+                "from_pool": False,
+                "message": "",
+                "duration": 0.0
+            }
+            for index, spec in enumerate(specs)
+        ]
+        if not specs:
+            return results
+            
+        if not self._check_docker_availability():
+            for result in results:
+                result["message"] = "Docker is not available"
+            return results
+            
+        # One catalog lookup for the whole batch
+        self.config_sync.refresh_if_stale()
+        containers_dict = self.config_sync.get_available_containers()
+        
+        errors = [self._validate_start_spec(spec, containers_dict) for spec in specs]
+        if any(errors):
+            for result, error in zip(results, errors):
+                result["message"] = error or "Not started: other entries failed validation"
+            return results
+            
+        # Build every container's options, then create the host paths in one pass
+        pid = os.getpid()
+        plans = []
+        host_paths = set()
+        try:
+            for index, spec in enumerate(specs):
+                template = spec["template"]
+                user = spec.get("user")
+                config = containers_dict[template]
+                options = self._build_run_options(
+                    template, config,
+                    use_host_network=spec.get("use_host_network", False),
+                    persist_data=spec.get("persist_data", False),
+                    user=user,
+                    create_dirs=False
+                )
+                host_paths.update(options["volumes"])
+                name_parts = ["lsl", template] + ([str(user)] if user else []) + [str(pid), str(index)]
+                plans.append((spec, config, "-".join(name_parts), options))
+                
+            for host_path in sorted(host_paths):
+                os.makedirs(host_path, exist_ok=True)
+        except Exception as e:
+            # Derived image builds and volume creation are shared by the batch
+            error_msg = self._format_error_message(e)
+            logger.error(f"Error preparing containers: {error_msg}")
+            for result in results:
+                result["message"] = f"Failed to prepare containers: {error_msg}"
+            return results
+            
+        def start_one(index: int) -> None:
+            spec, config, unique_name, options = plans[index]
+            result = results[index]
+            result["name"] = unique_name
+            labels = {LABEL_USER: str(spec["user"])} if spec.get("user") else {}
+            started = time.monotonic()
+            try:
+                container_id, from_pool = self._launch_container(
+                    spec["template"], config, unique_name,
+                    use_host_network=spec.get("use_host_network", False),
+                    persist_data=spec.get("persist_data", False),
+                    labels=self._build_labels(spec["template"], **labels),
+                    run_options=options
+                )
+                result.update(success=True, container_id=container_id, from_pool=from_pool,
+                              message=f"Container '{unique_name}' started successfully")
+            except Exception as e:
+                error_msg = self._format_error_message(e)
+                logger.error(f"Error starting container {unique_name}: {error_msg}")
+                result["message"] = f"Failed to start container: {error_msg}"
+            result["duration"] = round(time.monotonic() - started, 3)
+            
+        settings = self.client_config.config.get("settings", {})
+        workers = max(1, min(len(specs), concurrency or settings.get("start_concurrency", 4)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="LSLStart") as executor:
+            list(executor.map(start_one, range(len(specs))))
+            
+        started_count = sum(1 for result in results if result["success"])
+        logger.info(f"Started {started_count} of {len(specs)} container(s) with concurrency {workers}")
+        return results
+            
+    def _run_teardown(self, matching_containers: List[Dict[str, Any]], verb: str, wait: bool,
+                      **options) -> Tuple[bool, str]:
+        """
+        Run a teardown job and build the result message
+        
+        Args:
+            matching_containers: Raw container summaries to tear down
+            verb: Past-tense verb used in messages ("Stopped", "Removed")
+            wait: Whether to wait for the job to finish
+            **options: Options passed to TeardownPipeline.submit
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        job = self.teardown.submit(self.docker_client, matching_containers, **options)
+        count = len(matching_containers)
+        
+        if not wait:
+            return True, f"Queued {count} container(s) for teardown (job {job.id})"
+            
+        job.wait()
+        failures = job.failures()
+        if failures:
+            details = "; ".join(f"{f['name']}: {f['error']}" for f in failures)
+            return False, f"{verb} {count - len(failures)} of {count} container(s), failed: {details}"
+            
+        return True, f"{verb} {count} container(s)"
+            
+    def stop_container(self, container_name: str, wait: bool = True) -> Tuple[bool, str]:
         """
         Stop a running container
         
         Args:
             container_name: Name of the container to stop
+            wait: Wait for the containers to stop; if False, stopping continues
+                  on this process's teardown pool and can be followed with get_teardown_status
             
         Returns:
             Tuple of (success, message)
@@ -287,25 +809,15 @@ class ContainerManager:
         if not self._check_docker_availability():
             return False, "Docker is not available"
             
-        # Check if container name is a prefix or exact match
+        # Match by template label, or by exact container name
         try:
-            all_containers = self.docker_client.containers.list(all=True)
-            matching_containers = [c for c in all_containers 
-                                 if c.name == container_name or 
-                                    c.name.startswith(f"lsl-{container_name}-")]
+            matching_containers = self._find_matching_containers(container_name)
             
             if not matching_containers:
                 return False, f"No containers found matching '{container_name}'"
                 
-            # Stop all matching containers
-            for container in matching_containers:
-                if container.status == "running":
-                    logger.info(f"Stopping container {container.name}")
-                    container.stop(timeout=10)
-                else:
-                    logger.info(f"Container {container.name} is already stopped")
-                    
-            return True, f"Stopped {len(matching_containers)} container(s)"
+            # Stop all matching containers in parallel
+            return self._run_teardown(matching_containers, "Stopped", wait, stop=True, timeout=10)
             
         except Exception as e:
             error_msg = self._format_error_message(e)
@@ -313,7 +825,7 @@ class ContainerManager:
             return False, f"Failed to stop container: {error_msg}"
             
     def remove_container(self, container_name: str, force: bool = False, 
-                        remove_volumes: bool = False) -> Tuple[bool, str]:
+                        remove_volumes: bool = False, wait: bool = True) -> Tuple[bool, str]:
         """
         Remove a container
         
@@ -321,6 +833,7 @@ class ContainerManager:
             container_name: Name of the container to remove
             force: Force removal even if running
             remove_volumes: Whether to remove associated volumes
+            wait: Wait for the removal; if False, it continues on this process's teardown pool
             
         Returns:
             Tuple of (success, message)
@@ -329,22 +842,370 @@ class ContainerManager:
             return False, "Docker is not available"
             
         try:
-            all_containers = self.docker_client.containers.list(all=True)
-            matching_containers = [c for c in all_containers 
-                                 if c.name == container_name or 
-                                    c.name.startswith(f"lsl-{container_name}-")]
+            matching_containers = self._find_matching_containers(container_name)
             
             if not matching_containers:
                 return False, f"No containers found matching '{container_name}'"
                 
-            # Remove all matching containers
-            for container in matching_containers:
-                logger.info(f"Removing container {container.name}")
-                container.remove(force=force, v=remove_volumes)
-                
-            return True, f"Removed {len(matching_containers)} container(s)"
+            # Remove all matching containers in parallel
+            return self._run_teardown(matching_containers, "Removed", wait, stop=False, remove=True,
+                                      force=force, remove_volumes=remove_volumes)
             
         except Exception as e:
             error_msg = self._format_error_message(e)
             logger.error(f"Error removing container: {error_msg}")
             return False, f"Failed to remove container: {error_msg}"
+            
+    def teardown_container(self, container_name: str, remove_volumes: bool = True,
+                           wait: bool = False) -> Tuple[bool, str]:
+        """
+        Stop and remove containers, including their volumes, in one pipeline
+        
+        By default this returns as soon as the containers are queued, and
+        get_teardown_status reports progress. The teardown runs on this
+        process's worker pool, so it is not detached: the process must stay
+        alive until it finishes (exiting waits for it).
+        
+        Args:
+            container_name: Name of the container to tear down
+            remove_volumes: Whether to remove associated volumes
+            wait: Wait for the teardown to finish
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        if not self._check_docker_availability():
+            return False, "Docker is not available"
+            
+        try:
+            matching_containers = self._find_matching_containers(container_name)
+            
+            if not matching_containers:
+                return False, f"No containers found matching '{container_name}'"
+                
+            return self._run_teardown(matching_containers, "Tore down", wait, stop=True, remove=True,
+                                      remove_volumes=remove_volumes, timeout=10)
+            
+        except Exception as e:
+            error_msg = self._format_error_message(e)
+            logger.error(f"Error tearing down container: {error_msg}")
+            return False, f"Failed to tear down container: {error_msg}"
+            
+    def get_prefetch_progress(self, image: Optional[str] = None) -> Any:
+        """
+        Get the progress of background image prefetching
+        
+        Args:
+            image: Optional image reference
+            
+        Returns:
+            Progress of the image, or of all images keyed by reference
+        """
+        if self.prefetcher is None:
+            return None if image is not None else {}
+        return self.prefetcher.get_progress(image)
+        
+    def get_teardown_status(self, job_id: Optional[str] = None) -> Any:
+        """
+        Get the status of background teardown jobs
+        
+        Args:
+            job_id: Optional job ID returned in a teardown message
+            
+        Returns:
+            Status of the job, list of all job statuses, or None if unknown
+        """
+        return self.teardown.get_status(job_id)
+        
+    # Async API, backed by the asyncio Engine API client
+    
+    def _get_async_client(self) -> 'async_docker.AsyncDockerClient':
+        """
+        Get the asyncio Docker client, creating it on first use
+        
+        Returns:
+            AsyncDockerClient instance
+        """
+        if self.async_client is None:
+            self.async_client = async_docker.AsyncDockerClient(max_connections=self.async_concurrency)
+        return self.async_client
+        
+    async def _async_query_containers(self, **labels: str) -> List[Dict[str, Any]]:
+        """
+        List LSL containers using a Docker label filter
+        
+        Args:
+            **labels: Additional label filters, keyed by label name
+            
+        Returns:
+            List of raw container summaries from the Docker API
+        """
+        label_filters = [f"{LABEL_MANAGED}=true"]
+        label_filters.extend(f"{key}={value}" for key, value in labels.items())
+        summaries = await self._get_async_client().list_containers(all=True, filters={"label": label_filters})
+        return [s for s in summaries if not self._summary_name(s).startswith(POOL_NAME_PREFIX)]
+        
+    async def _async_query_unlabeled(self) -> List[Dict[str, Any]]:
+        """
+        List LSL containers created before containers were labeled
+        
+        Returns:
+            List of raw container summaries from the Docker API
+        """
+        if not self._unlabeled_remaining:
+            return []
+        summaries = await self._get_async_client().list_containers(
+            all=True, filters={"name": [f"^/{LEGACY_NAME_PREFIX}"]})
+        unlabeled = [s for s in summaries if self._is_unlabeled(s)]
+        self._unlabeled_remaining = bool(unlabeled)
+        return unlabeled
+        
+    async def _async_find_matching_containers(self, container_name: str) -> List[Dict[str, Any]]:
+        """
+        Find containers for a template name or an exact container name
+        
+        Args:
+            container_name: Template name (as defined in server config) or container name
+            
+        Returns:
+            List of raw container summaries from the Docker API
+        """
+        matches = await self._async_query_containers(**{LABEL_TEMPLATE: container_name})
+        matches = self._match_legacy(matches, await self._async_query_unlabeled(), container_name)
+        if matches:
+            return matches
+            
+        by_name = await self._get_async_client().list_containers(all=True, filters={"name": [container_name]})
+        return [c for c in by_name if self._summary_name(c) == container_name]
+        
+    async def async_list_running_containers(self) -> List[Dict[str, Any]]:
+        """
+        List running LSL containers
+        
+        Returns:
+            List of running container information
+        """
+        try:
+            summaries = await self._async_query_containers() + await self._async_query_unlabeled()
+            return [self._summary_info(summary) for summary in summaries]
+        except Exception as e:
+            error_msg = self._format_error_message(e)
+            logger.error(f"Error listing containers: {error_msg}")
+            return []
+            
+    async def async_inspect_container(self, container_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Inspect a container
+        
+        Args:
+            container_id: Container ID or name
+            
+        Returns:
+            Container details, or None if the container could not be inspected
+        """
+        try:
+            return await self._get_async_client().inspect_container(container_id)
+        except Exception as e:
+            error_msg = self._format_error_message(e)
+            logger.error(f"Error inspecting container: {error_msg}")
+            return None
+            
+    async def async_start_container(self, container_name: str, use_host_network: bool = False,
+                                    persist_data: bool = False, refresh: bool = True) -> Tuple[bool, str]:
+        """
+        Start a container by name
+        
+        Args:
+            container_name: Name of the container to start (as defined in server config)
+            use_host_network: Whether to use host networking
+            persist_data: Whether to persist container data in volumes
+            refresh: Whether to refresh a stale container catalog first
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        if refresh:
+            # A stale catalog means a blocking sync with the server; keep it off the event loop
+            await asyncio.to_thread(self.config_sync.refresh_if_stale)
+        containers_dict = self.config_sync.get_available_containers()
+        
+        if container_name not in containers_dict:
+            return False, f"Container '{container_name}' not found in available containers"
+            
+        container_config = containers_dict[container_name]
+        image = container_config.get("image")
+        if not image:
+            return False, f"No image specified for container '{container_name}'"
+            
+        try:
+            labels = self._build_labels(container_name)
+            # Concurrent starts in one process need distinct names
+            unique_name = f"lsl-{container_name}-{os.getpid()}-{labels[LABEL_SESSION][:8]}"
+            
+            pool_config = container_config.get("pool")
+            if pool_config and not use_host_network and not persist_data:
+                pool = self._get_pool()
+                claimed = await asyncio.to_thread(pool.claim, container_name, container_config, unique_name)
+                pool.refill_async(container_name, container_config)
+                if claimed:
+                    logger.info(f"Started container {unique_name} from warm pool")
+                    return True, f"Container '{unique_name}' started successfully"
+                    
+            options = await asyncio.to_thread(self._build_run_options, container_name, container_config,
+                                              use_host_network, persist_data)
+            create_config = async_docker.create_config_from_options(options, labels=labels)
+            
+            client = self._get_async_client()
+            try:
+                container_id = await client.create_container(create_config, name=unique_name)
+            except async_docker.DockerEngineError as e:
+                if e.status != 404:
+                    raise
+                # Image missing locally; pull it like docker-py's run does
+                await client.pull_image(image)
+                container_id = await client.create_container(create_config, name=unique_name)
+            await client.start_container(container_id)
+            
+            logger.info(f"Started container {unique_name} from image {image}")
+            return True, f"Container '{unique_name}' started successfully"
+            
+        except Exception as e:
+            error_msg = self._format_error_message(e)
+            logger.error(f"Error starting container: {error_msg}")
+            return False, f"Failed to start container: {error_msg}"
+            
+    async def _async_teardown(self, container_name: str, verb: str, stop: bool, remove: bool,
+                              force: bool = False, remove_volumes: bool = False) -> Tuple[bool, str]:
+        """
+        Stop and/or remove the containers matching a name concurrently
+        
+        Args:
+            container_name: Template name or container name
+            verb: Past-tense verb used in messages ("Stopped", "Removed")
+            stop: Whether to stop running containers
+            remove: Whether to remove the containers
+            force: Force removal even if running
+            remove_volumes: Whether to remove associated volumes
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        client = self._get_async_client()
+        try:
+            matching_containers = await self._async_find_matching_containers(container_name)
+        except Exception as e:
+            error_msg = self._format_error_message(e)
+            logger.error(f"Error finding containers: {error_msg}")
+            return False, f"Failed to find containers: {error_msg}"
+            
+        if not matching_containers:
+            return False, f"No containers found matching '{container_name}'"
+            
+        async def teardown_one(summary):
+            if stop and summary.get("State") == "running":
+                await client.stop_container(summary["Id"], timeout=10)
+            if remove:
+                await client.remove_container(summary["Id"], force=force, v=remove_volumes)
+                
+        results = await async_docker.gather_bounded(
+            [lambda summary=summary: teardown_one(summary) for summary in matching_containers],
+            self.async_concurrency
+        )
+        
+        count = len(matching_containers)
+        failures = [
+            f"{self._summary_name(summary)}: {self._format_error_message(result)}"
+            for summary, result in zip(matching_containers, results)
+            if isinstance(result, Exception)
+        ]
+        if failures:
+            return False, f"{verb} {count - len(failures)} of {count} container(s), failed: {'; '.join(failures)}"
+        return True, f"{verb} {count} container(s)"
+        
+    async def async_stop_container(self, container_name: str) -> Tuple[bool, str]:
+        """
+        Stop running containers
+        
+        Args:
+            container_name: Template name or container name
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        return await self._async_teardown(container_name, "Stopped", stop=True, remove=False)
+        
+    async def async_remove_container(self, container_name: str, force: bool = False,
+                                     remove_volumes: bool = False) -> Tuple[bool, str]:
+        """
+        Remove containers
+        
+        Args:
+            container_name: Template name or container name
+            force: Force removal even if running
+            remove_volumes: Whether to remove associated volumes
+            
+        Returns:
+            Tuple of (success, message)
+        """
+        return await self._async_teardown(container_name, "Removed", stop=False, remove=True,
+                                          force=force, remove_volumes=remove_volumes)
+                                          
+    async def async_exec(self, container_id: str, command: Any,
+                         user: Optional[str] = None) -> Tuple[Optional[int], str, str]:
+        """
+        Run a command in a container
+        
+        Args:
+            container_id: Container ID or name
+            command: Command (string or list)
+            user: Optional user to run as
+            
+        Returns:
+            Tuple of (exit code, stdout, stderr); the exit code is None if Docker did not report one
+        """
+        exit_code, stdout, stderr = await self._get_async_client().exec(container_id, command, user=user)
+        return exit_code, stdout.decode("utf-8", "replace"), stderr.decode("utf-8", "replace")
+        
+    async def async_bulk(self, operation: str, names: List[str], concurrency: Optional[int] = None,
+                         **kwargs) -> List[Tuple[bool, str]]:
+        """
+        Run an async operation for many containers with bounded parallelism
+        
+        Args:
+            operation: One of "start", "stop" or "remove"
+            names: Template or container names, one operation per entry
+            concurrency: Maximum number of operations in flight (defaults to async_concurrency)
+            **kwargs: Options passed to the operation
+            
+        Returns:
+            List of (success, message) tuples in input order
+        """
+        operations = {
+            "start": self.async_start_container,
+            "stop": self.async_stop_container,
+            "remove": self.async_remove_container
+        }
+        if operation not in operations:
+            raise ValueError(f"Unknown bulk operation: {operation}")
+        func = operations[operation]
+        if operation == "start":
+            # Refresh the catalog once for the whole batch, not once per container
+            await asyncio.to_thread(self.config_sync.refresh_if_stale)
+            kwargs["refresh"] = False
+        
+        results = await async_docker.gather_bounded(
+            [lambda name=name: func(name, **kwargs) for name in names],
+            concurrency or self.async_concurrency
+        )
+        return [
+            (False, f"Failed to {operation} container: {self._format_error_message(result)}")
+            if isinstance(result, Exception) else result
+            for result in results
+        ]
+        
+    async def async_close(self) -> None:
+        """
+        Close the connections of the asyncio Docker client
+        """
+        if self.async_client is not None:
+            await self.async_client.close()
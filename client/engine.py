@@ -0,0 +1,353 @@
+"""
+Local Engine Module
+
+This module drives containers for lsl.py directly through the Docker Engine
+API instead of spawning a docker CLI process per step, including:
+- One persistent API connection reused for every step of a command
+- Building images with setup steps through SetupImageBuilder
+- Listing the host ports published by running containers
+- Creating and starting containers, with errors reported by the daemon
+- Attaching the terminal to a container through its hijacked TTY stream
+- Keeping the container TTY the size of the local terminal window
+"""
+import os
+import shutil
+import signal
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+from client.containers import format_docker_error
+from client.images import SetupImageBuilder
+from client.prefetch import split_image_reference
+from client.terminal import relay_terminal
+from shared.utils.lazy_import import lazy_import
+from shared.utils.yaml_logger import setup_logger
+
+docker = lazy_import("docker")
+
+# Initialize logger
+logger = setup_logger("local_engine", "/tmp/lsl_client.log")
+
+# Default directory of the derived image build locks
+DEFAULT_STATE_DIR = "~/.cache/lsl/containers"
+
+
+class EngineError(Exception):
+    """Error reported by the Docker daemon"""
+
+    def __init__(self, error: Exception):
+        """
+        Initialize the error
+
+        Args:
+            error: Underlying docker-py exception
+        """
+        super().__init__(format_docker_error(error))
+        self.error = error
+        self.status = getattr(error, "status_code", None)
+        self.explanation = str(getattr(error, "explanation", None) or error)
+
+    def is_port_conflict(self) -> bool:
+        """
+        Check if the error means a published host port is already in use
+
+        Returns:
+            True if the port is taken
+        """
+        explanation = self.explanation.lower()
+        return "port is already allocated" in explanation or "address already in use" in explanation
+
+
+class LocalEngine:
+    """
+    Local Engine
+
+    Runs lsl.py's containers through one docker-py API client, so every step
+    of a command shares a keep-alive connection to the daemon.
+    """
+
+    def __init__(self, docker_client=None, state_dir: str = DEFAULT_STATE_DIR):
+        """
+        Initialize the engine
+
+        Args:
+            docker_client: docker-py client, created from the environment if not given
+            state_dir: Directory holding the derived image build locks
+
+        Raises:
+            EngineError: If the Docker daemon cannot be reached
+        """
+        try:
+            self.docker_client = docker_client or docker.from_env()
+        except Exception as e:
+            raise EngineError(e)
+        self.api = self.docker_client.api
+        self.state_dir = os.path.expanduser(state_dir)
+        self._image_builder: Optional[SetupImageBuilder] = None
+
+    def ensure_image(self, image: str) -> None:
+        """
+        Pull an image unless it is present locally
+
+        Args:
+            image: Image reference
+
+        Raises:
+            EngineError: If the image cannot be pulled
+        """
+        try:
+            self.api.inspect_image(image)
+            return
+        except docker.errors.ImageNotFound:
+            pass
+        except docker.errors.APIError as e:
+            raise EngineError(e)
+
+        repository, tag = split_image_reference(image)
+        logger.info(f"Pulling image {image}")
+        try:
+            for event in self.api.pull(repository, tag=tag, stream=True, decode=True):
+                if "error" in event:
+                    raise EngineError(docker.errors.APIError(event["error"]))
+        except docker.errors.APIError as e:
+            raise EngineError(e)
+
+    def setup_image(self, image: str, setup: Dict[str, Any]) -> str:
+        """
+        Get the derived image of a base image with setup steps, building it on first use
+
+        Args:
+            image: Base image reference
+            setup: Setup steps (packages, commands)
+
+        Returns:
+            Derived image reference
+
+        Raises:
+            EngineError: If pulling or building fails
+        """
+        if self._image_builder is None:
+            self._image_builder = SetupImageBuilder(self.docker_client, state_dir=self.state_dir)
+        try:
+            return self._image_builder.resolve(image, setup)
+        except docker.errors.APIError as e:
+            raise EngineError(e)
+        except RuntimeError as e:
+            raise EngineError(e)
+
+    def published_ports(self) -> Dict[int, str]:
+        """
+        List the host ports published by running containers
+
+        Returns:
+            Dictionary of host port to container name
+
+        Raises:
+            EngineError: If the containers cannot be listed
+        """
+        try:
+            summaries = self.api.containers()
+        except docker.errors.APIError as e:
+            raise EngineError(e)
+
+        published = {}
+        for summary in summaries:
+            name = (summary.get("Names") or ["/"])[0].lstrip("/")
+            for port in summary.get("Ports") or []:
+                if port.get("PublicPort"):
+                    published[int(port["PublicPort"])] = name
+        return published
+
+    def create(self, image: str, command: List[str], name: Optional[str] = None,
+               environment: Optional[Dict[str, str]] = None, binds: Optional[List[str]] = None,
+               network_mode: Optional[str] = None, ports: Optional[Dict[int, int]] = None,
+               interactive: bool = False, auto_remove: bool = True) -> str:
+        """
+        Create a container, pulling its image if needed
+
+        Args:
+            image: Image reference
+            command: Command to run
+            name: Container name
+            environment: Environment variables
+            binds: Volume binds as 'host_path:container_path'
+            network_mode: Network mode, e.g. 'host'
+            ports: Container port to host port
+            interactive: Allocate a TTY and keep stdin open
+            auto_remove: Remove the container when it exits
+
+        Returns:
+            Container ID
+
+        Raises:
+            EngineError: If the container cannot be created
+        """
+        host_config = self.api.create_host_config(
+            binds=binds or None,
+            network_mode=network_mode,
+            port_bindings=ports or None,
+            auto_remove=auto_remove
+        )
+        options = dict(
+            command=command,
+            name=name,
+            environment=environment,
+            ports=list(ports) if ports else None,
+            tty=interactive,
+            stdin_open=interactive,
+            host_config=host_config
+        )
+        try:
+            try:
+                return self.api.create_container(image, **options)["Id"]
+            except docker.errors.ImageNotFound:
+                self.ensure_image(image)
+                return self.api.create_container(image, **options)["Id"]
+        except docker.errors.APIError as e:
+            raise EngineError(e)
+
+    def start(self, container_id: str) -> None:
+        """
+        Start a container, removing it if it cannot start
+
+        Args:
+            container_id: Container ID
+
+        Raises:
+            EngineError: If the container cannot start
+        """
+        try:
+            self.api.start(container_id)
+        except docker.errors.APIError as e:
+            self.remove(container_id)
+            raise EngineError(e)
+
+    def run_detached(self, image: str, command: List[str], **options) -> str:
+        """
+        Create and start a background container
+
+        Args:
+            image: Image reference
+            command: Command to run
+            **options: Options passed to create
+
+        Returns:
+            Container ID
+
+        Raises:
+            EngineError: If the container cannot be created or started
+        """
+        container_id = self.create(image, command, **options)
+        self.start(container_id)
+        return container_id
+
+    def attach(self, container_id: str) -> int:
+        """
+        Attach to a container's TTY, hijacking the HTTP connection
+
+        Attach before starting the container so no output is missed.
+
+        Args:
+            container_id: Container ID
+
+        Returns:
+            File descriptor of the raw TTY stream, owned by the caller
+
+        Raises:
+            EngineError: If the attach request fails
+        """
+        params = {"stdin": 1, "stdout": 1, "stderr": 1, "stream": 1}
+        try:
+            stream = self.api.attach_socket(container_id, params=params)
+        except docker.errors.APIError as e:
+            raise EngineError(e)
+        # Keep our own descriptor so closing docker-py's response does not end the stream
+        stream_fd = os.dup(stream.fileno())
+        stream.close()
+        return stream_fd
+
+    def resize(self, container_id: str, columns: int, rows: int) -> None:
+        """
+        Resize a container's TTY
+
+        Args:
+            container_id: Container ID
+            columns: Terminal width
+            rows: Terminal height
+        """
+        try:
+            self.api.resize(container_id, height=rows, width=columns)
+        except docker.errors.APIError as e:
+            logger.debug(f"Could not resize {container_id[:12]}: {str(e)}")
+
+    @contextmanager
+    def follow_terminal_size(self, container_id: str):
+        """
+        Keep a container's TTY the size of the local terminal for the duration of the block
+
+        Args:
+            container_id: Container ID
+        """
+        def resize_to_terminal(*_):
+            columns, rows = shutil.get_terminal_size()
+            self.resize(container_id, columns, rows)
+
+        resize_to_terminal()
+        # Signal handlers can only be installed from the main thread
+        if not hasattr(signal, "SIGWINCH") or threading.current_thread() is not threading.main_thread():
+            yield
+            return
+
+        previous = signal.signal(signal.SIGWINCH, resize_to_terminal)
+        try:
+            yield
+        finally:
+            signal.signal(signal.SIGWINCH, previous if previous is not None else signal.SIG_DFL)
+
+    def remove(self, container_id: str) -> None:
+        """
+        Force-remove a container, ignoring containers that are already gone
+
+        Args:
+            container_id: Container ID
+        """
+        try:
+            self.api.remove_container(container_id, force=True)
+        except docker.errors.APIError as e:
+            logger.debug(f"Could not remove {container_id[:12]}: {str(e)}")
+
+    def run_interactive(self, image: str, command: List[str], stdin_fd: int = 0, stdout_fd: int = 1,
+                        **options) -> int:
+        """
+        Run a container attached to the terminal, like `docker run -it --rm`
+
+        Args:
+            image: Image reference
+            command: Command to run
+            stdin_fd: File descriptor keyboard input is read from
+            stdout_fd: File descriptor output is written to
+            **options: Options passed to create (except interactive and auto_remove)
+
+        Returns:
+            Exit code of the container command
+
+        Raises:
+            EngineError: If the container cannot be created or started
+        """
+        # Removed here rather than by the daemon, so the exit code can be read first
+        container_id = self.create(image, command, interactive=True, auto_remove=False, **options)
+        try:
+            stream_fd = self.attach(container_id)
+            try:
+                self.start(container_id)
+                with self.follow_terminal_size(container_id):
+                    relay_terminal(stream_fd, stdin_fd, stdout_fd)
+            finally:
+                os.close(stream_fd)
+            try:
+                return self.api.wait(container_id).get("StatusCode", 0)
+            except docker.errors.APIError as e:
+                raise EngineError(e)
+        finally:
+            self.remove(container_id)
@@ -0,0 +1,183 @@
+"""
+Derived Image Module
+
+This module builds the derived images of container templates with setup
+steps (packages, commands) in containers.yaml, including:
+- Images keyed by base image digest plus a hash of the setup steps
+- Building each image once and reusing it from the local image store
+- A lock shared between threads and LSL processes, so an image is built only once
+- Removing derived images of older base image versions after a rebuild
+"""
+import io
+import os
+import fcntl
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any
+
+from client.prefetch import split_image_reference
+from shared.utils.derived_image import (
+    LABEL_SETUP_BASE, LABEL_SETUP_BASE_DIGEST, derived_image_tag, has_setup_steps, render_dockerfile
+)
+from shared.utils.yaml_logger import setup_logger
+
+# Initialize logger
+logger = setup_logger("image_builder", "/tmp/lsl_client.log")
+
+
+class SetupImageBuilder:
+    """
+    Setup Image Builder
+
+    Resolves container templates with setup steps to cached derived images.
+    """
+
+    def __init__(self, docker_client, state_dir: str):
+        """
+        Initialize the image builder
+
+        Args:
+            docker_client: Docker client used to inspect, pull and build images
+            state_dir: Directory holding the build lock files
+        """
+        self.docker_client = docker_client
+        self.state_dir = state_dir
+
+        self._thread_lock = threading.RLock()
+
+    @contextmanager
+    def _locked(self, tag: str):
+        """
+        Hold the build lock of one derived image, shared between threads and LSL processes
+
+        Args:
+            tag: Derived image reference
+        """
+        with self._thread_lock:
+            os.makedirs(self.state_dir, exist_ok=True)
+            lock_file = os.path.join(self.state_dir, f"setup-{tag.rsplit(':', 1)[-1]}.lock")
+            with open(lock_file, 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _image_exists(self, image: str) -> bool:
+        """
+        Check if an image is present locally
+
+        Args:
+            image: Image reference
+
+        Returns:
+            True if the image exists in the local image store
+        """
+        try:
+            self.docker_client.api.inspect_image(image)
+            return True
+        except Exception:
+            return False
+
+    def base_digest(self, image: str) -> str:
+        """
+        Get the image ID of a base image, pulling it if missing
+
+        Args:
+            image: Base image reference
+
+        Returns:
+            Image ID (sha256:...)
+        """
+        try:
+            return self.docker_client.api.inspect_image(image)["Id"]
+        except Exception:
+            repository, tag = split_image_reference(image)
+            logger.info(f"Pulling base image {image}")
+            for event in self.docker_client.api.pull(repository, tag=tag, stream=True, decode=True):
+                if "error" in event:
+                    raise RuntimeError(event["error"])
+            return self.docker_client.api.inspect_image(image)["Id"]
+
+    def resolve(self, base_image: str, setup: Dict[str, Any]) -> str:
+        """
+        Get the image to run for a template, building it on first use
+
+        Args:
+            base_image: Base image reference of the template
+            setup: Setup steps of the template
+
+        Returns:
+            Derived image reference, or the base image if there are no steps
+        """
+        if not has_setup_steps(setup):
+            return base_image
+
+        base_digest = self.base_digest(base_image)
+        tag = derived_image_tag(base_image, base_digest, setup)
+        if self._image_exists(tag):
+            return tag
+
+        with self._locked(tag):
+            # Another thread or process may have built it while we waited
+            if not self._image_exists(tag):
+                self._build(base_image, base_digest, setup, tag)
+                self.prune(base_image, base_digest)
+        return tag
+
+    def _build(self, base_image: str, base_digest: str, setup: Dict[str, Any], tag: str) -> None:
+        """
+        Build a derived image
+
+        Args:
+            base_image: Base image reference
+            base_digest: Image ID of the base image
+            setup: Setup steps
+            tag: Tag of the derived image
+        """
+        dockerfile = render_dockerfile(base_image, base_digest, setup)
+        logger.info(f"Building derived image {tag} from {base_image}")
+
+        events = self.docker_client.api.build(
+            fileobj=io.BytesIO(dockerfile.encode('utf-8')),
+            tag=tag,
+            rm=True,
+            forcerm=True,
+            decode=True
+        )
+        for event in events:
+            if "error" in event:
+                raise RuntimeError(f"Building {tag} failed: {event['error'].strip()}")
+            if event.get("stream", "").strip():
+                logger.debug(event["stream"].strip())
+
+        logger.info(f"Built derived image {tag}")
+
+    def prune(self, base_image: str, base_digest: str) -> int:
+        """
+        Remove derived images built from older versions of a base image
+
+        Args:
+            base_image: Base image reference
+            base_digest: Image ID of the current base image
+
+        Returns:
+            Number of images removed
+        """
+        removed = 0
+        try:
+            images = self.docker_client.api.images(filters={"label": [f"{LABEL_SETUP_BASE}={base_image}"]})
+        except Exception as e:
+            logger.warning(f"Could not list derived images: {str(e)}")
+            return 0
+
+        for image in images:
+            if (image.get("Labels") or {}).get(LABEL_SETUP_BASE_DIGEST) == base_digest:
+                continue
+            try:
+                self.docker_client.api.remove_image(image["Id"])
+                removed += 1
+            except Exception as e:
+                # Still used by a container
+                logger.debug(f"Keeping derived image {image['Id'][:19]}: {str(e)}")
+        return removed
@@ -1,8 +1,9 @@
 """
 Ping Thread Module
 
-This module implements the background ping thread that keeps the server
-informed about the client's online status.
+This module implements the heartbeat job that keeps the server informed
+about the client's online status. The heartbeat runs on the shared client
+scheduler rather than on a dedicated thread.
 """
 import os
 import time
@@ -11,16 +12,13 @@ import logging
 import random
 from typing import Optional
 
-import requests
-
-# Use absolute imports for better compatibility
-import sys
-import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from client.config import get_client_config, ClientConfig
+from client.scheduler import ClientScheduler, get_scheduler
+from shared.utils.lazy_import import lazy_import
 from shared.utils.yaml_logger import setup_logger
 
+requests = lazy_import("requests")
+
 # Initialize logger
 logger = setup_logger("ping_thread", "/tmp/lsl_client.log")
 
@@ -32,15 +30,19 @@ class PingManager:
     the client's last seen timestamp.
     """
     
-    def __init__(self, client_config: Optional[ClientConfig] = None):
+    HEARTBEAT_JOB = "heartbeat"
+    
+    def __init__(self, client_config: Optional[ClientConfig] = None,
+                 scheduler: Optional[ClientScheduler] = None):
         """
         Initialize the ping manager
         
         Args:
             client_config: Optional ClientConfig instance, will create one if not provided
+            scheduler: Optional ClientScheduler, defaults to the shared process-wide scheduler
         """
         self.client_config = client_config or get_client_config()
-        self.ping_thread = None
+        self.scheduler = scheduler or get_scheduler()
         self.stop_event = threading.Event()
         
         # Default ping interval from config (60 seconds)
@@ -51,90 +53,105 @@ class PingManager:
         self.initial_retry_delay = 1.0  # seconds
         self.max_retry_delay = 60.0    # seconds
         
+    @property
+    def ping_thread(self) -> Optional[threading.Thread]:
+        """Thread running the heartbeat job (the shared scheduler thread)"""
+        return self.scheduler.thread
+        
     def start_ping_thread(self) -> None:
         """
-        Start the background ping thread
+        Register the heartbeat job and start the shared scheduler
         """
-        if self.ping_thread is not None and self.ping_thread.is_alive():
+        if self.scheduler.has_job(self.HEARTBEAT_JOB) and self.scheduler.is_running():
             logger.warning("Ping thread is already running")
             return
             
         self.stop_event.clear()
-        self.ping_thread = threading.Thread(
-            target=self._ping_loop,
-            daemon=True,
-            name="PingThread"
+        self.scheduler.add_job(
+            self.HEARTBEAT_JOB,
+            self._heartbeat,
+            interval=self.ping_interval
         )
-        self.ping_thread.start()
-        logger.info("Started background ping thread")
+        self.scheduler.start()
+        logger.info("Started background ping job")
         
     def stop_ping_thread(self) -> None:
         """
-        Stop the background ping thread
+        Unregister the heartbeat job, stopping the scheduler if it has no jobs left
         """
-        if self.ping_thread is None or not self.ping_thread.is_alive():
+        if not self.scheduler.remove_job(self.HEARTBEAT_JOB):
             logger.warning("No ping thread running")
             return
             
         self.stop_event.set()
-        self.ping_thread.join(timeout=5.0)
-        if self.ping_thread.is_alive():
-            logger.warning("Ping thread did not terminate gracefully")
-        else:
-            logger.info("Stopped background ping thread")
+        if not self.scheduler.jobs:
+            self.scheduler.stop(timeout=5.0)
+        logger.info("Stopped background ping job")
             
-    def _ping_loop(self) -> None:
+    def _heartbeat(self) -> bool:
         """
-        Background thread loop for periodic pings
+        Scheduled heartbeat job
+        
+        Sends a single ping attempt; retries are handled by the scheduler's
+        shared backoff so sync and heartbeat do not hammer a server that is down.
+        
+        Returns:
+            True if ping was successful, False otherwise
         """
-        while not self.stop_event.is_set():
-            # Send ping to server
-            success = self._send_ping_with_retry()
-            
-            if not success:
-                logger.error("Failed to ping server after multiple retries")
-                
-            # Wait for next ping interval or until stopped
-            self.stop_event.wait(self.ping_interval)
+        return self._send_ping_with_retry(max_retries=1)
     
-    def _send_ping_with_retry(self) -> bool:
+    def _send_ping_with_retry(self, max_retries: Optional[int] = None) -> bool:
         """
         Send ping to server with exponential backoff retry
         
+        Args:
+            max_retries: Optional override of the number of attempts
+            
         Returns:
             True if ping was successful, False otherwise
         """
         server_url = self.client_config.get_server_url()
-        uuid, token = self.client_config.get_uuid_and_token()
+        uuid, _ = self.client_config.get_uuid_and_token()
         
         # Prepare auth headers
         headers = {
-            "Authorization": f"Bearer {uuid}:{token}",
+            "Authorization": self.client_config.get_auth_header(),
             "Content-Type": "application/json"
         }
         
         retry_delay = self.initial_retry_delay
+        max_retries = max_retries or self.max_retries
+        
+        def send() -> requests.Response:
+            return requests.post(
+                f"{server_url}/ping",
+                headers=headers,
+                json={"uuid": uuid},
+                timeout=5
+            )
         
         # Try to ping the server with exponential backoff
-        for attempt in range(1, self.max_retries + 1):
+        for attempt in range(1, max_retries + 1):
             try:
-                response = requests.post(
-                    f"{server_url}/ping",
-                    headers=headers,
-                    json={"uuid": uuid},
-                    timeout=5
-                )
+                response = send()
+                
+                # A rejected signed token is dropped and the ping retried at once with the
+                # client UUID, like ClientConfig.sync_with_server; it doesn't use up an attempt
+                if response.status_code == 401 and self.client_config.discard_signed_token():
+                    logger.info("Signed token rejected, retrying ping with the client UUID")
+                    headers["Authorization"] = self.client_config.get_auth_header()
+                    response = send()
                 
                 if response.status_code == 200:
                     return True
                     
                 logger.warning(f"Ping failed with status code: {response.status_code}")
-                
+
             except requests.RequestException as e:
-                logger.warning(f"Ping attempt {attempt}/{self.max_retries} failed: {str(e)}")
+                logger.warning(f"Ping attempt {attempt}/{max_retries} failed: {str(e)}")
             
             # Only sleep if we're going to retry
-            if attempt < self.max_retries:
+            if attempt < max_retries:
                 # Add jitter to prevent thundering herd
                 jitter = random.uniform(0.8, 1.2)
                 sleep_time = retry_delay * jitter
@@ -0,0 +1,338 @@
+"""
+Warm Container Pool Module
+
+This module implements the warm pool of pre-created containers used to make
+`start_container` near-instant, including:
+- Per-template pools configured with a `pool` section in containers.yaml
+- Claiming a pooled container by renaming it (and unpausing/starting it)
+- Background refills whose target size adapts to recent demand
+- Hit/miss metrics reporting how often starts are served from the pool
+"""
+import os
+import json
+import time
+import fcntl
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from shared.utils.uuid_hash import generate_uuid
+from shared.utils.yaml_logger import setup_logger
+
+# Initialize logger
+logger = setup_logger("container_pool", "/tmp/lsl_client.log")
+
+# Pooled containers carry this name prefix until they are claimed
+POOL_NAME_PREFIX = "lsl-pool-"
+
+# Labels set on containers created by the pool
+LABEL_POOL = "lsl.pool"
+LABEL_POOL_CONFIG = "lsl.pool.config"
+
+
+def template_config_hash(config: Dict[str, Any]) -> str:
+    """
+    Hash a template configuration, ignoring its pool settings
+
+    Pooled containers created from an older template version are detected
+    by comparing this hash.
+
+    Args:
+        config: Template configuration
+
+    Returns:
+        Short hex digest
+    """
+    relevant = {key: value for key, value in config.items() if key != "pool"}
+    encoded = json.dumps(relevant, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class WarmPool:
+    """
+    Warm Container Pool
+
+    Keeps pre-created (optionally paused) containers per template that
+    start_container can claim instead of creating a container from scratch.
+    """
+
+    def __init__(self, docker_client, owner: str,
+                 build_options: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+                 build_labels: Callable[..., Dict[str, str]],
+                 state_dir: str, demand_window: float = 600.0):
+        """
+        Initialize the warm pool
+
+        Args:
+            docker_client: Docker client used to manage pooled containers
+            owner: Owner (client UUID) of the pooled containers
+            build_options: Callable returning docker-py create options for a template
+            build_labels: Callable returning the labels for a template (extra labels as kwargs)
+            state_dir: Directory holding pool metrics and the pool lock file
+            demand_window: Seconds of start history used to size the pools
+        """
+        self.docker_client = docker_client
+        self.owner = owner
+        self.build_options = build_options
+        self.build_labels = build_labels
+        self.state_dir = state_dir
+        self.state_file = os.path.join(state_dir, "pool.json")
+        self.lock_file = os.path.join(state_dir, "pool.lock")
+        self.demand_window = demand_window
+
+        self._thread_lock = threading.RLock()
+        self._refill_threads: Dict[str, threading.Thread] = {}
+
+    @contextmanager
+    def _locked(self):
+        """
+        Hold the pool lock, shared between threads and LSL processes
+        """
+        with self._thread_lock:
+            os.makedirs(self.state_dir, exist_ok=True)
+            with open(self.lock_file, 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load_state(self) -> Dict[str, Any]:
+        """
+        Load pool metrics and start history
+
+        Returns:
+            State dictionary
+        """
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            if isinstance(state, dict):
+                state.setdefault("templates", {})
+                return state
+        except (IOError, ValueError):
+            pass
+        return {"templates": {}}
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        """
+        Atomically save pool metrics and start history
+
+        Args:
+            state: State dictionary
+        """
+        temp_path = f"{self.state_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(state, f, separators=(',', ':'))
+            os.replace(temp_path, self.state_file)
+        except (IOError, OSError) as e:
+            logger.warning(f"Could not save pool state: {str(e)}")
+
+    def _record_start(self, template: str, hit: bool) -> None:
+        """
+        Record a start for metrics and demand tracking; caller holds the lock
+
+        Args:
+            template: Template name
+            hit: Whether the start was served from the pool
+        """
+        now = time.time()
+        state = self._load_state()
+        entry = state["templates"].setdefault(template, {"hits": 0, "misses": 0, "starts": []})
+        entry["hits" if hit else "misses"] += 1
+        entry["starts"] = [ts for ts in entry.get("starts", []) if ts > now - self.demand_window] + [now]
+        self._save_state(state)
+
+    def _pooled_containers(self, template: str, config: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        List the pooled containers of a template
+
+        Args:
+            template: Template name
+            config: Template configuration
+
+        Returns:
+            Tuple of (containers matching the current config, stale containers)
+        """
+        filters = {
+            "label": [
+                "lsl.managed=true",
+                f"{LABEL_POOL}=true",
+                f"lsl.owner={self.owner}",
+                f"lsl.template={template}"
+            ],
+            "name": [POOL_NAME_PREFIX]
+        }
+        current_hash = template_config_hash(config)
+        current, stale = [], []
+        for summary in self.docker_client.api.containers(all=True, filters=filters):
+            name = (summary.get("Names") or ["/"])[0].lstrip("/")
+            if not name.startswith(POOL_NAME_PREFIX):
+                continue
+            labels = summary.get("Labels") or {}
+            (current if labels.get(LABEL_POOL_CONFIG) == current_hash else stale).append(summary)
+        return current, stale
+
+    def claim(self, template: str, config: Dict[str, Any], new_name: str) -> Optional[str]:
+        """
+        Claim a pooled container for a start
+
+        The container is renamed to new_name and unpaused or started as needed.
+
+        Args:
+            template: Template name
+            config: Template configuration
+            new_name: Name the claimed container should get
+
+        Returns:
+            ID of the claimed container, or None if the pool was empty
+        """
+        with self._locked():
+            try:
+                current, _ = self._pooled_containers(template, config)
+            except Exception as e:
+                logger.error(f"Error listing pooled containers: {str(e)}")
+                current = []
+
+            # Prefer containers that are already running or paused
+            current.sort(key=lambda summary: summary.get("State") not in ("running", "paused"))
+            for summary in current:
+                container_id = summary["Id"]
+                try:
+                    self.docker_client.api.rename(container_id, new_name)
+                    state = summary.get("State")
+                    if state == "paused":
+                        self.docker_client.api.unpause(container_id)
+                    elif state != "running":
+                        self.docker_client.api.start(container_id)
+                except Exception as e:
+                    logger.warning(f"Could not claim pooled container {container_id[:12]}: {str(e)}")
+                    continue
+
+                self._record_start(template, hit=True)
+                logger.info(f"Claimed pooled container {container_id[:12]} as {new_name}")
+                return container_id
+
+            self._record_start(template, hit=False)
+            return None
+
+    def target_size(self, template: str, config: Dict[str, Any]) -> int:
+        """
+        Compute the target pool size of a template from its config and recent demand
+
+        Args:
+            template: Template name
+            config: Template configuration
+
+        Returns:
+            Number of containers the pool should hold
+        """
+        pool_config = config.get("pool") or {}
+        size = int(pool_config.get("size", 1))
+        max_size = int(pool_config.get("max_size", size))
+
+        now = time.time()
+        starts = self._load_state()["templates"].get(template, {}).get("starts", [])
+        demand = len([ts for ts in starts if ts > now - self.demand_window])
+
+        return max(0, min(max_size, max(size, demand)))
+
+    def refill(self, template: str, config: Dict[str, Any]) -> int:
+        """
+        Bring the pool of a template to its target size
+
+        Stale containers (created from an older template config) and
+        containers beyond the target are removed.
+
+        Args:
+            template: Template name
+            config: Template configuration
+
+        Returns:
+            Number of containers created
+        """
+        pool_config = config.get("pool") or {}
+        created = 0
+
+        with self._locked():
+            current, stale = self._pooled_containers(template, config)
+            target = self.target_size(template, config)
+
+            for summary in stale + current[target:]:
+                try:
+                    self.docker_client.api.remove_container(summary["Id"], force=True, v=True)
+                except Exception as e:
+                    logger.warning(f"Could not remove pooled container {summary['Id'][:12]}: {str(e)}")
+
+            labels = {LABEL_POOL: "true", LABEL_POOL_CONFIG: template_config_hash(config)}
+            for _ in range(target - len(current[:target])):
+                name = f"{POOL_NAME_PREFIX}{template}-{generate_uuid()[:8]}"
+                try:
+                    container = self.docker_client.containers.create(
+                        name=name,
+                        labels=self.build_labels(template, **labels),
+                        **self.build_options(template, config)
+                    )
+                    container.start()
+                    if pool_config.get("paused", False):
+                        container.pause()
+                    created += 1
+                except Exception as e:
+                    logger.error(f"Could not create pooled container for {template}: {str(e)}")
+                    break
+
+        if created:
+            logger.info(f"Added {created} container(s) to the {template} pool")
+        return created
+
+    def refill_async(self, template: str, config: Dict[str, Any]) -> None:
+        """
+        Refill the pool of a template on a background thread
+
+        Args:
+            template: Template name
+            config: Template configuration
+        """
+        with self._thread_lock:
+            running = self._refill_threads.get(template)
+            if running is not None and running.is_alive():
+                return
+
+            def refill():
+                try:
+                    self.refill(template, config)
+                except Exception as e:
+                    logger.error(f"Error refilling {template} pool: {str(e)}")
+
+            thread = threading.Thread(target=refill, daemon=True, name=f"LSLPoolRefill-{template}")
+            self._refill_threads[template] = thread
+            thread.start()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get pool hit/miss metrics
+
+        Returns:
+            Dictionary with overall and per-template hits, misses and hit rate
+        """
+        state = self._load_state()
+        templates = {}
+        total_hits = total_misses = 0
+        for template, entry in state["templates"].items():
+            hits, misses = entry.get("hits", 0), entry.get("misses", 0)
+            total_hits += hits
+            total_misses += misses
+            templates[template] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0
+            }
+        total = total_hits + total_misses
+        return {
+            "hits": total_hits,
+            "misses": total_misses,
+            "hit_rate": total_hits / total if total else 0.0,
+            "templates": templates
+        }
@@ -0,0 +1,379 @@
+"""
+Image Prefetch Module
+
+This module implements the background image prefetcher, which pulls the
+images of every container template the user is allowed to run so the first
+start does not block on a pull. It includes:
+- A bounded pool of daemon workers (one pull at a time by default) with a pause between pulls
+- Missing images are pulled before images that only need an update check
+- Digest tracking, so unchanged images are not pulled again
+- Per-image progress reporting
+"""
+import os
+import json
+import time
+import queue
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from shared.utils.yaml_logger import setup_logger
+
+# Initialize logger
+logger = setup_logger("image_prefetcher", "/tmp/lsl_client.log")
+
+# Per-image prefetch states
+STATE_QUEUED = "queued"
+STATE_CHECKING = "checking"
+STATE_PULLING = "pulling"
+STATE_UP_TO_DATE = "up_to_date"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+
+def split_image_reference(image: str) -> Tuple[str, str]:
+    """
+    Split an image reference into repository and tag
+
+    Args:
+        image: Image reference, e.g. 'ubuntu:22.04' or 'registry:5000/app'
+
+    Returns:
+        Tuple of (repository, tag); tag defaults to 'latest'
+    """
+    if "@" in image:
+        repository, digest = image.split("@", 1)
+        return repository, digest
+    repository, _, tag = image.rpartition(":")
+    if not repository or "/" in tag:
+        return image, "latest"
+    return repository, tag
+
+
+class ImagePrefetcher:
+    """
+    Image Prefetcher
+
+    Pulls container template images in the background after each config sync.
+    """
+
+    def __init__(self, docker_client, state_file: Optional[str] = None,
+                 max_concurrent_pulls: int = 1, pause_between_pulls: float = 1.0):
+        """
+        Initialize the image prefetcher
+
+        Args:
+            docker_client: Docker client used to pull images
+            state_file: Optional JSON file used to persist known image digests
+            max_concurrent_pulls: Maximum number of simultaneous pulls
+            pause_between_pulls: Seconds each worker waits after a pull, leaving bandwidth to others
+        """
+        self.docker_client = docker_client
+        self.state_file = state_file
+        self.max_concurrent_pulls = max_concurrent_pulls
+        self.pause_between_pulls = pause_between_pulls
+
+        self.progress: Dict[str, Dict[str, Any]] = {}
+        self.digests: Dict[str, str] = self._load_digests()
+
+        self._lock = threading.Lock()
+        self._work_queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+
+    def _load_digests(self) -> Dict[str, str]:
+        """
+        Load known image digests from the state file
+
+        Returns:
+            Dictionary of image reference to digest
+        """
+        if not self.state_file or not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f).get("digests", {})
+        except (IOError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable prefetch state: {str(e)}")
+            return {}
+
+    def _save_digests(self) -> None:
+        """Persist known image digests to the state file"""
+        if not self.state_file:
+            return
+        with self._lock:
+            data = json.dumps({"digests": dict(self.digests)}, separators=(',', ':'))
+        temp_path = f"{self.state_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.state_file)), exist_ok=True)
+            with open(temp_path, 'w') as f:
+                f.write(data)
+            os.replace(temp_path, self.state_file)
+        except (IOError, OSError) as e:
+            logger.warning(f"Could not save prefetch state: {str(e)}")
+            if os.path.exists(temp_path):
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+
+    def _ensure_workers(self) -> None:
+        """
+        Start the pull worker threads on first use
+
+        Workers are daemon threads, so a short-lived CLI process never waits
+        for outstanding prefetches when it exits.
+        """
+        with self._lock:
+            self._workers = [worker for worker in self._workers if worker.is_alive()]
+            for index in range(len(self._workers), self.max_concurrent_pulls):
+                worker = threading.Thread(
+                    target=self._worker_loop,
+                    daemon=True,
+                    name=f"LSLPrefetch-{index}"
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _worker_loop(self) -> None:
+        """Pull worker thread loop"""
+        while True:
+            image = self._work_queue.get()
+            try:
+                if image is None:
+                    return
+                self._prefetch_one(image)
+            finally:
+                self._work_queue.task_done()
+
+    def prefetch_catalog(self, containers: Dict[str, Any]) -> List[str]:
+        """
+        Queue the images of a container catalog for prefetching
+
+        Suitable as a ConfigSyncManager sync listener.
+
+        Args:
+            containers: Container configurations keyed by template name
+
+        Returns:
+            List of image references that were queued
+        """
+        images = []
+        for config in (containers or {}).values():
+            image = config.get("image") if isinstance(config, dict) else None
+            if image and image not in images:
+                images.append(image)
+
+        # Images missing locally would block a start, so they go first
+        missing = [image for image in images if not self._is_local(image)]
+        present = [image for image in images if image not in missing]
+
+        queued = []
+        for image in missing + present:
+            if self._enqueue(image):
+                queued.append(image)
+
+        if queued:
+            logger.info(f"Queued {len(queued)} image(s) for prefetching")
+        return queued
+
+    def _enqueue(self, image: str) -> bool:
+        """
+        Queue one image unless it is already queued or being pulled
+
+        Args:
+            image: Image reference
+
+        Returns:
+            True if the image was queued
+        """
+        with self._lock:
+            current = self.progress.get(image, {}).get("state")
+            if current in (STATE_QUEUED, STATE_CHECKING, STATE_PULLING):
+                return False
+            self.progress[image] = {
+                "state": STATE_QUEUED,
+                "current": 0,
+                "total": 0,
+                "percent": 0.0,
+                "digest": self.digests.get(image),
+                "error": None,
+                "updated_at": time.time()
+            }
+
+        self._ensure_workers()
+        self._work_queue.put(image)
+        return True
+
+    def _is_local(self, image: str) -> bool:
+        """
+        Check if an image is present locally
+
+        Args:
+            image: Image reference
+
+        Returns:
+            True if the image exists in the local image store
+        """
+        try:
+            self.docker_client.api.inspect_image(image)
+            return True
+        except Exception:
+            return False
+
+    def _local_digest(self, image: str) -> Optional[str]:
+        """
+        Get the repository digest of a local image
+
+        Args:
+            image: Image reference
+
+        Returns:
+            Digest string (sha256:...) or None if unknown
+        """
+        try:
+            repo_digests = self.docker_client.api.inspect_image(image).get("RepoDigests") or []
+        except Exception:
+            return None
+        for repo_digest in repo_digests:
+            if "@" in repo_digest:
+                return repo_digest.split("@", 1)[1]
+        return None
+
+    def _remote_digest(self, image: str) -> Optional[str]:
+        """
+        Get the registry digest of an image without pulling it
+
+        Args:
+            image: Image reference
+
+        Returns:
+            Digest string or None if the registry could not be reached
+        """
+        try:
+            return self.docker_client.api.inspect_distribution(image)["Descriptor"]["digest"]
+        except Exception as e:
+            logger.debug(f"Could not query registry digest for {image}: {str(e)}")
+            return None
+
+    def _update(self, image: str, **fields: Any) -> None:
+        """
+        Update the progress entry of an image
+
+        Args:
+            image: Image reference
+            **fields: Fields to update
+        """
+        with self._lock:
+            entry = self.progress.setdefault(image, {})
+            entry.update(fields)
+            entry["updated_at"] = time.time()
+
+    def _prefetch_one(self, image: str) -> None:
+        """
+        Check and, if needed, pull a single image
+
+        Args:
+            image: Image reference
+        """
+        try:
+            self._update(image, state=STATE_CHECKING)
+            is_local = self._is_local(image)
+            local_digest = self._local_digest(image) if is_local else None
+
+            if is_local and local_digest is None:
+                # Built or loaded locally (e.g. derived images): the registry has no copy to compare
+                # against, so pulling would only fail or replace it
+                self._update(image, state=STATE_UP_TO_DATE, percent=100.0)
+                return
+
+            if local_digest is not None:
+                remote_digest = self._remote_digest(image)
+                # Offline or unchanged: the local image is good enough
+                if remote_digest is None or remote_digest == local_digest:
+                    self._record_digest(image, local_digest)
+                    self._update(image, state=STATE_UP_TO_DATE, percent=100.0, digest=local_digest)
+                    return
+
+            self._pull(image)
+            digest = self._local_digest(image)
+            self._record_digest(image, digest)
+            self._update(image, state=STATE_DONE, percent=100.0, digest=digest)
+            logger.info(f"Prefetched image {image} ({digest})")
+
+            # Leave bandwidth to interactive pulls between prefetches
+            if self.pause_between_pulls:
+                time.sleep(self.pause_between_pulls)
+
+        except Exception as e:
+            logger.error(f"Failed to prefetch image {image}: {str(e)}")
+            self._update(image, state=STATE_FAILED, error=str(e))
+
+    def _pull(self, image: str) -> None:
+        """
+        Pull an image, reporting layer download progress
+
+        Args:
+            image: Image reference
+        """
+        repository, tag = split_image_reference(image)
+        layers: Dict[str, Tuple[int, int]] = {}
+        self._update(image, state=STATE_PULLING)
+
+        for event in self.docker_client.api.pull(repository, tag=tag, stream=True, decode=True):
+            if "error" in event:
+                raise RuntimeError(event["error"])
+
+            detail = event.get("progressDetail") or {}
+            layer_id = event.get("id")
+            if layer_id and detail.get("total"):
+                layers[layer_id] = (detail.get("current", 0), detail["total"])
+                current = sum(c for c, _ in layers.values())
+                total = sum(t for _, t in layers.values())
+                self._update(image, current=current, total=total,
+                             percent=round(100.0 * current / total, 1) if total else 0.0)
+
+    def _record_digest(self, image: str, digest: Optional[str]) -> None:
+        """
+        Remember the digest of a prefetched image
+
+        Args:
+            image: Image reference
+            digest: Image digest
+        """
+        if not digest:
+            return
+        with self._lock:
+            changed = self.digests.get(image) != digest
+            self.digests[image] = digest
+        if changed:
+            self._save_digests()
+
+    def get_progress(self, image: Optional[str] = None) -> Any:
+        """
+        Get prefetch progress
+
+        Args:
+            image: Optional image reference
+
+        Returns:
+            Progress entry of the image (None if unknown), or all entries keyed by image
+        """
+        with self._lock:
+            if image is not None:
+                entry = self.progress.get(image)
+                return dict(entry) if entry else None
+            return {name: dict(entry) for name, entry in self.progress.items()}
+
+    def wait(self) -> None:
+        """
+        Block until every queued image has been processed
+        """
+        self._work_queue.join()
+
+    def shutdown(self) -> None:
+        """
+        Stop the pull workers after their current pull
+        """
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for _ in workers:
+            self._work_queue.put(None)
@@ -0,0 +1,419 @@
+"""
+Client Scheduler Module
+
+This module implements a single asyncio-based scheduler that runs all periodic
+client jobs (heartbeat, config sync, ...) from one background thread, including:
+- Blocking jobs run on worker threads, so a slow server call delays no other job
+- Jittered job timing to avoid synchronized clients
+- Coalescing of jobs that fall due close together into one wakeup
+- Shared exponential backoff when the server is unreachable
+- Clean shutdown
+"""
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Any
+
+from shared.utils.lazy_import import lazy_import
+from shared.utils.yaml_logger import setup_logger
+
+asyncio = lazy_import("asyncio")
+
+# Initialize logger
+logger = setup_logger("client_scheduler", "/tmp/lsl_client.log")
+
+
+class BackoffState:
+    """
+    Exponential backoff state shared by all network jobs of a scheduler
+
+    When one job fails to reach the server, every other network job is
+    delayed as well instead of retrying against a server that is down.
+    """
+
+    def __init__(self, initial_delay: float = 1.0, max_delay: float = 60.0):
+        """
+        Initialize the backoff state
+
+        Args:
+            initial_delay: Delay after the first failure in seconds
+            max_delay: Upper bound for the delay in seconds
+        """
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def record_success(self) -> None:
+        """Reset the backoff after a successful job run"""
+        self.failures = 0
+        self.retry_at = 0.0
+
+    def record_failure(self, now: float) -> float:
+        """
+        Register a failed job run and compute the next retry time
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            Monotonic time before which network jobs should not run
+        """
+        self.failures += 1
+        delay = min(self.initial_delay * (2 ** (self.failures - 1)), self.max_delay)
+        # Add jitter to prevent thundering herd
+        delay *= random.uniform(0.8, 1.2)
+        self.retry_at = now + delay
+        return self.retry_at
+
+    @property
+    def active(self) -> bool:
+        """True if at least one failure has been recorded since the last success"""
+        return self.failures > 0
+
+
+class ScheduledJob:
+    """A periodic job registered with the ClientScheduler"""
+
+    def __init__(self, name: str, func: Callable[[], Any], interval: float,
+                 jitter: float = 0.1, network: bool = True, initial_delay: float = 0.0):
+        """
+        Initialize a scheduled job
+
+        Args:
+            name: Unique job name
+            func: Callable (or coroutine function) to run; returning False marks a failure
+            interval: Interval between runs in seconds
+            jitter: Relative jitter applied to the interval (0.1 = +/-10%)
+            network: Whether the job talks to the server and takes part in shared backoff
+            initial_delay: Delay before the first run in seconds
+        """
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.network = network
+        self.next_run = time.monotonic() + initial_delay
+        self.last_run: Optional[float] = None
+        self.last_success: Optional[bool] = None
+        self.running = False
+
+    def schedule_next(self, now: float) -> None:
+        """
+        Compute the next run time with jitter
+
+        Args:
+            now: Current monotonic time
+        """
+        factor = 1.0 + random.uniform(-self.jitter, self.jitter) if self.jitter else 1.0
+        self.next_run = now + self.interval * factor
+
+
+class ClientScheduler:
+    """
+    Client Scheduler
+
+    Schedules every periodic client job on a single asyncio event loop living
+    in one background thread. Coroutine jobs run on the loop; plain callables,
+    such as the blocking heartbeat and sync requests, run on worker threads.
+    Jobs run concurrently, but a job never overlaps with itself.
+    """
+
+    def __init__(self, coalesce_window: float = 1.0,
+                 initial_retry_delay: float = 1.0, max_retry_delay: float = 60.0):
+        """
+        Initialize the scheduler
+
+        Args:
+            coalesce_window: Jobs due within this many seconds of each other run in the same wakeup
+            initial_retry_delay: First delay of the shared backoff in seconds
+            max_retry_delay: Maximum delay of the shared backoff in seconds
+        """
+        self.coalesce_window = coalesce_window
+        self.backoff = BackoffState(initial_retry_delay, max_retry_delay)
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self.thread: Optional[threading.Thread] = None
+
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def add_job(self, name: str, func: Callable[[], Any], interval: float,
+                jitter: float = 0.1, network: bool = True, initial_delay: float = 0.0) -> ScheduledJob:
+        """
+        Register a periodic job, replacing any job with the same name
+
+        Args:
+            name: Unique job name
+            func: Callable (or coroutine function) to run
+            interval: Interval between runs in seconds
+            jitter: Relative jitter applied to the interval
+            network: Whether the job takes part in shared backoff
+            initial_delay: Delay before the first run in seconds
+
+        Returns:
+            The registered job
+        """
+        job = ScheduledJob(name, func, interval, jitter, network, initial_delay)
+        with self._lock:
+            self.jobs[name] = job
+        self._wake()
+        logger.debug(f"Registered scheduler job '{name}' every {interval}s")
+        return job
+
+    def remove_job(self, name: str) -> bool:
+        """
+        Unregister a job
+
+        Args:
+            name: Job name
+
+        Returns:
+            True if the job existed, False otherwise
+        """
+        with self._lock:
+            removed = self.jobs.pop(name, None) is not None
+        self._wake()
+        return removed
+
+    def has_job(self, name: str) -> bool:
+        """
+        Check if a job is registered
+
+        Args:
+            name: Job name
+
+        Returns:
+            True if a job with this name is registered
+        """
+        with self._lock:
+            return name in self.jobs
+
+    def run_now(self, name: str) -> None:
+        """
+        Make a job due immediately, bypassing its interval (but not the shared backoff)
+
+        Args:
+            name: Job name
+        """
+        with self._lock:
+            job = self.jobs.get(name)
+            if job is not None:
+                job.next_run = time.monotonic()
+        self._wake()
+
+    def is_running(self) -> bool:
+        """
+        Check if the scheduler thread is running
+
+        Returns:
+            True if the scheduler thread is alive
+        """
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Start the scheduler thread
+        """
+        if self.is_running():
+            return
+
+        self._stopping = False
+        ready = threading.Event()
+        self.thread = threading.Thread(
+            target=self._thread_main,
+            args=(ready,),
+            daemon=True,
+            name="ClientSchedulerThread"
+        )
+        self.thread.start()
+        ready.wait(timeout=5.0)
+        logger.info("Started client scheduler thread")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the scheduler thread and wait for it to exit
+
+        Args:
+            timeout: Maximum time to wait for the thread in seconds
+        """
+        if not self.is_running():
+            return
+
+        self._stopping = True
+        self._wake()
+        self.thread.join(timeout=timeout)
+        if self.thread.is_alive():
+            logger.warning("Client scheduler thread did not terminate gracefully")
+        else:
+            logger.info("Stopped client scheduler thread")
+
+    def _wake(self) -> None:
+        """Wake the event loop so it re-evaluates the job table"""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # Loop already closed
+                pass
+
+    def _thread_main(self, ready: threading.Event) -> None:
+        """
+        Entry point of the scheduler thread
+
+        Args:
+            ready: Event set once the event loop is accepting wakeups
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            asyncio.set_event_loop(loop)
+            self._loop = loop
+            loop.run_until_complete(self._run(ready))
+        finally:
+            self._loop = None
+            self._wakeup = None
+            loop.close()
+
+    async def _run(self, ready: threading.Event) -> None:
+        """
+        Main scheduler loop
+
+        Args:
+            ready: Event set once the event loop is accepting wakeups
+        """
+        self._wakeup = asyncio.Event()
+        ready.set()
+        tasks = set()
+
+        while not self._stopping:
+            now = time.monotonic()
+            for job in self._collect_due_jobs(now):
+                job.running = True
+                task = asyncio.create_task(self._run_job(job))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            timeout = self._seconds_until_next_run(time.monotonic())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+        # Blocking calls cannot be interrupted; their worker threads finish on their own
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _collect_due_jobs(self, now: float):
+        """
+        Collect idle jobs that are due now or within the coalesce window
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            List of jobs to run in this wakeup
+        """
+        with self._lock:
+            jobs = [job for job in self.jobs.values() if not job.running]
+
+        if not any(self._effective_next_run(job) <= now for job in jobs):
+            return []
+
+        horizon = now + self.coalesce_window
+        return [job for job in jobs if self._effective_next_run(job) <= horizon]
+
+    def _effective_next_run(self, job: ScheduledJob) -> float:
+        """
+        Get the next run time of a job, taking shared backoff into account
+
+        Args:
+            job: Scheduled job
+
+        Returns:
+            Monotonic time of the next run
+        """
+        if job.network and self.backoff.active:
+            return max(job.next_run, self.backoff.retry_at)
+        return job.next_run
+
+    def _seconds_until_next_run(self, now: float) -> Optional[float]:
+        """
+        Compute how long the loop may sleep
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            Seconds until the next idle job is due, or None if there is none
+        """
+        with self._lock:
+            jobs = [job for job in self.jobs.values() if not job.running]
+        if not jobs:
+            return None
+        return max(0.0, min(self._effective_next_run(job) for job in jobs) - now)
+
+    async def _run_job(self, job: ScheduledJob) -> None:
+        """
+        Run a single job and reschedule it
+
+        A failed network job is retried when the shared backoff expires,
+        which is usually well before its next regular run. Plain callables
+        run on a worker thread so they never block the event loop.
+
+        Args:
+            job: Scheduled job to run
+        """
+        success = True
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                result = await job.func()
+            else:
+                result = await asyncio.to_thread(job.func)
+                if asyncio.iscoroutine(result):
+                    result = await result
+            success = result is not False
+        except Exception as e:
+            logger.error(f"Error in scheduler job '{job.name}': {str(e)}")
+            success = False
+        finally:
+            job.running = False
+
+        now = time.monotonic()
+        job.last_run = now
+        job.last_success = success
+        job.schedule_next(now)
+
+        if job.network:
+            if success:
+                self.backoff.record_success()
+            else:
+                retry_at = self.backoff.record_failure(now)
+                job.next_run = retry_at
+                logger.warning(
+                    f"Job '{job.name}' failed, backing off network jobs for {retry_at - now:.2f} seconds"
+                )
+        # The loop may be sleeping without this job in its timeout
+        self._wakeup.set()
+
+
+# Shared scheduler used by all client managers in this process
+_default_scheduler: Optional[ClientScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> ClientScheduler:
+    """
+    Get the process-wide client scheduler instance
+
+    Returns:
+        ClientScheduler instance
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = ClientScheduler()
+        return _default_scheduler
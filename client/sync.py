@@ -3,26 +3,50 @@ Config Sync Module
 
 This module handles the synchronization of client configuration with the LSL server,
 including fetching container configurations and keeping them updated.
+Periodic syncing runs as a job on the shared client scheduler.
 """
 import os
 import time
+import atexit
 import threading
 import logging
-from typing import Optional, Dict, Any
-
-import requests
-
-# Use absolute imports for better compatibility
-import sys
-import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from typing import Optional, Dict, Any, Callable, List, Set
 
 from client.config import get_client_config, ClientConfig
+from client.scheduler import ClientScheduler, get_scheduler
+from shared.utils.lazy_import import lazy_import
 from shared.utils.yaml_logger import setup_logger
 
+requests = lazy_import("requests")
+
 # Initialize logger
 logger = setup_logger("config_sync", "/tmp/lsl_client.log")
 
+# Seconds a background refresh may hold up process exit; one-shot `lsl` runs usually
+# exit before it completes, and the cache would then never be revalidated
+REFRESH_EXIT_TIMEOUT = 2.0
+
+# Background refreshes still in flight
+_refresh_threads: Set[threading.Thread] = set()
+
+
+def _join_refreshes(timeout: float = REFRESH_EXIT_TIMEOUT) -> None:
+    """
+    Wait, up to a shared deadline, for background refreshes to finish
+
+    Registered at exit after the config store's flush hook, so it runs first
+    and the refreshed configuration is still written.
+
+    Args:
+        timeout: Maximum time to wait in seconds, for all refreshes together
+    """
+    deadline = time.monotonic() + timeout
+    for thread in list(_refresh_threads):
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+
+atexit.register(_join_refreshes)
+
 class ConfigSyncManager:
     """
     Configuration Synchronization Manager
@@ -30,82 +54,126 @@ class ConfigSyncManager:
     Handles periodic syncing of client configuration with the server
     """
     
-    def __init__(self, client_config: Optional[ClientConfig] = None):
+    SYNC_JOB = "config_sync"
+    HEARTBEAT_JOB = "heartbeat"
+    
+    def __init__(self, client_config: Optional[ClientConfig] = None,
+                 scheduler: Optional[ClientScheduler] = None):
         """
         Initialize the config sync manager
         
         Args:
             client_config: Optional ClientConfig instance, will create one if not provided
+            scheduler: Optional ClientScheduler, defaults to the shared process-wide scheduler
         """
         self.client_config = client_config or get_client_config()
-        self.sync_thread = None
+        self._scheduler = scheduler
         self.stop_event = threading.Event()
-        self.sync_interval = self.client_config.config["server"].get("ping_interval", 60)
+        server_settings = self.client_config.config["server"]
+        self.sync_interval = server_settings.get("sync_interval", server_settings.get("ping_interval", 60))
+        
+        # Cached server config is served as-is below cache_ttl, served while being
+        # refreshed in the background up to cache_max_age, and re-fetched blocking beyond it
+        self.cache_ttl = server_settings.get("config_cache_ttl", 300)
+        self.cache_max_age = server_settings.get("config_cache_max_age", 86400)
+        self._refresh_lock = threading.Lock()
+        self._refresh_thread = None
+        
+        # Callbacks receiving the synced container catalog after each successful sync
+        self._sync_listeners: List[Callable[[Dict[str, Any]], Any]] = []
+        
+    def add_sync_listener(self, listener: Callable[[Dict[str, Any]], Any]) -> None:
+        """
+        Register a callback run after each successful sync
+        
+        Args:
+            listener: Callable receiving the available containers dictionary
+        """
+        self._sync_listeners.append(listener)
+        
+    def _notify_sync_listeners(self) -> None:
+        """Pass the synced container catalog to all sync listeners"""
+        if not self._sync_listeners:
+            return
+            
+        containers = self.client_config.config.get("server_config", {}).get("containers", {})
+        for listener in self._sync_listeners:
+            try:
+                listener(containers)
+            except Exception as e:
+                logger.error(f"Error in sync listener: {str(e)}")
+        
+    @property
+    def scheduler(self) -> ClientScheduler:
+        """Scheduler running the sync job, resolved lazily so one-shot syncs never touch it"""
+        if self._scheduler is None:
+            self._scheduler = get_scheduler()
+        return self._scheduler
+        
+    @property
+    def sync_thread(self) -> Optional[threading.Thread]:
+        """Thread running the sync job (the shared scheduler thread)"""
+        return self.scheduler.thread
         
     def start_sync_thread(self) -> None:
         """
-        Start the configuration sync thread
+        Register the sync job and start the shared scheduler
         """
-        if self.sync_thread is not None and self.sync_thread.is_alive():
+        if self.scheduler.has_job(self.SYNC_JOB) and self.scheduler.is_running():
             logger.warning("Sync thread is already running")
             return
             
         self.stop_event.clear()
-        self.sync_thread = threading.Thread(
-            target=self._sync_loop,
-            daemon=True,
-            name="ConfigSyncThread"
+        self.scheduler.add_job(
+            self.SYNC_JOB,
+            self._sync_and_ping,
+            interval=self.sync_interval
         )
-        self.sync_thread.start()
-        logger.info("Started configuration sync thread")
+        self.scheduler.start()
+        logger.info("Started configuration sync job")
         
     def stop_sync_thread(self) -> None:
         """
-        Stop the configuration sync thread
+        Unregister the sync job, stopping the scheduler if it has no jobs left
         """
-        if self.sync_thread is None or not self.sync_thread.is_alive():
+        if not self.scheduler.remove_job(self.SYNC_JOB):
             logger.warning("No sync thread running")
             return
             
         self.stop_event.set()
-        self.sync_thread.join(timeout=5.0)
-        if self.sync_thread.is_alive():
-            logger.warning("Sync thread did not terminate gracefully")
-        else:
-            logger.info("Stopped configuration sync thread")
-            
-    def _sync_loop(self) -> None:
-        """
-        Background thread loop for periodic configuration syncing
-        """
-        while not self.stop_event.is_set():
-            # Sync configuration with server
-            try:
-                self._sync_and_ping()
-            except Exception as e:
-                logger.error(f"Error in sync loop: {str(e)}")
-                
-            # Wait for the next sync interval or until stopped
-            self.stop_event.wait(self.sync_interval)
+        if not self.scheduler.jobs:
+            self.scheduler.stop(timeout=5.0)
+        logger.info("Stopped configuration sync job")
             
-    def _sync_and_ping(self) -> None:
+    def _sync_and_ping(self) -> bool:
         """
-        Perform configuration sync and server ping
+        Perform configuration sync and, if no heartbeat job is scheduled, a server ping
+        
+        When a PingManager heartbeat is registered on the same scheduler the
+        ping is left to it, so the client never sends duplicate pings.
+        
+        Returns:
+            True if all requests succeeded, False otherwise
         """
         server_url = self.client_config.get_server_url()
-        uuid, token = self.client_config.get_uuid_and_token()
+        uuid, _ = self.client_config.get_uuid_and_token()
         
         # Prepare auth headers
         headers = {
-            "Authorization": f"Bearer {uuid}:{token}",
+            "Authorization": self.client_config.get_auth_header(),
             "Content-Type": "application/json"
         }
         
         try:
             # 1. Sync full config
-            self.client_config.sync_with_server()
+            success = self.client_config.sync_with_server()
+            if success:
+                self._notify_sync_listeners()
             
-            # 2. Send ping to update last-seen timestamp
+            # 2. Send ping to update last-seen timestamp, unless the heartbeat job does it
+            if self.scheduler.has_job(self.HEARTBEAT_JOB):
+                return success
+                
             ping_response = requests.post(
                 f"{server_url}/ping",
                 headers=headers,
@@ -117,9 +185,13 @@ class ConfigSyncManager:
                 logger.debug("Successfully pinged server")
             else:
                 logger.error(f"Ping failed with status code: {ping_response.status_code}")
+                return False
+            
+            return success
                 
         except requests.RequestException as e:
             logger.error(f"Error communicating with server: {str(e)}")
+            return False
             
     def force_sync(self) -> bool:
         """
@@ -132,6 +204,7 @@ class ConfigSyncManager:
             success = self.client_config.sync_with_server()
             if success:
                 logger.info("Forced config sync successful")
+                self._notify_sync_listeners()
             else:
                 logger.warning("Forced config sync failed")
             return success
@@ -139,6 +212,70 @@ class ConfigSyncManager:
             logger.error(f"Error during forced sync: {str(e)}")
             return False
             
+    def get_cache_age(self) -> Optional[float]:
+        """
+        Get the age of the cached server configuration
+        
+        Returns:
+            Seconds since the last successful sync, or None if there is no cache
+        """
+        if "server_config" not in self.client_config.config:
+            return None
+            
+        last_sync = self.client_config.config.get("client", {}).get("last_server_sync")
+        if not last_sync:
+            return None
+            
+        return max(0.0, time.time() - last_sync)
+        
+    def refresh_if_stale(self) -> bool:
+        """
+        Make sure the cached server configuration is usable (stale-while-revalidate)
+        
+        Fresh caches are used directly, stale ones are used while a background
+        refresh runs, and only a missing or expired cache blocks on the server.
+        
+        Returns:
+            True if a usable cached configuration is available, False otherwise
+        """
+        age = self.get_cache_age()
+        
+        if age is None or age > self.cache_max_age:
+            logger.info("Cached server configuration missing or expired, syncing")
+            if self.force_sync():
+                return True
+            # Serve an expired cache rather than nothing when the server is down
+            return "server_config" in self.client_config.config
+            
+        if age > self.cache_ttl:
+            self._refresh_in_background()
+            
+        return True
+        
+    def _refresh_in_background(self) -> None:
+        """
+        Start a background sync unless one is already in flight
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+            
+        def refresh():
+            try:
+                self.force_sync()
+            finally:
+                _refresh_threads.discard(threading.current_thread())
+                self._refresh_lock.release()
+                
+        logger.debug("Cached server configuration is stale, refreshing in background")
+        self._refresh_thread = threading.Thread(
+            target=refresh,
+            daemon=True,
+            name="ConfigRefreshThread"
+        )
+        # Joined briefly at exit, so short-lived processes still revalidate the cache
+        _refresh_threads.add(self._refresh_thread)
+        self._refresh_thread.start()
+            
     def get_available_containers(self) -> Dict[str, Any]:
         """
         Get list of containers available to this user
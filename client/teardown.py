@@ -0,0 +1,280 @@
+"""
+Container Teardown Module
+
+This module implements the teardown pipeline used to stop and remove
+containers, including:
+- A bounded-concurrency worker pool so several containers are torn down in parallel
+- Teardown jobs that can be waited on or left to finish in the background of
+  this process (exiting waits for queued jobs; a killed process abandons them)
+- Per-container status tracking for queued and running jobs
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from shared.utils.uuid_hash import generate_uuid
+from shared.utils.yaml_logger import setup_logger
+
+# Initialize logger
+logger = setup_logger("container_teardown", "/tmp/lsl_client.log")
+
+# Per-container teardown states
+STATE_PENDING = "pending"
+STATE_STOPPING = "stopping"
+STATE_REMOVING = "removing"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+
+class TeardownJob:
+    """A batch of containers being stopped and/or removed"""
+
+    def __init__(self, containers: List[Dict[str, Any]], stop: bool, remove: bool,
+                 force: bool = False, remove_volumes: bool = False, timeout: int = 10):
+        """
+        Initialize a teardown job
+
+        Args:
+            containers: Raw container summaries from the Docker API
+            stop: Whether to stop running containers
+            remove: Whether to remove the containers
+            force: Force removal even if running
+            remove_volumes: Whether to remove associated volumes
+            timeout: Stop timeout in seconds
+        """
+        self.id = generate_uuid()
+        self.stop = stop
+        self.remove = remove
+        self.force = force
+        self.remove_volumes = remove_volumes
+        self.timeout = timeout
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+        self.containers = {
+            container["Id"]: {
+                "name": (container.get("Names") or ["/"])[0].lstrip("/"),
+                "running": container.get("State") == "running",
+                "state": STATE_PENDING,
+                "error": None
+            }
+            for container in containers
+        }
+
+        self._lock = threading.Lock()
+        self._remaining = len(self.containers)
+        self._done_event = threading.Event()
+        if self._remaining == 0:
+            self._finish()
+
+    def _set_state(self, container_id: str, state: str, error: Optional[str] = None) -> None:
+        """
+        Update the state of one container
+
+        Args:
+            container_id: Docker container ID
+            state: New state
+            error: Error message if the teardown failed
+        """
+        with self._lock:
+            entry = self.containers[container_id]
+            entry["state"] = state
+            entry["error"] = error
+            if state in (STATE_DONE, STATE_FAILED):
+                self._remaining -= 1
+                if self._remaining == 0:
+                    self._finish()
+
+    def _finish(self) -> None:
+        """Mark the job as finished"""
+        self.finished_at = time.time()
+        self._done_event.set()
+
+    def done(self) -> bool:
+        """
+        Check if all containers of the job have been processed
+
+        Returns:
+            True if the job is finished
+        """
+        return self._done_event.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for the job to finish
+
+        Args:
+            timeout: Maximum time to wait in seconds, None to wait forever
+
+        Returns:
+            True if the job finished, False on timeout
+        """
+        return self._done_event.wait(timeout)
+
+    def failures(self) -> List[Dict[str, Any]]:
+        """
+        Get containers whose teardown failed
+
+        Returns:
+            List of container status entries with errors
+        """
+        with self._lock:
+            return [dict(entry) for entry in self.containers.values() if entry["state"] == STATE_FAILED]
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of the job status
+
+        Returns:
+            Dictionary with job and per-container state
+        """
+        with self._lock:
+            return {
+                "id": self.id,
+                "done": self.done(),
+                "created_at": self.created_at,
+                "finished_at": self.finished_at,
+                "containers": {cid: dict(entry) for cid, entry in self.containers.items()}
+            }
+
+
+class TeardownPipeline:
+    """
+    Teardown Pipeline
+
+    Runs container stop/remove operations on a bounded, in-process worker pool.
+    Jobs only run while this process does: interpreter exit waits for the
+    pool to drain, and nothing resumes a job after the process is killed.
+    """
+
+    def __init__(self, max_workers: int = 4, history_size: int = 50):
+        """
+        Initialize the teardown pipeline
+
+        Args:
+            max_workers: Maximum number of containers torn down concurrently
+            history_size: Number of finished jobs kept for status queries
+        """
+        self.max_workers = max_workers
+        self.history_size = history_size
+        self.jobs: Dict[str, TeardownJob] = {}
+
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        Get the worker pool, creating it on first use
+
+        Returns:
+            ThreadPoolExecutor instance
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="LSLTeardown"
+                )
+            return self._executor
+
+    def submit(self, docker_client, containers: List[Dict[str, Any]], stop: bool = True,
+               remove: bool = False, force: bool = False, remove_volumes: bool = False,
+               timeout: int = 10) -> TeardownJob:
+        """
+        Queue containers for teardown
+
+        Args:
+            docker_client: Docker client used for the API calls
+            containers: Raw container summaries from the Docker API
+            stop: Whether to stop running containers
+            remove: Whether to remove the containers
+            force: Force removal even if running
+            remove_volumes: Whether to remove associated volumes
+            timeout: Stop timeout in seconds
+
+        Returns:
+            The queued TeardownJob
+        """
+        job = TeardownJob(containers, stop, remove, force, remove_volumes, timeout)
+        self._remember(job)
+
+        executor = self._get_executor()
+        for container_id in job.containers:
+            executor.submit(self._teardown_one, docker_client, job, container_id)
+
+        logger.info(f"Queued teardown job {job.id} for {len(job.containers)} container(s)")
+        return job
+
+    def _teardown_one(self, docker_client, job: TeardownJob, container_id: str) -> None:
+        """
+        Stop and/or remove a single container
+
+        Args:
+            docker_client: Docker client used for the API calls
+            job: Teardown job the container belongs to
+            container_id: Docker container ID
+        """
+        entry = job.containers[container_id]
+        try:
+            if job.stop:
+                if entry["running"]:
+                    job._set_state(container_id, STATE_STOPPING)
+                    logger.info(f"Stopping container {entry['name']}")
+                    docker_client.api.stop(container_id, timeout=job.timeout)
+                else:
+                    logger.info(f"Container {entry['name']} is already stopped")
+
+            if job.remove:
+                job._set_state(container_id, STATE_REMOVING)
+                logger.info(f"Removing container {entry['name']}")
+                docker_client.api.remove_container(container_id, force=job.force, v=job.remove_volumes)
+
+            job._set_state(container_id, STATE_DONE)
+        except Exception as e:
+            logger.error(f"Teardown of container {entry['name']} failed: {str(e)}")
+            job._set_state(container_id, STATE_FAILED, str(e))
+
+    def _remember(self, job: TeardownJob) -> None:
+        """
+        Track a job for status queries, dropping the oldest finished jobs
+
+        Args:
+            job: Teardown job
+        """
+        with self._lock:
+            self.jobs[job.id] = job
+            finished = [j for j in self.jobs.values() if j.done()]
+            excess = len(self.jobs) - self.history_size
+            for old in sorted(finished, key=lambda j: j.created_at)[:max(0, excess)]:
+                del self.jobs[old.id]
+
+    def get_status(self, job_id: Optional[str] = None) -> Any:
+        """
+        Get the status of one or all tracked jobs
+
+        Args:
+            job_id: Optional job ID
+
+        Returns:
+            Status dictionary of the job, a list of all job statuses if no ID
+            is given, or None if the job is unknown
+        """
+        with self._lock:
+            if job_id is not None:
+                job = self.jobs.get(job_id)
+                return job.status() if job else None
+            jobs = list(self.jobs.values())
+        return [job.status() for job in jobs]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Shut down the worker pool
+
+        Args:
+            wait: Whether to wait for queued teardowns to finish
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
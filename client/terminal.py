@@ -0,0 +1,98 @@
+"""
+Terminal Relay Module
+
+This module connects the local terminal to a remote terminal stream (a
+hijacked container TTY or a broadcast session), including:
+- Putting the local terminal in raw mode and restoring it afterwards
+- Relaying keyboard input and output with one select loop, without threads
+- An optional detach key
+"""
+import os
+import termios
+import selectors
+from contextlib import contextmanager, nullcontext
+from typing import Optional
+
+# Bytes read at once
+READ_SIZE = 64 * 1024
+
+
+def write_all(fd: int, data: bytes) -> None:
+    """
+    Write all data to a file descriptor, retrying short writes
+
+    Args:
+        fd: File descriptor (file, pipe, PTY or socket)
+        data: Bytes to write
+    """
+    view = memoryview(data)
+    while view:
+        try:
+            written = os.write(fd, view)
+        except BlockingIOError:
+            selector = selectors.DefaultSelector()
+            selector.register(fd, selectors.EVENT_WRITE)
+            selector.select()
+            selector.close()
+            continue
+        view = view[written:]
+
+
+@contextmanager
+def raw_terminal(fd: int):
+    """
+    Put a terminal in raw mode for the duration of the block; a no-op if fd is not a terminal
+
+    Args:
+        fd: Terminal file descriptor
+    """
+    if not os.isatty(fd):
+        yield
+        return
+
+    import tty
+
+    saved_attrs = termios.tcgetattr(fd)
+    try:
+        tty.setraw(fd)
+        yield
+    finally:
+        termios.tcsetattr(fd, termios.TCSADRAIN, saved_attrs)
+
+
+def relay_terminal(stream_fd: int, stdin_fd: int = 0, stdout_fd: int = 1,
+                   read_only: bool = False, detach_key: Optional[bytes] = None) -> None:
+    """
+    Relay a terminal stream until it ends, the input ends or the detach key is pressed
+
+    Args:
+        stream_fd: File descriptor of the remote terminal stream
+        stdin_fd: File descriptor keyboard input is read from
+        stdout_fd: File descriptor output is written to
+        read_only: Only show output, never send input
+        detach_key: Byte sequence that ends the relay when typed
+    """
+    selector = selectors.DefaultSelector()
+    selector.register(stream_fd, selectors.EVENT_READ)
+    if not read_only:
+        selector.register(stdin_fd, selectors.EVENT_READ)
+
+    try:
+        # Read-only viewers keep a cooked terminal, so Ctrl-C still works
+        with raw_terminal(stdin_fd) if not read_only else nullcontext():
+            while True:
+                for event, _ in selector.select():
+                    try:
+                        data = os.read(event.fd, READ_SIZE)
+                    except BlockingIOError:
+                        continue
+                    if event.fd == stream_fd:
+                        if not data:
+                            return
+                        write_all(stdout_fd, data)
+                    else:
+                        if not data or (detach_key and detach_key in data):
+                            return
+                        write_all(stream_fd, data)
+    finally:
+        selector.close()
@@ -0,0 +1,60 @@
+/*
+ * Container list: virtual table over /admin/api/containers with search and sorting.
+ */
+(function () {
+    "use strict";
+
+    var form = document.getElementById("container-search");
+    var count = document.getElementById("container-count");
+    var params = VirtualTable.formParams(form);
+
+    function actions(container) {
+        var cell = document.createDocumentFragment();
+        cell.appendChild(VirtualTable.button("Edit", "edit-container", "name", container.name));
+        cell.appendChild(VirtualTable.button("Delete", "btn-danger delete-container", "name", container.name));
+        return cell;
+    }
+
+    var table = new VirtualTable({
+        viewport: document.getElementById("containers-viewport"),
+        tbody: document.getElementById("containers-body"),
+        endpoint: "/admin/api/containers",
+        params: params,
+        initialPage: VirtualTable.readInitialPage("containers-initial"),
+        onTotal: function (total) { count.textContent = total + " containers"; },
+        columns: [
+            function (container) { return container.name; },
+            function (container) { return container.image; },
+            function (container) { return container.shared ? "Yes" : "No"; },
+            function (container) { return (container.cpu || "-") + " CPU, " + (container.memory || "-"); },
+            actions
+        ]
+    });
+
+    var timer = null;
+    function search() {
+        var next = VirtualTable.formParams(form);
+        if (params.sort) {
+            next.sort = params.sort;
+            next.order = params.order;
+        }
+        params = next;
+        table.setParams(params);
+    }
+    form.addEventListener("submit", function (event) {
+        event.preventDefault();
+        search();
+    });
+    form.addEventListener("input", function () {
+        clearTimeout(timer);
+        timer = setTimeout(search, 200);
+    });
+
+    document.querySelectorAll("#containers-viewport th[data-sort]").forEach(function (th) {
+        th.addEventListener("click", function () {
+            var descending = params.sort === th.dataset.sort && params.order !== "desc";
+            params = Object.assign({}, params, {sort: th.dataset.sort, order: descending ? "desc" : "asc"});
+            table.setParams(params);
+        });
+    });
+})();
@@ -0,0 +1,62 @@
+/*
+ * User list: virtual table over /admin/api/users with search, filters and sorting.
+ */
+(function () {
+    "use strict";
+
+    var form = document.getElementById("user-search");
+    var count = document.getElementById("user-count");
+    var params = VirtualTable.formParams(form);
+
+    function actions(user) {
+        var cell = document.createDocumentFragment();
+        cell.appendChild(VirtualTable.button("Edit", "edit-user", "uuid", user.uuid));
+        cell.appendChild(VirtualTable.button("Delete", "btn-danger delete-user", "uuid", user.uuid));
+        cell.appendChild(VirtualTable.button("Reset Token", "reset-token", "uuid", user.uuid));
+        return cell;
+    }
+
+    var table = new VirtualTable({
+        viewport: document.getElementById("users-viewport"),
+        tbody: document.getElementById("users-body"),
+        endpoint: "/admin/api/users",
+        params: params,
+        initialPage: VirtualTable.readInitialPage("users-initial"),
+        onTotal: function (total) { count.textContent = total + " users"; },
+        columns: [
+            function (user) { return user.username; },
+            function (user) { return user.email; },
+            function (user) { return user.role; },
+            function (user) { return user.allowed_containers.join(", "); },
+            function (user) { return user.last_seen || "Never"; },
+            actions
+        ]
+    });
+
+    var timer = null;
+    function search() {
+        var next = VirtualTable.formParams(form);
+        if (params.sort) {
+            next.sort = params.sort;
+            next.order = params.order;
+        }
+        params = next;
+        table.setParams(params);
+    }
+    form.addEventListener("submit", function (event) {
+        event.preventDefault();
+        search();
+    });
+    form.addEventListener("input", function () {
+        clearTimeout(timer);
+        timer = setTimeout(search, 200);
+    });
+
+    document.querySelectorAll("#users-viewport th[data-sort]").forEach(function (th) {
+        th.addEventListener("click", function () {
+            var descending = params.sort === th.dataset.sort && params.order !== "desc";
+            params = Object.assign({}, params, {sort: th.dataset.sort, order: descending ? "desc" : "asc"});
+            table.setParams(params);
+        });
+    });
+})();
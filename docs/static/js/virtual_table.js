@@ -0,0 +1,194 @@
+/*
+ * Virtual table for the LSL admin lists.
+ *
+ * Only the rows in view (plus a small margin) exist in the DOM; spacer rows
+ * above and below keep the scrollbar the size of the full list. Rows are
+ * fetched from a JSON endpoint in blocks as they scroll into view and kept
+ * in a small cache.
+ */
+(function (global) {
+    "use strict";
+
+    var BLOCK_SIZE = 100;
+    var MAX_CACHED_BLOCKS = 50;
+    var OVERSCAN = 10;
+
+    function VirtualTable(options) {
+        this.viewport = options.viewport;
+        this.tbody = options.tbody;
+        this.endpoint = options.endpoint;
+        this.columns = options.columns;
+        this.rowHeight = options.rowHeight || 36;
+        this.onTotal = options.onTotal || function () {};
+        this.params = options.params || {};
+        this.blocks = new Map();
+        this.pending = new Set();
+        this.generation = 0;
+        this.total = 0;
+        this.scheduled = false;
+
+        var self = this;
+        this.viewport.addEventListener("scroll", function () { self.schedule(); });
+        global.addEventListener("resize", function () { self.schedule(); });
+
+        if (options.initialPage) {
+            this.total = options.initialPage.total;
+            this.storeRows(0, options.initialPage.items);
+            this.onTotal(this.total);
+        }
+        this.schedule();
+    }
+
+    VirtualTable.prototype.setParams = function (params) {
+        this.params = params;
+        this.blocks.clear();
+        this.pending.clear();
+        this.generation += 1;
+        this.viewport.scrollTop = 0;
+        this.fetchBlock(0);
+    };
+
+    VirtualTable.prototype.storeRows = function (offset, rows) {
+        // Pages of the initial render may not be block aligned; split them into blocks
+        for (var i = 0; i < rows.length; i++) {
+            var index = offset + i;
+            var block = Math.floor(index / BLOCK_SIZE);
+            if (!this.blocks.has(block)) {
+                this.blocks.set(block, []);
+            }
+            this.blocks.get(block)[index % BLOCK_SIZE] = rows[i];
+        }
+    };
+
+    VirtualTable.prototype.row = function (index) {
+        var block = this.blocks.get(Math.floor(index / BLOCK_SIZE));
+        return block ? block[index % BLOCK_SIZE] : undefined;
+    };
+
+    VirtualTable.prototype.fetchBlock = function (block) {
+        if (this.pending.has(block)) {
+            return;
+        }
+        this.pending.add(block);
+        var self = this;
+        var generation = this.generation;
+        var query = new URLSearchParams(this.params);
+        query.set("offset", block * BLOCK_SIZE);
+        query.set("limit", BLOCK_SIZE);
+
+        fetch(this.endpoint + "?" + query.toString(), {credentials: "same-origin"})
+            .then(function (response) {
+                if (response.status === 401) {
+                    global.location.href = "/admin/login";
+                }
+                return response.json();
+            })
+            .then(function (page) {
+                if (generation !== self.generation) {
+                    return;  // Parameters changed while this block was loading
+                }
+                self.pending.delete(block);
+                self.evict(block);
+                self.blocks.set(block, page.items || []);
+                if (page.total !== self.total) {
+                    self.total = page.total;
+                    self.onTotal(self.total);
+                }
+                self.schedule();
+            })
+            .catch(function () {
+                self.pending.delete(block);
+            });
+    };
+
+    VirtualTable.prototype.evict = function (keep) {
+        if (this.blocks.size < MAX_CACHED_BLOCKS) {
+            return;
+        }
+        // Drop the cached block farthest from the one being loaded
+        var farthest = null;
+        this.blocks.forEach(function (_, block) {
+            if (farthest === null || Math.abs(block - keep) > Math.abs(farthest - keep)) {
+                farthest = block;
+            }
+        });
+        this.blocks.delete(farthest);
+    };
+
+    VirtualTable.prototype.schedule = function () {
+        if (this.scheduled) {
+            return;
+        }
+        this.scheduled = true;
+        var self = this;
+        global.requestAnimationFrame(function () {
+            self.scheduled = false;
+            self.render();
+        });
+    };
+
+    VirtualTable.prototype.spacer = function (height) {
+        var tr = document.createElement("tr");
+        tr.className = "virtual-spacer";
+        tr.style.height = height + "px";
+        return tr;
+    };
+
+    VirtualTable.prototype.render = function () {
+        var first = Math.max(0, Math.floor(this.viewport.scrollTop / this.rowHeight) - OVERSCAN);
+        var visible = Math.ceil(this.viewport.clientHeight / this.rowHeight) + 2 * OVERSCAN;
+        var last = Math.min(this.total, first + visible);
+        var fragment = document.createDocumentFragment();
+
+        fragment.appendChild(this.spacer(first * this.rowHeight));
+        for (var index = first; index < last; index++) {
+            var row = this.row(index);
+            if (row === undefined) {
+                this.fetchBlock(Math.floor(index / BLOCK_SIZE));
+            }
+            var tr = document.createElement("tr");
+            tr.style.height = this.rowHeight + "px";
+            for (var c = 0; c < this.columns.length; c++) {
+                var td = document.createElement("td");
+                if (row !== undefined) {
+                    var content = this.columns[c](row);
+                    if (content instanceof Node) {
+                        td.appendChild(content);
+                    } else {
+                        td.textContent = content === null || content === undefined ? "" : content;
+                    }
+                }
+                tr.appendChild(td);
+            }
+            fragment.appendChild(tr);
+        }
+        fragment.appendChild(this.spacer((this.total - last) * this.rowHeight));
+
+        this.tbody.replaceChildren(fragment);
+    };
+
+    VirtualTable.readInitialPage = function (id) {
+        var element = document.getElementById(id);
+        return element ? JSON.parse(element.textContent) : null;
+    };
+
+    VirtualTable.formParams = function (form) {
+        var params = {};
+        new FormData(form).forEach(function (value, key) {
+            if (value !== "") {
+                params[key] = value;
+            }
+        });
+        return params;
+    };
+
+    VirtualTable.button = function (label, className, dataName, dataValue) {
+        var button = document.createElement("button");
+        button.className = "btn btn-small " + className;
+        button.textContent = label;
+        button.dataset[dataName] = dataValue;
+        return button;
+    };
+
+    global.VirtualTable = VirtualTable;
+})(window);
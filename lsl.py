@@ -2,28 +2,30 @@ import argparse
 import subprocess                                                                                                    
 import os                                                                                                            
 import sys
-import random
-import re
-import socket
 import time
 from typing import Dict, List, Tuple, Optional
-from pathlib import Path
-from dotenv import load_dotenv
                                                                                           
-#Start config loader                                                                                                               
-def load_config() -> Dict[str, str]:                                                                                                   
-    config: Dict[str, str] = {}                                                                                                      
-    try:                                                                                                             
-        with open('containers.txt', 'r') as f:                                                                       
-            for line in f:                                                                                           
-                line = line.strip()                                                                                  
-                if not line or line.startswith('#'):                                                                 
-                    continue                                                                                         
-                name, repo = line.split('=', 1)                                                                      
-                config[name.strip()] = repo.strip()                                                                  
-    except FileNotFoundError:                                                                                        
-        pass  # Config file not found; proceed without it                                                            
-    return config
+#Start config loader
+# Set once the stray ./containers.txt warning was shown, so it appears once per run
+_stray_catalog_warned = False
+
+def warn_stray_containers_txt(local_path: str) -> None:
+    """Warn once if ./containers.txt exists but local overrides are read from another file"""
+    global _stray_catalog_warned
+    from client.catalog import LOCAL_CATALOG_NAME
+    stray = os.path.abspath(LOCAL_CATALOG_NAME)
+    if _stray_catalog_warned or not os.path.isfile(stray) or os.path.abspath(local_path) == stray:
+        return
+    _stray_catalog_warned = True
+    print(f"[LSL] Warning: ignoring {stray}; local container overrides are read from {local_path}. "
+          f"Move the file there or set LSL_CONTAINERS_FILE.", file=sys.stderr)
+
+def load_config() -> Dict[str, str]:
+    """Map container names to images: server-synced templates plus local containers.txt overrides"""
+    from client.catalog import ContainerCatalog
+    catalog = ContainerCatalog()
+    warn_stray_containers_txt(catalog.local_path)
+    return catalog.images()
 
 def check_if_screen_exists(session_name: str) -> bool:
     """Check if a screen session with the given name exists"""
@@ -59,38 +61,144 @@ def get_connection_key() -> str:
     load_dotenv()
     return os.getenv('CONNECTION_KEY', 'LSL')
 
-def find_free_port(start: int = 10000, end: int = 20000) -> int:
-    import random, socket
-    while True:
-        port = random.randint(start, end)
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            if s.connect_ex(('localhost', port)) != 0:
-                return port
+# Registry of host ports reserved for shared sessions
+PORT_STATE_DIR = os.path.expanduser('~/.lsl')
+# Ports tried before giving up when ports are bound outside Docker
+PORT_ATTEMPTS = 5
+
+def get_port_allocator():
+    from shared.utils.port_allocator import PortAllocator
+    return PortAllocator(PORT_STATE_DIR)
+
+_engine = None
+
+def get_engine():
+    """Engine API client shared by every Docker step of this run (one persistent connection)"""
+    global _engine
+    if _engine is None:
+        from client.engine import LocalEngine
+        _engine = LocalEngine()
+    return _engine
+
+def docker_published_ports() -> Optional[Dict[int, str]]:
+    """Return host port -> container name for running containers, or None if Docker can't be queried"""
+    try:
+        return get_engine().published_ports()
+    except Exception:
+        return None
+
+def find_free_port(owner: str, allocator=None) -> int:
+    """Reserve a host port for a container, after syncing the registry with Docker's published ports"""
+    allocator = allocator or get_port_allocator()
+    published = docker_published_ports()
+    if published is not None:
+        allocator.reconcile(published)
+    return allocator.allocate(owner)
 
-def setup_host_shared_container(image: str, session_name: str, options: list):
-    port = find_free_port()
+# Setup steps baked into the images of shared sessions
+SHARED_SSH_SETUP = {
+    'packages': ['openssh-server', 'screen'],
+    'commands': [
+        'mkdir -p /run/sshd',
+        "sed -i 's/^#*PasswordAuthentication.*/PasswordAuthentication yes/' /etc/ssh/sshd_config",
+        "sed -i 's/^#*PermitRootLogin.*/PermitRootLogin yes/' /etc/ssh/sshd_config",
+    ],
+}
+
+def ensure_setup_image(image: str, setup: dict) -> str:
+    """Return a derived image with the setup steps baked in, building it once per base image digest"""
+    return get_engine().setup_image(image, setup)
+
+def setup_host_shared_container(image: str, session_name: str, run_options: dict):
+    from client.engine import EngineError
     key = get_connection_key()
-    # Prepare Docker run command with SSH port mapping
-    docker_cmd = [
-        'docker', 'run', '-d', '--rm', '-p', f'{port}:22', '--name', f'lsl_{session_name}'
-    ] + options + [image, '/usr/sbin/sshd', '-D']
-    # Start container detached with SSHD as entrypoint
-    container_id = subprocess.check_output(docker_cmd).decode().strip()
-    # Set root password to CONNECTION_KEY
-    subprocess.run(['docker', 'exec', container_id, 'bash', '-c', f'echo root:{key} | chpasswd'], check=True)
-    # Allow password auth
-    subprocess.run(['docker', 'exec', container_id, 'bash', '-c', "sed -i 's/^#*PasswordAuthentication.*/PasswordAuthentication yes/' /etc/ssh/sshd_config"], check=True)
-    subprocess.run(['docker', 'exec', container_id, 'bash', '-c', "sed -i 's/^#*PermitRootLogin.*/PermitRootLogin yes/' /etc/ssh/sshd_config"], check=True)
-    subprocess.run(['docker', 'exec', container_id, 'service', 'ssh', 'restart'], check=True)
-    # Install screen and start session
-    subprocess.run(['docker', 'exec', container_id, 'apt-get', 'update'], check=True)
-    subprocess.run(['docker', 'exec', container_id, 'apt-get', 'install', '-y', 'screen'], check=True)
-    subprocess.run(['docker', 'exec', '-u', 'root', container_id, 'screen', '-dmS', session_name], check=True)
+    container_name = f'lsl_{session_name}'
+    # sshd, screen and the sshd config are baked into a cached derived image
+    setup_image = ensure_setup_image(image, SHARED_SSH_SETUP)
+    # Set the root password to CONNECTION_KEY, start the screen session, then run sshd
+    startup = f'echo "root:$LSL_CONNECTION_KEY" | chpasswd && screen -dmS {session_name} && exec /usr/sbin/sshd -D'
+    allocator = get_port_allocator()
+    for attempt in range(PORT_ATTEMPTS):
+        port = find_free_port(container_name, allocator) if attempt == 0 else allocator.allocate(container_name)
+        try:
+            container_id = get_engine().run_detached(
+                setup_image, ['sh', '-c', startup], name=container_name,
+                environment={'LSL_CONNECTION_KEY': key}, ports={22: port}, **run_options
+            )
+            break
+        except EngineError as e:
+            if e.is_port_conflict():
+                # Bound by something outside the registry; skip it and try the next free port
+                allocator.mark_unavailable(port)
+                continue
+            allocator.release(port)
+            raise
+    else:
+        raise RuntimeError(f"No usable port for {container_name} after {PORT_ATTEMPTS} attempts")
     print(f"[LSL] Shared container started. SSH on port {port} (password: {key})")
     print(f"[LSL] To join: python3 lsl.py --share 127.0.0.1:{port}")
     print(f"[LSL] Inside, run: screen -x {session_name}")
     return port, container_id
 
+def host_shared_session(image: str, session_name: str, run_options: dict) -> int:
+    """Run a shared SSH+screen container until it exits or Ctrl-C, then remove it and release its port"""
+    container_name = f'lsl_{session_name}'
+    engine = get_engine()
+    port, container_id = setup_host_shared_container(image, session_name, run_options)
+    print("[LSL] Press Ctrl-C to end the session.")
+    try:
+        return engine.api.wait(container_id).get('StatusCode', 0)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        engine.remove(container_id)
+        get_port_allocator().release_owner(container_name)
+
+def host_broadcast_session(image: str, session_name: str, run_options: dict, read_only: bool = False) -> int:
+    """Run a container attached to this process and broadcast its TTY to viewers over TCP"""
+    import secrets
+    from client.broadcast import BroadcastServer, join_session
+    key = get_connection_key()
+    # With --read-only, viewers only get the viewing key; the host types with a private key
+    write_key = secrets.token_hex(16) if read_only else key
+    engine = get_engine()
+    container_id = engine.create(image, ['/bin/bash'], name=f'lsl_{session_name}', interactive=True,
+                                 auto_remove=False, **run_options)
+    server = None
+    try:
+        # Attach before starting so no output is missed; the server owns the hijacked TTY stream
+        server = BroadcastServer(key=key, write_key=write_key, stream_fd=engine.attach(container_id))
+        engine.start(container_id)
+        # Port 0: the kernel hands out a free port atomically, no probing
+        port = server.run_in_thread()
+        mode = 'read-only' if read_only else 'read-write'
+        print(f"[LSL] Broadcasting session '{session_name}' on port {port} ({mode} viewers, key: {key})")
+        print(f"[LSL] To watch: python3 lsl.py --share HOST:{port} --broadcast{' --read-only' if read_only else ''}")
+        print("[LSL] Press Ctrl-] to end the session.")
+        with engine.follow_terminal_size(container_id):
+            join_session('127.0.0.1', port, write_key)
+        return engine.api.wait(container_id).get('StatusCode', 0) if server.closed else 0
+    finally:
+        # Removing the container ends the stream, which stops the server
+        engine.remove(container_id)
+        if server is not None:
+            server.stop()
+
+def join_broadcast_session(hostport: str, read_only: bool = False) -> None:
+    import re
+    from client.broadcast import join_session
+    m = re.match(r'([^:]+):(\d+)$', hostport)
+    if not m:
+        print("Invalid --share argument. Use host:port")
+        sys.exit(1)
+    host, port = m.groups()
+    print(f"[LSL] Joining broadcast at {host}:{port}{' (read-only)' if read_only else ''}. Press Ctrl-] to detach.")
+    try:
+        join_session(host, int(port), get_connection_key(), read_only=read_only)
+    except (ConnectionError, OSError) as e:
+        print(f"[LSL] Could not join broadcast: {e}")
+        sys.exit(1)
+
 def join_shared_session_ssh(hostport: str, session_name: str):
     import re
     key = get_connection_key()
@@ -112,6 +220,44 @@ def join_shared_session_ssh(hostport: str, session_name: str):
         print("[LSL] Tip: Install sshpass for passwordless automation, or enter password manually.")
     subprocess.run(ssh_cmd)
 
+def load_bulk_specs(path: str) -> List[dict]:
+    """Load bulk start entries from a YAML/JSON file (a list, or a mapping with a 'containers' list)"""
+    import yaml
+    with open(path, 'r') as f:
+        data = yaml.safe_load(f) or []
+    if isinstance(data, dict):
+        data = data.get('containers', [])
+    specs = []
+    for number, entry in enumerate(data, 1):
+        if not isinstance(entry, dict):
+            specs.append(entry)  # Rejected by validation with a per-item error
+            continue
+        entry = dict(entry)
+        raw_count = entry.pop('count', 1)
+        try:
+            count = int(raw_count)
+        except (TypeError, ValueError):
+            count = -1
+        if count < 0 or isinstance(raw_count, (bool, float)):
+            raise ValueError(f"Entry {number} ({entry.get('template', 'no template')}): "
+                             f"count must be a non-negative integer, got {raw_count!r}")
+        specs.extend(dict(entry) for _ in range(count))
+    return specs
+
+def start_bulk(specs: List[dict], concurrency: Optional[int]) -> int:
+    """Start many containers through the LSL client and print a per-item report"""
+    from client.containers import ContainerManager
+    started = time.monotonic()
+    results = ContainerManager().start_containers(specs, concurrency=concurrency)
+    for r in results:
+        status = 'ok' if r['success'] else 'FAILED'
+        who = f" ({r['user']})" if r['user'] else ''
+        print(f"[{r['index']:>3}] {status:<6} {r['template']}{who} {r['name'] or '-'} "
+              f"{r['duration']:.2f}s {'' if r['success'] else r['message']}".rstrip())
+    ok = sum(1 for r in results if r['success'])
+    print(f"[LSL] Started {ok}/{len(results)} container(s) in {time.monotonic() - started:.2f}s")
+    return 0 if results and ok == len(results) else 1
+
 def main():                                                                                                          
     parser = argparse.ArgumentParser(description='Manage throwaway Docker containers')                               
     parser.add_argument('-n', '--name', help='Name of the container to start')                                       
@@ -119,7 +265,16 @@ def main():
     parser.add_argument('--net', action='store_true', help='Use host network')                                       
     parser.add_argument('-p', '--persist', action='store_true', help='Persist data in a volume')
     parser.add_argument('--share', help='Create or join a shared terminal session (host:port or session name)')
-    parser.add_argument('--host', action='store_true', help='Act as the host for a shared terminal session')                     
+    parser.add_argument('--host', action='store_true', help='Act as the host for a shared terminal session')
+    parser.add_argument('--broadcast', action='store_true',
+                        help='Share through the PTY broadcast service instead of SSH+screen')
+    parser.add_argument('--read-only', action='store_true',
+                        help='With --broadcast: join as a viewer that cannot type (as host: viewers cannot type)')
+    parser.add_argument('--bulk', metavar='FILE', help='Start every container listed in a YAML/JSON file')
+    parser.add_argument('--count', type=int, help='Start COUNT containers of the template given with --name')
+    parser.add_argument('--user', help='User the containers started with --count or --bulk belong to '
+                                       '(bulk entries naming a user keep it)')
+    parser.add_argument('--concurrency', type=int, help='Maximum number of containers started at once')                     
     args = parser.parse_args()                                                                                       
                                                                                                                      
     if args.list:                                                                                                    
@@ -131,6 +286,34 @@ def main():
                 print(f"{name}: {repo}")                                                                             
         sys.exit(0)                                                                                                  
                                                                                                                      
+    if args.user and not (args.bulk or args.count is not None):
+        parser.error('--user requires --count or --bulk')
+    if args.bulk or args.count is not None:
+        # Bulk mode: start many containers through the LSL client
+        if args.bulk:
+            import yaml
+            try:
+                specs = load_bulk_specs(args.bulk)
+            except (OSError, ValueError, yaml.YAMLError) as e:
+                parser.error(f"--bulk {args.bulk}: {e}")
+            if args.user:
+                specs = [dict(spec, user=spec.get('user', args.user)) if isinstance(spec, dict) else spec
+                         for spec in specs]
+        elif args.count < 1:
+            parser.error(f'--count must be at least 1, got {args.count}')
+        elif args.name:
+            spec = {'template': args.name, 'use_host_network': args.net, 'persist_data': args.persist}
+            if args.user:
+                spec['user'] = args.user
+            specs = [dict(spec) for _ in range(args.count)]
+        else:
+            parser.error('--count requires --name')
+        sys.exit(start_bulk(specs, args.concurrency))
+
+    if args.share and args.broadcast and not args.host:
+        # Viewer: join a broadcast session
+        join_broadcast_session(args.share, read_only=args.read_only)
+        sys.exit(0)
     if args.share and not args.host:
         # Client: join shared session
         join_shared_session_ssh(args.share, 'sharedSession1')
@@ -142,60 +325,49 @@ def main():
     config = load_config()                                                                                           
     image = config.get(args.name, args.name)  # Use config or name as the image                                      
                                                                                                                      
-    volume_dir = f".lsl_persist_{args.name}"                                                                         
-    options = ['-it']                                                                                                
-                                                                                                                     
-    if args.persist:                                                                                                 
-        os.makedirs(volume_dir, exist_ok=True)                                                                       
-        volume_path = os.path.abspath(volume_dir)                                                                    
-        options.append(f'-v {volume_path}:/data')                                                                    
-                                                                                                                     
-    if args.net:                                                                                                     
-        options.extend(['--network', 'host'])                                                                        
-                                                                                                                     
-    # Always use --rm unless we want to keep the container (not required here)                                       
-    options.append('--rm')
-    
+    volume_dir = f".lsl_persist_{args.name}"
+    # Options of the container, passed to the Engine API (docker run -it --rm equivalent)
+    run_options = {}
+
+    if args.persist:
+        os.makedirs(volume_dir, exist_ok=True)
+        volume_path = os.path.abspath(volume_dir)
+        run_options['binds'] = [f'{volume_path}:/data']
+
+    if args.net:
+        run_options['network_mode'] = 'host'
+
+    from client.engine import EngineError
+
     # Prepare command
-    if args.share:
-        # Install screen in the container first if needed
-        cmd_prefix = ['docker', 'run'] + options
-        
-        # For a shared terminal session, we need to set up screen
-        # Make sure screen package is installed
-        install_screen_cmd = cmd_prefix + [image, 'bash', '-c', 
-                                          'apt-get update && apt-get install -y screen || apk add screen']
+    if args.share and args.broadcast:
+        # Host: one container TTY fanned out to every viewer, no sshd or screen in the container
         try:
-            print("Setting up shared terminal environment...")
-            subprocess.run(install_screen_cmd, check=True)
-            
-            # Now start the actual container with screen
-            shared_session_name = args.share
-            
-            # Check if we're the host or a client
-            if args.host:
-                # Host creates the screen session
-                cmd = cmd_prefix + [image, 'bash', '-c', 
-                                     f'screen -dmS {shared_session_name} && screen -r {shared_session_name}']
-                print(f"Starting shared terminal as host: {shared_session_name}")
-            else:
-                # Client joins the screen session
-                cmd = cmd_prefix + [image, 'bash', '-c', 
-                                    f'screen -x {shared_session_name} || echo "Session {shared_session_name} not found"']
-                print(f"Joining shared terminal session: {shared_session_name}")
-        except subprocess.CalledProcessError as e:
+            sys.exit(host_broadcast_session(image, args.share, run_options, read_only=args.read_only))
+        except EngineError as e:
+            print(f"Error running container: {e}")
+            sys.exit(1)
+    elif args.share:
+        # Host (clients exited above): an SSH+screen container on a port from the registry,
+        # joined with --share HOST:PORT
+        print("Setting up shared terminal environment...")
+        try:
+            sys.exit(host_shared_session(image, args.share, run_options))
+        except (EngineError, RuntimeError) as e:
             print(f"Error setting up shared terminal: {e}")
             sys.exit(1)
     else:
         # Regular non-shared container
-        cmd = ['docker', 'run'] + options + [image, '/bin/bash']                                                         
-                                                                                                                     
-    try:                                                                                                             
-        subprocess.run(cmd, check=True)                                                                              
-    except subprocess.CalledProcessError as e:                                                                       
-        print(f"Error running container: {e}")                                                                       
-        sys.exit(1)                                                                                                  
-                                                                                                                     
+        command = ['/bin/bash']
+
+    try:
+        exit_code = get_engine().run_interactive(image, command, **run_options)
+    except EngineError as e:
+        print(f"Error running container: {e}")
+        sys.exit(1)
+    if exit_code:
+        sys.exit(exit_code)
+
 if __name__ == "__main__":                                                                                           
     main()
 
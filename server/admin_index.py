@@ -0,0 +1,408 @@
+"""
+Admin Index Module
+
+This module keeps in-memory indexes of users and containers for the web
+admin, so listing pages stay fast with tens of thousands of users:
+- Precomputed sort orders for every sortable field; a page of an unfiltered
+  listing is a slice
+- Sorted keys for prefix search (binary search)
+- One joined, lowercased text per field for substring search, scanned with
+  str.find instead of a Python loop over all records
+- Inverted indexes for exact filters (role, allowed container)
+- Indexes are rebuilt only when the YAML file behind them changes
+"""
+import os
+import bisect
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from shared.config import load_yaml_config
+from shared.utils.yaml_logger import setup_logger
+
+# Initialize logger
+logger = setup_logger("admin_index", "logs/web_admin.log", queued=True)
+
+# Page size limits of index queries
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Search modes
+SEARCH_PREFIX = "prefix"
+SEARCH_SUBSTRING = "substring"
+
+# Separates the values in the joined search text; cannot appear in a lowercased value
+_SEPARATOR = "\x00"
+
+
+class RecordIndex:
+    """
+    Record Index
+
+    Indexes a list of flat rows. Each row is a dict of displayable values;
+    a field is searchable if it is listed in search_fields, sortable if in
+    sort_fields and filterable (exact match, also on list values) if in
+    filter_fields.
+    """
+
+    def __init__(self, rows: List[Dict[str, Any]], search_fields: Iterable[str], sort_fields: Iterable[str],
+                 filter_fields: Iterable[str] = ()):
+        """
+        Build the indexes
+
+        Args:
+            rows: Rows to index
+            search_fields: Fields that can be searched by prefix or substring
+            sort_fields: Fields the rows can be sorted by; the first is the default
+            filter_fields: Fields that can be filtered by exact value
+        """
+        self.rows = rows
+        self.search_fields = list(search_fields)
+        self.sort_fields = list(sort_fields)
+        self.filter_fields = list(filter_fields)
+        count = len(rows)
+
+        # Sort orders and the rank of every row in them
+        self._orders: Dict[str, List[int]] = {}
+        self._ranks: Dict[str, List[int]] = {}
+        for field in self.sort_fields:
+            order = sorted(range(count), key=lambda i: _sort_key(rows[i].get(field)))
+            ranks = [0] * count
+            for rank, i in enumerate(order):
+                ranks[i] = rank
+            self._orders[field] = order
+            self._ranks[field] = ranks
+
+        # Prefix tables and joined texts for substring search
+        self._prefix: Dict[str, Tuple[List[str], List[int]]] = {}
+        self._text: Dict[str, Tuple[str, List[int], List[int]]] = {}
+        for field in self.search_fields:
+            pairs = sorted((value, i) for i in range(count) for value in _search_values(rows[i].get(field)))
+            self._prefix[field] = ([value for value, _ in pairs], [i for _, i in pairs])
+            offsets, owners, parts, position = [], [], [], 0
+            for i in range(count):
+                for value in _search_values(rows[i].get(field)):
+                    offsets.append(position)
+                    owners.append(i)
+                    parts.append(value)
+                    position += len(value) + 1
+            self._text[field] = (_SEPARATOR.join(parts), offsets, owners)
+
+        # Inverted indexes for exact filters
+        self._filters: Dict[str, Dict[str, Set[int]]] = {}
+        for field in self.filter_fields:
+            inverted: Dict[str, Set[int]] = {}
+            for i in range(count):
+                for value in _filter_values(rows[i].get(field)):
+                    inverted.setdefault(value, set()).add(i)
+            self._filters[field] = inverted
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def facets(self, field: str) -> List[Tuple[str, int]]:
+        """
+        Get the values of a filter field with their row counts
+
+        Args:
+            field: Filter field
+
+        Returns:
+            (value, count) pairs sorted by value
+        """
+        return sorted((value, len(rows)) for value, rows in self._filters.get(field, {}).items())
+
+    def search(self, text: str, mode: str = SEARCH_SUBSTRING, fields: Optional[Iterable[str]] = None) -> Set[int]:
+        """
+        Find rows with a field value matching a search text, ignoring case
+
+        Args:
+            text: Search text
+            mode: SEARCH_PREFIX or SEARCH_SUBSTRING
+            fields: Fields to search (default: all search fields)
+
+        Returns:
+            Positions of the matching rows
+        """
+        needle = text.lower()
+        matches: Set[int] = set()
+        for field in fields or self.search_fields:
+            if field not in self._prefix:
+                continue
+            if mode == SEARCH_PREFIX:
+                values, owners = self._prefix[field]
+                start = bisect.bisect_left(values, needle)
+                end = bisect.bisect_left(values, needle + "\uffff", start)
+                matches.update(owners[start:end])
+            else:
+                joined, offsets, owners = self._text[field]
+                position = joined.find(needle)
+                while position != -1:
+                    value = bisect.bisect_right(offsets, position) - 1
+                    matches.add(owners[value])
+                    # Continue after this value; further hits in it add nothing
+                    next_value = value + 1
+                    if next_value >= len(offsets):
+                        break
+                    position = joined.find(needle, offsets[next_value])
+        return matches
+
+    def query(self, search: str = "", mode: str = SEARCH_SUBSTRING, fields: Optional[Iterable[str]] = None,
+              filters: Optional[Dict[str, str]] = None, sort: Optional[str] = None, descending: bool = False,
+              offset: int = 0, limit: int = DEFAULT_PAGE_SIZE) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Get one page of rows
+
+        Args:
+            search: Search text (empty matches every row)
+            mode: SEARCH_PREFIX or SEARCH_SUBSTRING
+            fields: Fields to search (default: all search fields)
+            filters: Exact values by filter field
+            sort: Sort field (default: the first sort field)
+            descending: Reverse the sort order
+            offset: Index of the first row of the page
+            limit: Maximum number of rows (capped at MAX_PAGE_SIZE)
+
+        Returns:
+            Tuple of (number of matching rows, rows of the page)
+
+        Raises:
+            ValueError: If the sort or a filter field is not indexed
+        """
+        sort = sort or self.sort_fields[0]
+        if sort not in self._orders:
+            raise ValueError(f"Cannot sort by '{sort}'")
+        offset = max(offset, 0)
+        limit = min(max(limit, 0), MAX_PAGE_SIZE)
+
+        matches: Optional[Set[int]] = None
+        for field, value in (filters or {}).items():
+            if field not in self._filters:
+                raise ValueError(f"Cannot filter by '{field}'")
+            rows = self._filters[field].get(value, set())
+            matches = set(rows) if matches is None else matches & rows
+        if search:
+            found = self.search(search, mode, fields)
+            matches = found if matches is None else matches & found
+
+        order = self._orders[sort]
+        if matches is None:
+            # Unfiltered: the page is a slice of the precomputed order
+            total = len(order)
+            if descending:
+                page = [order[total - 1 - k] for k in range(offset, min(offset + limit, total))]
+            else:
+                page = order[offset:offset + limit]
+        else:
+            total = len(matches)
+            if total * 8 < len(order):
+                # Few matches: sorting them by rank is cheaper than walking the order
+                ranked = sorted(matches, key=self._ranks[sort].__getitem__, reverse=descending)
+                page = ranked[offset:offset + limit]
+            else:
+                walk = reversed(order) if descending else iter(order)
+                page, skipped = [], 0
+                for i in walk:
+                    if i in matches:
+                        if skipped < offset:
+                            skipped += 1
+                            continue
+                        page.append(i)
+                        if len(page) >= limit:
+                            break
+        return total, [self.rows[i] for i in page]
+
+
+def _sort_key(value: Any) -> Tuple[int, Any]:
+    """
+    Sort key placing missing values last and ignoring case
+
+    Args:
+        value: Field value
+
+    Returns:
+        Comparable key
+    """
+    if value is None or value == "" or value == []:
+        return (1, "")
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value)
+    return (0, str(value).lower())
+
+
+def _search_values(value: Any) -> List[str]:
+    """
+    Lowercased searchable values of a field
+
+    Args:
+        value: Field value
+
+    Returns:
+        One entry per value; list fields contribute every item
+    """
+    if value is None:
+        return []
+    values = value if isinstance(value, list) else [value]
+    return [str(v).lower().replace(_SEPARATOR, "") for v in values if v is not None and v != ""]
+
+
+def _filter_values(value: Any) -> List[str]:
+    """
+    Exact values of a field for filtering
+
+    Args:
+        value: Field value
+
+    Returns:
+        One entry per value; list fields contribute every item
+    """
+    if value is None:
+        return []
+    values = value if isinstance(value, list) else [value]
+    return [str(v) for v in values if v is not None and v != ""]
+
+
+def user_rows(users_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten users.yaml into rows for the user index; password hashes and tokens are left out
+
+    Args:
+        users_config: Loaded users configuration
+
+    Returns:
+        One row per user
+    """
+    rows = []
+    for username, user_data in (users_config.get("users") or {}).items():
+        metadata = user_data.get("metadata") or {}
+        rows.append({
+            "username": username,
+            "uuid": user_data.get("uuid"),
+            "email": metadata.get("email"),
+            "role": metadata.get("role"),
+            "full_name": metadata.get("full_name"),
+            "allowed_containers": list(user_data.get("allowed_containers") or []),
+            # YAML may load timestamps as datetimes; rows are sent as JSON
+            "last_seen": str(user_data["last_seen"]) if user_data.get("last_seen") is not None else None,
+            "locked": bool(user_data.get("locked", False)),
+        })
+    return rows
+
+
+def container_rows(containers_config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Flatten containers.yaml into rows for the container index
+
+    Args:
+        containers_config: Loaded containers configuration
+
+    Returns:
+        One row per container
+    """
+    rows = []
+    for name, container in (containers_config.get("containers") or {}).items():
+        resources = container.get("resources") or {}
+        rows.append({
+            "name": name,
+            "image": container.get("image"),
+            "description": container.get("description"),
+            "shared": bool(container.get("shared", False)),
+            "cpu": resources.get("cpu"),
+            "memory": resources.get("memory"),
+        })
+    return rows
+
+
+def build_user_index(users_config: Dict[str, Any]) -> RecordIndex:
+    """
+    Build the user index
+
+    Args:
+        users_config: Loaded users configuration
+
+    Returns:
+        Index searchable by name, email, role, UUID and allowed container
+    """
+    return RecordIndex(
+        user_rows(users_config),
+        search_fields=["username", "email", "role", "full_name", "uuid", "allowed_containers"],
+        sort_fields=["username", "email", "role", "last_seen"],
+        filter_fields=["role", "allowed_containers"],
+    )
+
+
+def build_container_index(containers_config: Dict[str, Any]) -> RecordIndex:
+    """
+    Build the container index
+
+    Args:
+        containers_config: Loaded containers configuration
+
+    Returns:
+        Index searchable by name, image and description
+    """
+    return RecordIndex(
+        container_rows(containers_config),
+        search_fields=["name", "image", "description"],
+        sort_fields=["name", "image"],
+        filter_fields=["image"],
+    )
+
+
+class IndexedConfig:
+    """
+    Index of a YAML configuration file
+
+    Reloads the file and rebuilds the index when the file's modification
+    time or size changes; otherwise the existing index is returned.
+    """
+
+    def __init__(self, path: str, schema_name: str, builder: Callable[[Dict[str, Any]], RecordIndex]):
+        """
+        Initialize the indexed configuration
+
+        Args:
+            path: Path of the YAML file
+            schema_name: Schema the file is validated against
+            builder: Function building the index from the loaded file
+        """
+        self.path = path
+        self.schema_name = schema_name
+        self.builder = builder
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int]] = None
+        self._index: Optional[RecordIndex] = None
+
+    def get(self) -> RecordIndex:
+        """
+        Get the index, rebuilding it if the file changed
+
+        Returns:
+            The index; empty if the file does not exist
+
+        Raises:
+            ValueError: If the file cannot be loaded and there is no earlier index
+        """
+        try:
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            signature = None
+
+        with self._lock:
+            if self._index is not None and signature == self._signature:
+                return self._index
+            if signature is None:
+                index = self.builder({})
+            else:
+                try:
+                    index = self.builder(load_yaml_config(self.path, self.schema_name))
+                except ValueError as e:
+                    if self._index is None:
+                        raise
+                    # Keep serving the last good index while the file is being fixed
+                    logger.error(f"Could not reload {self.path}: {str(e)}")
+                    return self._index
+            logger.info(f"Indexed {len(index)} entries of {self.path}")
+            self._index = index
+            self._signature = signature
+            return index
@@ -4,6 +4,7 @@ REST API implementation for LSL server.
 This module provides:
 - FastAPI server setup
 - Endpoints for client interaction (/get_config, /ping, /monitor)
+- Client authentication by UUID or by signed token (see shared.utils.signed_token)
 - Rate limiting
 - Error handling
 - Config reloading via SIGHUP
@@ -15,7 +16,7 @@ import psutil
 import docker
 import yaml
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, NamedTuple
 from datetime import datetime, timedelta
 from fastapi import FastAPI, HTTPException, Depends, Request, status
 from fastapi.responses import JSONResponse
@@ -26,7 +27,10 @@ import uuid
 
 # Import shared modules
 from shared.config import load_yaml_config
-from shared.utils.yaml_logger import setup_logger
+from shared.utils.yaml_logger import setup_logger, get_log_stats
+from shared.utils.signed_token import (
+    TokenSigner, TokenError, DEFAULT_TTL, containers_version, is_signed_token, parse_keys
+)
 
 # Path configuration
 CONFIG_PATHS = {
@@ -35,9 +39,10 @@ CONFIG_PATHS = {
     'containers': os.environ.get('LSL_CONTAINERS_CONFIG', 'config/containers.yaml')
 }
 
-# Setup logging
+# Setup logging; records are formatted and written on a background thread, off the request path
 log_file = os.environ.get('LSL_SERVER_LOG', 'logs/server.log')
-logger = setup_logger('lsl_server', log_file, level=logging.INFO)
+log_format = os.environ.get('LSL_LOG_FORMAT', 'yaml')  # 'jsonl' for JSON Lines, searchable with lsl-logs
+logger = setup_logger('lsl_server', log_file, level=logging.INFO, queued=True, log_format=log_format)
 
 # Create FastAPI application
 app = FastAPI(title="LSL Server API", version="1.0.0")
@@ -54,6 +59,12 @@ app.add_middleware(
 # Security scheme for token authentication
 token_auth_scheme = HTTPBearer(auto_error=True)
 
+class ClientIdentity(NamedTuple):
+    """Authenticated client"""
+    uuid: str
+    username: str
+    claims: Optional[Dict[str, Any]]  # Signed token claims, None for UUID authentication
+
 # Rate limiting configuration
 class RateLimiter:
     def __init__(self, limit_per_minute: int = 60):
@@ -98,6 +109,8 @@ def setup_app():
         app.state.main_config = load_yaml_config(CONFIG_PATHS['main'], 'main')
         app.state.users_config = load_yaml_config(CONFIG_PATHS['users'], 'users')
         app.state.containers_config = load_yaml_config(CONFIG_PATHS['containers'], 'containers')
+        index_users()
+        setup_token_signer()
         
         # Initialize last seen timestamps
         app.state.last_seen = {}  # {uuid: last_seen_timestamp}
@@ -114,6 +127,38 @@ def setup_app():
         logger.critical(f"Failed to initialize server: {e}")
         raise
 
+def index_users():
+    """Map client UUIDs to usernames, so UUID authentication is a single lookup."""
+    users = app.state.users_config.get('users', {})
+    app.state.uuid_index = {
+        user_data['uuid']: username for username, user_data in users.items() if user_data.get('uuid')
+    }
+
+def setup_token_signer():
+    """
+    Configure signed client tokens.
+    
+    Signing keys come from the LSL_TOKEN_KEYS environment variable
+    ('kid:secret,kid:secret', the first key signs new tokens); without it
+    signed tokens are disabled. Lifetime and deny-list come from the 'tokens'
+    section of the main config.
+    """
+    app.state.token_signer = None
+    try:
+        keys = parse_keys(os.environ.get('LSL_TOKEN_KEYS', ''))
+    except ValueError as e:
+        logger.error(f"Signed tokens disabled: {e}")
+        return
+    if not keys:
+        return
+    
+    token_config = app.state.main_config.get('tokens', {})
+    signer = TokenSigner(keys, ttl=token_config.get('ttl', DEFAULT_TTL))
+    for jti in token_config.get('revoked', []):
+        signer.revoke(jti)
+    app.state.token_signer = signer
+    logger.info(f"Signed tokens enabled with key '{signer.active_kid}' ({len(keys)} keys)")
+
 def get_system_stats() -> Dict[str, Any]:
     """Get system statistics using psutil."""
     try:
@@ -142,24 +187,27 @@ def get_running_containers() -> List[Dict[str, Any]]:
     """Get information about running Docker containers."""
     try:
         client = docker.from_env()
-        containers = client.containers.list()
+        # Low-level list returns names, image, state and labels in one call
+        containers = client.api.containers()
         
         result = []
         for container in containers:
-            # Try to extract owner from container name
-            owner = None
-            name = container.name
+            labels = container.get('Labels') or {}
+            name = (container.get('Names') or ['/'])[0].lstrip('/')
+            
+            # LSL clients label their containers with the owner
+            owner = labels.get('lsl.owner')
             
-            # LSL containers are named with pattern: lsl_{container_type}_{owner}
-            if name.startswith('lsl_'):
+            # Older LSL containers are named with pattern: lsl_{container_type}_{owner}
+            if owner is None and name.startswith('lsl_'):
                 parts = name.split('_')
                 if len(parts) >= 3:
                     owner = parts[2]
             
             result.append({
                 "name": name,
-                "image": container.image.tags[0] if container.image.tags else "unknown",
-                "status": container.status,
+                "image": container.get('Image') or "unknown",
+                "status": container.get('State', 'unknown'),
                 "owner": owner
             })
             
@@ -170,22 +218,38 @@ def get_running_containers() -> List[Dict[str, Any]]:
 
 def get_user_for_uuid(user_uuid: str) -> Optional[str]:
     """Get username for a given UUID."""
-    users = app.state.users_config.get('users', {})
-    for username, user_data in users.items():
-        if user_data.get('uuid') == user_uuid:
-            return username
-    return None
+    return app.state.uuid_index.get(user_uuid)
 
-def validate_uuid(credentials: HTTPAuthorizationCredentials = Depends(token_auth_scheme)):
-    """Validate UUID from Authorization header."""
+def authenticate(credentials: HTTPAuthorizationCredentials = Depends(token_auth_scheme)) -> ClientIdentity:
+    """
+    Authenticate a client from the Authorization header.
+    
+    Signed tokens are checked with one MAC verification and no user lookup.
+    Otherwise the credential is a client UUID, which must belong to a user.
+    Older clients append ':<client token>'; the suffix is ignored, since the
+    server stores no client tokens, so only the UUID authenticates.
+    """
     token = credentials.credentials
     
-    # Check if token is a valid UUID
+    signer = getattr(app.state, 'token_signer', None)
+    if signer is not None and is_signed_token(token):
+        try:
+            claims = signer.verify(token)
+        except TokenError as e:
+            logger.limited(logging.WARNING, "invalid_signed_token", f"Rejected signed token: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token",
+            )
+        return ClientIdentity(claims['uid'], claims['sub'], claims)
+    
+    # Check if token is a valid UUID; anything after ':' is not checked
     try:
-        uuid_obj = uuid.UUID(token)
+        uuid_obj = uuid.UUID(token.split(':', 1)[0])
         token = str(uuid_obj)
     except ValueError:
-        logger.warning(f"Invalid UUID format in token: {token}")
+        # Arbitrary tokens would each get their own key, so all invalid tokens share one
+        logger.limited(logging.WARNING, "invalid_uuid", f"Invalid UUID format in token: {token}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid UUID format",
@@ -194,13 +258,13 @@ def validate_uuid(credentials: HTTPAuthorizationCredentials = Depends(token_auth
     # Check if UUID belongs to a valid user
     username = get_user_for_uuid(token)
     if not username:
-        logger.warning(f"Unknown UUID in request: {token}")
+        logger.limited(logging.WARNING, "unknown_uuid", f"Unknown UUID in request: {token}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Unknown UUID",
         )
     
-    return token
+    return ClientIdentity(token, username, None)
 
 def apply_rate_limit(endpoint: str, uuid_token: str):
     """Apply rate limiting for a specific endpoint and token."""
@@ -208,7 +272,8 @@ def apply_rate_limit(endpoint: str, uuid_token: str):
         return
         
     if rate_limiters[endpoint].is_rate_limited(uuid_token):
-        logger.warning(f"Rate limit exceeded for {endpoint} by {uuid_token}")
+        logger.limited(logging.WARNING, f"rate_limit:{endpoint}:{uuid_token}",
+                       f"Rate limit exceeded for {endpoint} by {uuid_token}")
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail=f"Rate limit exceeded for {endpoint}. Please try again later."
@@ -234,6 +299,8 @@ def reload_config(signum, frame):
         app.state.main_config = load_yaml_config(CONFIG_PATHS['main'], 'main')
         app.state.users_config = load_yaml_config(CONFIG_PATHS['users'], 'users')
         app.state.containers_config = load_yaml_config(CONFIG_PATHS['containers'], 'containers')
+        index_users()
+        setup_token_signer()
         
         # Update rate limiters
         if 'server' in app.state.main_config and 'rate_limits' in app.state.main_config['server']:
@@ -257,26 +324,26 @@ async def startup_event():
     logger.info("LSL server started")
 
 @app.get("/get_config")
-async def get_config(uuid_token: str = Depends(validate_uuid)):
+async def get_config(identity: ClientIdentity = Depends(authenticate)):
     """
-    Get the merged configuration for a user identified by UUID.
+    Get the merged configuration for a user identified by UUID or signed token.
     
-    Returns only the containers the user is allowed to access.
+    Returns only the containers the user is allowed to access. When signed
+    tokens are enabled, a new token is included if the client has none yet,
+    or its token expires soon or no longer matches the user's containers.
     """
     # Apply rate limiting
-    apply_rate_limit('get_config', uuid_token)
+    apply_rate_limit('get_config', identity.uuid)
     
-    # Get username for this UUID
-    username = get_user_for_uuid(uuid_token)
-    if not username:
+    # Get user data
+    users = app.state.users_config.get('users', {})
+    user_data = users.get(identity.username)
+    if user_data is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
-    
-    # Get user data
-    users = app.state.users_config.get('users', {})
-    user_data = users.get(username, {})
+    username = identity.username
     
     # Get allowed containers for this user
     allowed_containers = user_data.get('allowed_containers', [])
@@ -292,7 +359,7 @@ async def get_config(uuid_token: str = Depends(validate_uuid)):
     # Build the response
     config = {
         "username": username,
-        "uuid": uuid_token,
+        "uuid": identity.uuid,
         "containers": user_containers
     }
     
@@ -300,24 +367,29 @@ async def get_config(uuid_token: str = Depends(validate_uuid)):
     if 'metadata' in user_data:
         config['metadata'] = user_data['metadata']
     
-    logger.info(f"Config requested by {username} ({uuid_token})")
+    # Issue or refresh the client's signed token
+    signer = getattr(app.state, 'token_signer', None)
+    if signer is not None:
+        version = containers_version(allowed_containers, all_containers)
+        if identity.claims is None or signer.needs_refresh(identity.claims, version):
+            token, claims = signer.issue(username, identity.uuid, version)
+            config['token'] = {"value": token, "expires_at": claims['exp']}
+    
+    logger.info(f"Config requested by {username} ({identity.uuid})")
     return config
 
 @app.post("/ping")
-async def ping(uuid_token: str = Depends(validate_uuid)):
+async def ping(identity: ClientIdentity = Depends(authenticate)):
     """
-    Update last seen timestamp for a user identified by UUID.
+    Update last seen timestamp for a user identified by UUID or signed token.
     """
     # Apply rate limiting
-    apply_rate_limit('ping', uuid_token)
+    apply_rate_limit('ping', identity.uuid)
     
     # Update last seen timestamp
-    app.state.last_seen[uuid_token] = datetime.now()
-    
-    # Get username for logging
-    username = get_user_for_uuid(uuid_token)
+    app.state.last_seen[identity.uuid] = datetime.now()
     
-    logger.debug(f"Ping from {username} ({uuid_token})")
+    logger.limited(logging.DEBUG, f"ping:{identity.uuid}", f"Ping from {identity.username} ({identity.uuid})")
     return {"success": True}
 
 @app.get("/monitor")
@@ -354,7 +426,8 @@ async def monitor():
     return {
         "system": system_stats,
         "containers": containers,
-        "clients": clients
+        "clients": clients,
+        "logging": get_log_stats('lsl_server')
     }
 
 # Exception handler
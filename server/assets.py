@@ -0,0 +1,382 @@
+"""
+Static Asset Module
+
+This module builds and serves the web admin's static files, including:
+- Fingerprinted copies of every file ('css/styles.3f2a9c1b7d.css'), which
+  can be cached by browsers forever because a change produces a new name
+- Precompressed gzip (and brotli, if the brotli package is installed)
+  variants, built once instead of on every request
+- A manifest mapping source paths to fingerprinted names, used by templates
+- An in-memory store serving the best variant for the client's
+  Accept-Encoding with immutable cache headers
+
+Assets can be built ahead of deployment with 'python -m server.assets <site dir>';
+otherwise the web admin builds changed files at startup.
+"""
+import os
+import sys
+import json
+import gzip
+import hashlib
+import argparse
+import mimetypes
+from typing import Dict, List, Optional, Tuple
+
+from shared.utils.yaml_logger import setup_logger
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Initialize logger
+logger = setup_logger("assets", "logs/web_admin.log", queued=True)
+
+# Format version of the manifest
+MANIFEST_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+# Files with these extensions get compressed variants
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".map", ".svg", ".html", ".json", ".txt"}
+
+# Smaller files are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+# Cache headers for fingerprinted and plain file names
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Content-Encoding names of the variants, in order of preference
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def fingerprint_name(path: str, digest: str) -> str:
+    """
+    Insert a content digest into a file name
+
+    Args:
+        path: Source path relative to the static directory
+        digest: Hex content digest
+
+    Returns:
+        Fingerprinted path, e.g. 'css/styles.3f2a9c1b7d.css'
+    """
+    root, extension = os.path.splitext(path)
+    return f"{root}.{digest[:10]}{extension}"
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """
+    Compress data at the highest level; done once per build, not per request
+
+    Args:
+        data: Data to compress
+        encoding: 'gzip' or 'br'
+
+    Returns:
+        Compressed data
+    """
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    # A fixed mtime keeps builds reproducible
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def available_encodings() -> List[str]:
+    """
+    Get the encodings assets can be compressed with
+
+    Returns:
+        Content-Encoding names, most preferred first
+    """
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """
+    Pick the preferred encoding the client accepts
+
+    Args:
+        accept_encoding: Accept-Encoding request header
+        encodings: Available encodings, most preferred first
+
+    Returns:
+        Encoding to use, or None for the uncompressed file
+    """
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for encoding in encodings:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def load_manifest(build_dir: str) -> Dict[str, Dict]:
+    """
+    Load the manifest of a build
+
+    Args:
+        build_dir: Build output directory
+
+    Returns:
+        Assets by source path, empty if there is no usable manifest
+    """
+    try:
+        with open(os.path.join(build_dir, MANIFEST_NAME), "r") as f:
+            data = json.load(f)
+    except (IOError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("assets", {})
+
+
+def build_assets(source_dir: str, build_dir: str) -> Dict[str, Dict]:
+    """
+    Build fingerprinted and precompressed assets
+
+    Files whose content did not change since the last build are skipped.
+    Files of the previous build stay, so pages still cached by browsers can
+    load them; older files are removed.
+
+    Args:
+        source_dir: Static source directory
+        build_dir: Build output directory
+
+    Returns:
+        Assets by source path: {"path": fingerprinted path, "digest": ..., "encodings": [...]}
+    """
+    os.makedirs(build_dir, exist_ok=True)
+    previous = load_manifest(build_dir)
+    encodings = available_encodings()
+    assets: Dict[str, Dict] = {}
+    built = 0
+
+    for directory, _, files in os.walk(source_dir):
+        for file_name in sorted(files):
+            source_path = os.path.join(directory, file_name)
+            path = os.path.relpath(source_path, source_dir).replace(os.sep, "/")
+            with open(source_path, "rb") as f:
+                data = f.read()
+            digest = hashlib.sha256(data).hexdigest()
+            target = fingerprint_name(path, digest)
+
+            entry = previous.get(path)
+            if (entry and entry.get("digest") == digest and set(entry.get("encodings", [])) <= set(encodings)
+                    and os.path.exists(os.path.join(build_dir, target))):
+                assets[path] = entry
+                continue
+
+            target_path = os.path.join(build_dir, target)
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            _write_file(target_path, data)
+            variants = []
+            if os.path.splitext(path)[1] in COMPRESSIBLE_EXTENSIONS and len(data) >= MIN_COMPRESS_SIZE:
+                for encoding in encodings:
+                    compressed = compress(data, encoding)
+                    # Variants that don't save anything are not worth a header
+                    if len(compressed) < len(data):
+                        _write_file(target_path + ENCODING_SUFFIXES[encoding], compressed)
+                        variants.append(encoding)
+            assets[path] = {"path": target, "digest": digest, "encodings": variants}
+            built += 1
+
+    _write_file(os.path.join(build_dir, MANIFEST_NAME),
+                json.dumps({"version": MANIFEST_VERSION, "assets": assets}, indent=1, sort_keys=True).encode())
+    _prune(build_dir, [assets, previous])
+    logger.info(f"Built {built} of {len(assets)} static assets into {build_dir}")
+    return assets
+
+
+def _write_file(path: str, data: bytes) -> None:
+    """
+    Write a file atomically
+
+    Args:
+        path: Target path
+        data: File content
+    """
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def _prune(build_dir: str, manifests: List[Dict[str, Dict]]) -> None:
+    """
+    Remove built files no manifest refers to
+
+    Args:
+        build_dir: Build output directory
+        manifests: Manifests whose files are kept
+    """
+    keep = {MANIFEST_NAME}
+    for assets in manifests:
+        for entry in assets.values():
+            keep.add(entry["path"])
+            keep.update(entry["path"] + ENCODING_SUFFIXES[encoding] for encoding in entry.get("encodings", []))
+    for directory, _, files in os.walk(build_dir):
+        for file_name in files:
+            path = os.path.relpath(os.path.join(directory, file_name), build_dir).replace(os.sep, "/")
+            if path not in keep:
+                os.unlink(os.path.join(directory, file_name))
+
+
+class Asset:
+    """Servable file with its precompressed variants"""
+
+    __slots__ = ("content_type", "etag", "cache_control", "variants")
+
+    def __init__(self, content_type: str, etag: str, cache_control: str, variants: Dict[Optional[str], bytes]):
+        """
+        Initialize the asset
+
+        Args:
+            content_type: Content-Type header
+            etag: Entity tag, quoted
+            cache_control: Cache-Control header
+            variants: File content by encoding; None is the uncompressed file
+        """
+        self.content_type = content_type
+        self.etag = etag
+        self.cache_control = cache_control
+        self.variants = variants
+
+    def select(self, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+        """
+        Pick the variant for a request
+
+        Args:
+            accept_encoding: Accept-Encoding request header
+
+        Returns:
+            Tuple of (encoding or None, content)
+        """
+        encoding = negotiate_encoding(accept_encoding, [e for e in ENCODING_SUFFIXES if e in self.variants])
+        return encoding, self.variants[encoding]
+
+
+class AssetStore:
+    """
+    Asset Store
+
+    Holds the built assets in memory, so serving one is a dictionary lookup.
+    Fingerprinted paths are cached as immutable; the plain source paths stay
+    available for anything that does not use asset_url, but must be
+    revalidated.
+    """
+
+    def __init__(self, source_dir: str, build_dir: str, url_prefix: str = "/static"):
+        """
+        Initialize the asset store
+
+        Args:
+            source_dir: Static source directory
+            build_dir: Build output directory
+            url_prefix: URL path the assets are served under
+        """
+        self.source_dir = source_dir
+        self.build_dir = build_dir
+        self.url_prefix = url_prefix.rstrip("/")
+        self.manifest: Dict[str, Dict] = {}
+        self._assets: Dict[str, Asset] = {}
+
+    def load(self) -> int:
+        """
+        Build changed assets and load them into memory
+
+        Returns:
+            Number of assets loaded
+            
+        Raises:
+            RuntimeError: If there is neither a source directory nor a build
+        """
+        if os.path.isdir(self.source_dir):
+            self.manifest = build_assets(self.source_dir, self.build_dir)
+        elif os.path.exists(os.path.join(self.build_dir, MANIFEST_NAME)):
+            # Deployments may ship only the build output
+            self.manifest = load_manifest(self.build_dir)
+        else:
+            raise RuntimeError(f"Directory '{self.source_dir}' does not exist and there is no asset build")
+
+        assets = {}
+        for path, entry in self.manifest.items():
+            target_path = os.path.join(self.build_dir, entry["path"])
+            variants: Dict[Optional[str], bytes] = {}
+            with open(target_path, "rb") as f:
+                variants[None] = f.read()
+            for encoding in entry.get("encodings", []):
+                with open(target_path + ENCODING_SUFFIXES[encoding], "rb") as f:
+                    variants[encoding] = f.read()
+            content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+            if content_type.startswith("text/") or content_type == "application/javascript":
+                content_type += "; charset=utf-8"
+            etag = f'"{entry["digest"][:16]}"'
+            assets[entry["path"]] = Asset(content_type, etag, IMMUTABLE_CACHE_CONTROL, variants)
+            assets[path] = Asset(content_type, etag, REVALIDATE_CACHE_CONTROL, variants)
+        self._assets = assets
+        return len(self.manifest)
+
+    def get(self, path: str) -> Optional[Asset]:
+        """
+        Get an asset
+
+        Args:
+            path: Fingerprinted or source path, relative to the URL prefix
+
+        Returns:
+            The asset, or None if there is none
+        """
+        return self._assets.get(path)
+
+    def url(self, path: str) -> str:
+        """
+        Get the URL of an asset; used as asset_url() in templates
+
+        Args:
+            path: Source path relative to the static directory
+
+        Returns:
+            URL of the fingerprinted file, or of the source path if it is unknown
+        """
+        entry = self.manifest.get(path)
+        return f"{self.url_prefix}/{entry['path'] if entry else path}"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Build the web admin assets ahead of deployment
+
+    Args:
+        argv: Command line arguments (default: sys.argv[1:])
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(description="Build fingerprinted, precompressed web admin assets")
+    parser.add_argument("site_dir", help="Site directory containing static/")
+    parser.add_argument("-o", "--output", help="Build directory (default: <site_dir>/build)")
+    args = parser.parse_args(argv)
+
+    source_dir = os.path.join(args.site_dir, "static")
+    if not os.path.isdir(source_dir):
+        print(f"No static directory in {args.site_dir}", file=sys.stderr)
+        return 1
+    build_dir = args.output or os.path.join(args.site_dir, "build")
+    assets = build_assets(source_dir, build_dir)
+    for path, entry in sorted(assets.items()):
+        print(f"{path} -> {entry['path']} {' '.join(entry['encodings'])}".rstrip())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
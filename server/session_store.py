@@ -0,0 +1,299 @@
+"""
+Session Store Module
+
+This module keeps the web admin's login sessions, including:
+- Compact session records with monotonic expiry times
+- An expiry heap swept by a background thread, so expired sessions are
+  removed even if nobody presents them again
+- A fixed maximum number of sessions; the session closest to expiring is
+  evicted when a new one does not fit
+- Optional persistence to a JSON file, so sessions survive restarts
+"""
+import os
+import json
+import time
+import heapq
+import secrets
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from shared.utils.yaml_logger import setup_logger
+
+# Initialize logger
+logger = setup_logger("session_store", "logs/web_admin.log", queued=True)
+
+# Format version of the persisted sessions
+SESSIONS_VERSION = 1
+
+
+class Session:
+    """Login session of one user"""
+
+    __slots__ = ("username", "created_at", "expires")
+
+    def __init__(self, username: str, created_at: float, expires: float):
+        """
+        Initialize the session
+
+        Args:
+            username: User the session belongs to
+            created_at: Wall-clock creation time (seconds since the epoch)
+            expires: Monotonic expiry time
+        """
+        self.username = username
+        self.created_at = created_at
+        self.expires = expires
+
+
+class SessionStore:
+    """
+    Session Store
+
+    Maps session IDs to sessions. Every session also has an entry in a heap
+    ordered by expiry; entries of deleted or replaced sessions stay in the
+    heap until they reach the top and are skipped, and the heap is rebuilt
+    when such entries outnumber the live sessions.
+    """
+
+    def __init__(self, ttl: float = 3600, max_sessions: int = 10000, persist_path: Optional[str] = None,
+                 sweep_interval: float = 30.0, clock=time.monotonic, wall_clock=time.time):
+        """
+        Initialize the session store
+
+        Args:
+            ttl: Session lifetime in seconds
+            max_sessions: Maximum number of live sessions
+            persist_path: JSON file sessions are saved to and loaded from (None keeps them in memory only)
+            sweep_interval: Seconds between background sweeps
+            clock: Monotonic time source for expiry
+            wall_clock: Wall-clock time source, for persistence and display
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.persist_path = persist_path
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.wall_clock = wall_clock
+
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Session] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        if persist_path:
+            self.load()
+
+    def create(self, username: str, ttl: Optional[float] = None) -> str:
+        """
+        Create a session
+
+        Args:
+            username: User the session belongs to
+            ttl: Session lifetime in seconds (default: the store's TTL)
+
+        Returns:
+            New session ID
+        """
+        session_id = secrets.token_urlsafe(32)
+        expires = self.clock() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._sweep_locked(self.clock())
+            while len(self._sessions) >= self.max_sessions and self._evict_locked():
+                pass
+            self._add_locked(session_id, Session(username, self.wall_clock(), expires))
+        return session_id
+
+    def _add_locked(self, session_id: str, session: Session) -> None:
+        """
+        Store a session; caller holds the lock
+
+        Args:
+            session_id: Session ID
+            session: Session record
+        """
+        self._sessions[session_id] = session
+        heapq.heappush(self._heap, (session.expires, session_id))
+        self._dirty = True
+
+    def _evict_locked(self) -> bool:
+        """
+        Remove the live session closest to expiring; caller holds the lock
+
+        Returns:
+            True if a session was removed
+        """
+        while self._heap:
+            expires, session_id = heapq.heappop(self._heap)
+            session = self._sessions.get(session_id)
+            if session is not None and session.expires == expires:
+                del self._sessions[session_id]
+                self._dirty = True
+                logger.info(f"Evicted session of '{session.username}': session limit reached")
+                return True
+        return False
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """
+        Get a live session
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            The session, or None if it does not exist or has expired
+        """
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if session.expires <= self.clock():
+                # Its heap entry is skipped when it reaches the top
+                del self._sessions[session_id]
+                self._dirty = True
+                return None
+            return session
+
+    def pop(self, session_id: str) -> Optional[Session]:
+        """
+        Remove a session
+
+        Args:
+            session_id: Session ID
+
+        Returns:
+            The removed session, or None if it did not exist
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._dirty = True
+            return session
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def sweep(self) -> int:
+        """
+        Remove expired sessions
+
+        Returns:
+            Number of sessions removed
+        """
+        with self._lock:
+            return self._sweep_locked(self.clock())
+
+    def _sweep_locked(self, now: float) -> int:
+        """
+        Pop expired heap entries and remove their sessions; caller holds the lock
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            Number of sessions removed
+        """
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires, session_id = heapq.heappop(self._heap)
+            session = self._sessions.get(session_id)
+            if session is not None and session.expires == expires:
+                del self._sessions[session_id]
+                removed += 1
+        if removed:
+            self._dirty = True
+        # Rebuild the heap once stale entries of deleted sessions dominate it
+        if len(self._heap) > 2 * len(self._sessions) + 64:
+            self._heap = [(session.expires, session_id) for session_id, session in self._sessions.items()]
+            heapq.heapify(self._heap)
+        return removed
+
+    def start(self) -> None:
+        """Start the background sweeper"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="LSLSessionSweeper")
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            removed = self.sweep()
+            if removed:
+                logger.debug(f"Swept {removed} expired sessions")
+            if self.persist_path:
+                self.save()
+
+    def stop(self) -> None:
+        """Stop the background sweeper and save the sessions"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if self.persist_path:
+            self.save()
+
+    def save(self) -> None:
+        """Save the live sessions if they changed; the file is readable by the owner only"""
+        with self._lock:
+            if not self._dirty or not self.persist_path:
+                return
+            now, wall_now = self.clock(), self.wall_clock()
+            # Monotonic times mean nothing after a restart, so store wall-clock expiry times
+            sessions = {
+                session_id: [session.username, session.created_at, wall_now + session.expires - now]
+                for session_id, session in self._sessions.items() if session.expires > now
+            }
+            self._dirty = False
+
+        temp_path = f"{self.persist_path}.{os.getpid()}.tmp"
+        try:
+            directory = os.path.dirname(os.path.abspath(self.persist_path))
+            os.makedirs(directory, exist_ok=True)
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump({"version": SESSIONS_VERSION, "sessions": sessions}, f, separators=(',', ':'))
+            os.replace(temp_path, self.persist_path)
+        except OSError as e:
+            logger.error(f"Could not save sessions to {self.persist_path}: {str(e)}")
+            with self._lock:
+                self._dirty = True
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    def load(self) -> int:
+        """
+        Load the saved sessions, skipping expired ones
+
+        Returns:
+            Number of sessions loaded
+        """
+        try:
+            with open(self.persist_path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (IOError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sessions file {self.persist_path}: {str(e)}")
+            return 0
+        if not isinstance(data, dict) or data.get("version") != SESSIONS_VERSION:
+            return 0
+
+        now, wall_now = self.clock(), self.wall_clock()
+        # Keep the sessions closest to expiring last, so the limit drops them first
+        saved = sorted(((entry[2], session_id, entry) for session_id, entry in data.get("sessions", {}).items()
+                        if isinstance(entry, list) and len(entry) == 3 and entry[2] > wall_now), reverse=True)
+        loaded = 0
+        with self._lock:
+            for wall_expires, session_id, (username, created_at, _) in saved[:self.max_sessions]:
+                self._add_locked(session_id, Session(username, created_at, now + wall_expires - wall_now))
+                loaded += 1
+            self._dirty = False
+        return loaded
@@ -5,56 +5,109 @@ This module implements the web-based admin interface for the LSL server,
 providing functionality for managing users, containers, and monitoring
 the system status.
 """
+import io
 import os
-import secrets
-from datetime import datetime, timedelta
+import gzip
+import asyncio
+import hashlib
 import json
-from typing import Dict, Any, Optional, List
+import logging
+import tempfile
+from typing import Callable, Dict, Any, Optional, List, Mapping, Tuple
 
 import yaml
 from fastapi import FastAPI, Request, HTTPException, Depends, status, Form, Cookie
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel
 import bcrypt
 
 from shared.config import load_yaml_config
+from shared.user_bulk import (
+    READERS, FORMATS, FORMAT_CSV, FORMAT_JSONL, FORMAT_YAML, CONFLICT_POLICIES, CONFLICT_ERROR,
+    import_users, export_users
+)
 from shared.utils.yaml_logger import setup_logger
 from shared.utils.uuid_hash import verify_password_hash
+from shared.utils.password_verifier import PasswordVerifier, VerifierBusyError
+from server.session_store import SessionStore
+from server.assets import AssetStore, REVALIDATE_CACHE_CONTROL, negotiate_encoding
+from server.admin_index import (
+    IndexedConfig, RecordIndex, build_user_index, build_container_index,
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SEARCH_PREFIX, SEARCH_SUBSTRING
+)
 
 # Initialize logger
-logger = setup_logger("web_admin", "logs/web_admin.log")
+logger = setup_logger("web_admin", "logs/web_admin.log", queued=True)
 
 # Path to main config file
 CONFIG_PATH = "config/main.yaml"
 
-# Session management
-SESSIONS: Dict[str, Dict[str, Any]] = {}
+# Users and containers listed by the admin UI; same variables as the API server
+USERS_CONFIG_PATH = os.environ.get("LSL_USERS_CONFIG", "config/users.yaml")
+CONTAINERS_CONFIG_PATH = os.environ.get("LSL_CONTAINERS_CONFIG", "config/containers.yaml")
+
+# Templates and static files; set LSL_ADMIN_ASSETS to keep built assets outside the site directory
+SITE_DIR = os.environ.get("LSL_ADMIN_SITE", "site")
+ASSET_BUILD_DIR = os.environ.get("LSL_ADMIN_ASSETS")
+
+# Uploaded import files are kept in memory up to this size, then spooled to disk
+IMPORT_SPOOL_SIZE = 8 * 1024 * 1024
+
+# Content types of bulk import and export formats
+BULK_MEDIA_TYPES = {FORMAT_CSV: "text/csv", FORMAT_JSONL: "application/x-ndjson", FORMAT_YAML: "application/yaml"}
+
+# Pages without per-user data, rendered once and served from memory
+CACHED_PAGES = ("login.html",)
+
+# Session management; set LSL_ADMIN_SESSIONS to a file path to keep sessions across restarts
 SESSION_COOKIE_NAME = "lsl_admin_session"
 SESSION_EXPIRY = 3600  # 1 hour in seconds
+SESSIONS = SessionStore(ttl=SESSION_EXPIRY, persist_path=os.environ.get("LSL_ADMIN_SESSIONS"))
+
+# Password checks run off the event loop, so login bursts don't stall other requests; repeated
+# logins of the same admin (one per browser or expired session) hit the verified-credential cache
+password_verifier = PasswordVerifier(verify_func=verify_password_hash)
 
 class WebAdmin:
     """Web Admin UI implementation"""
     
-    def __init__(self, app: FastAPI):
+    def __init__(self, app: FastAPI, site_dir: Optional[str] = None, build_dir: Optional[str] = None):
         """
         Initialize the Web Admin UI
         
         Args:
             app: FastAPI application to mount the admin UI to
+            site_dir: Directory with templates/ and static/ (default: LSL_ADMIN_SITE or 'site')
+            build_dir: Directory for built assets (default: LSL_ADMIN_ASSETS or <site_dir>/build)
         """
         self.app = app
+        site_dir = site_dir or SITE_DIR
+        
+        # Build fingerprinted, precompressed static files and keep them in memory
+        self.assets = AssetStore(os.path.join(site_dir, "static"),
+                                 build_dir or ASSET_BUILD_DIR or os.path.join(site_dir, "build"))
+        self.assets.load()
         
-        # Load templates
-        self.templates = Jinja2Templates(directory="site/templates")
+        # Compile templates once; they are not checked for changes on every render
+        self.templates = Jinja2Templates(directory=os.path.join(site_dir, "templates"))
+        self.templates.env.auto_reload = False
+        self.templates.env.globals["asset_url"] = self.assets.url
+        for name in self.templates.env.list_templates():
+            self.templates.env.get_template(name)
+        self._page_cache: Dict[str, Tuple[str, Dict[Optional[str], bytes]]] = {}
         
-        # Load static files
-        self.app.mount("/static", StaticFiles(directory="site/static"), name="static")
+        # In-memory indexes behind the user and container lists, rebuilt when the files change
+        self.user_index = IndexedConfig(USERS_CONFIG_PATH, "users", build_user_index)
+        self.container_index = IndexedConfig(CONTAINERS_CONFIG_PATH, "containers", build_container_index)
         
         # Setup routes
         self._setup_routes()
+
+        # Sweep expired sessions in the background; save them on shutdown
+        SESSIONS.start()
+        self.app.router.add_event_handler("shutdown", SESSIONS.stop)
         
     def _setup_routes(self):
         """Set up routes for the Web Admin UI"""
@@ -75,6 +128,70 @@ class WebAdmin:
         
         # Monitoring routes (protected)
         self.app.add_api_route("/admin/monitor", self.monitor, methods=["GET"], response_class=HTMLResponse)
+        
+        # JSON endpoints behind the user and container tables (protected)
+        self.app.add_api_route("/admin/api/users", self.api_users, methods=["GET"])
+        self.app.add_api_route("/admin/api/containers", self.api_containers, methods=["GET"])
+        
+        # Bulk user import and export (protected)
+        self.app.add_api_route("/admin/api/users/import", self.import_users, methods=["POST"])
+        self.app.add_api_route("/admin/api/users/export", self.export_users, methods=["GET"])
+        
+        # Static files
+        self.app.add_api_route("/static/{path:path}", self.static_file, methods=["GET", "HEAD"], name="static")
+        
+    async def static_file(self, request: Request, path: str):
+        """
+        Serve a static file from memory
+        
+        Args:
+            request: FastAPI request
+            path: File path below /static
+            
+        Returns:
+            Response with the best precompressed variant the client accepts
+        """
+        asset = self.assets.get(path)
+        if asset is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+        headers = {"Cache-Control": asset.cache_control, "ETag": asset.etag, "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == asset.etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        encoding, content = asset.select(request.headers.get("accept-encoding", ""))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(content))
+            content = b""
+        return Response(content=content, media_type=asset.content_type, headers=headers)
+        
+    def _cached_page(self, request: Request, name: str) -> Response:
+        """
+        Serve a page without per-user data from the render cache
+        
+        Args:
+            request: FastAPI request
+            name: Template name (one of CACHED_PAGES)
+            
+        Returns:
+            HTML response, or 304 if the client has the current page
+        """
+        cached = self._page_cache.get(name)
+        if cached is None:
+            body = self.templates.env.get_template(name).render(error=None).encode("utf-8")
+            etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+            cached = (etag, {None: body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)})
+            self._page_cache[name] = cached
+        
+        etag, variants = cached
+        headers = {"Cache-Control": REVALIDATE_CACHE_CONTROL, "ETag": etag, "Vary": "Accept-Encoding"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""), ["gzip"])
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        return HTMLResponse(content=variants[encoding], headers=headers)
             
     async def login_page(self, request: Request):
         """
@@ -91,10 +208,7 @@ class WebAdmin:
         if session_id and self._validate_session(session_id):
             return RedirectResponse(url="/admin/dashboard", status_code=303)
             
-        return self.templates.TemplateResponse(
-            "login.html",
-            {"request": request, "error": None}
-        )
+        return self._cached_page(request, "login.html")
         
     async def login_submit(self, 
                          username: str = Form(...),
@@ -111,7 +225,7 @@ class WebAdmin:
         """
         # Check credentials against main.yaml
         try:
-            config = load_yaml_config(CONFIG_PATH)
+            config = await asyncio.to_thread(load_yaml_config, CONFIG_PATH)
             if "admin" not in config:
                 logger.error("No admin section in config")
                 raise HTTPException(
@@ -136,7 +250,7 @@ class WebAdmin:
                 response = RedirectResponse(url="/admin/login", status_code=303)
                 return response
                 
-            if not verify_password_hash(password, stored_password_hash):
+            if not await password_verifier.verify_async(username, password, stored_password_hash):
                 logger.warning(f"Failed login attempt for user '{username}': Invalid password")
                 response = RedirectResponse(url="/admin/login", status_code=303)
                 return response
@@ -156,6 +270,10 @@ class WebAdmin:
             )
             return response
             
+        except VerifierBusyError:
+            logger.limited(logging.WARNING, "login_busy", "Login rejected: too many password checks pending")
+            response = RedirectResponse(url="/admin/login", status_code=303)
+            return response
         except Exception as e:
             logger.error(f"Error during login: {str(e)}")
             response = RedirectResponse(url="/admin/login", status_code=303)
@@ -172,10 +290,9 @@ class WebAdmin:
             Redirect to login page
         """
         session_id = request.cookies.get(SESSION_COOKIE_NAME)
-        if session_id and session_id in SESSIONS:
-            username = SESSIONS[session_id].get("username", "Unknown")
-            del SESSIONS[session_id]
-            logger.info(f"User '{username}' logged out")
+        session = SESSIONS.pop(session_id) if session_id else None
+        if session is not None:
+            logger.info(f"User '{session.username}' logged out")
             
         response = RedirectResponse(url="/admin/login", status_code=303)
         response.delete_cookie(key=SESSION_COOKIE_NAME)
@@ -191,16 +308,7 @@ class WebAdmin:
         Returns:
             Session ID
         """
-        session_id = secrets.token_urlsafe(32)
-        expiry = datetime.now() + timedelta(seconds=SESSION_EXPIRY)
-        
-        SESSIONS[session_id] = {
-            "username": username,
-            "created_at": datetime.now().isoformat(),
-            "expires_at": expiry.isoformat(),
-        }
-        
-        return session_id
+        return SESSIONS.create(username)
         
     def _validate_session(self, session_id: str) -> bool:
         """
@@ -212,18 +320,8 @@ class WebAdmin:
         Returns:
             True if session is valid, False otherwise
         """
-        if session_id not in SESSIONS:
-            return False
-            
-        session = SESSIONS[session_id]
-        expiry = datetime.fromisoformat(session["expires_at"])
-        
-        if datetime.now() > expiry:
-            # Session expired, remove it
-            del SESSIONS[session_id]
-            return False
-            
-        return True
+        # Expired sessions are removed on lookup
+        return SESSIONS.get(session_id) is not None
         
     async def _get_current_user(self, request: Request) -> Optional[str]:
         """
@@ -236,10 +334,8 @@ class WebAdmin:
             Username if session is valid, None otherwise
         """
         session_id = request.cookies.get(SESSION_COOKIE_NAME)
-        if not session_id or not self._validate_session(session_id):
-            return None
-            
-        return SESSIONS[session_id]["username"]
+        session = SESSIONS.get(session_id) if session_id else None
+        return session.username if session is not None else None
         
     async def _auth_required(self, request: Request) -> str:
         """
@@ -281,14 +377,209 @@ class WebAdmin:
         
         # Render dashboard template
         return self.templates.TemplateResponse(
+            request,
             "dashboard.html",
-            {"request": request, "username": username}
+            {"username": username}
+        )
+        
+    def _query_page(self, index: RecordIndex, params: Mapping[str, str], filter_params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Run a list query from request parameters
+        
+        Query parameters: q (search text), mode ('prefix' or 'substring'),
+        field (search only this field), sort, order ('asc' or 'desc'),
+        offset, limit and one parameter per entry of filter_params.
+        
+        Args:
+            index: Index to query
+            params: Query parameters
+            filter_params: Index filter field by query parameter name
+            
+        Returns:
+            Page dictionary with total, offset, limit (as clamped by the index) and items
+            
+        Raises:
+            ValueError: If a parameter is invalid
+        """
+        mode = params.get("mode", SEARCH_SUBSTRING)
+        if mode not in (SEARCH_PREFIX, SEARCH_SUBSTRING):
+            raise ValueError(f"Unknown search mode '{mode}'")
+        field = params.get("field")
+        if field and field not in index.search_fields:
+            raise ValueError(f"Cannot search by '{field}'")
+        # Clamped like RecordIndex.query does, so the page reports what it actually holds
+        offset = max(int(params.get("offset", 0)), 0)
+        limit = min(max(int(params.get("limit", DEFAULT_PAGE_SIZE)), 0), MAX_PAGE_SIZE)
+        filters = {field_name: params[name] for name, field_name in filter_params.items() if params.get(name)}
+        
+        total, items = index.query(
+            search=params.get("q", "").strip(),
+            mode=mode,
+            fields=[field] if field else None,
+            filters=filters,
+            sort=params.get("sort") or None,
+            descending=params.get("order") == "desc",
+            offset=offset,
+            limit=limit
+        )
+        return {"total": total, "offset": offset, "limit": limit, "items": items}
+        
+    async def _api_page(self, request: Request, indexed: IndexedConfig, filter_params: Dict[str, str]):
+        """
+        Serve one page of a list as JSON
+        
+        Args:
+            request: FastAPI request
+            indexed: Indexed configuration to query
+            filter_params: Index filter field by query parameter name
+            
+        Returns:
+            JSON response with the page, 401 if not logged in, 400 for invalid parameters
+        """
+        if not await self._get_current_user(request):
+            return JSONResponse({"detail": "Not authenticated"}, status_code=status.HTTP_401_UNAUTHORIZED)
+        try:
+            # Loading a changed file may take a while; the queries themselves are fast
+            index = await asyncio.to_thread(indexed.get)
+            return self._query_page(index, request.query_params, filter_params)
+        except ValueError as e:
+            return JSONResponse({"detail": str(e)}, status_code=status.HTTP_400_BAD_REQUEST)
+            
+    async def api_users(self, request: Request):
+        """
+        User list page as JSON
+        
+        Args:
+            request: FastAPI request; see _query_page for the parameters, plus role and container filters
+            
+        Returns:
+            JSON response with the page
+        """
+        return await self._api_page(request, self.user_index,
+                                    {"role": "role", "container": "allowed_containers"})
+        
+    async def import_users(self, request: Request):
+        """
+        Import users from the request body
+        
+        The body is spooled to a temporary file, then imported while the
+        progress is streamed back as JSON Lines: one 'chunk' event per chunk
+        of records and a final 'done' (or 'error') event.
+        
+        Args:
+            request: FastAPI request; query parameters format (csv, jsonl or yaml; default from the
+                content type), on_conflict (error, skip or update), dry_run and skip_invalid
+            
+        Returns:
+            Streaming JSON Lines response, 401 if not logged in, 400 for invalid parameters
+        """
+        username = await self._get_current_user(request)
+        if not username:
+            return JSONResponse({"detail": "Not authenticated"}, status_code=status.HTTP_401_UNAUTHORIZED)
+        
+        params = request.query_params
+        content_type = request.headers.get("content-type", "").split(";")[0].strip()
+        fmt = params.get("format") or {media_type: name for name, media_type in BULK_MEDIA_TYPES.items()}.get(content_type)
+        on_conflict = params.get("on_conflict", CONFLICT_ERROR)
+        if fmt not in READERS:
+            return JSONResponse({"detail": f"format must be one of {', '.join(FORMATS)}"},
+                                status_code=status.HTTP_400_BAD_REQUEST)
+        if on_conflict not in CONFLICT_POLICIES:
+            return JSONResponse({"detail": f"on_conflict must be one of {', '.join(CONFLICT_POLICIES)}"},
+                                status_code=status.HTTP_400_BAD_REQUEST)
+        dry_run = params.get("dry_run", "").lower() in ("1", "true", "yes")
+        skip_invalid = params.get("skip_invalid", "").lower() in ("1", "true", "yes")
+        
+        spool = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE)
+        async for data in request.stream():
+            spool.write(data)
+        spool.seek(0)
+        users_path = self.user_index.path
+        logger.info(f"User import by {username}: format={fmt}, on_conflict={on_conflict}, dry_run={dry_run}")
+        
+        def events():
+            # Runs in the thread pool; hashing and the final write don't block the event loop
+            text = io.TextIOWrapper(spool, encoding="utf-8-sig", newline="")
+            try:
+                for event in import_users(READERS[fmt](text), users_path, on_conflict=on_conflict,
+                                          dry_run=dry_run, skip_invalid=skip_invalid):
+                    if event["event"] == "done":
+                        logger.info(f"User import by {username} finished: {event}")
+                    yield json.dumps(event) + "\n"
+            except ValueError as e:
+                logger.warning(f"User import by {username} failed: {e}")
+                yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+            finally:
+                text.close()
+        
+        return StreamingResponse(events(), media_type=BULK_MEDIA_TYPES[FORMAT_JSONL])
+        
+    async def export_users(self, request: Request):
+        """
+        Export all users as a download
+        
+        Users are read from users.yaml and written to the response one at a time.
+        
+        Args:
+            request: FastAPI request; query parameters format (csv, jsonl or yaml; default jsonl)
+                and include_secrets
+            
+        Returns:
+            Streaming response, 401 if not logged in, 400 for an unknown format
+        """
+        username = await self._get_current_user(request)
+        if not username:
+            return JSONResponse({"detail": "Not authenticated"}, status_code=status.HTTP_401_UNAUTHORIZED)
+        fmt = request.query_params.get("format", FORMAT_JSONL)
+        if fmt not in FORMATS:
+            return JSONResponse({"detail": f"format must be one of {', '.join(FORMATS)}"},
+                                status_code=status.HTTP_400_BAD_REQUEST)
+        include_secrets = request.query_params.get("include_secrets", "").lower() in ("1", "true", "yes")
+        logger.info(f"User export by {username}: format={fmt}, include_secrets={include_secrets}")
+        
+        return StreamingResponse(
+            export_users(self.user_index.path, fmt, include_secrets),
+            media_type=BULK_MEDIA_TYPES[fmt],
+            headers={"Content-Disposition": f'attachment; filename="users.{fmt}"'}
         )
         
+    async def api_containers(self, request: Request):
+        """
+        Container list page as JSON
+        
+        Args:
+            request: FastAPI request; see _query_page for the parameters, plus an image filter
+            
+        Returns:
+            JSON response with the page
+        """
+        return await self._api_page(request, self.container_index, {"image": "image"})
+        
+    async def _load_index(self, indexed: IndexedConfig, builder: Callable[[Dict[str, Any]], RecordIndex]) -> Tuple[RecordIndex, Optional[str]]:
+        """
+        Load an index for a list page
+        
+        Args:
+            indexed: Indexed configuration to load
+            builder: Index builder, used for an empty index if the file cannot be loaded
+            
+        Returns:
+            Tuple of (index, error message or None); the index is empty on error
+        """
+        try:
+            # Loading a changed file may take a while
+            return await asyncio.to_thread(indexed.get), None
+        except ValueError as e:
+            logger.error(f"Cannot load {indexed.path}: {str(e)}")
+            return builder({}), f"Cannot load {os.path.basename(indexed.path)}: {str(e)}"
+        
     async def user_list(self, request: Request):
         """
         User list page
         
+        The first page of users is embedded in the page; the table loads
+        further rows from /admin/api/users as they are scrolled into view.
+        
         Args:
             request: FastAPI request
             
@@ -301,18 +592,27 @@ class WebAdmin:
         except HTTPException as e:
             return RedirectResponse(url="/admin/login", status_code=303)
         
-        # TODO: Load user list from users.yaml
-        users = []
+        index, error = await self._load_index(self.user_index, build_user_index)
+        try:
+            page = self._query_page(index, request.query_params, {"role": "role", "container": "allowed_containers"})
+        except ValueError:
+            page = self._query_page(index, {}, {})
         
         return self.templates.TemplateResponse(
+            request,
             "users.html",
-            {"request": request, "username": username, "users": users}
+            {"username": username, "users": page["items"], "page": page, "error": error,
+             "roles": index.facets("role"), "container_names": index.facets("allowed_containers")},
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR if error else status.HTTP_200_OK
         )
         
     async def container_list(self, request: Request):
         """
         Container list page
         
+        The first page of containers is embedded in the page; the table loads
+        further rows from /admin/api/containers as they are scrolled into view.
+        
         Args:
             request: FastAPI request
             
@@ -325,12 +625,17 @@ class WebAdmin:
         except HTTPException as e:
             return RedirectResponse(url="/admin/login", status_code=303)
         
-        # TODO: Load container list from containers.yaml
-        containers = []
+        index, error = await self._load_index(self.container_index, build_container_index)
+        try:
+            page = self._query_page(index, request.query_params, {"image": "image"})
+        except ValueError:
+            page = self._query_page(index, {}, {})
         
         return self.templates.TemplateResponse(
+            request,
             "containers.html",
-            {"request": request, "username": username, "containers": containers}
+            {"username": username, "containers": page["items"], "page": page, "error": error},
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR if error else status.HTTP_200_OK
         )
         
     async def monitor(self, request: Request):
@@ -352,6 +657,7 @@ class WebAdmin:
         # TODO: Load monitoring data
         
         return self.templates.TemplateResponse(
+            request,
             "monitor.html",
-            {"request": request, "username": username}
+            {"username": username}
         )
@@ -16,4 +16,10 @@ setup(
         "requests",
         "psutil",
     ],
+    entry_points={
+        "console_scripts": [
+            "lsl-logs=shared.utils.log_query:main",
+            "lsl-users=shared.user_bulk:main",
+        ],
+    },
 )
@@ -0,0 +1,600 @@
+"""
+Bulk user import and export for LSL.
+
+This module provides:
+- Streaming readers for CSV, JSON Lines and users.yaml files; records are
+  parsed one at a time, so input size does not matter
+- Normalization of flat records (e.g. SIS exports) into users.yaml entries,
+  generating missing UUIDs and hashing plain-text passwords on a thread
+  pool (PBKDF2 releases the GIL, so hashes are computed on all cores)
+- Validation against the 'users' schema in chunks
+- One locked read-modify-write of users.yaml for the whole import
+- Streaming writers for CSV, JSON Lines and YAML exports
+- The lsl-users command line tool
+"""
+import io
+import os
+import re
+import csv
+import sys
+import json
+import argparse
+import datetime
+from copy import deepcopy
+from itertools import islice, repeat
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+import yaml
+import jsonschema
+
+from .config import _atomic_yaml_update
+from .schemas.validator import load_schema
+from .utils.uuid_hash import generate_uuid, hash_password
+
+# Supported file formats
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+FORMAT_YAML = "yaml"
+FORMATS = (FORMAT_CSV, FORMAT_JSONL, FORMAT_YAML)
+
+# What to do with imported users that already exist
+CONFLICT_ERROR = "error"
+CONFLICT_SKIP = "skip"
+CONFLICT_UPDATE = "update"
+CONFLICT_POLICIES = (CONFLICT_ERROR, CONFLICT_SKIP, CONFLICT_UPDATE)
+
+# Records validated and hashed together
+DEFAULT_CHUNK_SIZE = 1000
+
+# Errors reported per chunk; the rest are only counted
+MAX_CHUNK_ERRORS = 100
+
+# Fields stored directly on a user; other flat fields go into metadata
+USER_FIELDS = ("uuid", "password_hash", "allowed_containers", "token", "last_seen", "resource_limits", "locked")
+METADATA_FIELDS = ("email", "role", "full_name", "notes")
+SECRET_FIELDS = ("password_hash", "token")
+
+# Columns of CSV exports, in order; metadata fields are flattened
+CSV_COLUMNS = ("username", "uuid", "email", "role", "full_name", "allowed_containers", "locked", "last_seen")
+
+USERNAME_PATTERN = re.compile(r"^[a-zA-Z0-9_-]+$")
+
+
+class RecordError(ValueError):
+    """Raised when an import record cannot be turned into a user"""
+
+
+def detect_format(path: str) -> Optional[str]:
+    """
+    Guess a file format from its extension.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        Optional[str]: FORMAT_CSV, FORMAT_JSONL, FORMAT_YAML or None
+    """
+    extension = os.path.splitext(path)[1].lower()
+    return {".csv": FORMAT_CSV, ".jsonl": FORMAT_JSONL, ".ndjson": FORMAT_JSONL,
+            ".yaml": FORMAT_YAML, ".yml": FORMAT_YAML}.get(extension)
+
+
+def read_csv(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Read records from CSV with a header row; empty cells are left out.
+
+    Args:
+        stream (TextIO): Text stream
+
+    Yields:
+        Dict[str, Any]: One record per row
+    """
+    for row in csv.DictReader(stream):
+        yield {key.strip(): value.strip() for key, value in row.items()
+               if key and value is not None and value.strip() != ""}
+
+
+def read_jsonl(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Read records from JSON Lines.
+
+    Args:
+        stream (TextIO): Text stream
+
+    Yields:
+        Dict[str, Any]: One record per non-empty line
+
+    Raises:
+        ValueError: If a line is not a JSON object
+    """
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON on line {number}: {e}")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number} is not a JSON object")
+        yield record
+
+
+def read_yaml(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    """
+    Read records from a users.yaml file, one user at a time.
+
+    The document is composed node by node instead of loaded at once, so
+    only the current user is in memory.
+
+    Args:
+        stream (TextIO): Text stream
+
+    Yields:
+        Dict[str, Any]: User entry with its name under 'username'
+
+    Raises:
+        ValueError: If the document is not a users.yaml mapping
+    """
+    loader = yaml.SafeLoader(stream)
+    try:
+        loader.anchors = {}
+        loader.get_event()  # Stream start
+        if loader.check_event(yaml.StreamEndEvent):
+            return
+        loader.get_event()  # Document start
+        if loader.check_event(yaml.ScalarEvent):
+            return  # Empty document
+        if not loader.check_event(yaml.MappingStartEvent):
+            raise ValueError("Expected a mapping with a 'users' key")
+        loader.get_event()
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = loader.construct_document(loader.compose_node(None, None))
+            if key != "users" or not loader.check_event(yaml.MappingStartEvent):
+                # Other sections, and an empty users section, hold no users
+                loader.compose_node(None, None)
+                continue
+            loader.get_event()
+            while not loader.check_event(yaml.MappingEndEvent):
+                username = loader.construct_document(loader.compose_node(None, None))
+                user_data = loader.construct_document(loader.compose_node(None, None)) or {}
+                if not isinstance(user_data, dict):
+                    raise ValueError(f"Entry of user '{username}' is not a mapping")
+                yield dict(user_data, username=username)
+            loader.get_event()
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML: {e}")
+    finally:
+        loader.dispose()
+
+
+READERS = {FORMAT_CSV: read_csv, FORMAT_JSONL: read_jsonl, FORMAT_YAML: read_yaml}
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("1", "true", "yes", "y"):
+        return True
+    if text in ("0", "false", "no", "n", ""):
+        return False
+    raise RecordError(f"Invalid boolean '{value}'")
+
+
+def _to_text(value: Any) -> Any:
+    # YAML loads unquoted timestamps as datetimes; the schema expects strings
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
+
+
+def normalize_record(record: Dict[str, Any], field_map: Optional[Dict[str, str]] = None
+                     ) -> Tuple[str, Dict[str, Any], Optional[str]]:
+    """
+    Turn an import record into a users.yaml entry.
+
+    Records may be flat (CSV columns, JSON keys) or shaped like users.yaml
+    entries. Plain-text passwords are returned for hashing; the UUID is left
+    out if the record has none. Fields that are not user fields are kept as
+    metadata. Whether the record needs credentials depends on whether it
+    updates an existing user, so that is left to the caller.
+
+    Args:
+        record (Dict[str, Any]): Import record
+        field_map (Optional[Dict[str, str]]): Renames record keys, e.g. {'Student ID': 'username'}
+
+    Returns:
+        Tuple[str, Dict[str, Any], Optional[str]]: (username, user entry, plain-text password or None)
+
+    Raises:
+        RecordError: If the record has no usable username or an invalid value
+    """
+    if field_map:
+        record = {field_map.get(key, key): value for key, value in record.items()}
+    record = dict(record)
+
+    username = str(record.pop("username", "") or "").strip()
+    if not username:
+        raise RecordError("Missing username")
+    if not USERNAME_PATTERN.match(username):
+        raise RecordError(f"Invalid username '{username}'")
+
+    password = record.pop("password", None)
+    user: Dict[str, Any] = {}
+    metadata = dict(record.pop("metadata", None) or {})
+    for key, value in record.items():
+        if key in USER_FIELDS:
+            user[key] = _to_text(value)
+        else:
+            metadata[key] = _to_text(value)
+
+    containers = user.get("allowed_containers")
+    if isinstance(containers, str):
+        user["allowed_containers"] = [name.strip() for name in re.split(r"[;,|]", containers) if name.strip()]
+    if "locked" in user:
+        user["locked"] = _to_bool(user["locked"])
+    if not user.get("uuid"):
+        user.pop("uuid", None)
+    if metadata:
+        user["metadata"] = metadata
+
+    if password is not None and "password_hash" in user:
+        raise RecordError("Both password and password_hash given")
+    return username, user, None if password is None else str(password)
+
+
+def _chunks(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _update_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Relax the 'users' schema for updates of existing users.
+
+    Updates are merged into the current entry, so they may leave out
+    required fields such as the password hash.
+
+    Args:
+        schema (Dict[str, Any]): The 'users' schema
+
+    Returns:
+        Dict[str, Any]: Copy of the schema without required user fields
+    """
+    schema = deepcopy(schema)
+    for user_schema in schema["properties"]["users"].get("patternProperties", {}).values():
+        user_schema.pop("required", None)
+    return schema
+
+
+def merge_user(current: Dict[str, Any], update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge an imported entry into an existing user.
+
+    Fields of the update replace the user's fields, except metadata, which
+    is merged key by key; fields the update leaves out are kept.
+
+    Args:
+        current (Dict[str, Any]): Existing users.yaml entry
+        update (Dict[str, Any]): Imported entry
+
+    Returns:
+        Dict[str, Any]: Merged entry
+    """
+    merged = dict(current, **update)
+    if "metadata" in update:
+        merged["metadata"] = dict(current.get("metadata") or {}, **update["metadata"])
+    return merged
+
+
+def _schema_errors(validator: jsonschema.Draft7Validator, users: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """
+    Validate users against the 'users' schema.
+
+    Args:
+        validator (jsonschema.Draft7Validator): Validator of the 'users' schema
+        users (Dict[str, Dict[str, Any]]): Users by name
+
+    Returns:
+        Dict[str, str]: First error message of each invalid user
+    """
+    errors: Dict[str, str] = {}
+    for error in validator.iter_errors({"users": users}):
+        path = list(error.path)
+        username = path[1] if len(path) > 1 else None
+        if username is not None and username not in errors:
+            field = ".".join(str(part) for part in path[2:])
+            errors[username] = f"{field}: {error.message}" if field else error.message
+    return errors
+
+
+def import_users(records: Iterable[Dict[str, Any]], users_file: str, on_conflict: str = CONFLICT_ERROR,
+                 dry_run: bool = False, skip_invalid: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 workers: Optional[int] = None, iterations: int = 100000,
+                 field_map: Optional[Dict[str, str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Import users, reporting progress as it goes.
+
+    Records are normalized, hashed and validated in chunks. Existing users
+    are looked up before hashing, so conflicting records are not hashed.
+    Updates are merged into the existing entries (see merge_user) and need
+    no password; updated users keep their UUID unless the record has one. Valid users
+    are written to users.yaml in one locked update at the end; if any record
+    is invalid nothing is written, unless skip_invalid is set.
+
+    Args:
+        records (Iterable[Dict[str, Any]]): Import records, e.g. from a reader in READERS
+        users_file (str): Path to users.yaml
+        on_conflict (str): CONFLICT_ERROR, CONFLICT_SKIP or CONFLICT_UPDATE for existing usernames
+        dry_run (bool): Validate only; write nothing
+        skip_invalid (bool): Import the valid users even if some records are invalid
+        chunk_size (int): Records per validation and hashing chunk
+        workers (Optional[int]): Password hashing threads (default: CPU count)
+        iterations (int): PBKDF2 iterations of new password hashes
+        field_map (Optional[Dict[str, str]]): Renames record keys before normalization
+
+    Yields:
+        Dict[str, Any]: {'event': 'chunk', ...} per chunk, then {'event': 'done', ...}
+
+    Raises:
+        ValueError: If on_conflict is unknown or the input cannot be parsed
+    """
+    if on_conflict not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy '{on_conflict}'")
+    schema = load_schema("users")
+    validator = jsonschema.Draft7Validator(schema)
+    update_validator = jsonschema.Draft7Validator(_update_schema(schema))
+    # Only names and UUIDs of existing users are kept, not their entries
+    existing = {record["username"]: record.get("uuid") for record in _read_users_file(users_file)}
+    uuids: Dict[str, str] = {uuid: username for username, uuid in existing.items() if uuid}
+    pending: Dict[str, Dict[str, Any]] = {}
+    total = invalid = skipped = 0
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        for number, chunk in enumerate(_chunks(records, chunk_size)):
+            errors: List[Dict[str, Any]] = []
+            users: Dict[str, Dict[str, Any]] = {}
+            passwords: List[Tuple[str, str]] = []
+            chunk_skipped = 0
+            for position, record in enumerate(chunk, total + 1):
+                try:
+                    username, user, password = normalize_record(record, field_map)
+                    if username in pending or username in users:
+                        raise RecordError(f"Duplicate username '{username}'")
+                    if username in existing:
+                        if on_conflict == CONFLICT_SKIP:
+                            chunk_skipped += 1
+                            continue
+                        if on_conflict == CONFLICT_ERROR:
+                            raise RecordError(f"User '{username}' already exists")
+                    elif password is None and "password_hash" not in user:
+                        raise RecordError("Missing password or password_hash")
+                    user.setdefault("uuid", existing.get(username) or generate_uuid())
+                    owner = uuids.get(user["uuid"])
+                    if owner is not None and owner != username:
+                        raise RecordError(f"UUID {user['uuid']} already used by '{owner}'")
+                except RecordError as e:
+                    errors.append({"record": position, "error": str(e)})
+                    continue
+                users[username] = user
+                uuids[user["uuid"]] = username
+                if password is not None:
+                    passwords.append((username, password))
+            total += len(chunk)
+
+            # Hashing dominates the import; spread it over the thread pool
+            hashes = executor.map(hash_password, [password for _, password in passwords], repeat(iterations))
+            for (username, _), password_hash in zip(passwords, hashes):
+                users[username]["password_hash"] = password_hash
+
+            updates = {username: user for username, user in users.items() if username in existing}
+            new_users = {username: user for username, user in users.items() if username not in existing}
+            schema_errors = _schema_errors(validator, new_users)
+            schema_errors.update(_schema_errors(update_validator, updates))
+            for username, message in schema_errors.items():
+                errors.append({"username": username, "error": message})
+                user = users.pop(username)
+                if existing.get(username) != user["uuid"]:
+                    uuids.pop(user["uuid"], None)
+
+            pending.update(users)
+            invalid += len(errors)
+            skipped += chunk_skipped
+            yield {"event": "chunk", "chunk": number, "records": len(chunk), "valid": len(users),
+                   "invalid": len(errors), "skipped": chunk_skipped, "errors": errors[:MAX_CHUNK_ERRORS]}
+
+    summary = {"event": "done", "records": total, "valid": len(pending), "invalid": invalid,
+               "created": 0, "updated": 0, "skipped": skipped, "committed": False}
+    if dry_run or not pending or (invalid and not skip_invalid):
+        yield summary
+        return
+
+    def update_config(config: Dict[str, Any]) -> Dict[str, Any]:
+        # Checked again under the lock, in case users.yaml changed during the import
+        current = config.get("users") or {}
+        taken = {user_data.get("uuid"): username for username, user_data in current.items()}
+        created = updated = late_skipped = 0
+        for username, user in pending.items():
+            owner = taken.get(user["uuid"])
+            if owner is not None and owner != username:
+                raise ValueError(f"UUID {user['uuid']} of '{username}' is already used by '{owner}'")
+            if username not in current:
+                if "password_hash" not in user:
+                    raise ValueError(f"User '{username}' was removed during the import")
+                created += 1
+                current[username] = user
+            elif on_conflict == CONFLICT_SKIP:
+                late_skipped += 1
+            elif on_conflict == CONFLICT_UPDATE:
+                updated += 1
+                current[username] = merge_user(current[username], user)
+            else:
+                raise ValueError(f"User '{username}' already exists")
+        config["users"] = current
+        summary.update(created=created, updated=updated, skipped=skipped + late_skipped)
+        return config
+
+    # Raising in update_config leaves the file unchanged
+    _atomic_yaml_update(users_file, "users", update_config)
+    summary["committed"] = True
+    yield summary
+
+
+def _read_users_file(users_file: str) -> Iterator[Dict[str, Any]]:
+    if not os.path.exists(users_file):
+        return
+    with open(users_file, "r") as stream:
+        yield from read_yaml(stream)
+
+
+def _export_record(record: Dict[str, Any], include_secrets: bool) -> Dict[str, Any]:
+    record = {key: _to_text(value) for key, value in record.items()}
+    if not include_secrets:
+        for field in SECRET_FIELDS:
+            record.pop(field, None)
+    return record
+
+
+def export_users(users_file: str, fmt: str = FORMAT_JSONL, include_secrets: bool = False) -> Iterator[str]:
+    """
+    Export users as a stream of text chunks.
+
+    users.yaml is read one user at a time and every user is written as soon
+    as it is read.
+
+    Args:
+        users_file (str): Path to users.yaml
+        fmt (str): FORMAT_CSV, FORMAT_JSONL or FORMAT_YAML
+        include_secrets (bool): Include password hashes and tokens
+
+    Yields:
+        str: Output text, one user per chunk (plus a header for CSV and YAML)
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'")
+    columns = CSV_COLUMNS + (SECRET_FIELDS if include_secrets else ())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if fmt == FORMAT_CSV:
+        writer.writerow(columns)
+        yield buffer.getvalue()
+    wrote_yaml_header = False
+
+    for record in _read_users_file(users_file):
+        record = _export_record(record, include_secrets)
+        if fmt == FORMAT_JSONL:
+            yield json.dumps(record, separators=(",", ":")) + "\n"
+        elif fmt == FORMAT_CSV:
+            flat = dict(record.pop("metadata", None) or {}, **record)
+            flat["allowed_containers"] = ";".join(flat.get("allowed_containers") or [])
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow(["" if flat.get(column) is None else flat[column] for column in columns])
+            yield buffer.getvalue()
+        else:
+            if not wrote_yaml_header:
+                wrote_yaml_header = True
+                yield "users:\n"
+            username = record.pop("username")
+            text = yaml.safe_dump({username: record}, default_flow_style=False, sort_keys=False)
+            yield "".join("  " + line for line in text.splitlines(True))
+    if fmt == FORMAT_YAML and not wrote_yaml_header:
+        yield "users: {}\n"
+
+
+def _parse_field_map(values: List[str]) -> Dict[str, str]:
+    field_map = {}
+    for value in values:
+        source, separator, target = value.rpartition("=")
+        if not separator or not source or not target:
+            raise argparse.ArgumentTypeError(f"Invalid mapping '{value}', expected 'column=field'")
+        field_map[source] = target
+    return field_map
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point of lsl-users.
+
+    Args:
+        argv (Optional[List[str]]): Command line arguments (default: sys.argv[1:])
+
+    Returns:
+        int: Exit code; 1 if records were invalid or nothing could be written
+    """
+    parser = argparse.ArgumentParser(prog="lsl-users", description="Bulk import and export of LSL users")
+    parser.add_argument("--users-file", default=os.environ.get("LSL_USERS_CONFIG", "config/users.yaml"),
+                        help="users.yaml to import into or export from")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    importer = commands.add_parser("import", help="Import users from CSV, JSON Lines or users.yaml")
+    importer.add_argument("file", help="Input file ('-' for standard input)")
+    importer.add_argument("--format", choices=FORMATS, help="Input format (default: from the file extension)")
+    importer.add_argument("--on-conflict", choices=CONFLICT_POLICIES, default=CONFLICT_ERROR,
+                          help="What to do with users that already exist")
+    importer.add_argument("--map", action="append", default=[], metavar="COLUMN=FIELD",
+                          help="Rename an input column, e.g. 'Student ID=username'")
+    importer.add_argument("--dry-run", action="store_true", help="Validate only")
+    importer.add_argument("--skip-invalid", action="store_true", help="Import valid users despite invalid records")
+    importer.add_argument("--workers", type=int, help="Password hashing threads (default: CPU count)")
+    importer.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Records per chunk")
+
+    exporter = commands.add_parser("export", help="Export users")
+    exporter.add_argument("-o", "--output", default="-", help="Output file ('-' for standard output)")
+    exporter.add_argument("--format", choices=FORMATS, help="Output format (default: from the file extension, or jsonl)")
+    exporter.add_argument("--include-secrets", action="store_true", help="Include password hashes and tokens")
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        fmt = args.format or detect_format(args.output) or FORMAT_JSONL
+        output = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+        try:
+            for text in export_users(args.users_file, fmt, args.include_secrets):
+                output.write(text)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        return 0
+
+    fmt = args.format or detect_format(args.file)
+    if fmt is None:
+        parser.error("cannot tell the input format; use --format")
+    try:
+        field_map = _parse_field_map(args.map)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    stream = sys.stdin if args.file == "-" else open(args.file, "r", newline="", encoding="utf-8-sig")
+    try:
+        summary: Dict[str, Any] = {}
+        for event in import_users(READERS[fmt](stream), args.users_file, on_conflict=args.on_conflict,
+                                  dry_run=args.dry_run, skip_invalid=args.skip_invalid,
+                                  chunk_size=args.chunk_size, workers=args.workers, field_map=field_map):
+            if event["event"] == "chunk":
+                for error in event["errors"]:
+                    where = f"record {error['record']}" if "record" in error else f"user '{error['username']}'"
+                    print(f"{where}: {error['error']}", file=sys.stderr)
+            else:
+                summary = event
+    except ValueError as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    print(f"{summary['records']} records, {summary['valid']} valid, {summary['invalid']} invalid; "
+          f"created {summary['created']}, updated {summary['updated']}, skipped {summary['skipped']}"
+          f"{'' if summary['committed'] else ' (nothing written)'}", file=sys.stderr)
+    return 0 if summary["invalid"] == 0 and (summary["committed"] or args.dry_run or not summary["valid"]) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
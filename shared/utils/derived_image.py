@@ -0,0 +1,138 @@
+"""
+Derived image utilities for LSL.
+
+This module provides functions for:
+- Hashing the setup steps (packages, commands) of a container template
+- Naming the derived image built from a base image digest and setup steps
+- Rendering the Dockerfile that bakes the setup steps into an image
+"""
+import re
+import json
+import shlex
+import hashlib
+
+# Repository of derived images
+DERIVED_REPOSITORY = "lsl-setup"
+
+# Labels set on derived images
+LABEL_SETUP_BASE = "lsl.setup.base"
+LABEL_SETUP_BASE_DIGEST = "lsl.setup.base_digest"
+LABEL_SETUP_HASH = "lsl.setup.hash"
+
+
+def normalize_setup(setup):
+    """
+    Normalize setup steps so equivalent definitions hash the same.
+
+    Package order does not matter; command order does.
+
+    Args:
+        setup (dict): Setup steps with optional 'packages' and 'commands' lists
+
+    Returns:
+        dict: Normalized setup steps
+    """
+    setup = setup or {}
+    return {
+        "packages": sorted(set(setup.get("packages") or [])),
+        "commands": list(setup.get("commands") or [])
+    }
+
+
+def has_setup_steps(setup):
+    """
+    Check if a setup definition contains any steps.
+
+    Args:
+        setup (dict): Setup steps
+
+    Returns:
+        bool: True if there is at least one package or command
+    """
+    normalized = normalize_setup(setup)
+    return bool(normalized["packages"] or normalized["commands"])
+
+
+def setup_hash(setup):
+    """
+    Hash setup steps.
+
+    Args:
+        setup (dict): Setup steps
+
+    Returns:
+        str: Hex digest identifying the steps
+    """
+    encoded = json.dumps(normalize_setup(setup), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def derived_image_tag(base_image, base_digest, setup):
+    """
+    Name the derived image of a base image and setup steps.
+
+    The tag is keyed by the base image digest and the setup hash, so a new
+    base image or changed steps produce a new image while unchanged ones
+    reuse the cached build.
+
+    Args:
+        base_image (str): Base image reference, e.g. 'ubuntu:22.04'
+        base_digest (str): Image ID or digest of the base image
+        setup (dict): Setup steps
+
+    Returns:
+        str: Image reference, e.g. 'lsl-setup/ubuntu-22.04:3f2a...'
+    """
+    name = re.sub(r'[^a-z0-9._-]+', '-', base_image.lower()).strip('-._') or "image"
+    key = hashlib.sha256(f"{base_digest}\n{setup_hash(setup)}".encode('utf-8')).hexdigest()
+    return f"{DERIVED_REPOSITORY}/{name}:{key[:16]}"
+
+
+def package_install_command(packages):
+    """
+    Build a shell command installing packages with the image's package manager.
+
+    Args:
+        packages (list): Package names
+
+    Returns:
+        str: Shell command supporting apt-get, apk, dnf and yum
+    """
+    names = " ".join(shlex.quote(package) for package in packages)
+    return (
+        "if command -v apt-get >/dev/null 2>&1; then "
+        f"apt-get update && DEBIAN_FRONTEND=noninteractive apt-get install -y --no-install-recommends {names} "
+        "&& rm -rf /var/lib/apt/lists/*; "
+        f"elif command -v apk >/dev/null 2>&1; then apk add --no-cache {names}; "
+        f"elif command -v dnf >/dev/null 2>&1; then dnf install -y {names} && dnf clean all; "
+        f"elif command -v yum >/dev/null 2>&1; then yum install -y {names} && yum clean all; "
+        "else echo 'No supported package manager found' >&2; exit 1; fi"
+    )
+
+
+def render_dockerfile(base_image, base_digest, setup):
+    """
+    Render the Dockerfile of a derived image.
+
+    Args:
+        base_image (str): Base image reference
+        base_digest (str): Image ID or digest of the base image
+        setup (dict): Setup steps
+
+    Returns:
+        str: Dockerfile contents
+    """
+    normalized = normalize_setup(setup)
+    lines = [
+        f"FROM {base_image}",
+        "LABEL " + " ".join(f"{key}={json.dumps(value)}" for key, value in (
+            (LABEL_SETUP_BASE, base_image),
+            (LABEL_SETUP_BASE_DIGEST, base_digest),
+            (LABEL_SETUP_HASH, setup_hash(setup)),
+        )),
+    ]
+    if normalized["packages"]:
+        lines.append(f"RUN {package_install_command(normalized['packages'])}")
+    for command in normalized["commands"]:
+        lines.append(f"RUN {command}")
+    return "\n".join(lines) + "\n"
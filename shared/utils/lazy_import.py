@@ -0,0 +1,64 @@
+"""
+Lazy import utility for LSL.
+
+This module provides a module proxy that defers importing heavy
+dependencies (docker, requests, yaml, asyncio) until they are first used,
+keeping CLI startup fast for commands that never touch them.
+"""
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """
+    Module proxy that imports the real module on first attribute access.
+
+    Attributes set on the proxy (e.g. by unittest.mock.patch) shadow the
+    attributes of the real module.
+    """
+
+    def __init__(self, name):
+        """
+        Initialize the proxy.
+
+        Args:
+            name (str): Fully qualified name of the module to import
+        """
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self):
+        """
+        Import the real module if needed.
+
+        Returns:
+            module: The imported module
+        """
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attribute):
+        return getattr(self._load(), attribute)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__['_lazy_module'] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name):
+    """
+    Get a module proxy that imports the module on first use.
+
+    Args:
+        name (str): Fully qualified module name
+
+    Returns:
+        LazyModule: Proxy for the module
+    """
+    return LazyModule(name)
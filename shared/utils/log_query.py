@@ -0,0 +1,497 @@
+"""
+Log query tool for LSL.
+
+This module searches JSON Lines log files written by setup_logger
+(log_format="jsonl"), including:
+- Memory-mapped scanning, one line at a time, without loading whole files
+- A sparse timestamp/offset index per log file and per rotation, stored next
+  to the file and extended as the file grows
+- Filtering by time range, level, logger and fields, rejecting most lines by
+  substring before any JSON is parsed
+- The `lsl-logs` command line
+
+Usage:
+    lsl-logs logs/server.log --since 1d --level WARNING --grep "Rate limit"
+    lsl-logs logs/server.log --since 2024-05-01T00:00 --until 2024-05-02T00:00 --field client=abc
+"""
+import os
+import re
+import sys
+import mmap
+import json
+import zlib
+import bisect
+import argparse
+import datetime
+
+# Format version of the index files
+INDEX_VERSION = 1
+
+# Suffix of index files, next to the log file
+INDEX_SUFFIX = ".idx"
+
+# Bytes between index entries
+DEFAULT_STRIDE = 64 * 1024
+
+# Bytes hashed to recognize a file after it was rotated or replaced
+HEAD_SIZE = 4096
+
+# Every JSON line written by JSONLinesFormatter starts with its timestamp
+_TIMESTAMP_PREFIX = b'{"timestamp":"'
+
+# Relative times, e.g. '30m', '12h', '7d'
+_RELATIVE_TIME = re.compile(r'^(\d+(?:\.\d+)?)([smhdw])$')
+_UNIT_SECONDS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+# Level names, lowest first
+LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL']
+
+
+def parse_time(value, now=None):
+    """
+    Parse a time filter into an ISO timestamp comparable with log timestamps.
+
+    Args:
+        value (str): ISO date/time, or a relative time before now such as '30m', '12h' or '7d'
+        now (datetime.datetime): Current time, for relative values
+
+    Returns:
+        str: ISO timestamp
+
+    Raises:
+        ValueError: If the value is not a time
+    """
+    match = _RELATIVE_TIME.match(value.strip())
+    if match:
+        now = now or datetime.datetime.now()
+        delta = datetime.timedelta(seconds=float(match.group(1)) * _UNIT_SECONDS[match.group(2)])
+        return (now - delta).isoformat()
+    return datetime.datetime.fromisoformat(value.strip()).isoformat()
+
+
+def line_timestamp(line):
+    """
+    Read the timestamp of a JSON log line without parsing the line.
+
+    Args:
+        line (bytes): One log line
+
+    Returns:
+        str: ISO timestamp, or None if the line has none
+    """
+    if line.startswith(_TIMESTAMP_PREFIX):
+        end = line.find(b'"', len(_TIMESTAMP_PREFIX))
+        if end > 0:
+            return line[len(_TIMESTAMP_PREFIX):end].decode('ascii', 'replace')
+    try:
+        timestamp = json.loads(line).get('timestamp')
+    except (ValueError, AttributeError):
+        return None
+    return timestamp if isinstance(timestamp, str) else None
+
+
+def rotated_files(path):
+    """
+    List a log file and its rotations, oldest first.
+
+    Args:
+        path (str): Path of the current log file
+
+    Returns:
+        list: Existing paths, e.g. ['server.log.2', 'server.log.1', 'server.log']
+    """
+    directory = os.path.dirname(path) or '.'
+    base = os.path.basename(path)
+    rotations = []
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        names = []
+    for name in names:
+        suffix = name[len(base) + 1:]
+        if name.startswith(base + '.') and suffix.isdigit():
+            rotations.append((int(suffix), os.path.join(directory, name)))
+    paths = [rotated for _, rotated in sorted(rotations, reverse=True)]
+    if os.path.exists(path):
+        paths.append(path)
+    return paths
+
+
+def _open_map(path):
+    """
+    Memory-map a file for reading.
+
+    Args:
+        path (str): File path
+
+    Returns:
+        tuple: (mmap, os.stat_result), or (None, stat) for an empty file
+    """
+    with open(path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        if stat.st_size == 0:
+            return None, stat
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), stat
+
+
+class LogIndex:
+    """
+    Sparse timestamp index of one log file.
+
+    Holds the timestamp and offset of about one line every `stride` bytes,
+    plus the first and last timestamp of the file. The index is saved as
+    `<log file>.idx` and recognizes its file by inode and a hash of its first
+    bytes, so it survives appends (and is extended) but is rebuilt once the
+    path holds a different file after a rotation.
+    """
+
+    def __init__(self, path, stride=DEFAULT_STRIDE):
+        """
+        Initialize the index.
+
+        Args:
+            path (str): Log file path
+            stride (int): Bytes between index entries
+        """
+        self.path = path
+        self.index_path = path + INDEX_SUFFIX
+        self.stride = stride
+        self.entries = []
+        self.first = None
+        self.last = None
+        self.size = 0
+
+    def _read(self):
+        """
+        Read the saved index.
+
+        Returns:
+            dict: Saved index, or None if there is none
+        """
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (IOError, ValueError):
+            return None
+        if not isinstance(index, dict) or index.get('version') != INDEX_VERSION or \
+                index.get('stride') != self.stride:
+            return None
+        return index
+
+    def _save(self, stat, head):
+        """
+        Atomically save the index; a failed write only costs a rebuild next time.
+
+        Args:
+            stat (os.stat_result): Stat of the indexed file
+            head (int): Hash of the file's first bytes
+        """
+        index = {
+            'version': INDEX_VERSION, 'stride': self.stride, 'inode': stat.st_ino, 'head': head,
+            'size': self.size, 'first': self.first, 'last': self.last, 'entries': self.entries
+        }
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(index, f, separators=(',', ':'))
+            os.replace(temp_path, self.index_path)
+        except (IOError, OSError):
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    def update(self, data=None, stat=None):
+        """
+        Load the saved index and index any lines appended since it was saved.
+
+        Args:
+            data (mmap.mmap): Mapped log file, mapped here if not given
+            stat (os.stat_result): Stat of the mapped file
+
+        Returns:
+            LogIndex: self
+        """
+        owned = data is None
+        if owned:
+            data, stat = _open_map(self.path)
+        try:
+            if data is None:
+                self.entries, self.first, self.last, self.size = [], None, None, 0
+                return self
+            saved = self._read()
+            # The hash covers the indexed bytes only, so appends to a small file keep its index
+            saved_size = saved.get('size', 0) if saved else 0
+            if saved and saved.get('inode') == stat.st_ino and saved_size <= len(data) and \
+                    saved.get('head') == zlib.crc32(data[:min(HEAD_SIZE, saved_size)]):
+                self.entries = [tuple(entry) for entry in saved.get('entries', [])]
+                self.first, self.last, self.size = saved.get('first'), saved.get('last'), saved['size']
+                if self.size == len(data):
+                    return self
+            else:
+                self.entries, self.first, self.last, self.size = [], None, None, 0
+            self._scan(data)
+            self._save(stat, zlib.crc32(data[:min(HEAD_SIZE, self.size)]))
+            return self
+        finally:
+            if owned and data is not None:
+                data.close()
+
+    def _scan(self, data):
+        """
+        Index the complete lines after the indexed size.
+
+        Args:
+            data (mmap.mmap): Mapped log file
+        """
+        position = self.size
+        next_entry = (self.entries[-1][1] + self.stride) if self.entries else position
+        end = len(data)
+        while position < end:
+            newline = data.find(b'\n', position)
+            if newline < 0:
+                # A partial last line is indexed once it is complete
+                break
+            if position >= next_entry or self.first is None:
+                timestamp = line_timestamp(data[position:newline])
+                if timestamp is not None:
+                    if position >= next_entry:
+                        self.entries.append((timestamp, position))
+                        next_entry = position + self.stride
+                    if self.first is None:
+                        self.first = timestamp
+            position = newline + 1
+        self.size = position
+        # The last timestamp, from the last complete line
+        line_end = position - 1
+        while line_end > 0:
+            line_start = data.rfind(b'\n', 0, line_end) + 1
+            timestamp = line_timestamp(data[line_start:line_end])
+            if timestamp is not None:
+                self.last = timestamp
+                break
+            line_end = line_start - 1
+
+    def start_offset(self, since):
+        """
+        Get an offset before the first line at or after a time.
+
+        Args:
+            since (str): ISO timestamp, or None for the start of the file
+
+        Returns:
+            int: Byte offset to start scanning from
+        """
+        if not since or not self.entries:
+            return 0
+        position = bisect.bisect_left([timestamp for timestamp, _ in self.entries], since)
+        return self.entries[position - 1][1] if position > 0 else 0
+
+
+class LogQuery:
+    """
+    Filters for log records.
+
+    Each filter is checked on the raw line first (the level, logger and field
+    values must appear in it), so most lines are rejected without parsing.
+    """
+
+    def __init__(self, since=None, until=None, level=None, loggers=None, fields=None, grep=None):
+        """
+        Initialize the query.
+
+        Args:
+            since (str): Earliest ISO timestamp
+            until (str): Latest ISO timestamp
+            level (str): Minimum level name
+            loggers (list): Logger names to include
+            fields (dict): Field name (dotted for nested fields) -> required value
+            grep (str): Text the message must contain
+        """
+        self.since = since
+        self.until = until
+        self.levels = None
+        if level:
+            level = level.upper()
+            if level not in LEVELS:
+                raise ValueError(f"Unknown level: {level}")
+            self.levels = set(LEVELS[LEVELS.index(level):])
+        self.loggers = set(loggers) if loggers else None
+        self.fields = dict(fields or {})
+        self.grep = grep
+
+        self._level_needles = [json.dumps(name).encode() for name in self.levels] if self.levels else None
+        self._logger_needles = [json.dumps(name).encode() for name in self.loggers] if self.loggers else None
+        self._needles = [json.dumps(str(value), ensure_ascii=False)[1:-1].encode() for value in self.fields.values()]
+        if grep:
+            self._needles.append(json.dumps(grep, ensure_ascii=False)[1:-1].encode())
+
+    def prefilter(self, line):
+        """
+        Cheaply reject a raw line that cannot match.
+
+        Args:
+            line (bytes): One log line
+
+        Returns:
+            bool: False if the line cannot match
+        """
+        if self._level_needles and not any(needle in line for needle in self._level_needles):
+            return False
+        if self._logger_needles and not any(needle in line for needle in self._logger_needles):
+            return False
+        return all(needle in line for needle in self._needles)
+
+    def matches(self, record):
+        """
+        Check a parsed record against every filter.
+
+        Args:
+            record (dict): Log record
+
+        Returns:
+            bool: True if the record matches
+        """
+        timestamp = record.get('timestamp') or ''
+        if self.since and timestamp < self.since:
+            return False
+        if self.until and timestamp > self.until:
+            return False
+        if self.levels and record.get('level') not in self.levels:
+            return False
+        if self.loggers and record.get('logger') not in self.loggers:
+            return False
+        if self.grep and self.grep not in str(record.get('message', '')):
+            return False
+        for name, expected in self.fields.items():
+            value = record
+            for part in name.split('.'):
+                value = value.get(part) if isinstance(value, dict) else None
+            if value is None or str(value) != str(expected):
+                return False
+        return True
+
+
+def query_file(path, query, stride=DEFAULT_STRIDE):
+    """
+    Stream the matching records of one log file.
+
+    Records are assumed to be written in time order, as setup_logger does,
+    so scanning starts at the index entry before `since` and stops at the
+    first record after `until`.
+
+    Args:
+        path (str): Log file path
+        query (LogQuery): Filters
+        stride (int): Bytes between index entries
+
+    Yields:
+        dict: Matching records
+    """
+    data, stat = _open_map(path)
+    if data is None:
+        return
+    try:
+        index = LogIndex(path, stride).update(data, stat)
+        if (query.since and index.last and index.last < query.since) or \
+                (query.until and index.first and index.first > query.until):
+            return
+
+        position = index.start_offset(query.since)
+        end = len(data)
+        while position < end:
+            newline = data.find(b'\n', position)
+            if newline < 0:
+                newline = end
+            line = data[position:newline]
+            position = newline + 1
+
+            if query.since or query.until:
+                timestamp = line_timestamp(line)
+                if timestamp is not None:
+                    if query.until and timestamp > query.until:
+                        return
+                    if query.since and timestamp < query.since:
+                        continue
+            if not query.prefilter(line):
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and query.matches(record):
+                yield record
+    finally:
+        data.close()
+
+
+def query_logs(paths, query, stride=DEFAULT_STRIDE):
+    """
+    Stream the matching records of log files and all their rotations, oldest first.
+
+    Args:
+        paths (list): Current log file paths
+        query (LogQuery): Filters
+        stride (int): Bytes between index entries
+
+    Yields:
+        dict: Matching records
+    """
+    for path in paths:
+        for rotated in rotated_files(path):
+            yield from query_file(rotated, query, stride)
+
+
+def _parse_field(value):
+    """Parse a --field NAME=VALUE argument."""
+    name, separator, expected = value.partition('=')
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {value!r}")
+    return name, expected
+
+
+def main(argv=None):
+    """Run the `lsl-logs` command."""
+    parser = argparse.ArgumentParser(prog='lsl-logs', description='Search LSL JSON Lines log files')
+    parser.add_argument('paths', nargs='+', help='Log files (their rotations are searched too)')
+    parser.add_argument('--since', help="Earliest time: ISO date/time or relative ('30m', '12h', '7d')")
+    parser.add_argument('--until', help='Latest time: ISO date/time or relative')
+    parser.add_argument('--level', choices=LEVELS, type=str.upper, help='Minimum level')
+    parser.add_argument('--logger', action='append', help='Logger name (repeatable)')
+    parser.add_argument('--field', action='append', type=_parse_field, default=[],
+                        help='Required field value as NAME=VALUE, dotted for nested fields (repeatable)')
+    parser.add_argument('--grep', help='Text the message must contain')
+    parser.add_argument('-n', '--limit', type=int, help='Stop after this many records')
+    parser.add_argument('-c', '--count', action='store_true', help='Only print the number of matching records')
+    args = parser.parse_args(argv)
+
+    try:
+        query = LogQuery(
+            since=parse_time(args.since) if args.since else None,
+            until=parse_time(args.until) if args.until else None,
+            level=args.level,
+            loggers=args.logger,
+            fields=dict(args.field),
+            grep=args.grep
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    count = 0
+    try:
+        for record in query_logs(args.paths, query):
+            count += 1
+            if not args.count:
+                sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+            if args.limit and count >= args.limit:
+                break
+    except BrokenPipeError:
+        # Output piped into head or similar
+        return 0
+    if args.count:
+        print(count)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Password verifier for LSL.
+
+This module checks passwords without blocking the server's event loop:
+- PBKDF2 verification runs on a small, bounded worker pool
+- The number of checks waiting for a worker is capped, so a login burst is
+  rejected early instead of queueing without limit
+- Successful checks are remembered for a short time in memory, keyed by user
+  and a keyed fingerprint of the credential, so repeated checks of the same
+  credential skip PBKDF2
+
+The web admin login is the only caller: the client API authenticates by UUID
+or signed token and never checks a password.
+"""
+import os
+import hmac
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from shared.utils.uuid_hash import verify_password_hash
+
+
+class VerifierBusyError(RuntimeError):
+    """Raised when too many password checks are already waiting"""
+
+
+class PasswordVerifier:
+    """
+    Password Verifier
+
+    Runs password checks on a bounded thread pool (hashlib releases the GIL
+    while hashing) and caches verified (user, credential fingerprint) pairs.
+    Only successes are cached, and only in memory; the fingerprint is keyed
+    with a per-process secret, so cached entries reveal nothing about the
+    password.
+    """
+
+    def __init__(self, max_workers=2, max_pending=32, cache_ttl=300.0, cache_size=1024,
+                 verify_func=verify_password_hash):
+        """
+        Initialize the verifier.
+
+        Args:
+            max_workers (int): Threads hashing passwords
+            max_pending (int): Checks allowed to run or wait at once
+            cache_ttl (float): Seconds a verified credential is remembered (0 disables the cache)
+            cache_size (int): Maximum number of remembered credentials
+            verify_func (callable): Function (password, stored_hash) -> bool doing the actual check
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.verify_func = verify_func
+
+        self._secret = os.urandom(32)
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._pending = 0
+        self._executor = None
+        self.counters = {'verified': 0, 'rejected': 0, 'cache_hits': 0, 'busy': 0}
+
+    def _fingerprint(self, user, password, stored_hash):
+        """
+        Key a credential for the cache.
+
+        Args:
+            user (str): Username
+            password (str): Password being checked
+            stored_hash (str): Stored hash it is checked against
+
+        Returns:
+            tuple: (user, fingerprint)
+        """
+        message = f"{stored_hash}\0{password}".encode('utf-8')
+        return user, hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def _cached(self, key):
+        """
+        Check the cache for a verified credential.
+
+        Args:
+            key (tuple): Cache key
+
+        Returns:
+            bool: True if the credential was verified within the TTL
+        """
+        if not self.cache_ttl:
+            return False
+        with self._lock:
+            expires = self._cache.get(key)
+            if expires is None:
+                return False
+            if expires < time.monotonic():
+                del self._cache[key]
+                return False
+            self.counters['cache_hits'] += 1
+            return True
+
+    def _remember(self, key):
+        """
+        Cache a verified credential.
+
+        Args:
+            key (tuple): Cache key
+        """
+        if not self.cache_ttl:
+            return
+        with self._lock:
+            self._cache[key] = time.monotonic() + self.cache_ttl
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _check(self, key, password, stored_hash):
+        """
+        Run one check and record its result; runs on a worker thread.
+
+        Args:
+            key (tuple): Cache key
+            password (str): Password being checked
+            stored_hash (str): Stored hash
+
+        Returns:
+            bool: True if the password matches
+        """
+        verified = bool(self.verify_func(password, stored_hash))
+        with self._lock:
+            self.counters['verified' if verified else 'rejected'] += 1
+        if verified:
+            self._remember(key)
+        return verified
+
+    def verify(self, user, password, stored_hash):
+        """
+        Check a password in the calling thread, using the cache.
+
+        Args:
+            user (str): Username
+            password (str): Password being checked
+            stored_hash (str): Stored hash
+
+        Returns:
+            bool: True if the password matches
+        """
+        key = self._fingerprint(user, password, stored_hash)
+        if self._cached(key):
+            return True
+        return self._check(key, password, stored_hash)
+
+    async def verify_async(self, user, password, stored_hash):
+        """
+        Check a password on the worker pool, using the cache.
+
+        Args:
+            user (str): Username
+            password (str): Password being checked
+            stored_hash (str): Stored hash
+
+        Returns:
+            bool: True if the password matches
+
+        Raises:
+            VerifierBusyError: If max_pending checks are already running or waiting
+        """
+        key = self._fingerprint(user, password, stored_hash)
+        if self._cached(key):
+            return True
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.counters['busy'] += 1
+                raise VerifierBusyError(f"{self._pending} password checks already pending")
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix="LSLPasswordVerifier")
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._check, key, password, stored_hash)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def forget(self, user):
+        """
+        Drop every cached credential of a user, e.g. after a password change.
+
+        Args:
+            user (str): Username
+        """
+        with self._lock:
+            for key in [key for key in self._cache if key[0] == user]:
+                del self._cache[key]
+
+    def shutdown(self):
+        """Stop the worker pool and clear the cache."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._cache.clear()
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,243 @@
+"""
+Port allocator for LSL.
+
+This module hands out host ports for containers that publish a port (shared
+SSH sessions), including:
+- A registry of reserved ports shared between threads and LSL processes
+- Reconciling the registry with the ports Docker has actually published
+- Releasing ports when their containers exit
+- Allocation by scanning from a cursor shared between processes, without
+  probing or random retries
+"""
+import os
+import json
+import time
+import fcntl
+import threading
+from contextlib import contextmanager
+
+# Kinds of registry entries
+KIND_LSL = "lsl"        # Reserved by LSL for one of its containers
+KIND_DOCKER = "docker"  # Published by a container LSL did not start
+KIND_HOST = "host"      # Bound by a process outside Docker
+
+
+class PortAllocator:
+    """
+    Port Allocator
+
+    Keeps a registry of reserved host ports in a JSON file protected by a
+    file lock. Ports are handed out round-robin from a cursor stored in the
+    registry, so allocating usually checks a single port and nothing is
+    built per process; released ports come up again only after the rest of
+    the range.
+    """
+
+    def __init__(self, state_dir, start=10000, end=20000, grace=60.0, host_ttl=3600.0):
+        """
+        Initialize the port allocator.
+
+        Args:
+            state_dir (str): Directory holding the registry and its lock file
+            start (int): First port of the range
+            end (int): Last port of the range
+            grace (float): Seconds a new reservation is kept before Docker must have published it
+            host_ttl (float): Seconds a port found bound outside Docker is skipped
+        """
+        self.state_dir = state_dir
+        self.state_file = os.path.join(state_dir, "ports.json")
+        self.lock_file = os.path.join(state_dir, "ports.lock")
+        self.start = start
+        self.end = end
+        self.grace = grace
+        self.host_ttl = host_ttl
+
+        self._thread_lock = threading.RLock()
+
+    @contextmanager
+    def _locked(self):
+        """
+        Hold the registry lock and yield the registry, saving it if it changed.
+
+        Yields:
+            dict: Registry state with 'cursor' (next port to try) and 'reserved' (port string -> entry)
+        """
+        with self._thread_lock:
+            os.makedirs(self.state_dir, exist_ok=True)
+            with open(self.lock_file, 'a') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    state = self._load_state()
+                    before = json.dumps(state, sort_keys=True)
+                    yield state
+                    if json.dumps(state, sort_keys=True) != before:
+                        self._save_state(state)
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load_state(self):
+        """
+        Load the registry.
+
+        Returns:
+            dict: Registry state
+        """
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+            if isinstance(state, dict) and isinstance(state.get("reserved"), dict):
+                return state
+        except (IOError, ValueError):
+            pass
+        return {"reserved": {}}
+
+    def _save_state(self, state):
+        """
+        Atomically save the registry.
+
+        Args:
+            state (dict): Registry state
+        """
+        temp_path = f"{self.state_file}.{os.getpid()}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(state, f, separators=(',', ':'))
+        os.replace(temp_path, self.state_file)
+
+    def _reserve(self, state, port, owner, kind):
+        """
+        Add a registry entry; caller holds the lock.
+
+        Args:
+            state (dict): Registry state
+            port (int): Host port
+            owner (str): Container name, or a description of the holder
+            kind (str): KIND_LSL, KIND_DOCKER or KIND_HOST
+        """
+        state["reserved"][str(port)] = {"owner": owner, "kind": kind, "since": time.time()}
+
+    def _release(self, state, port):
+        """
+        Remove a registry entry; caller holds the lock.
+
+        Args:
+            state (dict): Registry state
+            port (int): Host port
+
+        Returns:
+            bool: True if the port was reserved
+        """
+        return state["reserved"].pop(str(port), None) is not None
+
+    def allocate(self, owner):
+        """
+        Reserve a free port.
+
+        Args:
+            owner (str): Name of the container the port is for
+
+        Returns:
+            int: Reserved host port
+
+        Raises:
+            RuntimeError: If every port of the range is reserved
+        """
+        size = self.end - self.start + 1
+        with self._locked() as state:
+            cursor = state.get("cursor", self.start)
+            if not isinstance(cursor, int) or not self.start <= cursor <= self.end:
+                cursor = self.start
+            for step in range(size):
+                port = self.start + (cursor - self.start + step) % size
+                if str(port) not in state["reserved"]:
+                    state["cursor"] = port + 1 if port < self.end else self.start
+                    self._reserve(state, port, owner, KIND_LSL)
+                    return port
+            raise RuntimeError(f"No free ports in {self.start}-{self.end}")
+
+    def release(self, port):
+        """
+        Release a reserved port.
+
+        Args:
+            port (int): Host port
+
+        Returns:
+            bool: True if the port was reserved
+        """
+        with self._locked() as state:
+            return self._release(state, port)
+
+    def release_owner(self, owner):
+        """
+        Release every port reserved for a container.
+
+        Args:
+            owner (str): Container name
+
+        Returns:
+            list: Released ports
+        """
+        with self._locked() as state:
+            ports = [int(port) for port, entry in state["reserved"].items() if entry.get("owner") == owner]
+            for port in ports:
+                self._release(state, port)
+            return ports
+
+    def mark_unavailable(self, port, owner="host"):
+        """
+        Record that a port is bound outside Docker, so it is skipped for a while.
+
+        Args:
+            port (int): Host port
+            owner (str): Description of the holder
+        """
+        with self._locked() as state:
+            self._reserve(state, port, owner, KIND_HOST)
+
+    def reconcile(self, published):
+        """
+        Bring the registry in line with the ports Docker has published.
+
+        LSL reservations whose container no longer publishes the port are
+        released once they are older than the grace period; ports published
+        by other containers are recorded so they are never handed out.
+
+        Args:
+            published (dict): Host port -> container name, e.g. from LocalEngine.published_ports
+
+        Returns:
+            dict: Number of ports 'released' and 'adopted'
+        """
+        released = adopted = 0
+        now = time.time()
+        with self._locked() as state:
+            for key, entry in list(state["reserved"].items()):
+                port = int(key)
+                holder = published.get(port)
+                if entry.get("kind") == KIND_HOST:
+                    expired = now - entry.get("since", 0) > self.host_ttl
+                elif entry.get("kind") == KIND_LSL:
+                    expired = holder != entry.get("owner") and now - entry.get("since", 0) > self.grace
+                else:
+                    expired = holder is None
+                if expired and holder is None:
+                    self._release(state, port)
+                    released += 1
+                elif holder is not None and holder != entry.get("owner"):
+                    self._reserve(state, port, holder, KIND_DOCKER)
+
+            for port, holder in published.items():
+                if self.start <= port <= self.end and str(port) not in state["reserved"]:
+                    self._reserve(state, port, holder, KIND_DOCKER)
+                    adopted += 1
+        return {"released": released, "adopted": adopted}
+
+    def reserved(self):
+        """
+        Get the current reservations.
+
+        Returns:
+            dict: Host port -> registry entry
+        """
+        with self._locked() as state:
+            return {int(port): dict(entry) for port, entry in state["reserved"].items()}
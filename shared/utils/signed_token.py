@@ -0,0 +1,228 @@
+"""
+Signed client tokens for LSL.
+
+This module issues and verifies stateless client tokens, including:
+- Compact tokens carrying the user, the client UUID, a version of the user's
+  allowed containers and an expiry time, signed with HMAC-SHA256
+- Key rotation: every token names the key that signed it, new tokens are
+  signed with the active key and older keys keep verifying until removed
+- Revocation through a small deny-list of token IDs
+
+A token looks like 'lsl1.<key id>.<payload>.<mac>', where payload and mac are
+unpadded base64url. Verifying one is a single MAC check; no user lookup.
+"""
+import hmac
+import time
+import json
+import base64
+import hashlib
+import secrets
+
+# Prefix and version of the token format
+TOKEN_PREFIX = "lsl1"
+
+# Default token lifetime in seconds
+DEFAULT_TTL = 24 * 3600
+
+# Tokens expiring within this many seconds are refreshed
+REFRESH_MARGIN = 3600
+
+# Shortest accepted signing secret, in bytes
+MIN_SECRET_LENGTH = 16
+
+
+class TokenError(ValueError):
+    """Raised when a token is malformed, forged, expired or revoked"""
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def is_signed_token(credential):
+    """
+    Check if a bearer credential is a signed token rather than a client UUID.
+
+    Args:
+        credential (str): Bearer credential
+
+    Returns:
+        bool: True for signed tokens
+    """
+    return credential.startswith(TOKEN_PREFIX + ".")
+
+
+def containers_version(allowed_containers, containers):
+    """
+    Fingerprint the containers a user may access.
+
+    Args:
+        allowed_containers (list): Container names the user is allowed
+        containers (dict): Container definitions by name
+
+    Returns:
+        str: Short hash that changes when the user's containers change
+    """
+    allowed = {name: containers.get(name) for name in sorted(allowed_containers or [])}
+    data = json.dumps(allowed, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()[:12]
+
+
+def parse_keys(value):
+    """
+    Parse signing keys from a 'kid:secret,kid:secret' string; the first key is active.
+
+    Args:
+        value (str): Key list, e.g. the LSL_TOKEN_KEYS environment variable
+
+    Returns:
+        list: (key id, secret bytes) pairs, in order
+
+    Raises:
+        ValueError: If an entry is malformed or a secret is too short
+    """
+    keys = []
+    for entry in (value or "").split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        kid, separator, secret = entry.partition(':')
+        if not separator or not kid or '.' in kid:
+            raise ValueError(f"Invalid token key entry for key id '{kid}'")
+        if len(secret.encode('utf-8')) < MIN_SECRET_LENGTH:
+            raise ValueError(f"Token key '{kid}' is shorter than {MIN_SECRET_LENGTH} bytes")
+        keys.append((kid, secret.encode('utf-8')))
+    return keys
+
+
+class TokenSigner:
+    """
+    Token Signer
+
+    Issues tokens with the active key and verifies tokens signed by any
+    configured key. Revoked token IDs are kept until the tokens would have
+    expired anyway, so the deny-list stays small.
+    """
+
+    def __init__(self, keys, ttl=DEFAULT_TTL, clock=time.time):
+        """
+        Initialize the signer.
+
+        Args:
+            keys (list): (key id, secret bytes) pairs; the first one signs new tokens
+            ttl (int): Token lifetime in seconds
+            clock (callable): Wall-clock time source
+
+        Raises:
+            ValueError: If no keys are given
+        """
+        if not keys:
+            raise ValueError("At least one token key is required")
+        self.active_kid = keys[0][0]
+        self.keys = dict(keys)
+        self.ttl = ttl
+        self.clock = clock
+        self._revoked = {}
+
+    def _mac(self, kid, signed_part):
+        return hmac.new(self.keys[kid], signed_part.encode('ascii'), hashlib.sha256).digest()
+
+    def issue(self, username, client_uuid, version, ttl=None):
+        """
+        Issue a token.
+
+        Args:
+            username (str): User the token authenticates
+            client_uuid (str): Client UUID the token was issued to
+            version (str): containers_version of the user at issue time
+            ttl (int): Lifetime in seconds (default: the signer's TTL)
+
+        Returns:
+            tuple: (token, claims)
+        """
+        claims = {
+            "sub": username,
+            "uid": client_uuid,
+            "cv": version,
+            "exp": int(self.clock()) + (self.ttl if ttl is None else ttl),
+            "jti": secrets.token_hex(8),
+        }
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode('utf-8'))
+        signed_part = f"{TOKEN_PREFIX}.{self.active_kid}.{payload}"
+        return f"{signed_part}.{_b64encode(self._mac(self.active_kid, signed_part))}", claims
+
+    def verify(self, token):
+        """
+        Verify a token.
+
+        Args:
+            token (str): Token to verify
+
+        Returns:
+            dict: Token claims (sub, uid, cv, exp, jti) plus the kid of the signing key
+
+        Raises:
+            TokenError: If the token is malformed, signed by an unknown key, forged, expired or revoked
+        """
+        parts = token.split('.')
+        if len(parts) != 4 or parts[0] != TOKEN_PREFIX:
+            raise TokenError("Malformed token")
+        _, kid, payload, mac = parts
+        if kid not in self.keys:
+            raise TokenError("Unknown token key")
+        try:
+            expected = _b64decode(mac)
+        except ValueError:
+            raise TokenError("Malformed token")
+        if not hmac.compare_digest(self._mac(kid, f"{TOKEN_PREFIX}.{kid}.{payload}"), expected):
+            raise TokenError("Invalid token signature")
+
+        # The payload is only parsed once the signature is known to be ours
+        claims = json.loads(_b64decode(payload))
+        if claims.get("exp", 0) <= self.clock():
+            raise TokenError("Token expired")
+        if claims.get("jti") in self._revoked:
+            raise TokenError("Token revoked")
+        claims["kid"] = kid
+        return claims
+
+    def needs_refresh(self, claims, version):
+        """
+        Check if a client should get a new token.
+
+        Args:
+            claims (dict): Claims of the token presented
+            version (str): Current containers_version of the user
+
+        Returns:
+            bool: True if the token expires soon, was signed by an old key or has an old containers version
+        """
+        return (claims.get("exp", 0) - self.clock() < min(REFRESH_MARGIN, self.ttl / 2)
+                or claims.get("kid") != self.active_kid
+                or claims.get("cv") != version)
+
+    def revoke(self, jti, expires=None):
+        """
+        Add a token ID to the deny-list.
+
+        Args:
+            jti (str): Token ID
+            expires (int): Expiry of the token (default: now plus the TTL)
+        """
+        now = self.clock()
+        # Entries of tokens that have expired anyway are dropped
+        self._revoked = {key: exp for key, exp in self._revoked.items() if exp > now}
+        self._revoked[jti] = expires if expires is not None else now + self.ttl
+
+    def revoked(self):
+        """
+        Get the deny-list.
+
+        Returns:
+            set: Revoked token IDs
+        """
+        return set(self._revoked)
@@ -7,6 +7,7 @@ This module provides functions for:
 - Verifying passwords against their hashed values
 """
 import uuid
+import hmac
 import hashlib
 import os
 import binascii
@@ -86,5 +87,21 @@ def verify_password(password, stored_hash):
     )
     computed_hash_hex = binascii.hexlify(hash_bytes).decode('ascii')
     
-    # Compare the computed hash with the stored hash
-    return computed_hash_hex == hash_hex
+    # Compare the computed hash with the stored hash in constant time
+    return hmac.compare_digest(computed_hash_hex.encode('ascii'), hash_hex.lower().encode('utf-8'))
+
+def verify_password_hash(password, stored_hash):
+    """
+    Verify a password against its stored hash, treating a malformed hash as a mismatch.
+    
+    Args:
+        password (str): The password to verify
+        stored_hash (str): The stored hash in the format 'algorithm$iterations$salt$hash'
+        
+    Returns:
+        bool: True if the password matches the hash, False otherwise
+    """
+    try:
+        return verify_password(password, stored_hash)
+    except (ValueError, binascii.Error):
+        return False
@@ -3,18 +3,101 @@ YAML logger utility for LSL.
 
 This module provides a YAML-formatted logger for both server and client
 components of LSL, with support for log rotation and structured logging.
+Loggers can optionally hand records to a bounded queue, so formatting and
+file writes happen in batches on a background thread instead of in the
+calling thread.
 """
 import os
 import sys
-import yaml
+import copy
+import json
+import time
+import queue
+import atexit
 import logging
 import logging.handlers
 import datetime
-from typing import Dict, Optional, Any, Union
+import threading
+from typing import Dict, List, Optional, Any, Union, Callable, Tuple
+from collections import OrderedDict
+
+from shared.utils.lazy_import import lazy_import
+
+yaml = lazy_import("yaml")
 
 # Dictionary to store loggers by name
 _loggers = {}
 
+# Log file formats
+LOG_FORMAT_YAML = "yaml"    # One YAML document per record
+LOG_FORMAT_JSONL = "jsonl"  # One JSON object per line
+
+# Background writers of queued loggers, by logger name
+_listeners = {}
+
+# Handlers of each log file, by absolute path: 'file', plus 'queue' and 'listener' once a
+# queued logger writes to it. Loggers sharing a file share these, so one handler rolls it over.
+_outputs: Dict[str, Dict[str, Any]] = {}
+_outputs_lock = threading.Lock()
+
+# Rate-limited loggers with suppressed messages, and the thread that summarizes their
+# windows soon after they end rather than on the next message for the key
+_summary_loggers = set()
+_summary_lock = threading.Lock()
+_summary_thread: Optional[threading.Thread] = None
+_summary_stop = threading.Event()
+
+# Seconds between checks for ended rate limit windows
+SUMMARY_INTERVAL = 1.0
+
+# Policies for a full log queue
+OVERFLOW_DROP_NEW = "drop_new"        # Drop the incoming record
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Drop the oldest queued record to make room
+OVERFLOW_BLOCK = "block"              # Wait for room, up to a timeout, then drop the record
+OVERFLOW_POLICIES = (OVERFLOW_DROP_NEW, OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK)
+
+def record_to_dict(record: logging.LogRecord) -> Dict[str, Any]:
+    """
+    Build the structured fields of a log record.
+    
+    Args:
+        record (logging.LogRecord): The log record
+        
+    Returns:
+        Dict[str, Any]: Log entry, starting with its timestamp
+    """
+    # Create a dictionary with standard log fields
+    log_dict = {
+        'timestamp': datetime.datetime.fromtimestamp(record.created).isoformat(),
+        'level': record.levelname,
+        'message': record.getMessage(),
+        'logger': record.name,
+    }
+    
+    # Add source location information
+    if record.pathname and record.lineno:
+        log_dict['source'] = {
+            'file': os.path.basename(record.pathname),
+            'line': record.lineno,
+            'function': record.funcName
+        }
+    
+    # Add exception info if present
+    if record.exc_info:
+        exception_type, exception_value, _ = record.exc_info
+        log_dict['exception'] = {
+            'type': exception_type.__name__,
+            'message': str(exception_value)
+        }
+        
+    # Add any extra attributes from the record
+    if hasattr(record, 'extra') and isinstance(record.extra, dict):
+        for key, value in record.extra.items():
+            if key not in log_dict:
+                log_dict[key] = value
+    return log_dict
+
+
 class YAMLFormatter(logging.Formatter):
     """
     Custom formatter that formats log messages as YAML documents.
@@ -34,45 +117,388 @@ class YAMLFormatter(logging.Formatter):
         Returns:
             str: YAML-formatted log entry
         """
-        # Create a dictionary with standard log fields
-        log_dict = {
-            'timestamp': datetime.datetime.fromtimestamp(record.created).isoformat(),
-            'level': record.levelname,
-            'message': record.getMessage(),
-            'logger': record.name,
-        }
-        
-        # Add source location information
-        if record.pathname and record.lineno:
-            log_dict['source'] = {
-                'file': os.path.basename(record.pathname),
-                'line': record.lineno,
-                'function': record.funcName
-            }
-        
-        # Add exception info if present
-        if record.exc_info:
-            exception_type, exception_value, _ = record.exc_info
-            log_dict['exception'] = {
-                'type': exception_type.__name__,
-                'message': str(exception_value)
-            }
-            
-        # Add any extra attributes from the record
-        if hasattr(record, 'extra') and isinstance(record.extra, dict):
-            for key, value in record.extra.items():
-                if key not in log_dict:
-                    log_dict[key] = value
-        
         # Convert to YAML and add document separator
-        yaml_text = yaml.dump(log_dict, default_flow_style=False, sort_keys=False)
+        yaml_text = yaml.dump(record_to_dict(record), default_flow_style=False, sort_keys=False)
         return '---\n' + yaml_text
 
 
+class JSONLinesFormatter(logging.Formatter):
+    """
+    Formatter that writes each log entry as one compact JSON object per line.
+    The timestamp is always the first key, so tools can read it without
+    parsing the line.
+    """
+
+    # Compact, non-sorting encoder; values JSON cannot represent are written as strings
+    _encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=str)
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Format a log record as a JSON line.
+        
+        Args:
+            record (logging.LogRecord): The log record to format
+            
+        Returns:
+            str: JSON-encoded log entry, without the newline
+        """
+        return self._encoder.encode(record_to_dict(record))
+
+
+# Formatter class of each log format
+LOG_FORMATTERS = {
+    LOG_FORMAT_YAML: YAMLFormatter,
+    LOG_FORMAT_JSONL: JSONLinesFormatter,
+}
+
+class DeferredRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler that creates its log directory and opens its file
+    on the first record, so importing a module with a logger touches no files.
+    """
+
+    def __init__(self, filename: str, **kwargs):
+        kwargs['delay'] = True
+        super().__init__(filename, **kwargs)
+
+    def _open(self):
+        log_dir = os.path.dirname(self.baseFilename)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        return super()._open()
+
+    def emit_batch(self, records: List[logging.LogRecord]) -> None:
+        """
+        Write several records with one write and one flush.
+
+        Args:
+            records (List[logging.LogRecord]): Records to write, in order
+        """
+        chunks = []
+        for record in records:
+            try:
+                chunks.append(self.format(record) + self.terminator)
+            except Exception:
+                self.handleError(record)
+        if not chunks:
+            return
+
+        self.acquire()
+        try:
+            pending, size = [], 0
+            for chunk in chunks:
+                if self.stream is None:
+                    self.stream = self._open()
+                # Roll over between records, as emit would, so no file grows beyond maxBytes
+                position = self.stream.tell() + size
+                if self.maxBytes > 0 and position and position + len(chunk) >= self.maxBytes:
+                    self.stream.write(''.join(pending))
+                    pending, size = [], 0
+                    self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                pending.append(chunk)
+                size += len(chunk)
+            self.stream.write(''.join(pending))
+            self.flush()
+        except Exception:
+            self.handleError(records[-1])
+        finally:
+            self.release()
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler with a bounded queue, an overflow policy and counters.
+
+    The calling thread only freezes the record's message and enqueues it; a
+    LogQueueListener formats and writes it later.
+    """
+
+    def __init__(self, max_size: int = 10000, overflow: str = OVERFLOW_DROP_NEW,
+                 block_timeout: float = 0.1):
+        """
+        Initialize the queue handler.
+
+        Args:
+            max_size (int): Maximum number of queued records
+            overflow (str): Policy for a full queue (one of OVERFLOW_POLICIES)
+            block_timeout (float): Seconds to wait for room with OVERFLOW_BLOCK
+
+        Raises:
+            ValueError: If the overflow policy is unknown
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        super().__init__(queue.Queue(max_size))
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self._counter_lock = threading.Lock()
+        self.counters = {'enqueued': 0, 'dropped': 0}
+
+    def _count(self, name: str) -> None:
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Freeze a record for another thread without formatting it.
+
+        Args:
+            record (logging.LogRecord): The log record
+
+        Returns:
+            logging.LogRecord: The record, with its message merged and traceback dropped
+        """
+        # Copy so other handlers still see the original record
+        record = copy.copy(record)
+        # Merge the arguments now, they may change after the call returns
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # The formatter only needs the exception type and message; the traceback pins frames
+            record.exc_info = (record.exc_info[0], record.exc_info[1], None)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """
+        Queue a record, applying the overflow policy when the queue is full.
+
+        Args:
+            record (logging.LogRecord): Prepared record
+        """
+        try:
+            if self.overflow == OVERFLOW_BLOCK:
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+            self._count('enqueued')
+            return
+        except queue.Full:
+            pass
+
+        if self.overflow == OVERFLOW_DROP_OLDEST:
+            try:
+                self.queue.get_nowait()
+                self._count('dropped')
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+                self._count('enqueued')
+                return
+            except queue.Full:
+                pass
+        self._count('dropped')
+
+
+class LogQueueListener:
+    """
+    Background thread that drains a LogQueueHandler's queue in batches and
+    passes each batch to the file handlers.
+    """
+
+    _sentinel = None
+
+    def __init__(self, queue_handler: LogQueueHandler, handlers: List[logging.Handler],
+                 batch_size: int = 256):
+        """
+        Initialize the listener.
+
+        Args:
+            queue_handler (LogQueueHandler): Handler whose queue is drained
+            handlers (List[logging.Handler]): Handlers that format and write the records
+            batch_size (int): Maximum number of records written at once
+        """
+        self.queue_handler = queue_handler
+        self.queue = queue_handler.queue
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.counters = {'written': 0, 'batches': 0}
+        self._thread: Optional[threading.Thread] = None
+
+    def running(self) -> bool:
+        """
+        Check whether the listener was started and not stopped.
+
+        Returns:
+            bool: True while records handed to the queue are written
+        """
+        return self._thread is not None
+
+    def start(self) -> None:
+        """Start the background thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True, name="LSLLogWriter")
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = self._sentinel in batch
+            records = [record for record in batch if record is not self._sentinel]
+            if records:
+                self._write(records)
+            for _ in batch:
+                self.queue.task_done()
+            if stop:
+                return
+
+    def _write(self, records: List[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            accepted = [record for record in records
+                        if record.levelno >= handler.level and handler.filter(record)]
+            if not accepted:
+                continue
+            if hasattr(handler, 'emit_batch'):
+                handler.emit_batch(accepted)
+            else:
+                for record in accepted:
+                    handler.handle(record)
+        self.counters['written'] += len(records)
+        self.counters['batches'] += 1
+
+    def flush(self) -> None:
+        """Wait until every queued record has been written."""
+        if self._thread is not None and self._thread.is_alive():
+            self.queue.join()
+
+    def stop(self) -> None:
+        """Write the queued records and stop the background thread."""
+        if self._thread is None:
+            return
+        if self._thread.is_alive():
+            # Wait for room rather than dropping the sentinel
+            self.queue.put(self._sentinel)
+            self._thread.join()
+        self._thread = None
+        for handler in self.handlers:
+            handler.close()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the queue counters.
+
+        Returns:
+            Dict[str, int]: Records enqueued, dropped, written, batches written and currently queued
+        """
+        stats = dict(self.queue_handler.counters)
+        stats.update(self.counters)
+        stats['queued'] = self.queue.qsize()
+        return stats
+
+
+class LogRateLimiter:
+    """
+    Per-key log rate limiter.
+
+    Each key gets a window of `period` seconds in which the first `limit`
+    messages pass; later ones are suppressed (optionally letting every Nth
+    through) and counted. When a window ends, its suppressed count is
+    reported once so a summary can be logged. The number of tracked keys is
+    bounded; the oldest windows are closed first.
+    """
+
+    def __init__(self, max_keys: int = 10000, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            max_keys (int): Maximum number of keys tracked at once
+            clock (Callable[[], float]): Monotonic time source
+        """
+        self.max_keys = max_keys
+        self.clock = clock
+        self._lock = threading.Lock()
+        # key -> [start, period, count, suppressed, level], oldest window first
+        self._windows: 'OrderedDict[str, list]' = OrderedDict()
+
+    def check(self, key: str, level: int, limit: int, period: float,
+              sample_every: int = 0) -> Tuple[bool, List[Tuple[str, int, int]]]:
+        """
+        Count a message and decide whether it is logged.
+
+        Args:
+            key (str): Key of similar messages
+            level (int): Level of the message
+            limit (int): Messages logged per key per window
+            period (float): Window length in seconds
+            sample_every (int): Also log every Nth message over the limit (0 to suppress all)
+
+        Returns:
+            Tuple[bool, List[Tuple[str, int, int]]]: Whether to log the message, and
+            (key, level, suppressed count) of each window closed with suppressed messages
+        """
+        now = self.clock()
+        closed = []
+        with self._lock:
+            # Windows are swept oldest first; the sweep stops at the first open window
+            while self._windows:
+                oldest_key, oldest = next(iter(self._windows.items()))
+                if now - oldest[0] < oldest[1] and len(self._windows) < self.max_keys:
+                    break
+                self._windows.popitem(last=False)
+                if oldest[3]:
+                    closed.append((oldest_key, oldest[4], oldest[3]))
+
+            window = self._windows.get(key)
+            if window is not None and now - window[0] >= period:
+                del self._windows[key]
+                if window[3]:
+                    closed.append((key, window[4], window[3]))
+                window = None
+            if window is None:
+                window = self._windows[key] = [now, period, 0, 0, level]
+
+            window[2] += 1
+            over = window[2] - limit
+            if over <= 0 or (sample_every and over % sample_every == 0):
+                return True, closed
+            window[3] += 1
+            return False, closed
+
+    def expire(self) -> List[Tuple[str, int, int]]:
+        """
+        Close every window whose period has ended.
+
+        Returns:
+            List[Tuple[str, int, int]]: (key, level, suppressed count) of closed windows with suppressed messages
+        """
+        now = self.clock()
+        closed = []
+        with self._lock:
+            for key in [key for key, window in self._windows.items() if now - window[0] >= window[1]]:
+                window = self._windows.pop(key)
+                if window[3]:
+                    closed.append((key, window[4], window[3]))
+        return closed
+
+    def drain(self) -> List[Tuple[str, int, int]]:
+        """
+        Close every window.
+
+        Returns:
+            List[Tuple[str, int, int]]: (key, level, suppressed count) of windows with suppressed messages
+        """
+        with self._lock:
+            closed = [(key, window[4], window[3]) for key, window in self._windows.items() if window[3]]
+            self._windows.clear()
+        return closed
+
+
 class YAMLLogger(logging.Logger):
     """
     Custom logger class that extends standard Logger to add extra context to logs.
     """
+
+    def __init__(self, name: str, level: int = logging.NOTSET):
+        super().__init__(name, level)
+        self.rate_limiter = LogRateLimiter()
     
     def _log(self, level, msg, args, exc_info=None, extra=None, stack_info=False, **kwargs):
         """
@@ -99,12 +525,97 @@ class YAMLLogger(logging.Logger):
                 
         super()._log(level, msg, args, exc_info, extra, stack_info)
 
+    def limited(self, level: int, key: str, msg: str, *args, limit: int = 10, period: float = 60.0,
+                sample_every: int = 0, **kwargs) -> bool:
+        """
+        Log a message at most `limit` times per key per `period` seconds.
+
+        Suppressed messages are summarized with one "Suppressed N similar
+        messages" record per key when its window ends, within about
+        SUMMARY_INTERVAL seconds even if the key logs nothing more.
+
+        Args:
+            level (int): The logging level
+            key (str): Key of similar messages, e.g. 'rate_limit:<client>'
+            msg (str): The log message
+            *args: Message formatting arguments
+            limit (int): Messages logged per key per window. Defaults to 10.
+            period (float): Window length in seconds. Defaults to 60.
+            sample_every (int): Also log every Nth message over the limit. Defaults to 0 (none).
+            **kwargs: Additional keyword arguments treated as extra context
+
+        Returns:
+            bool: True if the message was logged
+        """
+        if not self.isEnabledFor(level):
+            return False
+        allowed, closed = self.rate_limiter.check(key, level, limit, period, sample_every)
+        self._log_suppressed(closed)
+        if allowed:
+            self._log(level, msg, args, **kwargs)
+        else:
+            _watch_suppressed(self)
+        return allowed
+
+    def flush_suppressed(self) -> None:
+        """Log the summaries of every window with suppressed messages and reset the limiter."""
+        self._log_suppressed(self.rate_limiter.drain())
+
+    def _log_suppressed(self, closed: List[Tuple[str, int, int]]) -> None:
+        """
+        Log one summary per closed window.
+
+        Args:
+            closed (List[Tuple[str, int, int]]): (key, level, suppressed count) of closed windows
+        """
+        for key, level, suppressed in closed:
+            if self.isEnabledFor(level):
+                self._log(level, "Suppressed %d similar messages for %s", (suppressed, key),
+                          rate_key=key, suppressed=suppressed)
+
+
+def _watch_suppressed(logger: YAMLLogger) -> None:
+    """
+    Have the summary thread close a logger's ended windows, starting the thread if needed.
+
+    Args:
+        logger (YAMLLogger): Logger that suppressed a message
+    """
+    global _summary_thread
+    with _summary_lock:
+        _summary_loggers.add(logger)
+        if _summary_thread is None and not _summary_stop.is_set():
+            _summary_thread = threading.Thread(target=_summarize_periodically, daemon=True,
+                                               name="LSLLogSummaries")
+            _summary_thread.start()
+
+
+def flush_expired_summaries() -> None:
+    """Log the summaries of every rate limit window that has ended."""
+    with _summary_lock:
+        loggers = list(_summary_loggers)
+    for logger in loggers:
+        logger._log_suppressed(logger.rate_limiter.expire())
+
+
+def _summarize_periodically() -> None:
+    """Summary thread: flush ended windows every SUMMARY_INTERVAL seconds until shutdown."""
+    while not _summary_stop.wait(SUMMARY_INTERVAL):
+        flush_expired_summaries()
+
 
 def setup_logger(name: str, log_file: str, level: int = logging.DEBUG, 
-                 max_size: int = 10 * 1024 * 1024, backup_count: int = 5) -> logging.Logger:
+                 max_size: int = 10 * 1024 * 1024, backup_count: int = 5,
+                 queued: bool = False, queue_size: int = 10000,
+                 overflow: str = OVERFLOW_DROP_NEW, batch_size: int = 256,
+                 log_format: str = LOG_FORMAT_YAML) -> logging.Logger:
     """
     Set up a logger with YAML formatting and file rotation.
     
+    Loggers writing to the same file share one file handler, and queued ones
+    one queue and writer thread, so rollover happens in one place. The first
+    logger set up for a file decides its format, size and backup count.
+    
     Args:
         name (str): Name of the logger
         log_file (str): Path to the log file
@@ -112,10 +623,22 @@ def setup_logger(name: str, log_file: str, level: int = logging.DEBUG,
         max_size (int, optional): Maximum log file size before rotation in bytes. 
                                   Defaults to 10MB.
         backup_count (int, optional): Number of backup files to keep. Defaults to 5.
+        queued (bool, optional): Format and write records on a background thread. Defaults to False.
+        queue_size (int, optional): Maximum number of queued records. Defaults to 10000.
+        overflow (str, optional): Policy for a full queue (one of OVERFLOW_POLICIES).
+                                  Defaults to OVERFLOW_DROP_NEW.
+        batch_size (int, optional): Maximum number of records written at once. Defaults to 256.
+        log_format (str, optional): LOG_FORMAT_YAML or LOG_FORMAT_JSONL. Defaults to LOG_FORMAT_YAML.
         
     Returns:
         logging.Logger: Configured logger instance
+        
+    Raises:
+        ValueError: If the log format is unknown
     """
+    if log_format not in LOG_FORMATTERS:
+        raise ValueError(f"Unknown log format: {log_format}")
+
     # Register the custom logger class
     logging.setLoggerClass(YAMLLogger)
     
@@ -127,22 +650,30 @@ def setup_logger(name: str, log_file: str, level: int = logging.DEBUG,
     if logger.handlers:
         return logger
     
-    # Create log directory if it doesn't exist
-    log_dir = os.path.dirname(log_file)
-    if log_dir and not os.path.exists(log_dir):
-        os.makedirs(log_dir)
-    
-    # Create formatter
-    formatter = YAMLFormatter()
-    
-    # Create rotating file handler
-    file_handler = logging.handlers.RotatingFileHandler(
-        log_file,
-        maxBytes=max_size,
-        backupCount=backup_count
-    )
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    with _outputs_lock:
+        output = _outputs.setdefault(os.path.abspath(log_file), {})
+        file_handler = output.get('file')
+        if file_handler is None:
+            # Rotating file handler; the directory and file are created on the first record
+            file_handler = output['file'] = DeferredRotatingFileHandler(
+                log_file,
+                maxBytes=max_size,
+                backupCount=backup_count
+            )
+            file_handler.setFormatter(LOG_FORMATTERS[log_format]())
+
+        if queued:
+            listener = output.get('listener')
+            if listener is None or not listener.running():
+                # The calling thread only enqueues; the listener formats and writes in batches
+                queue_handler = LogQueueHandler(max_size=queue_size, overflow=overflow)
+                listener = output['listener'] = LogQueueListener(queue_handler, [file_handler],
+                                                                 batch_size=batch_size)
+                listener.start()
+            _listeners[name] = listener
+            logger.addHandler(listener.queue_handler)
+        else:
+            logger.addHandler(file_handler)
     
     # Store the logger for future reference
     _loggers[name] = logger
@@ -176,3 +707,34 @@ def get_logger(name: str, log_file: Optional[str] = None,
         return setup_logger(name, log_file, level)
     else:
         raise ValueError(f"Logger {name} not found and no log_file provided to create it")
+
+
+def get_log_stats(name: str) -> Optional[Dict[str, int]]:
+    """
+    Get the queue counters of a queued logger.
+
+    Args:
+        name (str): Name of the logger
+
+    Returns:
+        Optional[Dict[str, int]]: Counters, or None if the logger is not queued
+    """
+    listener = _listeners.get(name)
+    return listener.stats() if listener else None
+
+
+def flush_loggers() -> None:
+    """Wait until every queued logger has written its queued records."""
+    for listener in list(_listeners.values()):
+        listener.flush()
+
+
+@atexit.register
+def shutdown_loggers() -> None:
+    """Write the queued records of every queued logger and stop their threads."""
+    _summary_stop.set()
+    for logger in list(_loggers.values()):
+        if isinstance(logger, YAMLLogger):
+            logger.flush_suppressed()
+    for listener in list(_listeners.values()):
+        listener.stop()
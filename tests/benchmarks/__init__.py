@@ -0,0 +1,4 @@
+"""
+Client module initialization for tests
+"""
+# This file is required to make the directory a Python package
@@ -0,0 +1,29 @@
+"""
+Tests for the shared host flow benchmark
+"""
+import json
+
+from benchmarks.shared_host import STEPS, run, main
+
+class TestSharedHost:
+    """Test suite for the benchmark run against the fake Docker API"""
+
+    def test_fake_backend_reports_engine_steps(self):
+        """Test a short run against the fake Docker API"""
+        results = run(iterations=2, backend="fake")
+
+        assert results["backend"] == "fake"
+        assert "skipped" in results["variants"]["cli"]
+        steps = results["variants"]["engine"]
+        for step in STEPS + ["total"]:
+            assert steps[step]["count"] == 2
+            assert steps[step]["p50"] > 0
+        assert "speedup" not in results
+
+    def test_main_writes_results(self, tmp_path):
+        """Test JSON output"""
+        output = tmp_path / "results.json"
+        assert main(["-n", "1", "--backend", "fake", "-o", str(output)]) == 0
+
+        results = json.loads(output.read_text())
+        assert results["variants"]["engine"]["total"]["count"] == 1
@@ -0,0 +1,80 @@
+"""
+Tests for the start latency benchmark
+"""
+import json
+import pytest
+
+from benchmarks.start_latency import (
+    PHASES, percentile, summarize, compare_to_baseline, run, main
+)
+
+class TestStatistics:
+    """Test suite for percentile and summary helpers"""
+
+    def test_percentile_nearest_rank(self):
+        """Test nearest-rank percentiles"""
+        samples = [float(i) for i in range(1, 101)]
+        assert percentile(samples, 50) == 50.0
+        assert percentile(samples, 95) == 95.0
+        assert percentile(samples, 99) == 99.0
+        assert percentile([3.0], 99) == 3.0
+        assert percentile([], 50) == 0.0
+
+    def test_compare_to_baseline(self):
+        """Test that only phases slower than the tolerance are reported"""
+        baseline = {"targets": {"container_manager": {
+            "create": summarize([0.010] * 5),
+            "start": summarize([0.010] * 5)
+        }}}
+        results = {"targets": {"container_manager": {
+            "create": summarize([0.011] * 5),
+            "start": summarize([0.020] * 5),
+            "skipped": "n/a"
+        }}}
+
+        regressions = compare_to_baseline(results, baseline, tolerance=0.25)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("container_manager.start p95")
+
+class TestStartLatency:
+    """Test suite for the benchmark run against the fake Docker API"""
+
+    def test_fake_backend_reports_every_phase(self):
+        """Test a short run against the fake Docker API"""
+        results = run(iterations=2, backend="fake", targets=["container_manager"],
+                      measure_startup=False)
+
+        assert results["backend"] == "fake"
+        phases = results["targets"]["container_manager"]
+        for phase in PHASES[1:] + ["total", "start_container"]:
+            assert phases[phase]["count"] == 2
+            assert phases[phase]["p50"] > 0
+        assert "startup" not in phases
+
+    def test_lsl_cli_resolves_benchmark_template(self):
+        """Test the lsl.py target finds its template through the container catalog"""
+        results = run(iterations=1, backend="fake", targets=["lsl_cli"], measure_startup=False)
+
+        phases = results["targets"]["lsl_cli"]
+        for phase in PHASES[1:]:
+            if phase != "server_sync":
+                assert phases[phase]["count"] == 1
+        assert "skipped" not in phases
+
+    def test_main_writes_results_and_detects_regressions(self, tmp_path):
+        """Test JSON output and the baseline exit code"""
+        output = tmp_path / "results.json"
+        assert main(["-n", "1", "--backend", "fake", "--target", "container_manager",
+                     "--no-startup", "-o", str(output)]) == 0
+
+        results = json.loads(output.read_text())
+        assert results["version"] == 1
+
+        # A baseline far faster than any real run must flag regressions
+        for phase in results["targets"]["container_manager"].values():
+            phase["p95"] = 1e-9
+        baseline = tmp_path / "baseline.json"
+        baseline.write_text(json.dumps(results))
+        assert main(["-n", "1", "--backend", "fake", "--target", "container_manager",
+                     "--no-startup", "--baseline", str(baseline)]) == 1
@@ -0,0 +1,74 @@
+"""
+Tests for the CLI startup budget benchmark
+"""
+import os
+import sys
+import subprocess
+
+from benchmarks.startup import PROJECT_ROOT, parse_importtime, forbidden_imports, failures, run
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      1500 |       2100 | site
+import time:       300 |        300 |     docker.errors
+import time:       900 |       1200 |   docker
+import time:       400 |       1600 | client.containers
+"""
+
+class TestImportTime:
+    """Test suite for importtime parsing"""
+
+    def test_parse_importtime(self):
+        """Test that entries keep their nesting depth and timings"""
+        imports = parse_importtime(IMPORTTIME)
+
+        assert [entry["name"] for entry in imports] == ["_io", "site", "docker.errors", "docker", "client.containers"]
+        assert imports[1] == {"name": "site", "depth": 0, "self_us": 1500, "cumulative_us": 2100}
+        assert imports[2]["depth"] == 2
+
+    def test_forbidden_imports_by_top_level_package(self):
+        """Test that submodules count against their top-level package"""
+        imports = parse_importtime(IMPORTTIME)
+
+        assert forbidden_imports(imports, ["docker", "requests"]) == ["docker"]
+        assert forbidden_imports(imports, ["requests"]) == []
+
+    def test_failures(self):
+        """Test that budget and import violations are both reported"""
+        results = {"scenarios": {
+            "fast": {"over_budget": False, "median_ms": 10.0, "budget_ms": 100.0, "forbidden_imports": []},
+            "slow": {"over_budget": True, "median_ms": 150.0, "budget_ms": 100.0, "forbidden_imports": ["yaml"]}
+        }}
+
+        problems = failures(results)
+
+        assert len(problems) == 2
+        assert all(problem.startswith("slow:") for problem in problems)
+
+class TestStartupBudget:
+    """Test suite for the startup scenarios"""
+
+    def test_cli_fast_paths_skip_heavy_imports(self):
+        """Test that lsl.py --help and -l load no heavy dependency"""
+        results = run(iterations=1, budget_ms=10000.0, scenarios=["lsl_help", "lsl_list"])
+
+        for scenario in results["scenarios"].values():
+            assert scenario["forbidden_imports"] == []
+            assert not scenario["over_budget"]
+
+    def test_client_import_opens_no_files(self):
+        """Test that importing the client loads no heavy dependency and opens no log file"""
+        code = (
+            "import sys, logging\n"
+            "import client.containers\n"
+            "heavy = [name for name in ('docker', 'requests', 'yaml', 'asyncio') if name in sys.modules]\n"
+            "handlers = [h for l in logging.Logger.manager.loggerDict.values() for h in getattr(l, 'handlers', [])]\n"
+            "print(heavy, [h.baseFilename for h in handlers if getattr(h, 'stream', None) is not None])\n"
+        )
+        env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+
+        process = subprocess.Popen([sys.executable, "-c", code], cwd=PROJECT_ROOT, env=env,
+                                   stdout=subprocess.PIPE, text=True)
+        output, _ = process.communicate()
+
+        assert output.strip() == "[] []"
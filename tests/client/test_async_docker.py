@@ -0,0 +1,318 @@
+"""
+Tests for client async Docker module
+"""
+import json
+import shutil
+import struct
+import asyncio
+import tempfile
+import os
+import pytest
+from unittest.mock import MagicMock, patch
+
+from client.async_docker import (
+    AsyncDockerClient, DockerEngineError, create_config_from_options,
+    demultiplex_stream, gather_bounded, parse_memory_limit
+)
+
+class FakeDockerDaemon:
+    """Minimal Docker Engine API served over a unix socket"""
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self.connections = 0
+        self.requests = []
+        self.exit_code = 3
+        self.pull_delay = 0
+        self.containers = [
+            {"Id": "abc123", "Names": ["/lsl-ubuntu-1"], "State": "running",
+             "Labels": {"lsl.managed": "true", "lsl.template": "ubuntu"}},
+        ]
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, target, _ = request_line.decode().split(" ")
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line == b"\r\n":
+                    break
+                key, _, value = line.decode().partition(":")
+                headers[key.strip().lower()] = value.strip()
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            self.requests.append((method, target, json.loads(body) if body else None))
+
+            path = target.split("?")[0]
+            if method == "GET" and path == "/containers/json":
+                # Chunked response
+                payload = json.dumps(self.containers).encode()
+                writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n")
+                writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(payload), payload))
+            elif method == "POST" and path.endswith("/exec"):
+                self._respond(writer, 201, {"Id": "exec1"})
+            elif method == "POST" and path == "/exec/exec1/start":
+                writer.write(b"HTTP/1.1 101 UPGRADED\r\nConnection: Upgrade\r\nUpgrade: tcp\r\n\r\n")
+                writer.write(struct.pack(">BxxxL", 1, 6) + b"hello\n")
+                writer.write(struct.pack(">BxxxL", 2, 4) + b"oops")
+                await writer.drain()
+                break
+            elif method == "GET" and path == "/exec/exec1/json":
+                self._respond(writer, 200, {"ExitCode": self.exit_code})
+            elif method == "POST" and path == "/images/create":
+                # Pull progress trickles in, one chunked JSON line at a time
+                writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n")
+                events = [{"status": f"Downloading {i}"} for i in range(4)]
+                if "fromImage=broken" in target:
+                    events.append({"error": "manifest unknown"})
+                for event in events:
+                    line = json.dumps(event).encode() + b"\n"
+                    writer.write(b"%x\r\n%s\r\n" % (len(line), line))
+                    await writer.drain()
+                    await asyncio.sleep(self.pull_delay)
+                writer.write(b"0\r\n\r\n")
+            elif method == "POST" and path == "/containers/create":
+                self._respond(writer, 201, {"Id": "new456"})
+            elif method == "GET" and path == "/containers/missing/json":
+                self._respond(writer, 404, {"message": "No such container: missing"})
+            elif method == "GET" and path.endswith("/json"):
+                self._respond(writer, 200, {"Id": path.split("/")[2], "State": {"Running": True}})
+            else:
+                writer.write(b"HTTP/1.1 204 No Content\r\n\r\n")
+            await writer.drain()
+        writer.close()
+
+    @staticmethod
+    def _respond(writer, status, data):
+        payload = json.dumps(data).encode()
+        writer.write(b"HTTP/1.1 %d X\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n%s"
+                     % (status, len(payload), payload))
+
+@pytest.fixture
+def socket_path():
+    """Short socket path (unix socket paths are length limited)"""
+    directory = tempfile.mkdtemp(prefix="lsl")
+    yield os.path.join(directory, "docker.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+def run_with_daemon(socket_path, scenario, timeout=60.0, **daemon_attrs):
+    """Run a scenario coroutine against a fake daemon"""
+    daemon = FakeDockerDaemon(socket_path)
+    for key, value in daemon_attrs.items():
+        setattr(daemon, key, value)
+
+    async def main():
+        server = await asyncio.start_unix_server(daemon.handle, path=socket_path)
+        async with server:
+            async with AsyncDockerClient(socket_path=socket_path, max_connections=2, timeout=timeout) as client:
+                return await scenario(client)
+
+    return daemon, asyncio.run(main())
+
+class TestAsyncDockerClient:
+    """Test suite for AsyncDockerClient class"""
+
+    def test_requests_reuse_pooled_connection(self, socket_path):
+        """Test that sequential requests share one keep-alive connection"""
+        async def scenario(client):
+            listed = await client.list_containers(filters={"label": ["lsl.managed=true"]})
+            await client.stop_container("abc123", timeout=5)
+            await client.remove_container("abc123", force=True)
+            return listed
+
+        daemon, listed = run_with_daemon(socket_path, scenario)
+
+        assert listed[0]["Id"] == "abc123"
+        assert daemon.connections == 1
+        assert daemon.requests[1][:2] == ("POST", "/containers/abc123/stop?t=5")
+        assert daemon.requests[2][:2] == ("DELETE", "/containers/abc123?force=1&v=0")
+        assert "filters=" in daemon.requests[0][1]
+
+    def test_concurrency_bounded_by_pool_size(self, socket_path):
+        """Test that concurrent requests never open more than max_connections"""
+        async def scenario(client):
+            return await asyncio.gather(*(client.inspect_container(f"c{i}") for i in range(10)))
+
+        daemon, results = run_with_daemon(socket_path, scenario)
+
+        assert [r["Id"] for r in results] == [f"c{i}" for i in range(10)]
+        assert daemon.connections <= 2
+
+    def test_error_status_raises(self, socket_path):
+        """Test that daemon errors raise DockerEngineError"""
+        async def scenario(client):
+            with pytest.raises(DockerEngineError) as excinfo:
+                await client.inspect_container("missing")
+            return excinfo.value
+
+        _, error = run_with_daemon(socket_path, scenario)
+
+        assert error.status == 404
+        assert "No such container" in error.message
+
+    def test_exec_collects_output(self, socket_path):
+        """Test exec demultiplexes output and reports the exit code"""
+        async def scenario(client):
+            return await client.exec("abc123", "echo hello", user="root")
+
+        daemon, (exit_code, stdout, stderr) = run_with_daemon(socket_path, scenario)
+
+        assert (exit_code, stdout, stderr) == (3, b"hello\n", b"oops")
+        assert daemon.requests[0][2]["Cmd"] == ["echo", "hello"]
+        assert daemon.requests[0][2]["User"] == "root"
+
+    def test_exec_unknown_exit_code(self, socket_path):
+        """Test a missing exit code is reported as None, not success"""
+        async def scenario(client):
+            return await client.exec("abc123", "sleep 100")
+
+        _, (exit_code, _, _) = run_with_daemon(socket_path, scenario, exit_code=None)
+
+        assert exit_code is None
+
+    def test_pull_outlasts_request_timeout(self, socket_path):
+        """Test a pull streaming longer than the timeout succeeds while it keeps making progress"""
+        async def scenario(client):
+            await client.pull_image("ubuntu:22.04")
+            # The connection is released and reusable afterwards
+            return await client.inspect_container("abc123")
+
+        daemon, result = run_with_daemon(socket_path, scenario, timeout=0.15, pull_delay=0.1)
+
+        assert result["Id"] == "abc123"
+        assert daemon.requests[0][1] == "/images/create?fromImage=ubuntu&tag=22.04"
+        assert daemon.connections == 1
+
+    def test_pull_reports_in_band_error(self, socket_path):
+        """Test an error line in the pull stream raises"""
+        async def scenario(client):
+            with pytest.raises(DockerEngineError) as excinfo:
+                await client.pull_image("broken")
+            return excinfo.value
+
+        _, error = run_with_daemon(socket_path, scenario)
+
+        assert "manifest unknown" in error.message
+
+class TestHelpers:
+    """Test suite for module helpers"""
+
+    def test_create_config_from_options(self):
+        """Test conversion of docker-py run options to an Engine API body"""
+        config = create_config_from_options({
+            "image": "ubuntu:latest",
+            "volumes": {"/host": {"bind": "/data", "mode": "ro"}},
+            "network_mode": "host",
+            "environment": {"A": "1"},
+            "mem_limit": "512Mi",
+            "cpu_shares": 1024
+        }, labels={"lsl.managed": "true"})
+
+        assert config["Image"] == "ubuntu:latest"
+        assert config["Env"] == ["A=1"]
+        assert config["Labels"] == {"lsl.managed": "true"}
+        assert config["HostConfig"] == {
+            "Binds": ["/host:/data:ro"],
+            "NetworkMode": "host",
+            "Memory": 512 * 1024 ** 2,
+            "CpuShares": 1024
+        }
+
+    def test_parse_memory_limit(self):
+        """Test memory limit parsing"""
+        assert parse_memory_limit("1g") == 1024 ** 3
+        assert parse_memory_limit("2Gi") == 2 * 1024 ** 3
+        assert parse_memory_limit(100) == 100
+        with pytest.raises(ValueError):
+            parse_memory_limit("lots")
+
+    def test_demultiplex_stream(self):
+        """Test splitting a multiplexed stream"""
+        data = struct.pack(">BxxxL", 1, 2) + b"ok" + struct.pack(">BxxxL", 2, 3) + b"err"
+        assert demultiplex_stream(data) == (b"ok", b"err")
+
+    def test_gather_bounded_limits_parallelism(self):
+        """Test that gather_bounded keeps at most `limit` operations in flight"""
+        state = {"running": 0, "peak": 0}
+
+        async def work(i):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.01)
+            state["running"] -= 1
+            if i == 3:
+                raise RuntimeError("boom")
+            return i
+
+        results = asyncio.run(gather_bounded([lambda i=i: work(i) for i in range(8)], 3))
+
+        assert state["peak"] == 3
+        assert results[:3] == [0, 1, 2]
+        assert isinstance(results[3], RuntimeError)
+
+class TestContainerManagerAsync:
+    """Test suite for the async ContainerManager API"""
+
+    @pytest.fixture
+    def manager(self):
+        with patch('client.containers.docker'), \
+             patch('client.containers.ConfigSyncManager') as mock_sync:
+            from client.containers import ContainerManager
+            client_config = MagicMock()
+            client_config.config = {"settings": {}}
+            client_config.get_uuid_and_token.return_value = ("owner-uuid", "token")
+            manager = ContainerManager(client_config)
+            manager.config_sync = mock_sync.return_value
+            manager.config_sync.get_available_containers.return_value = {
+                "ubuntu": {"image": "ubuntu:latest", "env": {"A": "1"}}
+            }
+            yield manager
+
+    def test_bulk_start_runs_concurrently(self, manager):
+        """Test that bulk starts create and start every container"""
+        client = MagicMock()
+        client.create_container = MagicMock(side_effect=lambda config, name: _done(f"id-{name}"))
+        client.start_container = MagicMock(side_effect=lambda cid: _done(None))
+        manager.async_client = client
+
+        results = asyncio.run(manager.async_bulk("start", ["ubuntu"] * 5, concurrency=2))
+
+        assert all(success for success, _ in results)
+        names = {call.kwargs["name"] for call in client.create_container.call_args_list}
+        assert len(names) == 5
+        config = client.create_container.call_args_list[0].args[0]
+        assert config["Labels"]["lsl.template"] == "ubuntu"
+        assert config["Labels"]["lsl.owner"] == "owner-uuid"
+        manager.config_sync.refresh_if_stale.assert_called_once()
+
+    def test_async_stop_reports_failures(self, manager):
+        """Test that async stop stops all matching containers and reports failures"""
+        client = MagicMock()
+        labels = {"lsl.managed": "true", "lsl.template": "ubuntu"}
+        client.list_containers = MagicMock(side_effect=lambda **kwargs: _done([
+            {"Id": "a", "Names": ["/lsl-ubuntu-1"], "State": "running", "Labels": labels},
+            {"Id": "b", "Names": ["/lsl-ubuntu-2"], "State": "running", "Labels": labels},
+        ]))
+
+        async def stop(container_id, timeout):
+            if container_id == "b":
+                raise DockerEngineError(500, "cannot stop")
+
+        client.stop_container = MagicMock(side_effect=stop)
+        manager.async_client = client
+
+        success, message = asyncio.run(manager.async_stop_container("ubuntu"))
+
+        assert not success
+        assert "Stopped 1 of 2" in message
+        assert "lsl-ubuntu-2" in message
+
+def _done(value):
+    """Awaitable resolving to value"""
+    async def result():
+        return value
+
+    return result()
@@ -0,0 +1,142 @@
+"""
+Tests for the terminal broadcast service
+"""
+import os
+import time
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from client.broadcast import (
+    BroadcastServer, Viewer, join_session, MODE_READ_ONLY, MODE_READ_WRITE, PROTOCOL
+)
+
+def read_until(fd, expected, timeout=5.0):
+    """Read from a non-blocking fd until expected bytes show up"""
+    os.set_blocking(fd, False)
+    data = b""
+    deadline = time.time() + timeout
+    while expected not in data and time.time() < deadline:
+        try:
+            data += os.read(fd, 4096)
+        except BlockingIOError:
+            time.sleep(0.01)
+    return data
+
+def start_viewer(port, key, read_only):
+    """Join a session from a thread with pipes for keyboard input and output"""
+    input_r, input_w = os.pipe()
+    output_r, output_w = os.pipe()
+    thread = threading.Thread(target=join_session, args=("127.0.0.1", port, key, read_only, input_r, output_w),
+                              daemon=True)
+    thread.start()
+    return input_w, output_r, thread
+
+class TestViewer:
+    """Test suite for per-viewer backpressure"""
+
+    def test_slow_viewer_skips_ahead(self):
+        """Test that a viewer over its buffer drops its queue and is marked for resync"""
+        async def scenario():
+            viewer = Viewer(MagicMock(), MODE_READ_ONLY, max_buffered=10)
+            viewer.enqueue(b"12345")
+            viewer.enqueue(b"67890")
+            assert viewer.buffered == 10 and not viewer.resync
+
+            viewer.enqueue(b"x")
+            assert viewer.resync and viewer.resyncs == 1
+            assert viewer.buffered == 0 and not viewer.chunks
+
+            # Output while resyncing is covered by the scrollback replay
+            viewer.enqueue(b"y")
+            assert not viewer.chunks
+
+        asyncio.run(scenario())
+
+class TestBroadcastServer:
+    """Test suite for BroadcastServer"""
+
+    def test_authenticate(self):
+        """Test that typing needs the write key and watching accepts either key"""
+        server = BroadcastServer(["true"], key="view", write_key="write")
+
+        assert server._authenticate(f"{PROTOCOL} rw write\n".encode()) == MODE_READ_WRITE
+        assert server._authenticate(f"{PROTOCOL} ro view\n".encode()) == MODE_READ_ONLY
+        assert server._authenticate(f"{PROTOCOL} ro write\n".encode()) == MODE_READ_ONLY
+        assert server._authenticate(f"{PROTOCOL} rw view\n".encode()) is None
+        assert server._authenticate(b"SSH-2.0-OpenSSH\n") is None
+
+    def test_broadcast_to_viewers(self):
+        """Test that output reaches every viewer and only read-write input reaches the PTY"""
+        server = BroadcastServer(["/bin/sh", "-c", "echo ready; cat"], host="127.0.0.1",
+                                 key="view", write_key="write")
+        port = server.run_in_thread()
+        try:
+            writer_in, writer_out, _ = start_viewer(port, "write", read_only=False)
+            watcher_in, watcher_out, _ = start_viewer(port, "view", read_only=True)
+            assert b"ready" in read_until(writer_out, b"ready")
+            assert b"ready" in read_until(watcher_out, b"ready")
+
+            os.write(writer_in, b"from-writer\n")
+            assert b"from-writer" in read_until(watcher_out, b"from-writer")
+
+            os.write(watcher_in, b"from-watcher\n")
+            os.write(writer_in, b"done\n")
+            output = read_until(watcher_out, b"done")
+            assert b"from-watcher" not in output
+
+            stats = server.stats()
+            assert stats["viewers"] == 2 and stats["read_only"] == 1
+        finally:
+            server.stop()
+
+    def test_late_viewer_gets_scrollback(self):
+        """Test that a viewer joining later sees earlier output at once"""
+        server = BroadcastServer(["/bin/sh", "-c", "echo early-output; sleep 5"], host="127.0.0.1", key="k")
+        port = server.run_in_thread()
+        try:
+            time.sleep(0.2)
+            _, output, _ = start_viewer(port, "k", read_only=True)
+            assert b"early-output" in read_until(output, b"early-output")
+        finally:
+            server.stop()
+
+    def test_rejects_wrong_key(self):
+        """Test that a viewer with the wrong key is refused"""
+        server = BroadcastServer(["/bin/sh", "-c", "sleep 5"], host="127.0.0.1", key="k")
+        port = server.run_in_thread()
+        try:
+            with pytest.raises(ConnectionError):
+                join_session("127.0.0.1", port, "wrong", read_only=True)
+        finally:
+            server.stop()
+
+    def test_blocked_input_does_not_stall_output(self):
+        """Test that a paste the program isn't reading holds back only that viewer"""
+        import socket
+        program, stream = socket.socketpair()
+        server = BroadcastServer(stream_fd=stream.detach(), host="127.0.0.1", key="k")
+        port = server.run_in_thread()
+        try:
+            typist = socket.create_connection(("127.0.0.1", port))
+            typist.sendall(f"{PROTOCOL} rw k\n".encode())
+            paste = threading.Thread(target=lambda: typist.sendall(b"x" * (16 * 1024 * 1024)), daemon=True)
+            paste.start()
+            time.sleep(0.3)
+
+            _, watcher_out, _ = start_viewer(port, "k", read_only=True)
+            program.sendall(b"still-flowing\n")
+            assert b"still-flowing" in read_until(watcher_out, b"still-flowing")
+
+            # Once the program reads, the paste arrives intact
+            received = 0
+            program.settimeout(5)
+            while received < 16 * 1024 * 1024:
+                received += len(program.recv(1024 * 1024))
+            paste.join(5)
+            assert not paste.is_alive()
+        finally:
+            server.stop()
+            program.close()
@@ -0,0 +1,80 @@
+"""
+Tests for the container catalog
+"""
+import os
+import json
+from unittest.mock import patch
+
+from client.catalog import ContainerCatalog, parse_containers_txt, SOURCE_LOCAL, SOURCE_SERVER
+from client.config_store import ConfigStore
+
+SERVER_CONFIG = {
+    "username": "alice",
+    "containers": {
+        "ubuntu": {"image": "ubuntu:22.04", "shared": True, "setup": {"packages": ["screen"]}},
+        "alpine": {"image": "alpine:latest"}
+    }
+}
+
+def write_sources(tmp_path, server_config=SERVER_CONFIG, local="alpine = alpine:3.19\nlocal_only = busybox\n"):
+    """Write a cached server config and local overrides next to a client config"""
+    config_path = tmp_path / "config.yaml"
+    (tmp_path / "config.cache.json").write_text(json.dumps(server_config))
+    if local is not None:
+        (tmp_path / "containers.txt").write_text(local)
+    return str(config_path)
+
+class TestContainerCatalog:
+    """Test suite for ContainerCatalog"""
+
+    def test_parse_containers_txt(self):
+        """Test that comments, blank and malformed lines are skipped"""
+        text = "# comment\n\ndev_env = ubuntu:22.04\nbroken line\nweb=nginx:alpine\n"
+
+        assert parse_containers_txt(text) == {"dev_env": "ubuntu:22.04", "web": "nginx:alpine"}
+
+    def test_local_overrides_server_templates(self, tmp_path):
+        """Test that both sources are merged with local entries taking precedence"""
+        catalog = ContainerCatalog(write_sources(tmp_path), local_path=str(tmp_path / "containers.txt"))
+
+        assert catalog.images() == {"ubuntu": "ubuntu:22.04", "alpine": "alpine:3.19", "local_only": "busybox"}
+        assert catalog.resolve("ubuntu") == {
+            "image": "ubuntu:22.04", "source": SOURCE_SERVER, "shared": True, "setup": {"packages": ["screen"]}
+        }
+        assert catalog.resolve("alpine")["source"] == SOURCE_LOCAL
+        assert catalog.resolve("missing") is None
+
+    def test_index_reused_until_a_source_changes(self, tmp_path):
+        """Test that lookups read the stored index and recompile only after a source changed"""
+        config_path = write_sources(tmp_path)
+        local_path = str(tmp_path / "containers.txt")
+        ContainerCatalog(config_path, local_path=local_path).compile()
+        assert os.path.exists(tmp_path / "config.catalog.json")
+
+        with patch.object(ContainerCatalog, "compile") as mock_compile:
+            assert ContainerCatalog(config_path, local_path=local_path).resolve("local_only")["image"] == "busybox"
+        mock_compile.assert_not_called()
+
+        (tmp_path / "containers.txt").write_text("local_only = busybox:1.36\n")
+        assert ContainerCatalog(config_path, local_path=local_path).resolve("local_only")["image"] == "busybox:1.36"
+
+    def test_independent_of_working_directory(self, tmp_path, monkeypatch):
+        """Test that a containers.txt in the working directory is not consulted"""
+        config_path = write_sources(tmp_path, local=None)
+        work_dir = tmp_path / "work"
+        work_dir.mkdir()
+        (work_dir / "containers.txt").write_text("stray = stray:latest\n")
+        monkeypatch.chdir(work_dir)
+        monkeypatch.delenv("LSL_CONTAINERS_FILE", raising=False)
+
+        assert "stray" not in ContainerCatalog(config_path).images()
+
+    def test_config_store_compiles_index_on_cache_write(self, tmp_path):
+        """Test that saving a synced server config precompiles the index"""
+        store = ConfigStore(str(tmp_path / "config.yaml"), debounce_interval=0)
+
+        store.save({"client": {"uuid": "u"}, "server_config": SERVER_CONFIG}, immediate=True)
+
+        with open(tmp_path / "config.catalog.json") as f:
+            index = json.load(f)
+        assert set(index["entries"]) == {"ubuntu", "alpine"}
@@ -189,3 +189,49 @@ class TestClientConfig:
             
             # Verify sync failed
             assert result is False
+            
+    @patch('client.config.requests.get')
+    def test_sync_stores_signed_token(self, mock_get):
+        """Test that a signed token issued with the config replaces the UUID header"""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "containers": {},
+            "token": {"value": "lsl1.k1.payload.mac", "expires_at": time.time() + 3600}
+        }
+        mock_get.return_value = mock_response
+        
+        with tempfile.NamedTemporaryFile(suffix='.yaml') as temp_file:
+            client_config = ClientConfig(temp_file.name)
+            
+            assert client_config.sync_with_server() is True
+            assert "token" not in client_config.config["server_config"]
+            assert client_config.get_auth_header() == "Bearer lsl1.k1.payload.mac"
+            
+            # An expiring token is no longer sent
+            client_config.config["client"]["signed_token"]["expires_at"] = time.time() + 10
+            uuid, token = client_config.get_uuid_and_token()
+            assert client_config.get_auth_header() == f"Bearer {uuid}:{token}"
+            client_config.store.flush()
+            
+    @patch('client.config.requests.get')
+    def test_sync_rejected_signed_token_falls_back(self, mock_get):
+        """Test that a rejected signed token is dropped and the sync retried with the UUID"""
+        rejected = MagicMock(status_code=401)
+        accepted = MagicMock(status_code=200)
+        accepted.json.return_value = {"containers": {}}
+        mock_get.side_effect = [rejected, accepted]
+        
+        with tempfile.NamedTemporaryFile(suffix='.yaml') as temp_file:
+            client_config = ClientConfig(temp_file.name)
+            client_config.config["client"]["signed_token"] = {
+                "value": "lsl1.k1.payload.mac", "expires_at": time.time() + 3600
+            }
+            
+            assert client_config.sync_with_server() is True
+            
+            uuid, token = client_config.get_uuid_and_token()
+            assert mock_get.call_args_list[0][1]['headers']["Authorization"] == "Bearer lsl1.k1.payload.mac"
+            assert mock_get.call_args_list[1][1]['headers']["Authorization"] == f"Bearer {uuid}:{token}"
+            assert "signed_token" not in client_config.config["client"]
+            client_config.store.flush()
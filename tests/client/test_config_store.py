@@ -0,0 +1,112 @@
+"""
+Tests for client config store module
+"""
+import gc
+import os
+import json
+import time
+import weakref
+import yaml
+import pytest
+from unittest.mock import patch
+
+from client.config_store import ConfigStore, _flush_open_stores
+
+@pytest.fixture
+def config_path(tmp_path):
+    """Path of an identity config file in a temporary directory"""
+    return str(tmp_path / "config.yaml")
+
+def make_config(containers=None):
+    """Build a client config dictionary"""
+    config = {
+        "client": {"uuid": "test-uuid", "token": "test-token", "last_server_sync": time.time()},
+        "server": {"url": "http://test-server:8000"},
+        "settings": {"log_level": "INFO"}
+    }
+    if containers is not None:
+        config["server_config"] = {"containers": containers}
+    return config
+
+class TestConfigStore:
+    """Test suite for ConfigStore class"""
+
+    def test_server_config_stored_separately(self, config_path):
+        """Test that the server config cache is kept out of the identity file"""
+        store = ConfigStore(config_path)
+        store.save(make_config({"ubuntu": {"image": "ubuntu:latest"}}), immediate=True)
+
+        with open(config_path) as f:
+            identity = yaml.safe_load(f)
+        with open(store.cache_path) as f:
+            cache = json.load(f)
+
+        assert "server_config" not in identity
+        assert "last_server_sync" not in identity["client"]
+        assert cache["containers"]["ubuntu"]["image"] == "ubuntu:latest"
+
+        # Loading merges both files back together
+        loaded = ConfigStore(config_path).load()
+        assert loaded["server_config"] == cache
+        assert loaded["client"]["last_server_sync"] == os.path.getmtime(store.cache_path)
+
+    def test_unchanged_content_is_not_written(self, config_path):
+        """Test that saving identical content does not touch the disk"""
+        store = ConfigStore(config_path)
+        store.save(make_config({"ubuntu": {"image": "ubuntu:latest"}}), immediate=True)
+
+        with patch.object(store, '_atomic_write') as mock_write:
+            store.save(make_config({"ubuntu": {"image": "ubuntu:latest"}}), immediate=True)
+            mock_write.assert_not_called()
+
+            store.save(make_config({"debian": {"image": "debian:stable"}}), immediate=True)
+            mock_write.assert_called_once()
+            assert mock_write.call_args[0][0] == store.cache_path
+
+    def test_bursts_are_debounced(self, config_path):
+        """Test that a burst of updates results in a single write"""
+        store = ConfigStore(config_path, debounce_interval=0.1)
+
+        with patch.object(store, '_atomic_write', return_value=True) as mock_write:
+            for i in range(5):
+                config = make_config()
+                config["server"]["url"] = f"http://server-{i}:8000"
+                store.save(config)
+            mock_write.assert_not_called()
+
+            time.sleep(0.3)
+
+            mock_write.assert_called_once()
+            assert b"server-4" in mock_write.call_args[0][1]
+
+    def test_flush_writes_pending_changes(self, config_path):
+        """Test that flush writes debounced changes immediately"""
+        store = ConfigStore(config_path, debounce_interval=60)
+        store.save(make_config())
+        assert not os.path.exists(config_path)
+
+        store.flush()
+        assert os.path.exists(config_path)
+
+    def test_exit_hook_flushes_live_stores_only(self, config_path):
+        """Test that pending changes are written at exit without the hook keeping stores alive"""
+        store = ConfigStore(config_path, debounce_interval=60)
+        store.save(make_config())
+
+        _flush_open_stores()
+        assert os.path.exists(config_path)
+
+        ref = weakref.ref(store)
+        del store
+        gc.collect()
+        assert ref() is None
+
+    def test_mark_synced_updates_cache_time(self, config_path):
+        """Test that mark_synced refreshes the cache time without rewriting it"""
+        store = ConfigStore(config_path)
+        store.save(make_config({}), immediate=True)
+        os.utime(store.cache_path, (0, 0))
+
+        store.mark_synced()
+
+        assert os.path.getmtime(store.cache_path) > 0
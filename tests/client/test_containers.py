@@ -1,6 +1,9 @@
 """
 Tests for client container management module
 """
+import os
+import time
+import threading
 import pytest
 from unittest.mock import patch, MagicMock, call
 
@@ -76,8 +79,8 @@ class TestContainerManager:
         # List available containers
         containers = container_manager.list_available_containers()
         
-        # Verify force_sync was called
-        mock_config_sync_instance.force_sync.assert_called_once()
+        # Verify the cached config was refreshed if stale
+        mock_config_sync_instance.refresh_if_stale.assert_called_once()
         
         # Verify containers list format
         assert len(containers) == 2
@@ -102,29 +105,25 @@ class TestContainerManager:
         mock_docker_client = MagicMock()
         mock_docker.from_env.return_value = mock_docker_client
         
-        # Mock running containers
-        container1 = MagicMock()
-        container1.id = "container1_id_12345678"
-        container1.name = "lsl-ubuntu-1234"
-        container1.status = "running"
-        container1.image.tags = ["ubuntu:latest"]
-        container1.attrs = {"Created": "2023-06-01"}
-        
-        container2 = MagicMock()
-        container2.id = "container2_id_87654321"
-        container2.name = "other-container"  # Not an LSL container
-        container2.status = "running"
-        container2.image.tags = ["other:latest"]
-        container2.attrs = {"Created": "2023-06-01"}
-        
-        container3 = MagicMock()
-        container3.id = "container3_id_11223344"
-        container3.name = "lsl-nginx-5678"
-        container3.status = "exited"
-        container3.image.tags = ["nginx:latest"]
-        container3.attrs = {"Created": "2023-06-01"}
-        
-        mock_docker_client.containers.list.return_value = [container1, container2, container3]
+        # Mock LSL containers as returned by the label-filtered list endpoint
+        mock_docker_client.api.containers.return_value = [
+            {
+                "Id": "container1_id_12345678",
+                "Names": ["/lsl-ubuntu-1234"],
+                "Image": "ubuntu:latest",
+                "State": "running",
+                "Created": 1685577600,
+                "Labels": {"lsl.managed": "true", "lsl.template": "ubuntu", "lsl.owner": "test-uuid"}
+            },
+            {
+                "Id": "container3_id_11223344",
+                "Names": ["/lsl-nginx-5678"],
+                "Image": "nginx:latest",
+                "State": "exited",
+                "Created": 1685577600,
+                "Labels": {"lsl.managed": "true", "lsl.template": "nginx"}
+            }
+        ]
         
         # Create container manager
         container_manager = ContainerManager()
@@ -132,17 +131,22 @@ class TestContainerManager:
         # List running containers
         containers = container_manager.list_running_containers()
         
-        # Verify docker client was called with all=True
-        mock_docker_client.containers.list.assert_called_once_with(all=True)
+        # Verify one label-filtered query (plus the lookup of unlabeled legacy containers),
+        # without per-container lookups
+        assert mock_docker_client.api.containers.call_args_list == [
+            call(all=True, filters={"label": ["lsl.managed=true"]}),
+            call(all=True, filters={"name": "^/lsl-"})
+        ]
+        assert len(containers) == 2
+        mock_docker_client.containers.list.assert_not_called()
+        mock_docker_client.containers.get.assert_not_called()
         
-        # Verify only LSL containers are returned (excluding non-lsl container)
         assert len(containers) == 2
         
         # Check containers info
         container_names = [c["name"] for c in containers]
         assert "lsl-ubuntu-1234" in container_names
         assert "lsl-nginx-5678" in container_names
-        assert "other-container" not in container_names
         
         # Check status is correctly reported
         running_container = next(c for c in containers if c["name"] == "lsl-ubuntu-1234")
@@ -153,6 +157,10 @@ class TestContainerManager:
         assert stopped_container["status"] == "exited"
         assert stopped_container["is_running"] is False
         
+        # Check label information is exposed
+        assert running_container["template"] == "ubuntu"
+        assert running_container["owner"] == "test-uuid"
+        
     @patch('client.containers.docker')
     @patch('client.containers.ConfigSyncManager')
     @patch('client.containers.os')
@@ -200,7 +208,7 @@ class TestContainerManager:
         )
         
         # Verify sync was called
-        mock_config_sync_instance.force_sync.assert_called_once()
+        mock_config_sync_instance.refresh_if_stale.assert_called_once()
         
         # Verify success
         assert success is True
@@ -286,15 +294,11 @@ class TestContainerManager:
         mock_docker.from_env.return_value = mock_docker_client
         
         # Mock containers
-        container1 = MagicMock()
-        container1.name = "lsl-ubuntu-1234"
-        container1.status = "running"
-        
-        container2 = MagicMock()
-        container2.name = "lsl-ubuntu-5678"
-        container2.status = "running"
-        
-        mock_docker_client.containers.list.return_value = [container1, container2]
+        labels = {"lsl.managed": "true", "lsl.template": "ubuntu"}
+        mock_docker_client.api.containers.return_value = [
+            {"Id": "container1", "Names": ["/lsl-ubuntu-1234"], "State": "running", "Labels": labels},
+            {"Id": "container2", "Names": ["/lsl-ubuntu-5678"], "State": "running", "Labels": labels}
+        ]
         
         # Create container manager
         container_manager = ContainerManager()
@@ -306,12 +310,16 @@ class TestContainerManager:
         assert success is True
         assert "Stopped 2 container" in message
         
-        # Verify Docker client was called to list containers
-        mock_docker_client.containers.list.assert_called_once_with(all=True)
+        # Verify Docker client was queried by template label
+        assert mock_docker_client.api.containers.call_args_list[0] == call(
+            all=True, filters={"label": ["lsl.managed=true", "lsl.template=ubuntu"]}
+        )
         
         # Verify stop was called on each container
-        container1.stop.assert_called_once()
-        container2.stop.assert_called_once()
+        mock_docker_client.api.stop.assert_has_calls([
+            call("container1", timeout=10),
+            call("container2", timeout=10)
+        ], any_order=True)
         
     @patch('client.containers.docker')
     def test_stop_container_no_match(self, mock_docker):
@@ -321,7 +329,7 @@ class TestContainerManager:
         mock_docker.from_env.return_value = mock_docker_client
         
         # No matching containers
-        mock_docker_client.containers.list.return_value = []
+        mock_docker_client.api.containers.return_value = []
         
         # Create container manager
         container_manager = ContainerManager()
@@ -341,13 +349,11 @@ class TestContainerManager:
         mock_docker.from_env.return_value = mock_docker_client
         
         # Mock containers
-        container1 = MagicMock()
-        container1.name = "lsl-ubuntu-1234"
-        
-        container2 = MagicMock()
-        container2.name = "lsl-ubuntu-5678"
-        
-        mock_docker_client.containers.list.return_value = [container1, container2]
+        labels = {"lsl.managed": "true", "lsl.template": "ubuntu"}
+        mock_docker_client.api.containers.return_value = [
+            {"Id": "container1", "Names": ["/lsl-ubuntu-1234"], "State": "exited", "Labels": labels},
+            {"Id": "container2", "Names": ["/lsl-ubuntu-5678"], "State": "exited", "Labels": labels}
+        ]
         
         # Create container manager
         container_manager = ContainerManager()
@@ -363,9 +369,243 @@ class TestContainerManager:
         assert success is True
         assert "Removed 2 container" in message
         
-        # Verify Docker client was called to list containers
-        mock_docker_client.containers.list.assert_called_once_with(all=True)
+        # Verify Docker client was queried by template label
+        assert mock_docker_client.api.containers.call_args_list[0] == call(
+            all=True, filters={"label": ["lsl.managed=true", "lsl.template=ubuntu"]}
+        )
         
         # Verify remove was called on each container with correct params
-        container1.remove.assert_called_once_with(force=True, v=True)
-        container2.remove.assert_called_once_with(force=True, v=True)
+        mock_docker_client.api.remove_container.assert_has_calls([
+            call("container1", force=True, v=True),
+            call("container2", force=True, v=True)
+        ], any_order=True)
+        
+    @patch('client.containers.docker')
+    def test_stop_container_by_exact_name(self, mock_docker):
+        """Test stopping a container by its exact name when no template matches"""
+        # Setup mocks
+        mock_docker_client = MagicMock()
+        mock_docker.from_env.return_value = mock_docker_client
+        
+        # Label and legacy queries find nothing, name query returns a partial match too
+        mock_docker_client.api.containers.side_effect = [
+            [],
+            [],
+            [
+                {"Id": "exact", "Names": ["/lsl-ubuntu-1234"], "State": "running"},
+                {"Id": "partial", "Names": ["/lsl-ubuntu-12345"], "State": "running"}
+            ]
+        ]
+        
+        # Create container manager
+        container_manager = ContainerManager()
+        
+        # Stop container
+        success, message = container_manager.stop_container("lsl-ubuntu-1234")
+        
+        # Verify only the exact match was stopped
+        assert success is True
+        assert "Stopped 1 container" in message
+        mock_docker_client.api.stop.assert_called_once_with("exact", timeout=10)
+        
+    @patch('client.containers.docker')
+    def test_stop_unlabeled_legacy_containers(self, mock_docker):
+        """Test containers of older clients are found by name prefix until none are left"""
+        # Setup mocks
+        mock_docker_client = MagicMock()
+        mock_docker.from_env.return_value = mock_docker_client
+        
+        # Labeled container, plus unlabeled ones from before containers were labeled
+        labeled = {"Id": "new", "Names": ["/lsl-ubuntu-99-abcd"], "State": "running",
+                   "Labels": {"lsl.managed": "true", "lsl.template": "ubuntu"}}
+        mock_docker_client.api.containers.side_effect = [
+            [labeled],
+            [
+                labeled,
+                {"Id": "old", "Names": ["/lsl-ubuntu-1234"], "State": "running", "Labels": {}},
+                {"Id": "other", "Names": ["/lsl-ubuntu2-1234"], "State": "running", "Labels": {}},
+                {"Id": "pool", "Names": ["/lsl-pool-ubuntu-1"], "State": "running", "Labels": {}}
+            ],
+            [labeled],
+            []
+        ]
+        
+        # Create container manager
+        container_manager = ContainerManager()
+        
+        # Stop containers
+        success, message = container_manager.stop_container("ubuntu")
+        
+        # Verify the legacy container was stopped along with the labeled one
+        assert success is True
+        assert "Stopped 2 container" in message
+        mock_docker_client.api.stop.assert_has_calls([
+            call("new", timeout=10),
+            call("old", timeout=10)
+        ], any_order=True)
+        
+        # Once no unlabeled containers are left, the legacy lookup is skipped
+        container_manager.list_running_containers()
+        container_manager.list_running_containers()
+        assert mock_docker_client.api.containers.call_count == 5
+        
+    @patch('client.containers.docker')
+    def test_teardown_container_fire_and_forget(self, mock_docker):
+        """Test background teardown returns immediately and reports status"""
+        # Setup mocks
+        mock_docker_client = MagicMock()
+        mock_docker.from_env.return_value = mock_docker_client
+        
+        release = threading.Event()
+        mock_docker_client.api.stop.side_effect = lambda *args, **kwargs: release.wait(5)
+        mock_docker_client.api.containers.return_value = [
+            {"Id": "container1", "Names": ["/lsl-ubuntu-1234"], "State": "running"}
+        ]
+        
+        # Create container manager
+        container_manager = ContainerManager()
+        
+        # Tear down without waiting
+        success, message = container_manager.teardown_container("ubuntu")
+        
+        assert success is True
+        assert "Queued 1 container" in message
+        
+        # Status is queryable while the teardown is still running
+        status = container_manager.get_teardown_status()
+        assert len(status) == 1
+        assert status[0]["done"] is False
+        
+        release.set()
+        job_id = status[0]["id"]
+        container_manager.teardown.jobs[job_id].wait(timeout=5)
+        
+        assert container_manager.get_teardown_status(job_id)["done"] is True
+        mock_docker_client.api.remove_container.assert_called_once_with("container1", force=False, v=True)
+        
+    @patch('client.containers.docker')
+    @patch('client.containers.ConfigSyncManager')
+    def test_start_container_from_warm_pool(self, mock_config_sync, mock_docker):
+        """Test that a start is served from the warm pool when possible"""
+        # Setup mocks
+        mock_docker_client = MagicMock()
+        mock_docker.from_env.return_value = mock_docker_client
+        
+        mock_config_sync_instance = MagicMock()
+        mock_config_sync.return_value = mock_config_sync_instance
+        mock_config_sync_instance.get_available_containers.return_value = {
+            "ubuntu": {"image": "ubuntu:latest", "pool": {"size": 1}}
+        }
+        
+        # Create container manager with a mock pool
+        container_manager = ContainerManager()
+        mock_pool = MagicMock()
+        mock_pool.claim.return_value = "pooled_id"
+        container_manager.pool = mock_pool
+        
+        # Start container
+        success, message = container_manager.start_container("ubuntu")
+        
+        # Verify the pooled container was claimed and the pool refilled
+        assert success is True
+        mock_pool.claim.assert_called_once()
+        mock_pool.refill_async.assert_called_once()
+        mock_docker_client.containers.run.assert_not_called()
+        
+        # Host networking cannot be served from the pool
+        mock_pool.reset_mock()
+        container_manager.start_container("ubuntu", use_host_network=True)
+        mock_pool.claim.assert_not_called()
+        mock_docker_client.containers.run.assert_called_once()
+        
+        # Pool containers can't take a user's labels, so per-user bulk starts create new ones
+        mock_pool.reset_mock()
+        mock_docker_client.containers.run.reset_mock()
+        results = container_manager.start_containers([{"template": "ubuntu", "user": "alice"},
+                                                      {"template": "ubuntu"}])
+        assert [r["from_pool"] for r in results] == [False, True]
+        mock_pool.claim.assert_called_once()
+        labels = mock_docker_client.containers.run.call_args.kwargs["labels"]
+        assert labels["lsl.user"] == "alice"
+        
+    @patch('client.containers.docker')
+    @patch('client.containers.ConfigSyncManager')
+    def test_start_containers_validates_up_front(self, mock_config_sync, mock_docker):
+        """Test that an invalid entry prevents the whole batch from starting"""
+        # Setup mocks
+        mock_docker_client = MagicMock()
+        mock_docker.from_env.return_value = mock_docker_client
+        
+        mock_config_sync_instance = MagicMock()
+        mock_config_sync.return_value = mock_config_sync_instance
+        mock_config_sync_instance.get_available_containers.return_value = {
+            "ubuntu": {"image": "ubuntu:latest"}
+        }
+        
+        container_manager = ContainerManager()
+        results = container_manager.start_containers([
+            {"template": "ubuntu"},
+            {"template": "nonexistent"},
+            {"template": "ubuntu", "color": "blue"}
+        ])
+        
+        # Verify nothing was started and every entry reports why
+        mock_docker_client.containers.run.assert_not_called()
+        assert [r["success"] for r in results] == [False, False, False]
+        assert "other entries failed validation" in results[0]["message"]
+        assert "not found" in results[1]["message"]
+        assert "Unknown option" in results[2]["message"]
+        
+    @patch('client.containers.docker')
+    @patch('client.containers.ConfigSyncManager')
+    def test_start_containers_in_parallel(self, mock_config_sync, mock_docker, tmp_path):
+        """Test bounded parallel bulk starts with one catalog lookup"""
+        # Setup mocks
+        mock_docker_client = MagicMock()
+        mock_docker.from_env.return_value = mock_docker_client
+        
+        state = {"running": 0, "peak": 0}
+        lock = threading.Lock()
+        
+        def run(**kwargs):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            if kwargs["labels"].get("lsl.user") == "bob":
+                raise Exception("boom")
+            return MagicMock(id=f"id-{kwargs['name']}")
+            
+        mock_docker_client.containers.run.side_effect = run
+        
+        mock_config_sync_instance = MagicMock()
+        mock_config_sync.return_value = mock_config_sync_instance
+        shared_dir = tmp_path / "shared"
+        mock_config_sync_instance.get_available_containers.return_value = {
+            "ubuntu": {
+                "image": "ubuntu:latest",
+                "volumes": [{"host_path": str(shared_dir), "container_path": "/shared"}]
+            }
+        }
+        
+        container_manager = ContainerManager()
+        specs = [{"template": "ubuntu", "user": f"user{i}"} for i in range(6)] + [
+            {"template": "ubuntu", "user": "bob"}
+        ]
+        with patch('client.containers.os.makedirs', wraps=os.makedirs) as mock_makedirs:
+            results = container_manager.start_containers(specs, concurrency=3)
+            
+        # Verify the catalog was looked up once and the volume created once
+        mock_config_sync_instance.refresh_if_stale.assert_called_once()
+        mock_makedirs.assert_called_once_with(str(shared_dir), exist_ok=True)
+        
+        # Verify bounded parallelism and per-item results
+        assert state["peak"] == 3
+        assert [r["success"] for r in results] == [True] * 6 + [False]
+        assert len({r["name"] for r in results}) == 7
+        assert results[0]["container_id"] == f"id-{results[0]['name']}"
+        assert results[6]["user"] == "bob"
+        assert "boom" in results[6]["message"]
+        assert all(r["duration"] > 0 for r in results)
@@ -0,0 +1,126 @@
+"""
+Tests for the local Engine API driver
+"""
+import os
+import signal
+import time
+from unittest.mock import MagicMock
+
+import docker
+import pytest
+
+from benchmarks.fake_docker import FakeDockerDaemon
+from client.engine import LocalEngine, EngineError
+
+@pytest.fixture
+def mock_client():
+    """docker-py client with a mocked low-level API"""
+    client = MagicMock()
+    client.api.create_container.return_value = {"Id": "abc123"}
+    return client
+
+@pytest.fixture
+def fake_engine(tmp_path):
+    """Engine connected to the in-process fake Docker daemon"""
+    daemon = FakeDockerDaemon().start()
+    client = docker.DockerClient(base_url=daemon.base_url)
+    yield LocalEngine(client, state_dir=str(tmp_path))
+    client.close()
+    daemon.stop()
+
+class TestEngineError:
+    """Test suite for daemon error classification"""
+
+    def test_port_conflict(self):
+        """Test that port conflicts are recognized from the daemon explanation"""
+        error = docker.errors.APIError("500 Server Error", explanation="Bind for 0.0.0.0:10000 failed: "
+                                                                       "port is already allocated")
+        assert EngineError(error).is_port_conflict()
+        assert not EngineError(docker.errors.APIError("No such image")).is_port_conflict()
+
+class TestLocalEngine:
+    """Test suite for LocalEngine against a mocked docker-py client"""
+
+    def test_published_ports(self, mock_client):
+        """Test host ports are mapped to container names"""
+        mock_client.api.containers.return_value = [
+            {"Names": ["/lsl_one"], "Ports": [{"PrivatePort": 22, "PublicPort": 10001, "Type": "tcp"},
+                                             {"PrivatePort": 80, "Type": "tcp"}]},
+            {"Names": ["/other"], "Ports": None}
+        ]
+
+        assert LocalEngine(mock_client).published_ports() == {10001: "lsl_one"}
+
+    def test_create_pulls_missing_image(self, mock_client):
+        """Test that a missing image is pulled and creation retried"""
+        mock_client.api.create_container.side_effect = [docker.errors.ImageNotFound("missing"), {"Id": "abc123"}]
+        mock_client.api.inspect_image.side_effect = docker.errors.ImageNotFound("missing")
+        mock_client.api.pull.return_value = iter([{"status": "Downloaded"}])
+
+        container_id = LocalEngine(mock_client).create("alpine:3.19", ["/bin/sh"], ports={22: 10001})
+
+        assert container_id == "abc123"
+        mock_client.api.pull.assert_called_once_with("alpine", tag="3.19", stream=True, decode=True)
+        assert mock_client.api.create_container.call_args.kwargs["ports"] == [22]
+        mock_client.api.create_host_config.assert_called_with(
+            binds=None, network_mode=None, port_bindings={22: 10001}, auto_remove=True)
+
+    def test_failed_start_removes_container(self, mock_client):
+        """Test that a container which cannot start is not left behind"""
+        mock_client.api.start.side_effect = docker.errors.APIError("port is already allocated")
+
+        with pytest.raises(EngineError):
+            LocalEngine(mock_client).run_detached("alpine", ["sleep", "1"])
+
+        mock_client.api.remove_container.assert_called_once_with("abc123", force=True)
+
+    def test_interactive_run_follows_window_resizes(self, mock_client, monkeypatch):
+        """Test that the TTY is resized again when the terminal window changes size during the relay"""
+        mock_client.api.wait.return_value = {"StatusCode": 0}
+        engine = LocalEngine(mock_client)
+        monkeypatch.setattr(engine, "attach", lambda container_id: os.open(os.devnull, os.O_RDONLY))
+        previous = signal.getsignal(signal.SIGWINCH)
+
+        def relay(stream_fd, stdin_fd, stdout_fd):
+            assert mock_client.api.resize.call_count == 1
+            os.kill(os.getpid(), signal.SIGWINCH)
+
+        monkeypatch.setattr("client.engine.relay_terminal", relay)
+
+        assert engine.run_interactive("alpine", ["/bin/sh"]) == 0
+        assert mock_client.api.resize.call_count == 2
+        assert signal.getsignal(signal.SIGWINCH) == previous
+
+class TestLocalEngineFakeDaemon:
+    """Test suite for LocalEngine against the fake Engine API"""
+
+    def test_port_conflict_on_start(self, fake_engine):
+        """Test that a second container publishing the same port fails with a port conflict"""
+        fake_engine.run_detached("alpine", ["sleep", "60"], name="first", ports={22: 10001})
+        assert fake_engine.published_ports() == {10001: "first"}
+
+        with pytest.raises(EngineError) as excinfo:
+            fake_engine.run_detached("alpine", ["sleep", "60"], name="second", ports={22: 10001})
+
+        assert excinfo.value.is_port_conflict()
+        assert [c["Names"][0] for c in fake_engine.api.containers(all=True)] == ["/first"]
+
+    def test_attach_relays_tty(self, fake_engine):
+        """Test that the hijacked attach stream carries terminal input and output"""
+        container_id = fake_engine.create("alpine", ["/bin/sh"], interactive=True)
+        stream_fd = fake_engine.attach(container_id)
+        try:
+            fake_engine.start(container_id)
+            os.write(stream_fd, b"echo hi\r")
+            os.set_blocking(stream_fd, False)
+            data = b""
+            deadline = time.time() + 5
+            while b"echo hi" not in data and time.time() < deadline:
+                try:
+                    data += os.read(stream_fd, 4096)
+                except BlockingIOError:
+                    time.sleep(0.01)
+        finally:
+            os.close(stream_fd)
+
+        assert b"echo hi" in data
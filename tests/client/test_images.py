@@ -0,0 +1,66 @@
+"""
+Tests for client derived image module
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from client.images import SetupImageBuilder
+from shared.utils.derived_image import derived_image_tag
+
+SETUP = {"packages": ["screen"]}
+
+@pytest.fixture
+def docker_client():
+    """Docker client mock with a local base image and no derived images"""
+    client = MagicMock()
+    images = {"ubuntu:22.04": {"Id": "sha256:base"}}
+
+    def inspect_image(image):
+        if image not in images:
+            raise Exception("No such image")
+        return images[image]
+
+    def build(fileobj, tag, **kwargs):
+        images[tag] = {"Id": "sha256:derived"}
+        return iter([{"stream": "Step 1/3 : FROM ubuntu:22.04\n"}])
+
+    client.api.inspect_image.side_effect = inspect_image
+    client.api.build.side_effect = build
+    client.api.images.return_value = [
+        {"Id": "sha256:old", "Labels": {"lsl.setup.base_digest": "sha256:previous"}},
+        {"Id": "sha256:current", "Labels": {"lsl.setup.base_digest": "sha256:base"}}
+    ]
+    return client
+
+class TestSetupImageBuilder:
+    """Test suite for SetupImageBuilder class"""
+
+    def test_builds_once_and_reuses(self, docker_client, tmp_path):
+        """Test that the derived image is built on first use only"""
+        builder = SetupImageBuilder(docker_client, str(tmp_path))
+
+        tag = builder.resolve("ubuntu:22.04", SETUP)
+        assert tag == derived_image_tag("ubuntu:22.04", "sha256:base", SETUP)
+        assert builder.resolve("ubuntu:22.04", SETUP) == tag
+
+        docker_client.api.build.assert_called_once()
+        dockerfile = docker_client.api.build.call_args.kwargs["fileobj"].getvalue().decode()
+        assert dockerfile.startswith("FROM ubuntu:22.04\n")
+
+        # Images built from an older base image version are removed
+        docker_client.api.remove_image.assert_called_once_with("sha256:old")
+
+    def test_no_steps_uses_base_image(self, docker_client, tmp_path):
+        """Test that templates without steps run the base image"""
+        builder = SetupImageBuilder(docker_client, str(tmp_path))
+
+        assert builder.resolve("ubuntu:22.04", {"packages": []}) == "ubuntu:22.04"
+        docker_client.api.build.assert_not_called()
+
+    def test_build_error_raises(self, docker_client, tmp_path):
+        """Test that build errors are raised"""
+        docker_client.api.build.side_effect = lambda **kwargs: iter([{"error": "E: Unable to locate package"}])
+        builder = SetupImageBuilder(docker_client, str(tmp_path))
+
+        with pytest.raises(RuntimeError, match="Unable to locate package"):
+            builder.resolve("ubuntu:22.04", SETUP)
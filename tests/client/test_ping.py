@@ -20,6 +20,7 @@ class TestPingManager:
         mock_config_instance = MagicMock()
         mock_config_instance.get_server_url.return_value = "http://test-server:8000"
         mock_config_instance.get_uuid_and_token.return_value = ("test-uuid", "test-token")
+        mock_config_instance.get_auth_header.return_value = "Bearer test-uuid:test-token"
         mock_config.return_value = mock_config_instance
         
         # Setup mock response
@@ -67,6 +68,32 @@ class TestPingManager:
         # Verify ping failed
         assert result is False
         
+    @patch('client.ping.ClientConfig')
+    @patch('client.ping.requests.post')
+    def test_heartbeat_retries_after_rejected_token(self, mock_post, mock_config):
+        """Test a rejected signed token is discarded and the heartbeat retried with the UUID at once"""
+        # Setup mock config whose token is discarded on the first 401
+        mock_config_instance = MagicMock()
+        mock_config_instance.get_server_url.return_value = "http://test-server:8000"
+        mock_config_instance.get_uuid_and_token.return_value = ("test-uuid", "test-token")
+        mock_config_instance.get_auth_header.side_effect = ["Bearer lsl1.signed", "Bearer test-uuid:test-token"]
+        mock_config_instance.discard_signed_token.return_value = True
+        mock_config.return_value = mock_config_instance
+        
+        headers_sent = []
+        responses = [MagicMock(status_code=401), MagicMock(status_code=200)]
+        mock_post.side_effect = lambda url, headers, **kwargs: (headers_sent.append(dict(headers)),
+                                                                responses.pop(0))[1]
+        
+        # The heartbeat makes a single attempt
+        ping_manager = PingManager(mock_config_instance)
+        result = ping_manager._heartbeat()
+        
+        # Verify the same heartbeat succeeded with the UUID header
+        assert result is True
+        assert [h["Authorization"] for h in headers_sent] == ["Bearer lsl1.signed", "Bearer test-uuid:test-token"]
+        mock_config_instance.discard_signed_token.assert_called_once()
+        
     @patch('client.ping.ClientConfig')
     @patch('client.ping.requests.post')
     def test_ping_with_retry(self, mock_post, mock_config):
@@ -0,0 +1,94 @@
+"""
+Tests for client warm container pool module
+"""
+import pytest
+from unittest.mock import MagicMock
+
+from client.pool import WarmPool, template_config_hash, POOL_NAME_PREFIX
+
+TEMPLATE_CONFIG = {"image": "ubuntu:latest", "pool": {"size": 1, "max_size": 3, "paused": True}}
+
+@pytest.fixture
+def docker_client():
+    """Mock Docker client without any pooled containers"""
+    client = MagicMock()
+    client.api.containers.return_value = []
+    return client
+
+@pytest.fixture
+def pool(docker_client, tmp_path):
+    """Warm pool backed by the mock Docker client"""
+    return WarmPool(
+        docker_client,
+        owner="test-uuid",
+        build_options=lambda template, config: {"image": config["image"]},
+        build_labels=lambda template, **extra: dict({"lsl.template": template}, **extra),
+        state_dir=str(tmp_path)
+    )
+
+def pooled(container_id, state="paused", config=TEMPLATE_CONFIG):
+    """Build a raw summary of a pooled container"""
+    return {
+        "Id": container_id,
+        "Names": [f"/{POOL_NAME_PREFIX}ubuntu-{container_id}"],
+        "State": state,
+        "Labels": {"lsl.pool.config": template_config_hash(config)}
+    }
+
+class TestWarmPool:
+    """Test suite for WarmPool class"""
+
+    def test_claim_renames_and_unpauses(self, pool, docker_client):
+        """Test claiming a paused pooled container"""
+        docker_client.api.containers.return_value = [pooled("abc123")]
+
+        container_id = pool.claim("ubuntu", TEMPLATE_CONFIG, "lsl-ubuntu-42")
+
+        assert container_id == "abc123"
+        docker_client.api.rename.assert_called_once_with("abc123", "lsl-ubuntu-42")
+        docker_client.api.unpause.assert_called_once_with("abc123")
+        assert pool.get_metrics()["hits"] == 1
+
+    def test_claim_ignores_stale_containers(self, pool, docker_client):
+        """Test that containers from an older template config are not claimed"""
+        old_config = {"image": "ubuntu:20.04"}
+        docker_client.api.containers.return_value = [pooled("old", config=old_config)]
+
+        assert pool.claim("ubuntu", TEMPLATE_CONFIG, "lsl-ubuntu-42") is None
+        docker_client.api.rename.assert_not_called()
+
+        metrics = pool.get_metrics()
+        assert metrics["misses"] == 1
+        assert metrics["hit_rate"] == 0.0
+
+    def test_refill_creates_paused_containers(self, pool, docker_client):
+        """Test that refill creates containers up to the target size"""
+        created = pool.refill("ubuntu", TEMPLATE_CONFIG)
+
+        assert created == 1
+        call_kwargs = docker_client.containers.create.call_args[1]
+        assert call_kwargs["name"].startswith(f"{POOL_NAME_PREFIX}ubuntu-")
+        assert call_kwargs["labels"]["lsl.pool"] == "true"
+        assert call_kwargs["labels"]["lsl.pool.config"] == template_config_hash(TEMPLATE_CONFIG)
+        docker_client.containers.create.return_value.pause.assert_called_once()
+
+    def test_refill_removes_stale_containers(self, pool, docker_client):
+        """Test that stale pooled containers are replaced"""
+        docker_client.api.containers.return_value = [pooled("old", config={"image": "ubuntu:20.04"})]
+
+        pool.refill("ubuntu", TEMPLATE_CONFIG)
+
+        docker_client.api.remove_container.assert_called_once_with("old", force=True, v=True)
+        assert docker_client.containers.create.call_count == 1
+
+    def test_target_size_adapts_to_demand(self, pool):
+        """Test that recent demand grows the pool up to max_size"""
+        assert pool.target_size("ubuntu", TEMPLATE_CONFIG) == 1
+
+        for _ in range(2):
+            pool.claim("ubuntu", TEMPLATE_CONFIG, "lsl-ubuntu-42")
+        assert pool.target_size("ubuntu", TEMPLATE_CONFIG) == 2
+
+        for _ in range(5):
+            pool.claim("ubuntu", TEMPLATE_CONFIG, "lsl-ubuntu-42")
+        assert pool.target_size("ubuntu", TEMPLATE_CONFIG) == 3
@@ -0,0 +1,127 @@
+"""
+Tests for client image prefetch module
+"""
+import json
+import pytest
+from unittest.mock import MagicMock
+
+from client.prefetch import (
+    ImagePrefetcher, split_image_reference,
+    STATE_DONE, STATE_UP_TO_DATE, STATE_FAILED
+)
+
+def make_docker_client(local_images=None, remote_digests=None):
+    """Build a mock Docker client with a local image store and registry"""
+    local_images = dict(local_images or {})
+    remote_digests = remote_digests or {}
+    docker_client = MagicMock()
+
+    def inspect_image(image):
+        if image not in local_images:
+            raise Exception("No such image")
+        if local_images[image] is None:
+            return {"RepoDigests": []}
+        return {"RepoDigests": [f"{image.split(':')[0]}@{local_images[image]}"]}
+
+    def inspect_distribution(image):
+        return {"Descriptor": {"digest": remote_digests[image]}}
+
+    def pull(repository, tag, stream, decode):
+        image = f"{repository}:{tag}"
+        yield {"status": "Downloading", "id": "layer1", "progressDetail": {"current": 50, "total": 100}}
+        yield {"status": "Downloading", "id": "layer1", "progressDetail": {"current": 100, "total": 100}}
+        local_images[image] = remote_digests.get(image, "sha256:pulled")
+
+    docker_client.api.inspect_image.side_effect = inspect_image
+    docker_client.api.inspect_distribution.side_effect = inspect_distribution
+    docker_client.api.pull.side_effect = pull
+    return docker_client
+
+class TestImagePrefetcher:
+    """Test suite for ImagePrefetcher class"""
+
+    def test_split_image_reference(self):
+        """Test splitting image references into repository and tag"""
+        assert split_image_reference("ubuntu:22.04") == ("ubuntu", "22.04")
+        assert split_image_reference("ubuntu") == ("ubuntu", "latest")
+        assert split_image_reference("registry:5000/app") == ("registry:5000/app", "latest")
+        assert split_image_reference("registry:5000/app:1.0") == ("registry:5000/app", "1.0")
+
+    def test_pulls_missing_images_and_records_digest(self, tmp_path):
+        """Test that missing images are pulled and their digests persisted"""
+        state_file = str(tmp_path / "images.json")
+        docker_client = make_docker_client(remote_digests={"ubuntu:22.04": "sha256:abc"})
+        prefetcher = ImagePrefetcher(docker_client, state_file=state_file, pause_between_pulls=0)
+
+        queued = prefetcher.prefetch_catalog({
+            "ubuntu": {"image": "ubuntu:22.04"},
+            "ubuntu-shared": {"image": "ubuntu:22.04"}
+        })
+        prefetcher.wait()
+
+        # Duplicate images are only queued once
+        assert queued == ["ubuntu:22.04"]
+        progress = prefetcher.get_progress("ubuntu:22.04")
+        assert progress["state"] == STATE_DONE
+        assert progress["percent"] == 100.0
+        assert progress["digest"] == "sha256:abc"
+
+        with open(state_file) as f:
+            assert json.load(f)["digests"] == {"ubuntu:22.04": "sha256:abc"}
+        prefetcher.shutdown()
+
+    def test_skips_up_to_date_images(self):
+        """Test that images matching the registry digest are not pulled"""
+        docker_client = make_docker_client(
+            local_images={"alpine:latest": "sha256:same"},
+            remote_digests={"alpine:latest": "sha256:same"}
+        )
+        prefetcher = ImagePrefetcher(docker_client, pause_between_pulls=0)
+
+        prefetcher.prefetch_catalog({"alpine": {"image": "alpine:latest"}})
+        prefetcher.wait()
+
+        docker_client.api.pull.assert_not_called()
+        assert prefetcher.get_progress("alpine:latest")["state"] == STATE_UP_TO_DATE
+        prefetcher.shutdown()
+
+    def test_skips_locally_built_images(self):
+        """Test that images without a registry digest are not pulled"""
+        docker_client = make_docker_client(local_images={"lsl-derived/alpine:abc123": None})
+        prefetcher = ImagePrefetcher(docker_client, pause_between_pulls=0)
+
+        prefetcher.prefetch_catalog({"alpine": {"image": "lsl-derived/alpine:abc123"}})
+        prefetcher.wait()
+
+        docker_client.api.pull.assert_not_called()
+        assert prefetcher.get_progress("lsl-derived/alpine:abc123")["state"] == STATE_UP_TO_DATE
+        prefetcher.shutdown()
+
+    def test_pulls_changed_images(self):
+        """Test that images with a new registry digest are pulled again"""
+        docker_client = make_docker_client(
+            local_images={"alpine:latest": "sha256:old"},
+            remote_digests={"alpine:latest": "sha256:new"}
+        )
+        prefetcher = ImagePrefetcher(docker_client, pause_between_pulls=0)
+
+        prefetcher.prefetch_catalog({"alpine": {"image": "alpine:latest"}})
+        prefetcher.wait()
+
+        docker_client.api.pull.assert_called_once()
+        assert prefetcher.get_progress("alpine:latest")["digest"] == "sha256:new"
+        prefetcher.shutdown()
+
+    def test_pull_error_reported(self):
+        """Test that pull errors are reported in the progress"""
+        docker_client = make_docker_client()
+        docker_client.api.pull.side_effect = lambda *args, **kwargs: iter([{"error": "denied"}])
+        prefetcher = ImagePrefetcher(docker_client, pause_between_pulls=0)
+
+        prefetcher.prefetch_catalog({"private": {"image": "private/app:1.0"}})
+        prefetcher.wait()
+
+        progress = prefetcher.get_progress("private/app:1.0")
+        assert progress["state"] == STATE_FAILED
+        assert progress["error"] == "denied"
+        prefetcher.shutdown()
@@ -0,0 +1,118 @@
+"""
+Tests for client scheduler module
+"""
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+
+from client.scheduler import ClientScheduler, BackoffState
+from client.ping import PingManager
+from client.sync import ConfigSyncManager
+
+class TestClientScheduler:
+    """Test suite for ClientScheduler class"""
+
+    def test_blocking_job_does_not_stall_others(self):
+        """Test that a slow blocking job runs off the loop, without overlapping itself"""
+        scheduler = ClientScheduler(coalesce_window=0.05)
+        slow_calls, fast_calls = [], []
+
+        def slow():
+            slow_calls.append(time.monotonic())
+            time.sleep(0.5)
+
+        scheduler.add_job("slow", slow, interval=0.01, jitter=0, network=False)
+        scheduler.add_job("fast", lambda: fast_calls.append(time.monotonic()), interval=0.05, jitter=0)
+
+        scheduler.start()
+        time.sleep(0.3)
+        scheduler.stop()
+
+        # The fast job kept its interval while the slow one was still running
+        assert len(slow_calls) == 1
+        assert len(fast_calls) >= 3
+        assert not scheduler.is_running()
+
+    def test_shared_backoff_delays_all_network_jobs(self):
+        """Test that a failing job backs off every network job"""
+        scheduler = ClientScheduler(coalesce_window=0, initial_retry_delay=10.0)
+        failing = MagicMock(return_value=False)
+        healthy = MagicMock(return_value=True)
+
+        scheduler.add_job("failing", failing, interval=0.01, jitter=0)
+        scheduler.add_job("healthy", healthy, interval=0.01, jitter=0, initial_delay=0.05)
+
+        scheduler.start()
+        time.sleep(0.3)
+        scheduler.stop()
+
+        # The failing job ran once, then the backoff held both jobs back
+        assert failing.call_count == 1
+        assert healthy.call_count == 0
+        assert scheduler.backoff.failures == 1
+
+    def test_failed_job_retries_before_its_interval(self):
+        """Test that a failed network job is retried after the backoff, not a whole interval later"""
+        scheduler = ClientScheduler(coalesce_window=0, initial_retry_delay=0.05, max_retry_delay=0.05)
+        heartbeat = MagicMock(side_effect=[False, True, True])
+
+        scheduler.add_job("heartbeat", heartbeat, interval=30, jitter=0)
+
+        scheduler.start()
+        time.sleep(0.5)
+        scheduler.stop()
+
+        # One retry after the failure, then back to the 30s interval
+        assert heartbeat.call_count == 2
+        assert not scheduler.backoff.active
+        assert scheduler.jobs["heartbeat"].next_run - scheduler.jobs["heartbeat"].last_run == pytest.approx(30)
+
+    def test_exception_counts_as_failure(self):
+        """Test that exceptions in jobs are caught and recorded as failures"""
+        scheduler = ClientScheduler(initial_retry_delay=10.0)
+        scheduler.add_job("boom", MagicMock(side_effect=Exception("boom")), interval=0.01)
+
+        scheduler.start()
+        time.sleep(0.1)
+        scheduler.stop()
+
+        assert scheduler.jobs["boom"].last_success is False
+        assert scheduler.backoff.active
+
+    def test_backoff_resets_on_success(self):
+        """Test backoff state growth and reset"""
+        backoff = BackoffState(initial_delay=1.0, max_delay=4.0)
+
+        first = backoff.record_failure(0.0)
+        backoff.record_failure(0.0)
+        backoff.record_failure(0.0)
+        third = backoff.record_failure(0.0)
+
+        assert 0.8 <= first <= 1.2
+        assert third <= 4.0 * 1.2
+
+        backoff.record_success()
+        assert not backoff.active
+
+    @patch('client.sync.requests.post')
+    def test_sync_skips_ping_when_heartbeat_scheduled(self, mock_post):
+        """Test that the sync job does not send a duplicate ping"""
+        mock_client_config = MagicMock()
+        mock_client_config.config = {"server": {"ping_interval": 60}}
+        mock_client_config.get_server_url.return_value = "http://test-server:8000"
+        mock_client_config.get_uuid_and_token.return_value = ("test-uuid", "test-token")
+        mock_client_config.sync_with_server.return_value = True
+
+        scheduler = ClientScheduler()
+        ping_manager = PingManager(mock_client_config, scheduler=scheduler)
+        sync_manager = ConfigSyncManager(mock_client_config, scheduler=scheduler)
+
+        # Without a heartbeat job the sync also pings
+        mock_post.return_value = MagicMock(status_code=200)
+        assert sync_manager._sync_and_ping() is True
+        assert mock_post.call_count == 1
+
+        # With a heartbeat job the ping is left to the heartbeat
+        scheduler.add_job(ping_manager.HEARTBEAT_JOB, ping_manager._heartbeat, interval=60, initial_delay=60)
+        assert sync_manager._sync_and_ping() is True
+        assert mock_post.call_count == 1
@@ -1,10 +1,11 @@
 """
 Tests for client sync module
 """
+import time
 import pytest
 from unittest.mock import patch, MagicMock
 
-from client.sync import ConfigSyncManager
+from client.sync import ConfigSyncManager, _join_refreshes
 
 class TestConfigSyncManager:
     """Test suite for ConfigSyncManager class"""
@@ -148,3 +149,86 @@ class TestConfigSyncManager:
         # Verify force_sync was called and containers returned
         mock_force_sync.assert_called_once()
         assert "added-container" in containers
+        
+    @patch('client.sync.ConfigSyncManager.force_sync')
+    def test_refresh_if_stale_fresh_cache(self, mock_force_sync):
+        """Test that a fresh cache is served without contacting the server"""
+        mock_client_config = MagicMock()
+        mock_client_config.config = {
+            "client": {"last_server_sync": time.time()},
+            "server": {"config_cache_ttl": 300, "config_cache_max_age": 3600},
+            "server_config": {"containers": {}}
+        }
+        
+        sync_manager = ConfigSyncManager(mock_client_config)
+        
+        assert sync_manager.refresh_if_stale() is True
+        mock_force_sync.assert_not_called()
+        
+    @patch('client.sync.ConfigSyncManager.force_sync')
+    def test_refresh_if_stale_stale_cache(self, mock_force_sync):
+        """Test that a stale cache is served while refreshing in the background"""
+        mock_client_config = MagicMock()
+        mock_client_config.config = {
+            "client": {"last_server_sync": time.time() - 600},
+            "server": {"config_cache_ttl": 300, "config_cache_max_age": 3600},
+            "server_config": {"containers": {}}
+        }
+        
+        sync_manager = ConfigSyncManager(mock_client_config)
+        
+        assert sync_manager.refresh_if_stale() is True
+        sync_manager._refresh_thread.join(timeout=1.0)
+        mock_force_sync.assert_called_once()
+        
+    @patch('client.sync.ConfigSyncManager.force_sync')
+    def test_background_refresh_finishes_before_exit(self, mock_force_sync):
+        """Test that the exit hook waits for an in-flight refresh, up to its timeout"""
+        finished = []
+        mock_force_sync.side_effect = lambda: (time.sleep(0.2), finished.append(True))
+        mock_client_config = MagicMock()
+        mock_client_config.config = {
+            "client": {"last_server_sync": time.time() - 600},
+            "server": {"config_cache_ttl": 300, "config_cache_max_age": 3600},
+            "server_config": {"containers": {}}
+        }
+        
+        ConfigSyncManager(mock_client_config).refresh_if_stale()
+        _join_refreshes(timeout=5.0)
+        
+        assert finished == [True]
+        
+    @patch('client.sync.ConfigSyncManager.force_sync')
+    def test_refresh_if_stale_expired_cache(self, mock_force_sync):
+        """Test that an expired cache blocks on a sync"""
+        mock_force_sync.return_value = False
+        mock_client_config = MagicMock()
+        mock_client_config.config = {
+            "client": {"last_server_sync": time.time() - 7200},
+            "server": {"config_cache_ttl": 300, "config_cache_max_age": 3600},
+            "server_config": {"containers": {}}
+        }
+        
+        sync_manager = ConfigSyncManager(mock_client_config)
+        
+        # Sync fails, but the expired cache is still served
+        assert sync_manager.refresh_if_stale() is True
+        assert sync_manager._refresh_thread is None
+        mock_force_sync.assert_called_once()
+        
+    @patch('client.sync.get_client_config')
+    def test_sync_listeners_receive_catalog(self, mock_get_client_config):
+        """Test that sync listeners are called with the synced containers"""
+        mock_client_config = MagicMock()
+        mock_client_config.config = {
+            "server": {},
+            "server_config": {"containers": {"ubuntu": {"image": "ubuntu:latest"}}}
+        }
+        mock_client_config.sync_with_server.return_value = True
+        
+        sync_manager = ConfigSyncManager(mock_client_config)
+        listener = MagicMock()
+        sync_manager.add_sync_listener(listener)
+        
+        assert sync_manager.force_sync() is True
+        listener.assert_called_once_with({"ubuntu": {"image": "ubuntu:latest"}})
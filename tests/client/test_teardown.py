@@ -0,0 +1,86 @@
+"""
+Tests for client container teardown module
+"""
+import time
+import threading
+import pytest
+from unittest.mock import MagicMock
+
+from client.teardown import TeardownPipeline, STATE_DONE, STATE_FAILED
+
+def make_containers(count, state="running"):
+    """Build raw container summaries"""
+    return [
+        {"Id": f"container{i}", "Names": [f"/lsl-ubuntu-{i}"], "State": state}
+        for i in range(count)
+    ]
+
+class TestTeardownPipeline:
+    """Test suite for TeardownPipeline class"""
+
+    def test_containers_stopped_in_parallel(self):
+        """Test that containers are torn down concurrently"""
+        docker_client = MagicMock()
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def slow_stop(container_id, timeout):
+            with lock:
+                active.append(container_id)
+                peak.append(len(active))
+            time.sleep(0.1)
+            with lock:
+                active.remove(container_id)
+
+        docker_client.api.stop.side_effect = slow_stop
+
+        pipeline = TeardownPipeline(max_workers=3)
+        job = pipeline.submit(docker_client, make_containers(5), stop=True)
+
+        assert job.wait(timeout=5)
+        assert docker_client.api.stop.call_count == 5
+        assert max(peak) == 3
+        pipeline.shutdown()
+
+    def test_stop_and_remove_with_volumes(self):
+        """Test a full teardown of stopped and running containers"""
+        docker_client = MagicMock()
+        containers = make_containers(1) + make_containers(1, state="exited")
+        containers[1]["Id"] = "stopped"
+
+        pipeline = TeardownPipeline()
+        job = pipeline.submit(docker_client, containers, stop=True, remove=True, remove_volumes=True)
+        job.wait(timeout=5)
+
+        # Only the running container is stopped, both are removed
+        docker_client.api.stop.assert_called_once_with("container0", timeout=10)
+        assert docker_client.api.remove_container.call_count == 2
+        docker_client.api.remove_container.assert_any_call("stopped", force=False, v=True)
+        pipeline.shutdown()
+
+    def test_status_and_failures(self):
+        """Test that job status is queryable and failures are reported"""
+        docker_client = MagicMock()
+        docker_client.api.stop.side_effect = [None, Exception("stop failed")]
+
+        pipeline = TeardownPipeline(max_workers=1)
+        job = pipeline.submit(docker_client, make_containers(2), stop=True)
+        job.wait(timeout=5)
+
+        status = pipeline.get_status(job.id)
+        states = sorted(entry["state"] for entry in status["containers"].values())
+        assert status["done"] is True
+        assert states == [STATE_DONE, STATE_FAILED]
+        assert job.failures()[0]["error"] == "stop failed"
+
+        assert pipeline.get_status("unknown") is None
+        assert len(pipeline.get_status()) == 1
+        pipeline.shutdown()
+
+    def test_empty_job_is_done(self):
+        """Test that a job without containers finishes immediately"""
+        pipeline = TeardownPipeline()
+        job = pipeline.submit(MagicMock(), [])
+
+        assert job.done()
@@ -0,0 +1,133 @@
+"""
+Tests for the web admin user and container indexes
+"""
+import time
+
+import pytest
+import yaml
+
+from server.admin_index import (
+    IndexedConfig, build_user_index, build_container_index, MAX_PAGE_SIZE, SEARCH_PREFIX
+)
+
+def make_users(count):
+    """users.yaml content with count users in three roles"""
+    users = {}
+    for i in range(count):
+        users[f"user{i:05d}"] = {
+            "uuid": f"{i:08x}-0000-4000-a000-000000000000",
+            "password_hash": "pbkdf2-sha256$1000$aa$bb",
+            "allowed_containers": ["alpine"] if i % 2 else ["alpine", "ubuntu"],
+            "metadata": {"email": f"person{i}@example.com", "role": ["dev", "ops", "admin"][i % 3]},
+        }
+    return {"users": users}
+
+@pytest.fixture
+def user_index():
+    return build_user_index(make_users(100))
+
+class TestRecordIndex:
+    """Test suite for RecordIndex queries on the user index"""
+
+    def test_unfiltered_pages(self, user_index):
+        """Test pages of the default order, both directions"""
+        total, page = user_index.query(offset=10, limit=5)
+        assert total == 100
+        assert [u["username"] for u in page] == [f"user{i:05d}" for i in range(10, 15)]
+
+        total, page = user_index.query(offset=0, limit=2, descending=True)
+        assert [u["username"] for u in page] == ["user00099", "user00098"]
+
+    def test_rows_omit_secrets(self, user_index):
+        """Test password hashes are not part of the rows"""
+        _, page = user_index.query(limit=1)
+        assert "password_hash" not in page[0]
+        assert page[0]["email"] == "person0@example.com"
+
+    def test_substring_and_prefix_search(self, user_index):
+        """Test substring search across fields and prefix search on one field"""
+        total, page = user_index.query(search="SON4@")
+        assert total == 1
+        assert page[0]["username"] == "user00004"
+
+        total, _ = user_index.query(search="person1", mode=SEARCH_PREFIX, fields=["email"])
+        assert total == 11  # person1 and person10-19
+
+        total, _ = user_index.query(search="user0001", mode=SEARCH_PREFIX, fields=["email"])
+        assert total == 0
+
+    def test_filters_combine_with_search(self, user_index):
+        """Test exact filters on role and allowed containers"""
+        total, page = user_index.query(filters={"role": "ops", "allowed_containers": "ubuntu"})
+        assert total == len([i for i in range(100) if i % 3 == 1 and i % 2 == 0])
+        assert all(u["role"] == "ops" and "ubuntu" in u["allowed_containers"] for u in page)
+
+        total, _ = user_index.query(search="person9", filters={"role": "admin"})
+        assert total == len([i for i in range(100) if str(i).startswith("9") and i % 3 == 2])
+
+    def test_sorted_filtered_pages(self, user_index):
+        """Test sorting matches by another field, for small and large match sets"""
+        _, page = user_index.query(filters={"role": "dev"}, sort="email", limit=3)
+        assert [u["email"] for u in page] == sorted(
+            f"person{i}@example.com" for i in range(0, 100, 3))[:3]
+
+        _, page = user_index.query(filters={"allowed_containers": "alpine"}, sort="role", descending=True,
+                                   offset=1, limit=2)
+        assert [u["role"] for u in page] == ["ops", "ops"]
+
+    def test_invalid_queries(self, user_index):
+        """Test unknown fields and page size capping"""
+        with pytest.raises(ValueError):
+            user_index.query(sort="password_hash")
+        with pytest.raises(ValueError):
+            user_index.query(filters={"uuid": "x"})
+        assert len(build_user_index(make_users(MAX_PAGE_SIZE + 10)).query(limit=10 ** 6)[1]) == MAX_PAGE_SIZE
+
+    def test_facets(self, user_index):
+        """Test filter values with counts"""
+        assert user_index.facets("role") == [("admin", 33), ("dev", 34), ("ops", 33)]
+
+    def test_large_index_query_speed(self):
+        """Test that queries over 50k users don't scan in Python"""
+        index = build_user_index(make_users(50000))
+
+        start = time.perf_counter()
+        for _ in range(20):
+            index.query(offset=25000, limit=100, sort="email")
+            index.query(search="person4999", limit=50)
+        assert time.perf_counter() - start < 2.0
+
+class TestContainerIndex:
+    """Test suite for the container index"""
+
+    def test_container_rows(self):
+        """Test container rows and search by image"""
+        index = build_container_index({"containers": {
+            "alpine": {"image": "alpine:latest", "resources": {"cpu": "0.5"}},
+            "ubuntu": {"image": "ubuntu:22.04", "shared": True},
+        }})
+
+        total, page = index.query(search="22.04")
+        assert total == 1
+        assert page[0] == {"name": "ubuntu", "image": "ubuntu:22.04", "description": None, "shared": True,
+                           "cpu": None, "memory": None}
+
+class TestIndexedConfig:
+    """Test suite for IndexedConfig"""
+
+    def test_rebuilds_only_on_change(self, tmp_path):
+        """Test the index is reused until the file changes"""
+        path = tmp_path / "users.yaml"
+        path.write_text(yaml.safe_dump(make_users(3)))
+        indexed = IndexedConfig(str(path), "users", build_user_index)
+
+        first = indexed.get()
+        assert len(first) == 3
+        assert indexed.get() is first
+
+        path.write_text(yaml.safe_dump(make_users(5)))
+        assert len(indexed.get()) == 5
+
+    def test_missing_file_is_empty(self, tmp_path):
+        """Test a missing file gives an empty index"""
+        assert len(IndexedConfig(str(tmp_path / "none.yaml"), "users", build_user_index).get()) == 0
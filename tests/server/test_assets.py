@@ -0,0 +1,118 @@
+"""
+Tests for the web admin static asset pipeline
+"""
+import os
+import gzip
+import json
+
+import pytest
+
+from server.assets import (
+    AssetStore, build_assets, fingerprint_name, load_manifest, negotiate_encoding, main,
+    IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
+)
+
+CSS = "body { margin: 0; padding: 0; }\n" * 20
+
+@pytest.fixture
+def static_dir(tmp_path):
+    """Static source directory with a stylesheet, a small script and an image"""
+    static = tmp_path / "static"
+    (static / "css").mkdir(parents=True)
+    (static / "js").mkdir()
+    (static / "css" / "styles.css").write_text(CSS)
+    (static / "js" / "app.js").write_text("init();\n")
+    (static / "logo.png").write_bytes(b"\x89PNG" + b"\x00" * 400)
+    return static
+
+class TestNegotiateEncoding:
+    """Test suite for Accept-Encoding negotiation"""
+
+    def test_preference_order(self):
+        """Test the first available encoding the client accepts wins"""
+        assert negotiate_encoding("gzip, deflate, br", ["br", "gzip"]) == "br"
+        assert negotiate_encoding("gzip", ["br", "gzip"]) == "gzip"
+        assert negotiate_encoding("", ["br", "gzip"]) is None
+
+    def test_quality_values(self):
+        """Test q=0 refuses an encoding and * accepts any"""
+        assert negotiate_encoding("br;q=0, gzip;q=0.5", ["br", "gzip"]) == "gzip"
+        assert negotiate_encoding("*", ["gzip"]) == "gzip"
+        assert negotiate_encoding("*, gzip;q=0", ["gzip"]) is None
+
+class TestBuildAssets:
+    """Test suite for build_assets"""
+
+    def test_build_fingerprints_and_compresses(self, static_dir, tmp_path):
+        """Test fingerprinted names and precompressed variants of text files"""
+        build_dir = tmp_path / "build"
+        assets = build_assets(str(static_dir), str(build_dir))
+
+        css = assets["css/styles.css"]
+        assert css["path"] == fingerprint_name("css/styles.css", css["digest"])
+        assert css["path"] != "css/styles.css"
+        assert "gzip" in css["encodings"]
+        assert gzip.decompress((build_dir / (css["path"] + ".gz")).read_bytes()).decode() == CSS
+
+        # Small and binary files are not compressed
+        assert assets["js/app.js"]["encodings"] == []
+        assert assets["logo.png"]["encodings"] == []
+        assert load_manifest(str(build_dir)) == assets
+
+    def test_rebuild_skips_unchanged_and_prunes_old(self, static_dir, tmp_path):
+        """Test that unchanged files are kept and files two builds old are removed"""
+        build_dir = tmp_path / "build"
+        first = build_assets(str(static_dir), str(build_dir))["css/styles.css"]["path"]
+        mtime = os.stat(build_dir / first).st_mtime_ns
+
+        assert build_assets(str(static_dir), str(build_dir))["css/styles.css"]["path"] == first
+        assert os.stat(build_dir / first).st_mtime_ns == mtime
+
+        (static_dir / "css" / "styles.css").write_text(CSS + "a {}\n")
+        second = build_assets(str(static_dir), str(build_dir))["css/styles.css"]["path"]
+        assert second != first
+        assert (build_dir / first).exists()
+
+        (static_dir / "css" / "styles.css").write_text(CSS + "b {}\n")
+        build_assets(str(static_dir), str(build_dir))
+        assert not (build_dir / first).exists()
+        assert not (build_dir / (first + ".gz")).exists()
+
+    def test_main(self, static_dir, tmp_path, capsys):
+        """Test building ahead of deployment"""
+        assert main([str(tmp_path)]) == 0
+
+        assert "css/styles.css -> css/styles." in capsys.readouterr().out
+        assert (tmp_path / "build" / "manifest.json").exists()
+        assert main([str(tmp_path / "missing")]) == 1
+
+class TestAssetStore:
+    """Test suite for AssetStore"""
+
+    def test_load_and_url(self, static_dir, tmp_path):
+        """Test fingerprinted URLs and cache headers"""
+        store = AssetStore(str(static_dir), str(tmp_path / "build"))
+        assert store.load() == 3
+
+        url = store.url("css/styles.css")
+        assert url.startswith("/static/css/styles.") and url != "/static/css/styles.css"
+        assert store.url("unknown.js") == "/static/unknown.js"
+
+        asset = store.get(url[len("/static/"):])
+        assert asset.cache_control == IMMUTABLE_CACHE_CONTROL
+        assert asset.content_type == "text/css; charset=utf-8"
+        assert store.get("css/styles.css").cache_control == REVALIDATE_CACHE_CONTROL
+
+        encoding, content = asset.select("gzip, deflate")
+        assert encoding == "gzip"
+        assert gzip.decompress(content).decode() == CSS
+        assert asset.select("identity") == (None, CSS.encode())
+
+    def test_load_prebuilt_without_sources(self, static_dir, tmp_path):
+        """Test serving a build shipped without the source directory"""
+        build_assets(str(static_dir), str(tmp_path / "build"))
+
+        store = AssetStore(str(tmp_path / "missing"), str(tmp_path / "build"))
+
+        assert store.load() == 3
+        assert store.get("js/app.js").variants[None] == b"init();\n"
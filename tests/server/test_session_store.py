@@ -0,0 +1,138 @@
+"""
+Tests for the web admin session store
+"""
+import os
+import json
+import time
+
+import pytest
+
+from server.session_store import SessionStore
+
+class FakeClock:
+    """Controllable monotonic and wall clocks"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.wall = 1_700_000_000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.wall
+
+    def advance(self, seconds):
+        self.now += seconds
+        self.wall += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+def make_store(clock, **kwargs):
+    """Session store driven by the fake clock"""
+    return SessionStore(clock=clock.monotonic, wall_clock=clock.time, **kwargs)
+
+class TestSessionStore:
+    """Test suite for SessionStore"""
+
+    def test_create_and_expire(self, clock):
+        """Test sessions are valid until their TTL passes"""
+        store = make_store(clock, ttl=60)
+        session_id = store.create("admin")
+
+        assert store.get(session_id).username == "admin"
+        clock.advance(59)
+        assert session_id in store
+        clock.advance(1)
+        assert store.get(session_id) is None
+        assert len(store) == 0
+
+    def test_sweep_removes_unvisited_sessions(self, clock):
+        """Test expired sessions are removed without being presented again"""
+        store = make_store(clock, ttl=60)
+        for _ in range(5):
+            store.create("admin")
+        clock.advance(30)
+        keep = store.create("admin")
+        clock.advance(30)
+
+        assert store.sweep() == 5
+        assert len(store) == 1
+        assert keep in store
+
+    def test_pop(self, clock):
+        """Test logout removes the session"""
+        store = make_store(clock)
+        session_id = store.create("admin")
+
+        assert store.pop(session_id).username == "admin"
+        assert store.pop(session_id) is None
+        assert session_id not in store
+
+    def test_bounded_sessions(self, clock):
+        """Test the session closest to expiring is evicted when the store is full"""
+        store = make_store(clock, ttl=60, max_sessions=3)
+        first = store.create("a")
+        clock.advance(1)
+        others = [store.create(name) for name in ("b", "c", "d")]
+
+        assert len(store) == 3
+        assert first not in store
+        assert all(session_id in store for session_id in others)
+
+    def test_heap_stays_bounded(self, clock):
+        """Test stale heap entries of logged-out sessions are compacted"""
+        store = make_store(clock)
+        for _ in range(1000):
+            store.pop(store.create("admin"))
+
+        assert len(store) == 0
+        assert len(store._heap) <= 64 + 1
+
+    def test_background_sweeper(self):
+        """Test the sweeper thread removes expired sessions"""
+        store = SessionStore(ttl=0.01, sweep_interval=0.01)
+        store.create("admin")
+        store.start()
+        try:
+            deadline = time.time() + 2
+            while len(store) and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            store.stop()
+
+        assert len(store) == 0
+
+class TestSessionPersistence:
+    """Test suite for saving and loading sessions"""
+
+    def test_sessions_survive_restart(self, clock, tmp_path):
+        """Test live sessions are restored with their remaining lifetime"""
+        path = str(tmp_path / "sessions.json")
+        store = make_store(clock, ttl=60, persist_path=path)
+        live = store.create("admin")
+        expired = store.create("admin", ttl=5)
+        clock.advance(10)
+        store.stop()
+
+        assert oct(os.stat(path).st_mode & 0o777) == "0o600"
+
+        # A restart resets the monotonic clock but not the wall clock
+        clock.now = 5.0
+        restored = make_store(clock, ttl=60, persist_path=path)
+
+        assert restored.get(live).username == "admin"
+        assert expired not in restored
+        clock.advance(49)
+        assert live in restored
+        clock.advance(1)
+        assert live not in restored
+
+    def test_unreadable_file_ignored(self, clock, tmp_path):
+        """Test a corrupt sessions file starts an empty store"""
+        path = tmp_path / "sessions.json"
+        path.write_text("{not json")
+
+        assert len(make_store(clock, persist_path=str(path))) == 0
@@ -6,6 +6,7 @@ from unittest.mock import patch, MagicMock
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
 import secrets
+import json
 
 from server.web_admin import WebAdmin, SESSIONS
 
@@ -37,7 +38,7 @@ def test_login_page_get(mock_load_config, client):
     assert "Password" in response.text
     
 @patch("server.web_admin.load_yaml_config")
-@patch("server.web_admin.verify_password_hash")
+@patch("server.web_admin.password_verifier.verify_func")
 def test_login_success(mock_verify_password, mock_load_config, client):
     """Test successful login"""
     # Mock config with admin credentials
@@ -68,11 +69,11 @@ def test_login_success(mock_verify_password, mock_load_config, client):
     
     # Verify session was created
     assert len(SESSIONS) == 1
-    session = list(SESSIONS.values())[0]
-    assert session["username"] == "admin"
+    session = SESSIONS.get(session_cookie.value)
+    assert session.username == "admin"
     
 @patch("server.web_admin.load_yaml_config")
-@patch("server.web_admin.verify_password_hash")
+@patch("server.web_admin.password_verifier.verify_func")
 def test_login_incorrect_password(mock_verify_password, mock_load_config, client):
     """Test login with incorrect password"""
     # Mock config with admin credentials
@@ -104,12 +105,7 @@ def test_login_incorrect_password(mock_verify_password, mock_load_config, client
 def test_logout(client):
     """Test logout functionality"""
     # Create a session
-    session_id = secrets.token_urlsafe(32)
-    SESSIONS[session_id] = {
-        "username": "admin",
-        "created_at": "2023-01-01T00:00:00",
-        "expires_at": "2099-01-01T00:00:00"  # Far future
-    }
+    session_id = SESSIONS.create("admin")
     
     # Set session cookie
     client.cookies.set("lsl_admin_session", session_id)
@@ -135,12 +131,7 @@ def test_dashboard_authenticated(mock_load_config, client):
     mock_load_config.return_value = {"admin": {}}
     
     # Create a session
-    session_id = secrets.token_urlsafe(32)
-    SESSIONS[session_id] = {
-        "username": "admin",
-        "created_at": "2023-01-01T00:00:00",
-        "expires_at": "2099-01-01T00:00:00"  # Far future
-    }
+    session_id = SESSIONS.create("admin")
     
     # Set session cookie
     client.cookies.set("lsl_admin_session", session_id)
@@ -173,20 +164,10 @@ def test_session_validation():
     web_admin = WebAdmin(app)
     
     # Create a valid session
-    valid_session_id = secrets.token_urlsafe(32)
-    SESSIONS[valid_session_id] = {
-        "username": "admin",
-        "created_at": "2023-01-01T00:00:00",
-        "expires_at": "2099-01-01T00:00:00"  # Far future
-    }
+    valid_session_id = SESSIONS.create("admin")
     
     # Create an expired session
-    expired_session_id = secrets.token_urlsafe(32)
-    SESSIONS[expired_session_id] = {
-        "username": "admin",
-        "created_at": "2023-01-01T00:00:00",
-        "expires_at": "2001-01-01T00:00:00"  # Past
-    }
+    expired_session_id = SESSIONS.create("admin", ttl=-1)
     
     # Check valid session
     assert web_admin._validate_session(valid_session_id) is True
@@ -199,3 +180,124 @@ def test_session_validation():
     
     # Check non-existent session
     assert web_admin._validate_session("nonexistent") is False
+    
+@pytest.fixture
+def site_client(tmp_path, monkeypatch):
+    """Test client for a web admin using the repository templates, a built stylesheet and sample config"""
+    import shutil
+    import yaml
+    users = {f"user{i:03d}": {"uuid": f"{i:08x}-0000-4000-a000-000000000000",
+                              "password_hash": "pbkdf2-sha256$1000$aa$bb",
+                              "allowed_containers": ["alpine"],
+                              "metadata": {"email": f"user{i}@example.com", "role": "dev" if i % 2 else "ops"}}
+             for i in range(120)}
+    (tmp_path / "users.yaml").write_text(yaml.safe_dump({"users": users}))
+    (tmp_path / "containers.yaml").write_text(yaml.safe_dump({"containers": {"alpine": {"image": "alpine:3.19"}}}))
+    monkeypatch.setattr("server.web_admin.USERS_CONFIG_PATH", str(tmp_path / "users.yaml"))
+    monkeypatch.setattr("server.web_admin.CONTAINERS_CONFIG_PATH", str(tmp_path / "containers.yaml"))
+    site = tmp_path / "site"
+    shutil.copytree("docs/templates", site / "templates")
+    (site / "static" / "css").mkdir(parents=True)
+    (site / "static" / "css" / "styles.css").write_text("body { margin: 0; }\n" * 50)
+    app = FastAPI()
+    WebAdmin(app, site_dir=str(site), build_dir=str(tmp_path / "build"))
+    return TestClient(app)
+
+def test_static_assets_fingerprinted_and_precompressed(site_client):
+    """Test pages link fingerprinted assets served with immutable caching"""
+    page = site_client.get("/admin/login")
+    href = page.text.split('rel="stylesheet" href="')[1].split('"')[0]
+    assert href.startswith("/static/css/styles.") and href != "/static/css/styles.css"
+    
+    response = site_client.get(href, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "immutable" in response.headers["cache-control"]
+    assert response.text.startswith("body { margin: 0; }")
+    
+    cached = site_client.get(href, headers={"If-None-Match": response.headers["etag"]})
+    assert cached.status_code == 304
+    assert site_client.get("/static/css/missing.css").status_code == 404
+    
+def test_login_page_render_cached(site_client):
+    """Test the login page is rendered once and revalidated by ETag"""
+    first = site_client.get("/admin/login")
+    second = site_client.get("/admin/login", headers={"If-None-Match": first.headers["etag"]})
+    
+    assert first.status_code == 200
+    assert "Username" in first.text
+    assert second.status_code == 304
+    
+def test_user_list_api(site_client):
+    """Test paginated, filtered and sorted user queries"""
+    assert site_client.get("/admin/api/users").status_code == 401
+    site_client.cookies.set("lsl_admin_session", SESSIONS.create("admin"))
+    
+    page = site_client.get("/admin/api/users", params={"offset": 100, "limit": 50}).json()
+    assert page["total"] == 120
+    assert [u["username"] for u in page["items"]][:2] == ["user100", "user101"]
+    assert len(page["items"]) == 20
+    
+    page = site_client.get("/admin/api/users", params={"q": "user1", "mode": "prefix", "field": "email",
+                                                       "role": "ops", "sort": "email", "order": "desc"}).json()
+    assert page["items"][0]["email"] == "user18@example.com"
+    assert all(u["role"] == "ops" for u in page["items"])
+    
+    assert site_client.get("/admin/api/users", params={"sort": "password_hash"}).status_code == 400
+    
+def test_user_list_api_reports_clamped_page(site_client):
+    """Test the page echoes the offset and limit the index actually used"""
+    site_client.cookies.set("lsl_admin_session", SESSIONS.create("admin"))
+    
+    page = site_client.get("/admin/api/users", params={"offset": -5, "limit": 10000}).json()
+    
+    assert page["offset"] == 0
+    assert page["limit"] == 500
+    assert len(page["items"]) == 120
+    
+def test_list_pages_show_unloadable_config(site_client, tmp_path):
+    """Test an invalid users.yaml renders an error on the page instead of failing the request"""
+    site_client.cookies.set("lsl_admin_session", SESSIONS.create("admin"))
+    (tmp_path / "users.yaml").write_text("users: [unclosed\n")
+    
+    response = site_client.get("/admin/users")
+    
+    assert response.status_code == 500
+    assert "Cannot load users.yaml" in response.text
+    assert "No users found" in response.text
+    
+def test_user_list_page_embeds_first_page(site_client):
+    """Test the user page renders the first page and the filter choices"""
+    site_client.cookies.set("lsl_admin_session", SESSIONS.create("admin"))
+    
+    response = site_client.get("/admin/users", params={"q": "user11"})
+    
+    assert response.status_code == 200
+    assert "user110@example.com" in response.text
+    assert "user020@example.com" not in response.text
+    assert 'id="users-initial"' in response.text
+    assert "ops (60)" in response.text
+    assert "alpine:3.19" in site_client.get("/admin/containers").text
+    
+def test_user_bulk_import_and_export(site_client):
+    """Test streamed import progress and export downloads"""
+    body = '{"username": "imported", "password_hash": "pbkdf2-sha256$1000$aa$bb"}\n'
+    assert site_client.post("/admin/api/users/import?format=jsonl", content=body).status_code == 401
+    site_client.cookies.set("lsl_admin_session", SESSIONS.create("admin"))
+    
+    response = site_client.post("/admin/api/users/import", content=body,
+                                headers={"Content-Type": "application/x-ndjson"})
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert events[-1]["event"] == "done" and events[-1]["created"] == 1
+    
+    events = [json.loads(line) for line in site_client.post("/admin/api/users/import?format=jsonl",
+                                                            content=body).text.splitlines()]
+    assert "already exists" in events[0]["errors"][0]["error"]
+    assert site_client.post("/admin/api/users/import", content=body).status_code == 400
+    
+    response = site_client.get("/admin/api/users/export", params={"format": "csv"})
+    assert response.headers["content-disposition"] == 'attachment; filename="users.csv"'
+    assert len(response.text.splitlines()) == 122
+    assert "password_hash" not in response.text
+    assert site_client.get("/admin/api/users", params={"q": "imported"}).json()["total"] == 1
@@ -0,0 +1,214 @@
+"""
+Tests for bulk user import and export
+"""
+import io
+import csv
+import json
+
+import pytest
+import yaml
+
+from shared.user_bulk import (
+    RecordError, normalize_record, read_csv, read_jsonl, read_yaml, import_users, export_users, detect_format,
+    main, CONFLICT_SKIP, CONFLICT_UPDATE
+)
+from shared.utils.uuid_hash import verify_password_hash
+
+HASH = "pbkdf2-sha256$1000$aa$bb"
+
+def existing_users(path, count=2):
+    """Write a users.yaml with count users"""
+    users = {f"old{i}": {"uuid": f"{i:08x}-0000-4000-a000-000000000000", "password_hash": HASH,
+                         "metadata": {"email": f"old{i}@example.com"}}
+             for i in range(count)}
+    path.write_text(yaml.safe_dump({"users": users}))
+    return users
+
+def run_import(records, path, **kwargs):
+    """Import records with cheap password hashes; return all events"""
+    return list(import_users(records, str(path), iterations=1000, chunk_size=3, **kwargs))
+
+class TestReaders:
+    """Test suite for the input readers and record normalization"""
+
+    def test_read_csv_and_jsonl(self):
+        """Test empty CSV cells are left out and blank JSON lines skipped"""
+        rows = list(read_csv(io.StringIO("username,email,role\nalice,a@example.com,\n")))
+        assert rows == [{"username": "alice", "email": "a@example.com"}]
+
+        records = list(read_jsonl(io.StringIO('{"username": "bob"}\n\n{"username": "eve"}\n')))
+        assert [r["username"] for r in records] == ["bob", "eve"]
+        with pytest.raises(ValueError):
+            list(read_jsonl(io.StringIO("[1, 2]\n")))
+
+    def test_read_yaml_streams_users(self):
+        """Test users are read one by one, other sections ignored"""
+        text = yaml.safe_dump({"defaults": {"x": 1}, "users": {"a": {"uuid": "u1"}, "b": {"uuid": "u2"}}})
+        reader = read_yaml(io.StringIO(text))
+        assert next(reader) == {"uuid": "u1", "username": "a"}
+        assert [r["username"] for r in reader] == ["b"]
+        assert list(read_yaml(io.StringIO("users: {}\n"))) == []
+        assert list(read_yaml(io.StringIO(""))) == []
+
+    def test_normalize_flat_record(self):
+        """Test flat fields are mapped onto a users.yaml entry"""
+        username, user, password = normalize_record(
+            {"Student ID": "s1", "password": "pw", "email": "s1@example.com", "Grade": "7",
+             "allowed_containers": "alpine; ubuntu", "locked": "no"},
+            field_map={"Student ID": "username"})
+        assert username == "s1"
+        assert password == "pw"
+        assert user == {"allowed_containers": ["alpine", "ubuntu"], "locked": False,
+                        "metadata": {"email": "s1@example.com", "Grade": "7"}}
+
+    def test_normalize_rejects_bad_records(self):
+        """Test records without a usable username or credentials"""
+        with pytest.raises(RecordError):
+            normalize_record({"username": "bad name", "password": "pw"})
+        with pytest.raises(RecordError):
+            normalize_record({"username": "alice", "password": "pw", "password_hash": HASH})
+
+    def test_detect_format(self):
+        """Test formats by file extension"""
+        assert detect_format("users.CSV") == "csv"
+        assert detect_format("dump.ndjson") == "jsonl"
+        assert detect_format("users.yml") == "yaml"
+        assert detect_format("users.txt") is None
+
+class TestImport:
+    """Test suite for import_users"""
+
+    def test_import_hashes_and_commits_once(self, tmp_path):
+        """Test chunked progress events and the written users"""
+        path = tmp_path / "users.yaml"
+        existing_users(path)
+        records = [{"username": f"new{i}", "password": f"pw{i}", "role": "student"} for i in range(7)]
+
+        events = run_import(records, path)
+        assert [e["records"] for e in events[:-1]] == [3, 3, 1]
+        assert events[-1]["created"] == 7 and events[-1]["committed"]
+
+        users = yaml.safe_load(path.read_text())["users"]
+        assert len(users) == 9
+        assert verify_password_hash("pw4", users["new4"]["password_hash"])
+        assert users["new4"]["metadata"] == {"role": "student"}
+        assert len({u["uuid"] for u in users.values()}) == 9
+
+    def test_invalid_records_abort_import(self, tmp_path):
+        """Test nothing is written when a record is invalid, unless skip_invalid is set"""
+        path = tmp_path / "users.yaml"
+        existing_users(path)
+        before = path.read_text()
+        records = [{"username": "ok", "password": "pw"},
+                   {"username": "bad", "password": "pw", "resource_limits": {"cpu": "lots"}},
+                   {"username": "ok", "password": "again"}]
+
+        events = run_import(records, path)
+        errors = events[0]["errors"]
+        assert {e.get("username") for e in errors} == {None, "bad"}
+        assert any("Duplicate" in e["error"] for e in errors)
+        assert not events[-1]["committed"]
+        assert path.read_text() == before
+
+        events = run_import(records, path, skip_invalid=True)
+        assert events[-1]["created"] == 1
+        assert "ok" in yaml.safe_load(path.read_text())["users"]
+
+    def test_conflict_policies(self, tmp_path):
+        """Test existing users are rejected, skipped without hashing or updated keeping their UUID"""
+        path = tmp_path / "users.yaml"
+        users = existing_users(path)
+        records = [{"username": "old0", "password": "pw", "email": "new@example.com"}]
+
+        assert run_import(records, path)[-1]["invalid"] == 1
+
+        events = run_import(records, path, on_conflict=CONFLICT_SKIP)
+        assert events[-1]["skipped"] == 1 and events[-1]["valid"] == 0
+
+        events = run_import(records, path, on_conflict=CONFLICT_UPDATE)
+        assert events[-1]["updated"] == 1
+        updated = yaml.safe_load(path.read_text())["users"]["old0"]
+        assert updated["uuid"] == users["old0"]["uuid"]
+        assert updated["metadata"] == {"email": "new@example.com"}
+
+    def test_update_merges_into_existing_user(self, tmp_path):
+        """Test fields an update leaves out survive, and updates need no password"""
+        path = tmp_path / "users.yaml"
+        users = existing_users(path)
+        users["old0"].update(allowed_containers=["alpine"], token="ab" * 16)
+        path.write_text(yaml.safe_dump({"users": users}))
+
+        events = run_import([{"username": "old0", "role": "teacher"}], path, on_conflict=CONFLICT_UPDATE)
+        assert events[-1]["updated"] == 1
+
+        updated = yaml.safe_load(path.read_text())["users"]["old0"]
+        assert updated == dict(users["old0"], metadata={"email": "old0@example.com", "role": "teacher"})
+
+        events = run_import([{"username": "old1", "allowed_containers": 5}, {"username": "new"}], path,
+                            on_conflict=CONFLICT_UPDATE)
+        errors = {e.get("username", e.get("record")): e["error"] for e in events[0]["errors"]}
+        assert "allowed_containers" in errors["old1"]
+        assert errors[2] == "Missing password or password_hash"
+
+    def test_uuid_clash_with_existing_user(self, tmp_path):
+        """Test a new user can't take the UUID of another user"""
+        path = tmp_path / "users.yaml"
+        users = existing_users(path)
+        events = run_import([{"username": "new", "uuid": users["old1"]["uuid"], "password_hash": HASH}], path)
+        assert "already used by 'old1'" in events[0]["errors"][0]["error"]
+
+    def test_dry_run_and_missing_file(self, tmp_path):
+        """Test a dry run validates without creating the file"""
+        path = tmp_path / "users.yaml"
+        events = run_import([{"username": "a", "password": "pw"}], path, dry_run=True)
+        assert events[-1]["valid"] == 1 and not events[-1]["committed"]
+        assert not path.exists()
+
+class TestExport:
+    """Test suite for export_users"""
+
+    def test_export_formats_round_trip(self, tmp_path):
+        """Test exports stream one user per chunk and can be imported again"""
+        path = tmp_path / "users.yaml"
+        existing_users(path, count=3)
+
+        lines = list(export_users(str(path), "jsonl"))
+        assert len(lines) == 3
+        assert "password_hash" not in json.loads(lines[0])
+
+        rows = list(csv.DictReader(io.StringIO("".join(export_users(str(path), "csv")))))
+        assert rows[1]["username"] == "old1" and rows[1]["email"] == "old1@example.com"
+
+        dumped = "".join(export_users(str(path), "yaml", include_secrets=True))
+        assert yaml.safe_load(dumped) == yaml.safe_load(path.read_text())
+
+        copy = tmp_path / "copy.yaml"
+        assert run_import(read_yaml(io.StringIO(dumped)), copy)[-1]["created"] == 3
+
+    def test_export_missing_file(self, tmp_path):
+        """Test exports of a missing users file are empty"""
+        missing = str(tmp_path / "none.yaml")
+        assert "".join(export_users(missing, "yaml")) == "users: {}\n"
+        assert "".join(export_users(missing, "jsonl")) == ""
+        with pytest.raises(ValueError):
+            list(export_users(missing, "xml"))
+
+class TestCommandLine:
+    """Test suite for the lsl-users command"""
+
+    def test_import_and_export(self, tmp_path, capsys):
+        """Test importing a mapped CSV and exporting it again"""
+        source = tmp_path / "sis.csv"
+        source.write_text("Student ID,password_hash,Email\ns1,%s,s1@example.com\n" % HASH)
+        users_file = str(tmp_path / "users.yaml")
+
+        assert main(["--users-file", users_file, "import", str(source), "--map", "Student ID=username",
+                     "--map", "Email=email"]) == 0
+        assert "created 1" in capsys.readouterr().err
+
+        assert main(["--users-file", users_file, "import", str(source), "--map", "Student ID=username"]) == 1
+        assert "already exists" in capsys.readouterr().err
+
+        output = tmp_path / "out.jsonl"
+        assert main(["--users-file", users_file, "export", "-o", str(output)]) == 0
+        assert json.loads(output.read_text())["metadata"] == {"email": "s1@example.com"}
@@ -0,0 +1,38 @@
+"""
+Tests for derived image utilities
+"""
+from shared.utils.derived_image import (
+    derived_image_tag, has_setup_steps, render_dockerfile, setup_hash
+)
+
+class TestDerivedImage:
+    """Test suite for derived image naming and Dockerfile rendering"""
+
+    def test_tag_keyed_by_digest_and_steps(self):
+        """Test that the tag changes with the base digest and the steps only"""
+        setup = {"packages": ["screen", "curl"], "commands": ["echo hi"]}
+        tag = derived_image_tag("ubuntu:22.04", "sha256:aaa", setup)
+
+        assert tag.startswith("lsl-setup/ubuntu-22.04:")
+        # Package order does not matter
+        assert tag == derived_image_tag("ubuntu:22.04", "sha256:aaa",
+                                        {"packages": ["curl", "screen"], "commands": ["echo hi"]})
+        assert tag != derived_image_tag("ubuntu:22.04", "sha256:bbb", setup)
+        assert tag != derived_image_tag("ubuntu:22.04", "sha256:aaa", dict(setup, commands=["echo bye"]))
+
+    def test_empty_setup_has_no_steps(self):
+        """Test detection of empty setup definitions"""
+        assert not has_setup_steps(None)
+        assert not has_setup_steps({"packages": [], "commands": []})
+        assert has_setup_steps({"commands": ["true"]})
+
+    def test_render_dockerfile(self):
+        """Test the rendered Dockerfile installs packages before running commands"""
+        setup = {"packages": ["screen"], "commands": ["mkdir -p /run/sshd"]}
+        dockerfile = render_dockerfile("ubuntu:22.04", "sha256:aaa", setup).splitlines()
+
+        assert dockerfile[0] == "FROM ubuntu:22.04"
+        assert f'lsl.setup.hash="{setup_hash(setup)}"' in dockerfile[1]
+        assert "apt-get install -y --no-install-recommends screen" in dockerfile[2]
+        assert "apk add --no-cache screen" in dockerfile[2]
+        assert dockerfile[3] == "RUN mkdir -p /run/sshd"
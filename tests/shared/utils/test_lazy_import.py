@@ -0,0 +1,31 @@
+"""
+Tests for the lazy import utility
+"""
+import sys
+from unittest.mock import patch
+
+from shared.utils.lazy_import import lazy_import
+
+class TestLazyImport:
+    """Test suite for lazy module proxies"""
+
+    def test_import_deferred_until_attribute_access(self):
+        """Test that the module is imported on first attribute access only"""
+        sys.modules.pop("colorsys", None)
+        colorsys = lazy_import("colorsys")
+
+        assert "colorsys" not in sys.modules
+        assert "not loaded" in repr(colorsys)
+
+        assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert "colorsys" in sys.modules
+
+    def test_patch_shadows_and_restores_attribute(self):
+        """Test that mock.patch on the proxy overrides and then restores the real attribute"""
+        json = lazy_import("json")
+        real_dumps = json.dumps
+
+        with patch.object(json, "dumps", return_value="patched"):
+            assert json.dumps({}) == "patched"
+
+        assert json.dumps is real_dumps
@@ -0,0 +1,175 @@
+"""
+Tests for the log query tool
+"""
+import json
+import datetime
+
+import pytest
+
+from shared.utils.log_query import (
+    LogIndex, LogQuery, parse_time, line_timestamp, rotated_files, query_file, query_logs, main
+)
+
+START = datetime.datetime(2024, 5, 1, 12, 0, 0)
+
+def write_log(path, count, start=START, level_every=10, mode="w"):
+    """Write JSON log lines one second apart; every level_every-th record is a warning"""
+    with open(path, mode) as f:
+        for i in range(count):
+            record = {
+                "timestamp": (start + datetime.timedelta(seconds=i)).isoformat(),
+                "level": "WARNING" if i % level_every == 0 else "INFO",
+                "message": f"request {i}",
+                "logger": "lsl_server" if i % 2 else "web_admin",
+                "client": f"c{i % 3}",
+                "source": {"function": "ping"}
+            }
+            f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+def ts(seconds):
+    """Timestamp of the record written at the given second"""
+    return (START + datetime.timedelta(seconds=seconds)).isoformat()
+
+class TestHelpers:
+    """Test suite for time parsing and file discovery"""
+
+    def test_parse_time(self):
+        """Test absolute and relative times"""
+        assert parse_time("2024-05-01T12:00") == "2024-05-01T12:00:00"
+        assert parse_time("2h", now=START) == "2024-05-01T10:00:00"
+        with pytest.raises(ValueError):
+            parse_time("yesterday")
+
+    def test_line_timestamp(self):
+        """Test the timestamp is read from the line prefix, with a parsing fallback"""
+        assert line_timestamp(b'{"timestamp":"2024-05-01T12:00:00","level":"INFO"}') == "2024-05-01T12:00:00"
+        assert line_timestamp(b'{"level":"INFO","timestamp":"2024-05-01T12:00:01"}') == "2024-05-01T12:00:01"
+        assert line_timestamp(b"not json") is None
+
+    def test_rotated_files_oldest_first(self, tmp_path):
+        """Test rotations are listed before the current file, highest number first"""
+        for name in ("server.log", "server.log.1", "server.log.2", "server.log.idx", "server.log.10"):
+            (tmp_path / name).write_text("")
+
+        names = [p.rsplit("/", 1)[-1] for p in rotated_files(str(tmp_path / "server.log"))]
+
+        assert names == ["server.log.10", "server.log.2", "server.log.1", "server.log"]
+
+class TestLogIndex:
+    """Test suite for the sparse timestamp index"""
+
+    def test_index_is_sparse_and_saved(self, tmp_path):
+        """Test entries are about one stride apart and reused from disk"""
+        path = tmp_path / "server.log"
+        write_log(path, 500)
+
+        index = LogIndex(str(path), stride=4096).update()
+
+        assert index.first == ts(0) and index.last == ts(499)
+        assert 1 < len(index.entries) < 500
+        assert all(b[1] - a[1] >= 4096 for a, b in zip(index.entries, index.entries[1:]))
+        saved = json.loads((tmp_path / "server.log.idx").read_text())
+        assert saved["size"] == path.stat().st_size
+
+    def test_index_extended_after_append(self, tmp_path):
+        """Test appended lines are indexed without rescanning the file"""
+        path = tmp_path / "server.log"
+        write_log(path, 100)
+        first = LogIndex(str(path), stride=1024).update()
+        entries = list(first.entries)
+
+        write_log(path, 100, start=START + datetime.timedelta(seconds=100), mode="a")
+        index = LogIndex(str(path), stride=1024).update()
+
+        assert index.entries[:len(entries)] == entries
+        assert index.last == ts(199)
+        assert index.size == path.stat().st_size
+
+    def test_index_rebuilt_for_new_file(self, tmp_path):
+        """Test a file replaced at the same path (rotation) gets a new index"""
+        path = tmp_path / "server.log"
+        write_log(path, 100)
+        LogIndex(str(path), stride=1024).update()
+
+        path.unlink()
+        write_log(path, 10, start=START + datetime.timedelta(days=1))
+        index = LogIndex(str(path), stride=1024).update()
+
+        assert index.first == (START + datetime.timedelta(days=1)).isoformat()
+
+    def test_start_offset(self, tmp_path):
+        """Test scanning starts at the last entry before the requested time"""
+        path = tmp_path / "server.log"
+        write_log(path, 500)
+        index = LogIndex(str(path), stride=4096).update()
+
+        offset = index.start_offset(ts(300))
+
+        assert 0 < offset <= path.read_bytes().index(ts(300).encode()) - len('{"timestamp":"')
+        assert index.start_offset(None) == 0
+
+class TestQuery:
+    """Test suite for record filters"""
+
+    def test_time_range_level_and_logger(self, tmp_path):
+        """Test combined filters"""
+        path = tmp_path / "server.log"
+        write_log(path, 500)
+        query = LogQuery(since=ts(100), until=ts(199), level="WARNING", loggers=["web_admin"])
+
+        records = list(query_file(str(path), query, stride=4096))
+
+        assert [r["message"] for r in records] == [f"request {i}" for i in range(100, 200, 10)]
+
+    def test_fields_and_grep(self, tmp_path):
+        """Test field filters, including nested fields, and message search"""
+        path = tmp_path / "server.log"
+        write_log(path, 30)
+        query = LogQuery(fields={"client": "c1", "source.function": "ping"}, grep="request 2")
+
+        records = list(query_file(str(path), query))
+
+        assert [r["message"] for r in records] == ["request 22", "request 25", "request 28"]
+
+    def test_prefilter_skips_parsing(self, tmp_path):
+        """Test lines without the needles are rejected before JSON parsing"""
+        query = LogQuery(level="ERROR", fields={"client": "c1"})
+        assert not query.prefilter(b'{"timestamp":"x","level":"INFO","client":"c1"}')
+        assert query.prefilter(b'{"timestamp":"x","level":"ERROR","client":"c1"}')
+
+    def test_rotations_searched_in_order(self, tmp_path):
+        """Test a query covers every rotation, oldest first, and skips files outside the range"""
+        write_log(tmp_path / "server.log.1", 10)
+        write_log(tmp_path / "server.log", 10, start=START + datetime.timedelta(seconds=10))
+
+        all_records = list(query_logs([str(tmp_path / "server.log")], LogQuery()))
+        recent = list(query_logs([str(tmp_path / "server.log")], LogQuery(since=ts(15))))
+
+        assert [r["message"] for r in all_records] == [f"request {i}" for i in range(10)] * 2
+        assert len(recent) == 5
+        assert json.loads((tmp_path / "server.log.1.idx").read_text())["last"] == ts(9)
+
+    def test_unknown_level(self):
+        """Test an unknown level is rejected"""
+        with pytest.raises(ValueError):
+            LogQuery(level="LOUD")
+
+class TestMain:
+    """Test suite for the lsl-logs command"""
+
+    def test_count(self, tmp_path, capsys):
+        """Test --count prints the number of matching records"""
+        path = tmp_path / "server.log"
+        write_log(path, 100)
+
+        assert main([str(path), "--level", "warning", "--since", ts(50), "-c"]) == 0
+        assert capsys.readouterr().out.strip() == "5"
+
+    def test_limit(self, tmp_path, capsys):
+        """Test --limit stops after the given number of records"""
+        path = tmp_path / "server.log"
+        write_log(path, 100)
+
+        assert main([str(path), "--field", "client=c0", "-n", "2"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert [json.loads(line)["message"] for line in lines] == ["request 0", "request 3"]
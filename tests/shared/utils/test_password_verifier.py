@@ -0,0 +1,129 @@
+"""
+Tests for the off-loop password verifier
+"""
+import time
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from shared.utils.uuid_hash import hash_password, verify_password, verify_password_hash
+from shared.utils.password_verifier import PasswordVerifier, VerifierBusyError
+
+class TestPasswordHash:
+    """Test suite for password hash verification"""
+
+    def test_verify_password(self):
+        """Test matching and mismatching passwords"""
+        stored = hash_password("secret", iterations=1000)
+        assert verify_password("secret", stored)
+        assert not verify_password("Secret", stored)
+
+    def test_verify_password_hash_malformed(self):
+        """Test malformed hashes are a mismatch instead of an error"""
+        with pytest.raises(ValueError):
+            verify_password("secret", "plain")
+        assert not verify_password_hash("secret", "plain")
+        assert not verify_password_hash("secret", "pbkdf2-sha256$1000$abc$1234")
+
+class TestPasswordVerifier:
+    """Test suite for PasswordVerifier"""
+
+    def test_successes_are_cached(self):
+        """Test a verified credential skips the check until it expires"""
+        verify_func = MagicMock(return_value=True)
+        verifier = PasswordVerifier(verify_func=verify_func, cache_ttl=60)
+
+        assert verifier.verify("admin", "secret", "hash")
+        assert verifier.verify("admin", "secret", "hash")
+        assert verify_func.call_count == 1
+        assert verifier.counters["cache_hits"] == 1
+
+        # A different password, user or stored hash is a different credential
+        verifier.verify("admin", "other", "hash")
+        verifier.verify("root", "secret", "hash")
+        verifier.verify("admin", "secret", "new-hash")
+        assert verify_func.call_count == 4
+
+    def test_failures_are_not_cached(self):
+        """Test a rejected credential is checked every time"""
+        verify_func = MagicMock(return_value=False)
+        verifier = PasswordVerifier(verify_func=verify_func)
+
+        assert not verifier.verify("admin", "wrong", "hash")
+        assert not verifier.verify("admin", "wrong", "hash")
+        assert verify_func.call_count == 2
+        assert verifier.counters["rejected"] == 2
+
+    def test_cache_expires_and_forget(self):
+        """Test expiry and per-user invalidation"""
+        verify_func = MagicMock(return_value=True)
+        verifier = PasswordVerifier(verify_func=verify_func, cache_ttl=0.05)
+
+        verifier.verify("admin", "secret", "hash")
+        time.sleep(0.06)
+        verifier.verify("admin", "secret", "hash")
+        verifier.forget("admin")
+        verifier.verify("admin", "secret", "hash")
+
+        assert verify_func.call_count == 3
+
+    def test_cache_does_not_store_password(self):
+        """Test cache keys hold a fingerprint, not the password"""
+        verifier = PasswordVerifier(verify_func=MagicMock(return_value=True))
+        verifier.verify("admin", "secret", "hash")
+
+        ((user, fingerprint),) = verifier._cache.keys()
+        assert user == "admin"
+        assert b"secret" not in fingerprint
+
+    def test_verify_async_keeps_loop_responsive(self):
+        """Test PBKDF2 runs on the pool while the event loop keeps serving other tasks"""
+        stored = hash_password("secret", iterations=200000)
+        verifier = PasswordVerifier(max_workers=2)
+        loop_threads = set()
+
+        async def heartbeat(stop):
+            ticks = 0
+            while not stop.is_set():
+                loop_threads.add(threading.get_ident())
+                ticks += 1
+                await asyncio.sleep(0.001)
+            return ticks
+
+        async def main():
+            stop = asyncio.Event()
+            ticker = asyncio.create_task(heartbeat(stop))
+            results = await asyncio.gather(*(verifier.verify_async(f"user{i}", "secret", stored)
+                                             for i in range(4)))
+            stop.set()
+            return results, await ticker
+
+        results, ticks = asyncio.run(main())
+        verifier.shutdown()
+
+        assert results == [True] * 4
+        assert ticks > 5
+
+    def test_busy_when_too_many_pending(self):
+        """Test checks beyond max_pending are rejected without queueing"""
+        release = threading.Event()
+
+        def slow_verify(password, stored_hash):
+            release.wait(5)
+            return True
+
+        verifier = PasswordVerifier(max_workers=1, max_pending=2, verify_func=slow_verify)
+
+        async def main():
+            tasks = [asyncio.create_task(verifier.verify_async(f"user{i}", "secret", "hash")) for i in range(2)]
+            await asyncio.sleep(0.01)
+            with pytest.raises(VerifierBusyError):
+                await verifier.verify_async("user3", "secret", "hash")
+            release.set()
+            return await asyncio.gather(*tasks)
+
+        assert asyncio.run(main()) == [True, True]
+        assert verifier.counters["busy"] == 1
+        verifier.shutdown()
@@ -0,0 +1,95 @@
+"""
+Tests for the port allocator
+"""
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from shared.utils.port_allocator import PortAllocator, KIND_DOCKER, KIND_HOST
+
+class TestPortAllocator:
+    """Test suite for PortAllocator"""
+
+    def test_allocate_unique_ports(self, tmp_path):
+        """Test that concurrent allocations never hand out the same port"""
+        allocator = PortAllocator(str(tmp_path), start=10000, end=10049)
+        ports = []
+
+        def allocate(index):
+            ports.append(allocator.allocate(f"c{index}"))
+
+        threads = [threading.Thread(target=allocate, args=(i,)) for i in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(ports) == list(range(10000, 10050))
+        with pytest.raises(RuntimeError):
+            allocator.allocate("one-too-many")
+
+    def test_registry_shared_between_instances(self, tmp_path):
+        """Test that a second allocator (another LSL process) sees earlier reservations"""
+        first = PortAllocator(str(tmp_path), start=10000, end=10002)
+        second = PortAllocator(str(tmp_path), start=10000, end=10002)
+
+        assert first.allocate("a") == 10000
+        assert second.allocate("b") == 10001
+        assert first.allocate("c") == 10002
+
+    def test_released_ports_reused_last(self, tmp_path):
+        """Test that a released port goes to the back of the free queue"""
+        allocator = PortAllocator(str(tmp_path), start=10000, end=10002)
+        port = allocator.allocate("a")
+
+        assert allocator.release(port)
+        assert not allocator.release(port)
+        assert [allocator.allocate(name) for name in ("b", "c", "d")] == [10001, 10002, 10000]
+
+    def test_new_instance_continues_from_shared_cursor(self, tmp_path):
+        """Test that a new allocator (a later LSL process) does not hand out a just-released port first"""
+        first = PortAllocator(str(tmp_path), start=10000, end=20000)
+        assert first.allocate("a") == 10000
+        assert first.release(10000)
+
+        assert PortAllocator(str(tmp_path), start=10000, end=20000).allocate("b") == 10001
+
+    def test_reconcile_adopts_docker_ports(self, tmp_path):
+        """Test that ports published by other containers are never handed out"""
+        allocator = PortAllocator(str(tmp_path), start=10000, end=10002)
+
+        result = allocator.reconcile({10000: "web", 10001: "db", 80: "proxy"})
+
+        assert result == {"released": 0, "adopted": 2}
+        assert allocator.reserved()[10000]["kind"] == KIND_DOCKER
+        assert allocator.allocate("a") == 10002
+
+    def test_reconcile_releases_exited_containers(self, tmp_path):
+        """Test that ports of exited containers are released after the grace period"""
+        allocator = PortAllocator(str(tmp_path), start=10000, end=10002, grace=60.0)
+        running = allocator.allocate("running")
+        exited = allocator.allocate("exited")
+
+        # Fresh reservations survive even though Docker has not published them yet
+        assert allocator.reconcile({running: "running"})["released"] == 0
+
+        with patch("shared.utils.port_allocator.time.time", return_value=2e9):
+            result = allocator.reconcile({running: "running"})
+
+        assert result["released"] == 1
+        assert set(allocator.reserved()) == {running}
+        assert exited not in allocator.reserved()
+
+    def test_host_ports_expire(self, tmp_path):
+        """Test that ports bound outside Docker are skipped until their TTL expires"""
+        allocator = PortAllocator(str(tmp_path), start=10000, end=10001, host_ttl=60.0)
+        allocator.mark_unavailable(10000)
+
+        assert allocator.reserved()[10000]["kind"] == KIND_HOST
+        assert allocator.allocate("a") == 10001
+
+        with patch("shared.utils.port_allocator.time.time", return_value=2e9):
+            allocator.reconcile({10001: "a"})
+
+        assert set(allocator.reserved()) == {10001}
@@ -0,0 +1,132 @@
+"""
+Tests for signed client tokens
+"""
+import pytest
+
+from shared.utils.signed_token import (
+    TokenSigner, TokenError, containers_version, is_signed_token, parse_keys
+)
+
+KEYS = [("k2", b"second-secret-0123456789"), ("k1", b"first-secret-0123456789")]
+
+class FakeClock:
+    """Settable wall clock"""
+
+    def __init__(self, now=1000000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture
+def signer(clock):
+    return TokenSigner(KEYS, ttl=3600, clock=clock)
+
+class TestParseKeys:
+    """Test suite for signing key parsing"""
+
+    def test_parse_keys(self):
+        """Test key order is kept, so the first key is active"""
+        keys = parse_keys("k2:second-secret-0123456789, k1:first-secret-0123456789")
+        assert keys == KEYS
+        assert parse_keys("") == []
+
+    def test_parse_keys_rejects_bad_entries(self):
+        """Test malformed entries and short secrets"""
+        with pytest.raises(ValueError):
+            parse_keys("no-separator")
+        with pytest.raises(ValueError):
+            parse_keys("k1:short")
+        with pytest.raises(ValueError):
+            parse_keys("k.1:first-secret-0123456789")
+
+class TestTokenSigner:
+    """Test suite for TokenSigner"""
+
+    def test_issue_and_verify(self, signer):
+        """Test a token round trip"""
+        token, claims = signer.issue("alice", "uuid-1", "abc")
+
+        assert is_signed_token(token)
+        assert not is_signed_token("123e4567-e89b-12d3-a456-426614174000")
+        verified = signer.verify(token)
+        assert verified["sub"] == "alice"
+        assert verified["uid"] == "uuid-1"
+        assert verified["cv"] == "abc"
+        assert verified["exp"] == claims["exp"] == 1000000 + 3600
+        assert verified["kid"] == "k2"
+
+    def test_tampered_token_rejected(self, signer):
+        """Test that changed payloads and foreign keys fail the MAC check"""
+        token, _ = signer.issue("alice", "uuid-1", "abc")
+        other, _ = signer.issue("bob", "uuid-2", "abc")
+        prefix, kid, _, mac = token.split('.')
+
+        with pytest.raises(TokenError):
+            signer.verify(f"{prefix}.{kid}.{other.split('.')[2]}.{mac}")
+        with pytest.raises(TokenError):
+            signer.verify(f"{prefix}.k1.{token.split('.')[2]}.{mac}")
+        with pytest.raises(TokenError):
+            signer.verify("lsl1.k2.payload")
+        with pytest.raises(TokenError):
+            TokenSigner([("k2", b"another-secret-0123456789")]).verify(token)
+
+    def test_expired_token_rejected(self, signer, clock):
+        """Test expiry"""
+        token, _ = signer.issue("alice", "uuid-1", "abc")
+        clock.now += 3600
+
+        with pytest.raises(TokenError, match="expired"):
+            signer.verify(token)
+
+    def test_key_rotation(self, clock):
+        """Test tokens of the previous key verify after rotation, and are refreshed"""
+        old_signer = TokenSigner(list(reversed(KEYS)), clock=clock)
+        token, _ = old_signer.issue("alice", "uuid-1", "abc")
+
+        signer = TokenSigner(KEYS, clock=clock)
+        claims = signer.verify(token)
+        assert claims["kid"] == "k1"
+        assert signer.needs_refresh(claims, "abc")
+
+        # Once the old key is removed its tokens are rejected
+        with pytest.raises(TokenError, match="Unknown token key"):
+            TokenSigner(KEYS[:1], clock=clock).verify(token)
+
+    def test_needs_refresh(self, signer, clock):
+        """Test refresh near expiry and after container changes"""
+        token, _ = signer.issue("alice", "uuid-1", "abc")
+        claims = signer.verify(token)
+
+        assert not signer.needs_refresh(claims, "abc")
+        assert signer.needs_refresh(claims, "def")
+        clock.now += 3000
+        assert signer.needs_refresh(claims, "abc")
+
+    def test_revoke(self, signer, clock):
+        """Test the deny-list and that it forgets entries of expired tokens"""
+        token, claims = signer.issue("alice", "uuid-1", "abc")
+        signer.revoke(claims["jti"], claims["exp"])
+
+        with pytest.raises(TokenError, match="revoked"):
+            signer.verify(token)
+
+        clock.now += 3600
+        signer.revoke("other")
+        assert signer.revoked() == {"other"}
+
+class TestContainersVersion:
+    """Test suite for containers_version"""
+
+    def test_version_tracks_allowed_containers(self):
+        """Test the version changes with the allowed containers and their definitions"""
+        containers = {"a": {"image": "alpine"}, "b": {"image": "debian"}}
+        version = containers_version(["a"], containers)
+
+        assert version == containers_version(["a"], dict(containers))
+        assert version != containers_version(["a", "b"], containers)
+        assert version != containers_version(["a"], {"a": {"image": "alpine:3.19"}})
@@ -0,0 +1,258 @@
+"""
+Tests for the YAML logger
+"""
+import json
+import logging
+import threading
+from unittest.mock import patch
+
+import yaml
+import pytest
+
+from shared.utils import yaml_logger
+from shared.utils.yaml_logger import (
+    setup_logger, get_log_stats, flush_loggers, LogQueueHandler, DeferredRotatingFileHandler,
+    YAMLFormatter, OVERFLOW_DROP_NEW, OVERFLOW_DROP_OLDEST, LOG_FORMAT_JSONL,
+    LogRateLimiter, flush_expired_summaries
+)
+
+def make_record(message, level=logging.INFO):
+    """Build a log record"""
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+@pytest.fixture
+def queued_logger(tmp_path, request):
+    """Queued logger writing to a temporary file"""
+    name = f"test_queued_{request.node.name}"
+    log_file = tmp_path / "queued.log"
+    logger = setup_logger(name, str(log_file), queued=True, batch_size=8)
+    yield logger, log_file
+    yaml_logger._listeners.pop(name).stop()
+    logger.handlers.clear()
+
+class TestQueuedLogger:
+    """Test suite for the queue-based logging mode"""
+
+    def test_records_written_in_batches(self, queued_logger):
+        """Test that every record is written, as YAML, in fewer writes than records"""
+        logger, log_file = queued_logger
+        for i in range(20):
+            logger.info("request %d", i, client="abc")
+        flush_loggers()
+
+        documents = list(yaml.safe_load_all(log_file.read_text()))
+        assert [doc["message"] for doc in documents] == [f"request {i}" for i in range(20)]
+        assert documents[0]["client"] == "abc"
+        stats = get_log_stats(logger.name)
+        assert stats["enqueued"] == stats["written"] == 20
+        assert stats["dropped"] == 0
+        assert stats["batches"] >= 3
+
+    def test_formatting_happens_off_the_calling_thread(self, queued_logger):
+        """Test that the calling thread never runs the YAML formatter"""
+        logger, _ = queued_logger
+        threads = []
+        original = YAMLFormatter.format
+
+        def record_thread(self, record):
+            threads.append(threading.get_ident())
+            return original(self, record)
+
+        with patch.object(YAMLFormatter, "format", record_thread):
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.exception("failed")
+            flush_loggers()
+
+        assert threads and threading.get_ident() not in threads
+
+    def test_loggers_of_one_file_share_its_writer(self, tmp_path):
+        """Test that loggers writing one file share one queue, writer thread and file handler"""
+        log_file = tmp_path / "shared.log"
+        first = setup_logger("test_shared_first", str(log_file), queued=True)
+        second = setup_logger("test_shared_second", str(log_file), queued=True)
+        plain = setup_logger("test_shared_plain", str(log_file))
+        try:
+            assert first.handlers == second.handlers
+            assert yaml_logger._listeners["test_shared_first"] is yaml_logger._listeners["test_shared_second"]
+            assert plain.handlers == yaml_logger._listeners["test_shared_first"].handlers
+
+            first.info("from first")
+            second.info("from second")
+            flush_loggers()
+
+            assert [doc["logger"] for doc in yaml.safe_load_all(log_file.read_text())] == [
+                "test_shared_first", "test_shared_second"]
+        finally:
+            yaml_logger._listeners.pop("test_shared_first").stop()
+            yaml_logger._listeners.pop("test_shared_second")
+            for logger in (first, second, plain):
+                logger.handlers.clear()
+
+    def test_unqueued_logger_has_no_stats(self, tmp_path):
+        """Test that plain loggers report no queue counters"""
+        setup_logger("test_plain_logger", str(tmp_path / "plain.log"))
+        assert get_log_stats("test_plain_logger") is None
+
+class TestLogQueueHandler:
+    """Test suite for the bounded queue and its overflow policies"""
+
+    def test_drop_new(self):
+        """Test that a full queue drops incoming records"""
+        handler = LogQueueHandler(max_size=2, overflow=OVERFLOW_DROP_NEW)
+        for message in ("a", "b", "c"):
+            handler.handle(make_record(message))
+
+        assert [handler.queue.get_nowait().msg for _ in range(2)] == ["a", "b"]
+        assert handler.counters == {"enqueued": 2, "dropped": 1}
+
+    def test_drop_oldest(self):
+        """Test that a full queue drops its oldest record"""
+        handler = LogQueueHandler(max_size=2, overflow=OVERFLOW_DROP_OLDEST)
+        for message in ("a", "b", "c"):
+            handler.handle(make_record(message))
+
+        assert [handler.queue.get_nowait().msg for _ in range(2)] == ["b", "c"]
+        assert handler.counters == {"enqueued": 3, "dropped": 1}
+
+    def test_unknown_policy(self):
+        """Test that an unknown overflow policy is rejected"""
+        with pytest.raises(ValueError):
+            LogQueueHandler(overflow="spill")
+
+class TestDeferredRotatingFileHandler:
+    """Test suite for batched writes"""
+
+    def test_emit_batch_rolls_over(self, tmp_path):
+        """Test that a batch larger than maxBytes is split across rotated files"""
+        log_file = tmp_path / "logs" / "batch.log"
+        handler = DeferredRotatingFileHandler(str(log_file), maxBytes=400, backupCount=10)
+        handler.setFormatter(YAMLFormatter())
+        handler.emit_batch([make_record(f"message {i}") for i in range(6)])
+        handler.close()
+
+        files = sorted(tmp_path.joinpath("logs").iterdir())
+        assert len(files) > 1
+        messages = [doc["message"] for path in files for doc in yaml.safe_load_all(path.read_text())]
+        assert sorted(messages) == [f"message {i}" for i in range(6)]
+        assert all(path.stat().st_size < 800 for path in files)
+
+class TestJSONLinesFormat:
+    """Test suite for the JSON Lines log format"""
+
+    def test_jsonl_logger(self, tmp_path):
+        """Test one JSON object per line, timestamp first"""
+        log_file = tmp_path / "server.jsonl"
+        logger = setup_logger("test_jsonl_logger", str(log_file), log_format=LOG_FORMAT_JSONL)
+        logger.warning("Rate limit exceeded", client="abc", retry={"after": 5})
+        try:
+            raise KeyError("x")
+        except KeyError:
+            logger.error("failed", exc_info=True)
+        for handler in logger.handlers:
+            handler.close()
+
+        lines = log_file.read_text().splitlines()
+        assert len(lines) == 2
+        assert lines[0].startswith('{"timestamp":"')
+        first = json.loads(lines[0])
+        assert first["level"] == "WARNING"
+        assert first["client"] == "abc" and first["retry"] == {"after": 5}
+        assert json.loads(lines[1])["exception"]["type"] == "KeyError"
+
+    def test_unknown_format(self, tmp_path):
+        """Test an unknown log format is rejected"""
+        with pytest.raises(ValueError):
+            setup_logger("test_unknown_format", str(tmp_path / "x.log"), log_format="xml")
+
+class TestRateLimitedLogging:
+    """Test suite for per-key rate-limited logging"""
+
+    @pytest.fixture
+    def limited_logger(self, tmp_path, request):
+        """JSON Lines logger with a controllable clock"""
+        log_file = tmp_path / "limited.log"
+        logger = setup_logger(f"test_limited_{request.node.name}", str(log_file), log_format=LOG_FORMAT_JSONL)
+        now = [0.0]
+        logger.rate_limiter = LogRateLimiter(clock=lambda: now[0])
+
+        def read():
+            for handler in logger.handlers:
+                handler.flush()
+            return [json.loads(line) for line in log_file.read_text().splitlines()]
+
+        yield logger, now, read
+        logger.handlers.clear()
+
+    def test_limit_per_key_and_summary(self, limited_logger):
+        """Test at most `limit` messages per key per window, then one summary"""
+        logger, now, read = limited_logger
+        for i in range(10):
+            logger.limited(logging.WARNING, "rate_limit:a", "Rate limit exceeded %d", i, limit=3)
+        logger.limited(logging.WARNING, "rate_limit:b", "Rate limit exceeded b", limit=3)
+
+        assert [r["message"] for r in read()] == ["Rate limit exceeded 0", "Rate limit exceeded 1",
+                                                  "Rate limit exceeded 2", "Rate limit exceeded b"]
+
+        now[0] = 61.0
+        assert logger.limited(logging.WARNING, "rate_limit:a", "Rate limit exceeded again", limit=3)
+
+        records = read()[4:]
+        assert records[0]["message"] == "Suppressed 7 similar messages for rate_limit:a"
+        assert records[0]["level"] == "WARNING"
+        assert records[0]["suppressed"] == 7
+        assert records[1]["message"] == "Rate limit exceeded again"
+
+    def test_sample_every(self, limited_logger):
+        """Test every Nth message over the limit is still logged"""
+        logger, _, read = limited_logger
+        logged = [logger.limited(logging.INFO, "ping:a", "Ping", limit=2, sample_every=5) for _ in range(12)]
+
+        assert sum(logged) == 4
+        assert logged[6] and logged[11]
+
+    def test_flush_suppressed(self, limited_logger):
+        """Test pending summaries are logged on flush"""
+        logger, _, read = limited_logger
+        for _ in range(3):
+            logger.limited(logging.ERROR, "unknown_uuid", "Unknown UUID", limit=1)
+        logger.flush_suppressed()
+
+        assert read()[-1]["message"] == "Suppressed 2 similar messages for unknown_uuid"
+
+    def test_summary_logged_when_window_ends(self, limited_logger):
+        """Test a burst that stops is summarized once its window ends, without another message"""
+        logger, now, read = limited_logger
+        for _ in range(4):
+            logger.limited(logging.WARNING, "rate_limit:a", "Rate limit exceeded", limit=1)
+        assert yaml_logger._summary_thread.is_alive()
+
+        flush_expired_summaries()
+        assert len(read()) == 1
+
+        now[0] = 61.0
+        flush_expired_summaries()
+        assert read()[-1]["message"] == "Suppressed 3 similar messages for rate_limit:a"
+        flush_expired_summaries()
+        assert len(read()) == 2
+
+    def test_disabled_level_not_counted(self, limited_logger):
+        """Test messages below the logger level are neither logged nor counted"""
+        logger, _, read = limited_logger
+        logger.setLevel(logging.INFO)
+
+        assert not logger.limited(logging.DEBUG, "ping:a", "Ping", limit=1)
+        assert logger.rate_limiter.drain() == []
+
+    def test_max_keys_bounds_memory(self):
+        """Test the oldest windows are closed once too many keys are tracked"""
+        limiter = LogRateLimiter(max_keys=2, clock=lambda: 0.0)
+        limiter.check("a", logging.WARNING, 1, 60)
+        limiter.check("a", logging.WARNING, 1, 60)
+        limiter.check("b", logging.WARNING, 1, 60)
+
+        allowed, closed = limiter.check("c", logging.WARNING, 1, 60)
+
+        assert allowed
+        assert closed == [("a", logging.WARNING, 1)]
@@ -6,12 +6,64 @@ import os
 import lsl  # Adjust the import if needed (e.g., `import .lsl` for Python 3.3+)
 #main tests
 class TestLSL(unittest.TestCase):
+    @patch("lsl.start_bulk", return_value=0)
+    def test_bulk_arguments_validated(self, mock_start_bulk):
+        import io
+        import tempfile
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+            f.write("- template: [unclosed\n")
+        try:
+            for argv in (["-n", "alpine", "--count", "0"], ["-n", "alpine", "--count", "-5"],
+                         ["-n", "alpine", "--user", "alice"], ["--bulk", f.name]):
+                with patch("sys.argv", ["lsl.py"] + argv), patch("sys.stderr", new_callable=io.StringIO):
+                    with self.assertRaises(SystemExit) as cm:
+                        lsl.main()
+                self.assertEqual(cm.exception.code, 2, argv)
+        finally:
+            os.unlink(f.name)
+        mock_start_bulk.assert_not_called()
+
+        with patch("sys.argv", ["lsl.py", "-n", "alpine", "--count", "2", "--user", "alice"]):
+            with self.assertRaises(SystemExit):
+                lsl.main()
+        specs = mock_start_bulk.call_args[0][0]
+        self.assertEqual([spec["user"] for spec in specs], ["alice", "alice"])
+
+    def test_load_bulk_specs_rejects_bad_count(self):
+        import tempfile
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+            f.write("- template: ubuntu\n  count: 2\n- template: alpine\n  count: many\n")
+        try:
+            with self.assertRaisesRegex(ValueError, r"Entry 2 \(alpine\).*'many'"):
+                lsl.load_bulk_specs(f.name)
+        finally:
+            os.unlink(f.name)
     @patch("builtins.open", new_callable=mock_open, read_data="alpine = alpine:latest\nnginx = nginx:stable")
     def test_load_config(self, mock_file):
         config = lsl.load_config()
         self.assertEqual(config["alpine"], "alpine:latest")
         self.assertEqual(config["nginx"], "nginx:stable")
 
+    def test_load_config_warns_once_about_stray_containers_txt(self):
+        import io
+        import tempfile
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "containers.txt"), "w") as f:
+                f.write("alpine = alpine:latest\n")
+            os.chdir(tmp)
+            try:
+                lsl._stray_catalog_warned = False
+                with patch.dict(os.environ, {"LSL_CONTAINERS_FILE": os.path.join(tmp, "elsewhere.txt")}), \
+                        patch("client.catalog.ContainerCatalog.images", return_value={}), \
+                        patch("sys.stderr", new_callable=io.StringIO) as stderr:
+                    lsl.load_config()
+                    lsl.load_config()
+            finally:
+                os.chdir(cwd)
+        self.assertEqual(stderr.getvalue().count("ignoring"), 1)
+        self.assertIn("elsewhere.txt", stderr.getvalue())
+
     @patch("argparse.ArgumentParser.parse_args")
     def test_parse_args_list(self, mock_parse_args):
         mock_parse_args.return_value = type('Args', (), {
@@ -24,19 +76,32 @@ class TestLSL(unittest.TestCase):
             lsl.main() 
             self.assertIn("alpine: alpine:latest", log.output[0])
 
-    @patch("subprocess.run")
+    @patch("lsl.get_engine")
     @patch("os.makedirs")
-    def test_start_container(self, mock_makedirs, mock_run):
+    def test_start_container(self, mock_makedirs, mock_get_engine):
+        mock_get_engine.return_value.run_interactive.return_value = 0
         with patch("lsl.load_config", return_value={"alpine": "alpine:latest"}):
             with patch("sys.argv", ["lsl.py", "-n", "alpine", "--net", "-p"]):
                 lsl.main()
-                expected_cmd = [
-                    'docker', 'run', '-it', '--rm',
-                    '--network', 'host',
-                    f'-v {os.getcwd()}/.lsl_persist_alpine:/data',
-                    'alpine:latest', '/bin/bash'
-                ]
-                mock_run.assert_called_with(expected_cmd, check=True)
+                mock_get_engine.return_value.run_interactive.assert_called_with(
+                    'alpine:latest', ['/bin/bash'],
+                    binds=[f'{os.getcwd()}/.lsl_persist_alpine:/data'],
+                    network_mode='host'
+                )
+
+    @patch("lsl.get_port_allocator")
+    @patch("lsl.setup_host_shared_container", return_value=(10001, "cid"))
+    @patch("lsl.get_engine")
+    def test_share_host_releases_port_when_session_ends(self, mock_get_engine, mock_setup, mock_allocator):
+        mock_get_engine.return_value.api.wait.side_effect = KeyboardInterrupt
+        with patch("lsl.load_config", return_value={"alpine": "alpine:latest"}):
+            with patch("sys.argv", ["lsl.py", "-n", "alpine", "--share", "s1", "--host"]):
+                with self.assertRaises(SystemExit) as cm:
+                    lsl.main()
+        self.assertEqual(cm.exception.code, 0)
+        mock_setup.assert_called_once_with("alpine:latest", "s1", {})
+        mock_get_engine.return_value.remove.assert_called_once_with("cid")
+        mock_allocator.return_value.release_owner.assert_called_once_with("lsl_s1")
 
     def test_invalid_container_name(self):
         with patch("sys.argv", ["lsl.py", "-n", "invalid"]):